@@ -0,0 +1,3 @@
+from exporters.autoscaling.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,11 @@
+from exporters.registry import Counter
+
+AUTOSCALING_REQUESTS = Counter(
+    "autoscaling_requests",
+    "Autoscaling signal requests served, by route and status code",
+    ["route", "code"],
+)
+
+METRICS = [
+    AUTOSCALING_REQUESTS,
+]
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from prometheus_client import make_wsgi_app
+from prometheus_client.exposition import ThreadingWSGIServer
+
+from exporters.autoscaling.metrics import AUTOSCALING_REQUESTS
+from exporters.autoscaling.signals import SIGNAL_NAMES, SIGNALS, ScalingSignals
+
+MODELS_PATH = "/autoscaling/v1/models"
+EXTERNAL_METRICS_API = "external.metrics.k8s.io/v1beta1"
+EXTERNAL_METRICS_PATH = f"/apis/{EXTERNAL_METRICS_API}/namespaces/"
+
+StartResponse = Callable[[str, list[tuple[str, str]]], Any]
+WSGIApp = Callable[[dict[str, Any], StartResponse], Iterable[bytes]]
+
+
+def quantity(value: float) -> str:
+    return f"{round(value * 1000)}m"
+
+
+def rfc3339(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def selected_model(label_selector: str) -> str | None:
+    for requirement in label_selector.split(","):
+        key, _, value = requirement.partition("=")
+        if key.strip() == "model" and value:
+            return value.lstrip("=").strip()
+    return None
+
+
+def not_found(message: str) -> dict[str, Any]:
+    return {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "status": "Failure",
+        "message": message,
+        "reason": "NotFound",
+        "code": 404,
+    }
+
+
+class SignalsApp:
+    def __init__(self, signals: ScalingSignals = SIGNALS, metrics_app: WSGIApp | None = None):
+        self.signals = signals
+        self.metrics_app = metrics_app or make_wsgi_app()
+
+    def __call__(self, environ: dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        path = environ.get("PATH_INFO", "")
+        if path == MODELS_PATH or path.startswith(f"{MODELS_PATH}/"):
+            route = "models"
+            code, body = self.models(path[len(MODELS_PATH) + 1 :])
+        elif path.startswith(EXTERNAL_METRICS_PATH):
+            route = "external_metrics"
+            code, body = self.external_metrics(
+                path[len(EXTERNAL_METRICS_PATH) :], environ.get("QUERY_STRING", "")
+            )
+        else:
+            return self.metrics_app(environ, start_response)
+
+        AUTOSCALING_REQUESTS.labels(route=route, code=str(code)).inc()
+        data = json.dumps(body).encode()
+        start_response(
+            f"{code} {HTTPStatus(code).phrase}",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(data)))],
+        )
+        return [data]
+
+    def models(self, model: str) -> tuple[int, dict[str, Any]]:
+        models = self.signals.models()
+        if not model:
+            return 200, {
+                "timestamp": time.time(),
+                "models": {name: signals.as_dict() for name, signals in models.items()},
+            }
+        signals = models.get(model)
+        if signals is None:
+            return 404, not_found(f"no recent signals for model {model}")
+        return 200, signals.as_dict()
+
+    def external_metrics(self, path: str, query: str) -> tuple[int, dict[str, Any]]:
+        namespace, _, metric = path.partition("/")
+        if not namespace or metric not in SIGNAL_NAMES:
+            return 404, not_found(f"unknown external metric {metric}")
+        selector = parse_qs(query).get("labelSelector", [""])[0]
+        model = selected_model(selector)
+        items = []
+        for name, signals in self.signals.models().items():
+            value = signals.value(metric)
+            if value is None or (model is not None and name != model):
+                continue
+            items.append(
+                {
+                    "metricName": metric,
+                    "metricLabels": {"model": name},
+                    "timestamp": rfc3339(signals.timestamp),
+                    "value": quantity(value),
+                }
+            )
+        return 200, {
+            "kind": "ExternalMetricValueList",
+            "apiVersion": EXTERNAL_METRICS_API,
+            "metadata": {},
+            "items": items,
+        }
+
+
+class SilentHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def start_http_server(
+    port: int, addr: str = "0.0.0.0", signals: ScalingSignals = SIGNALS
+) -> ThreadingWSGIServer:
+    server = make_server(
+        addr, port, SignalsApp(signals), ThreadingWSGIServer, handler_class=SilentHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from exporters.config import settings
+from exporters.queueing.analyzer import littles_law_wait
+
+MAX_SIGNAL_VALUE = 1e9
+SIGNAL_NAMES = (
+    "queue_depth",
+    "kv_cache_usage",
+    "predicted_wait_seconds",
+    "tokens_per_second",
+    "arrival_rate",
+)
+
+
+@dataclass(frozen=True)
+class TargetSignals:
+    backend: str
+    endpoint: str
+    model: str
+    queue_depth: float
+    kv_cache_usage: float | None = None
+    arrival_rate: float | None = None
+    completion_rate: float | None = None
+    tokens_per_second: float | None = None
+    updated: float = field(default_factory=time.monotonic)
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class ModelSignals:
+    model: str
+    targets: int
+    queue_depth: float
+    kv_cache_usage: float | None
+    predicted_wait_seconds: float | None
+    tokens_per_second: float | None
+    arrival_rate: float | None
+    timestamp: float
+    age_seconds: float
+
+    def value(self, name: str) -> float | None:
+        value: float | None = getattr(self, name)
+        if value is None or math.isnan(value):
+            return None
+        return max(-MAX_SIGNAL_VALUE, min(value, MAX_SIGNAL_VALUE))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "targets": self.targets,
+            **{name: self.value(name) for name in SIGNAL_NAMES},
+            "timestamp": self.timestamp,
+            "age_seconds": self.age_seconds,
+        }
+
+
+def _total(values: list[float | None]) -> float | None:
+    present = [value for value in values if value is not None]
+    return sum(present) if present else None
+
+
+def predicted_wait(queue_depth: float, completion_rate: float) -> float:
+    wait = littles_law_wait(queue_depth, completion_rate)
+    return math.inf if wait is None else wait
+
+
+def aggregate(model: str, targets: list[TargetSignals], now: float) -> ModelSignals:
+    queue_depth = sum(target.queue_depth for target in targets)
+    kv_cache = [target.kv_cache_usage for target in targets if target.kv_cache_usage is not None]
+    arrival_rate = _total([target.arrival_rate for target in targets])
+    completion_rate = _total([target.completion_rate for target in targets])
+    newest = max(targets, key=lambda target: target.updated)
+    return ModelSignals(
+        model=model,
+        targets=len(targets),
+        queue_depth=queue_depth,
+        kv_cache_usage=sum(kv_cache) / len(kv_cache) if kv_cache else None,
+        predicted_wait_seconds=(
+            predicted_wait(queue_depth, completion_rate) if completion_rate is not None else None
+        ),
+        tokens_per_second=_total([target.tokens_per_second for target in targets]),
+        arrival_rate=arrival_rate,
+        timestamp=newest.timestamp,
+        age_seconds=max(0.0, now - newest.updated),
+    )
+
+
+class ScalingSignals:
+    def __init__(self) -> None:
+        self._targets: dict[str, TargetSignals] = {}
+        self._lock = threading.Lock()
+
+    def update(self, signals: TargetSignals) -> None:
+        with self._lock:
+            self._targets[signals.endpoint] = signals
+
+    def remove(self, endpoint: str) -> None:
+        with self._lock:
+            self._targets.pop(endpoint, None)
+
+    def models(
+        self, max_age: float | None = None, now: float | None = None
+    ) -> dict[str, ModelSignals]:
+        now = time.monotonic() if now is None else now
+        max_age = settings.autoscaling_max_age if max_age is None else max_age
+        with self._lock:
+            targets = list(self._targets.values())
+        by_model: dict[str, list[TargetSignals]] = {}
+        for target in targets:
+            if max_age <= 0 or now - target.updated <= max_age:
+                by_model.setdefault(target.model, []).append(target)
+        return {model: aggregate(model, group, now) for model, group in sorted(by_model.items())}
+
+
+SIGNALS = ScalingSignals()
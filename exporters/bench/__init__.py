@@ -0,0 +1,3 @@
+from exporters.bench.runner import BenchmarkRunner
+
+__all__ = ["BenchmarkRunner"]
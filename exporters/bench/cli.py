@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import logging
+import socket
+import sys
+
+import structlog
+from prometheus_client import start_http_server
+
+from exporters.bench.results import build_results, format_report, write_results
+from exporters.bench.runner import MODES, BenchmarkRunner
+from exporters.bench.workload import load_workload, synthetic_workload
+from exporters.config import settings
+from exporters.probe.prober import record_timing
+from exporters.probe.stream import BACKENDS, StreamTiming
+from exporters.remote_write.writer import RemoteWriter
+from exporters.simulator.server import MockInferenceServer
+
+logger = structlog.get_logger()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="token-path-bench",
+        description="Drive a vLLM/TGI streaming endpoint and measure TTFT/ITL under load",
+    )
+    target = parser.add_argument_group("target")
+    target.add_argument("--endpoint", default=None, help="Inference server base URL")
+    target.add_argument("--backend", choices=BACKENDS, default="vllm")
+    target.add_argument("--model", default="unknown", help="Model id (default: discovered)")
+    target.add_argument(
+        "--mock", action="store_true", help="Run against the bundled mock inference server"
+    )
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--mode", choices=MODES, default="closed")
+    load.add_argument("--rate", type=float, default=1.0, help="Open-loop arrivals per second")
+    load.add_argument("--concurrency", type=int, default=8, help="Closed-loop concurrency")
+    load.add_argument("--num-requests", type=int, default=100)
+    load.add_argument("--duration", type=float, default=None, help="Stop after N seconds")
+    load.add_argument("--seed", type=int, default=None)
+
+    workload = parser.add_argument_group("workload")
+    workload.add_argument(
+        "--workload",
+        default=None,
+        help="JSONL file with 'prompt' or 'prompt_tokens' and 'max_tokens' per line",
+    )
+    workload.add_argument("--prompt-tokens", type=int, default=128)
+    workload.add_argument("--max-tokens", type=int, default=128)
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", default=None, help="Write columnar results to this file")
+    output.add_argument("--slo-ttft", type=float, default=None, help="TTFT SLO in seconds")
+    output.add_argument("--slo-itl", type=float, default=None, help="ITL SLO in seconds")
+    output.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve live probe_* metrics on this port"
+    )
+    output.add_argument(
+        "--remote-write-url", default=None, help="Push live probe_* metrics via remote write"
+    )
+    output.add_argument(
+        "--push-interval", type=float, default=5.0, help="Seconds between remote-write pushes"
+    )
+    return parser
+
+
+async def push_periodically(writer: RemoteWriter, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        writer.push()
+
+
+async def run_benchmark(args: argparse.Namespace) -> int:
+    mock = None
+    endpoint = args.endpoint
+    if args.mock:
+        mock = MockInferenceServer(seed=args.seed).start()
+        endpoint = mock.endpoint
+    elif endpoint is None:
+        endpoint = settings.tgi_endpoint if args.backend == "tgi" else settings.vllm_endpoint
+
+    if args.workload:
+        workload = load_workload(args.workload, default_max_tokens=args.max_tokens)
+    else:
+        workload = synthetic_workload(args.prompt_tokens, args.max_tokens)
+
+    remote_writer = None
+    pusher = None
+    if args.remote_write_url:
+        remote_writer = RemoteWriter(
+            url=args.remote_write_url,
+            external_labels={"job": "token-path-bench", "instance": socket.gethostname()},
+        )
+        remote_writer.start()
+        pusher = asyncio.create_task(push_periodically(remote_writer, args.push_interval))
+
+    runner: BenchmarkRunner
+
+    def on_result(timing: StreamTiming) -> None:
+        labels = {"model": runner.model, "endpoint": runner.endpoint, "backend": args.backend}
+        record_timing(timing, labels)
+
+    live = args.metrics_port is not None or remote_writer is not None
+    runner = BenchmarkRunner(
+        endpoint=endpoint,
+        workload=workload,
+        backend=args.backend,
+        model=args.model,
+        mode=args.mode,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        num_requests=args.num_requests if args.duration is None else None,
+        duration=args.duration,
+        seed=args.seed,
+        on_result=on_result if live else None,
+    )
+    try:
+        records = await runner.run()
+    finally:
+        if pusher is not None:
+            pusher.cancel()
+        if remote_writer is not None:
+            remote_writer.push()
+            await remote_writer.stop()
+        if mock is not None:
+            mock.stop()
+
+    results = build_results(
+        records,
+        origin=runner.started_at,
+        meta={
+            "endpoint": runner.endpoint,
+            "backend": args.backend,
+            "model": runner.model,
+            "mode": args.mode,
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "duration": runner.finished_at - runner.started_at,
+        },
+    )
+    if args.output:
+        write_results(args.output, results)
+    print(format_report(results, slo_ttft=args.slo_ttft, slo_itl=args.slo_itl))
+    return 0 if results.ok_indices() else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=settings.log_level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.metrics_port is not None:
+        start_http_server(args.metrics_port)
+    return asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from exporters.probe.stream import StreamTiming
+
+MAGIC = b"TPBENCH1"
+
+COLUMN_TYPES = {
+    "scheduled": "d",
+    "start": "d",
+    "ttft": "d",
+    "e2e": "d",
+    "prompt_chars": "q",
+    "max_tokens": "q",
+    "output_tokens": "q",
+    "error": "q",
+    "token_offsets": "q",
+    "token_times": "d",
+}
+
+
+@dataclass
+class RequestRecord:
+    scheduled: float
+    prompt_chars: int
+    max_tokens: int
+    timing: StreamTiming
+
+
+@dataclass
+class BenchmarkResults:
+    columns: dict[str, array[Any]]
+    meta: dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.columns["start"])
+
+    def token_times(self, index: int) -> array[float]:
+        offsets = self.columns["token_offsets"]
+        return self.columns["token_times"][offsets[index] : offsets[index + 1]]
+
+    def ok_indices(self) -> list[int]:
+        return [i for i, code in enumerate(self.columns["error"]) if code < 0]
+
+    def ttfts(self) -> list[float]:
+        return [self.columns["ttft"][i] for i in self.ok_indices()]
+
+    def itls(self) -> list[float]:
+        values: list[float] = []
+        for i in self.ok_indices():
+            times = self.token_times(i)
+            values.extend(times[j] - times[j - 1] for j in range(1, len(times)))
+        return values
+
+    def e2es(self) -> list[float]:
+        return [self.columns["e2e"][i] for i in self.ok_indices()]
+
+    def output_token_rates(self) -> list[float]:
+        rates = []
+        for i in self.ok_indices():
+            times = self.token_times(i)
+            if len(times) > 1 and times[-1] > times[0]:
+                rates.append((len(times) - 1) / (times[-1] - times[0]))
+        return rates
+
+
+def build_results(
+    records: list[RequestRecord], origin: float, meta: dict[str, Any] | None = None
+) -> BenchmarkResults:
+    columns: dict[str, array[Any]] = {name: array(t) for name, t in COLUMN_TYPES.items()}
+    errors: list[str] = []
+    columns["token_offsets"].append(0)
+    for record in records:
+        timing = record.timing
+        columns["scheduled"].append(record.scheduled - origin)
+        columns["start"].append(timing.start - origin)
+        columns["ttft"].append(timing.ttft if timing.ttft is not None else math.nan)
+        columns["e2e"].append(timing.e2e)
+        columns["prompt_chars"].append(record.prompt_chars)
+        columns["max_tokens"].append(record.max_tokens)
+        columns["output_tokens"].append(timing.tokens)
+        if timing.ok:
+            columns["error"].append(-1)
+        else:
+            error = timing.error or "Unknown"
+            if error not in errors:
+                errors.append(error)
+            columns["error"].append(errors.index(error))
+        columns["token_times"].extend(t - timing.start for t in timing.token_times)
+        columns["token_offsets"].append(len(columns["token_times"]))
+    return BenchmarkResults(columns=columns, meta={**(meta or {}), "errors": errors})
+
+
+def _write_column(f: BinaryIO, values: array[Any]) -> None:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def write_results(path: str | Path, results: BenchmarkResults) -> None:
+    header = json.dumps(
+        {
+            "meta": results.meta,
+            "columns": [
+                {"name": name, "type": values.typecode, "length": len(values)}
+                for name, values in results.columns.items()
+            ],
+        }
+    ).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for values in results.columns.values():
+            _write_column(f, values)
+
+
+def read_results(path: str | Path) -> BenchmarkResults:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a token-path-bench results file")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len))
+        columns: dict[str, array[Any]] = {}
+        for column in header["columns"]:
+            values = array(column["type"])
+            values.fromfile(f, column["length"])
+            if sys.byteorder == "big":
+                values.byteswap()
+            columns[column["name"]] = values
+    return BenchmarkResults(columns=columns, meta=header["meta"])
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def format_report(
+    results: BenchmarkResults,
+    quantiles: tuple[float, ...] = (0.5, 0.9, 0.95, 0.99),
+    slo_ttft: float | None = None,
+    slo_itl: float | None = None,
+) -> str:
+    total = len(results)
+    ok = results.ok_indices()
+    duration = float(results.meta.get("duration", 0.0))
+    output_tokens = sum(results.columns["output_tokens"][i] for i in ok)
+
+    lines = [
+        f"requests: {total}  succeeded: {len(ok)}  failed: {total - len(ok)}",
+        f"duration: {duration:.2f}s  "
+        f"request throughput: {len(ok) / duration if duration else 0.0:.2f} req/s  "
+        f"output throughput: {output_tokens / duration if duration else 0.0:.1f} tok/s",
+    ]
+    for index, name in enumerate(results.meta.get("errors", [])):
+        count = sum(1 for code in results.columns["error"] if code == index)
+        lines.append(f"error {name}: {count}")
+
+    header = f"{'metric':<16}{'count':>8}{'mean':>10}" + "".join(
+        f"{'p' + format(q * 100, 'g'):>10}" for q in quantiles
+    ) + f"{'max':>10}"
+    lines.extend(["", header, "-" * len(header)])
+    series = [
+        ("ttft_s", results.ttfts()),
+        ("itl_s", results.itls()),
+        ("e2e_s", results.e2es()),
+        ("tokens_per_s", results.output_token_rates()),
+    ]
+    for name, values in series:
+        values = sorted(values)
+        mean = sum(values) / len(values) if values else math.nan
+        row = f"{name:<16}{len(values):>8}{mean:>10.4f}"
+        row += "".join(f"{percentile(values, q):>10.4f}" for q in quantiles)
+        row += f"{(values[-1] if values else math.nan):>10.4f}"
+        lines.append(row)
+
+    if slo_ttft is not None or slo_itl is not None:
+        lines.append("")
+    if slo_ttft is not None:
+        ttfts = results.ttfts()
+        met = sum(1 for v in ttfts if v <= slo_ttft) / len(ttfts) if ttfts else 0.0
+        lines.append(f"TTFT <= {slo_ttft}s: {met:.2%} of requests")
+    if slo_itl is not None:
+        itls = results.itls()
+        met = sum(1 for v in itls if v <= slo_itl) / len(itls) if itls else 0.0
+        lines.append(f"ITL <= {slo_itl}s: {met:.2%} of tokens")
+    return "\n".join(lines)
@@ -0,0 +1,143 @@
+import asyncio
+import random
+import time
+from collections.abc import Callable
+
+import httpx
+import structlog
+
+from exporters.bench.results import RequestRecord
+from exporters.bench.workload import WorkloadItem, WorkloadSampler
+from exporters.probe.stream import BACKENDS, StreamTiming, stream_completion
+
+logger = structlog.get_logger()
+
+MODES = ("open", "closed")
+
+
+class BenchmarkRunner:
+    def __init__(
+        self,
+        endpoint: str,
+        workload: list[WorkloadItem],
+        backend: str = "vllm",
+        model: str = "unknown",
+        mode: str = "closed",
+        rate: float = 1.0,
+        concurrency: int = 8,
+        num_requests: int | None = 100,
+        duration: float | None = None,
+        seed: int | None = None,
+        timeout: float = 300.0,
+        on_result: Callable[[StreamTiming], None] | None = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}")
+        if mode not in MODES:
+            raise ValueError(f"Unsupported mode: {mode}")
+        if mode == "open" and rate <= 0:
+            raise ValueError("Open-loop mode requires a positive arrival rate")
+        if num_requests is None and duration is None:
+            raise ValueError("Either num_requests or duration must be set")
+        self.endpoint = endpoint.rstrip("/")
+        self.backend = backend
+        self.model = model
+        self.mode = mode
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.num_requests = num_requests
+        self.duration = duration
+        self.sampler = WorkloadSampler(workload, seed=seed)
+        self._arrivals = random.Random(seed)
+        self.on_result = on_result
+        # Open-loop arrivals must never wait for a free connection, or the
+        # measured latency would hide client-side queueing.
+        max_connections = None if mode == "open" else self.concurrency
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        self.records: list[RequestRecord] = []
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self._issued = 0
+
+    async def fetch_model_info(self) -> None:
+        path = "/info" if self.backend == "tgi" else "/v1/models"
+        try:
+            response = await self.client.get(f"{self.endpoint}{path}")
+            response.raise_for_status()
+            data = response.json()
+            if self.backend == "tgi" and data.get("model_id"):
+                self.model = data["model_id"]
+            elif data.get("data"):
+                self.model = data["data"][0].get("id", self.model)
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch model info", error=str(e))
+
+    def _should_issue(self, now: float) -> bool:
+        if self.num_requests is not None and self._issued >= self.num_requests:
+            return False
+        if self.duration is not None and now - self.started_at >= self.duration:
+            return False
+        return True
+
+    async def _send(self, item: WorkloadItem, scheduled: float) -> None:
+        timing = await stream_completion(
+            self.client, self.backend, self.endpoint, self.model, item.prompt, item.max_tokens
+        )
+        self.records.append(
+            RequestRecord(
+                scheduled=scheduled,
+                prompt_chars=len(item.prompt),
+                max_tokens=item.max_tokens,
+                timing=timing,
+            )
+        )
+        if self.on_result is not None:
+            self.on_result(timing)
+
+    async def _run_open_loop(self) -> None:
+        tasks: list[asyncio.Task[None]] = []
+        next_arrival = self.started_at
+        while self._should_issue(next_arrival):
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._issued += 1
+            tasks.append(asyncio.create_task(self._send(self.sampler.sample(), next_arrival)))
+            next_arrival += self._arrivals.expovariate(self.rate)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _closed_loop_worker(self) -> None:
+        while self._should_issue(time.perf_counter()):
+            self._issued += 1
+            await self._send(self.sampler.sample(), time.perf_counter())
+
+    async def _run_closed_loop(self) -> None:
+        await asyncio.gather(*(self._closed_loop_worker() for _ in range(self.concurrency)))
+
+    async def run(self) -> list[RequestRecord]:
+        if self.model == "unknown":
+            await self.fetch_model_info()
+        self.started_at = time.perf_counter()
+        logger.info(
+            "Starting benchmark",
+            endpoint=self.endpoint,
+            mode=self.mode,
+            rate=self.rate,
+            concurrency=self.concurrency,
+        )
+        try:
+            if self.mode == "open":
+                await self._run_open_loop()
+            else:
+                await self._run_closed_loop()
+        finally:
+            self.finished_at = time.perf_counter()
+            await self.client.aclose()
+        return self.records
@@ -0,0 +1,56 @@
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+SYNTHETIC_WORD = "token "
+
+
+@dataclass(frozen=True)
+class WorkloadItem:
+    prompt: str
+    max_tokens: int
+
+
+def synthetic_prompt(prompt_tokens: int) -> str:
+    return (SYNTHETIC_WORD * max(1, prompt_tokens)).rstrip()
+
+
+def parse_workload_line(line: str, default_max_tokens: int) -> WorkloadItem:
+    entry = json.loads(line)
+    if "prompt" in entry:
+        prompt = str(entry["prompt"])
+    elif "prompt_tokens" in entry:
+        prompt = synthetic_prompt(int(entry["prompt_tokens"]))
+    else:
+        raise ValueError("workload entry needs 'prompt' or 'prompt_tokens'")
+    max_tokens = entry.get("max_tokens", entry.get("output_tokens", default_max_tokens))
+    return WorkloadItem(prompt=prompt, max_tokens=int(max_tokens))
+
+
+def load_workload(path: str | Path, default_max_tokens: int = 128) -> list[WorkloadItem]:
+    items: list[WorkloadItem] = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(parse_workload_line(line, default_max_tokens))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}:{lineno}: invalid workload entry: {e}") from e
+    if not items:
+        raise ValueError(f"{path}: workload is empty")
+    return items
+
+
+def synthetic_workload(prompt_tokens: int, max_tokens: int) -> list[WorkloadItem]:
+    return [WorkloadItem(prompt=synthetic_prompt(prompt_tokens), max_tokens=max_tokens)]
+
+
+class WorkloadSampler:
+    def __init__(self, items: list[WorkloadItem], seed: int | None = None):
+        self.items = items
+        self._random = random.Random(seed)
+
+    def sample(self) -> WorkloadItem:
+        return self._random.choice(self.items)
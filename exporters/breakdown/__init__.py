@@ -0,0 +1,3 @@
+from exporters.breakdown.metrics import *
+
+__all__ = ["METRICS"]
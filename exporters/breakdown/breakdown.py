@@ -0,0 +1,215 @@
+import bisect
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from exporters.breakdown.metrics import MODEL_BREAKDOWN_MODELS, MODEL_BREAKDOWN_OVERFLOW_MODELS
+from exporters.config import settings
+from exporters.recording.recorder import counter_delta
+from exporters.recording.window import bucket_midpoints
+from exporters.registry import DeferredMetric, DeltaHistogramChild, remove_series
+
+OTHER_MODEL = "__other__"
+
+
+@dataclass(frozen=True)
+class BreakdownSpec:
+    backend: str
+    model_label: str
+    ttft_histogram: str | None = None
+    itl_histogram: str | None = None
+    prefill_tokens_counter: str | None = None
+    decode_tokens_counter: str | None = None
+    requests_counter: str | None = None
+    default_models: tuple[str, ...] = ()
+
+    @property
+    def families(self) -> tuple[str, ...]:
+        names = (
+            self.ttft_histogram,
+            self.itl_histogram,
+            self.prefill_tokens_counter,
+            self.decode_tokens_counter,
+            self.requests_counter,
+        )
+        return tuple(name for name in names if name is not None)
+
+
+@dataclass
+class HistogramDelta:
+    bounds: tuple[float, ...]
+    counts: list[float]
+    sum: float
+
+
+@dataclass
+class ModelDelta:
+    ttft: HistogramDelta | None = None
+    itl: HistogramDelta | None = None
+    prefill_tokens: float | None = None
+    decode_tokens: float | None = None
+    requests: float | None = None
+
+    @property
+    def tokens(self) -> float | None:
+        if self.prefill_tokens is None and self.decode_tokens is None:
+            return None
+        return (self.prefill_tokens or 0.0) + (self.decode_tokens or 0.0)
+
+
+def _items(metrics: dict[str, Any], name: str) -> list[dict[str, Any]]:
+    value = metrics.get(name)
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [{"labels": {}, "value": float(value)}]
+
+
+def group_by_label(metrics: dict[str, Any], name: str, label: str) -> dict[str | None, float]:
+    grouped: dict[str | None, float] = {}
+    for item in _items(metrics, name):
+        key = item["labels"].get(label)
+        grouped[key] = grouped.get(key, 0.0) + item["value"]
+    return grouped
+
+
+def group_histogram(
+    metrics: dict[str, Any], name: str, label: str
+) -> dict[str | None, tuple[tuple[float, ...], list[float]]]:
+    cumulative: dict[str | None, dict[float, float]] = {}
+    parsed_bounds: dict[str, float] = {}
+    for item in _items(metrics, f"{name}_bucket"):
+        labels = item["labels"]
+        le = labels.get("le")
+        bound = parsed_bounds.get(le) if le is not None else None
+        if bound is None:
+            try:
+                bound = parsed_bounds[le] = float(le)
+            except (TypeError, ValueError):
+                continue
+        key = labels.get(label)
+        buckets = cumulative.get(key)
+        if buckets is None:
+            buckets = cumulative[key] = {}
+        buckets[bound] = buckets.get(bound, 0.0) + item["value"]
+    sums = group_by_label(metrics, f"{name}_sum", label)
+    grouped = {}
+    for key, buckets in cumulative.items():
+        bounds = tuple(sorted(buckets))
+        grouped[key] = (bounds, [buckets[bound] for bound in bounds] + [sums.get(key, 0.0)])
+    return grouped
+
+
+def observe_delta(histogram: DeltaHistogramChild, delta: HistogramDelta) -> None:
+    upper_bounds = histogram.upper_bounds
+    counts = [0.0] * len(upper_bounds)
+    for value, count in zip(bucket_midpoints(delta.bounds), delta.counts):
+        if count > 0:
+            counts[bisect.bisect_left(upper_bounds, value)] += count
+    histogram.add(counts, max(delta.sum, 0.0))
+
+
+def remove_model_series(
+    collectors: Iterable[DeferredMetric], model: str, endpoint: str
+) -> None:
+    remove_series(collectors, model=model, endpoint=endpoint)
+
+
+class ModelBreakdown:
+    def __init__(
+        self,
+        spec: BreakdownSpec,
+        endpoint: str,
+        max_models: int | None = None,
+    ):
+        self.spec = spec
+        self.endpoint = endpoint
+        self.max_models = settings.model_label_limit if max_models is None else max_models
+        self.models: dict[str, None] = {}
+        self._seen: set[str] = set()
+        self._overflow: set[str] = set()
+        self._previous: dict[tuple[str, str | None], list[float]] = {}
+
+    def resolve(self, name: str | None, default_model: str) -> str:
+        if name is None or name == default_model or name in self.spec.default_models:
+            return default_model
+        self._seen.add(name)
+        if name in self.models:
+            return name
+        if len(self.models) < self.max_models:
+            self.models[name] = None
+            return name
+        self._overflow.add(name)
+        return OTHER_MODEL
+
+    def set_known_models(self, names: Iterable[str], default_model: str) -> list[str]:
+        known = [
+            name
+            for name in names
+            if name != default_model and name not in self.spec.default_models
+        ]
+        active = set(known) | self._seen
+        stale = [model for model in self.models if model not in active]
+        for model in stale:
+            del self.models[model]
+        for name in known:
+            if name not in self.models and len(self.models) < self.max_models:
+                self.models[name] = None
+        for key in [key for key in self._previous if key[1] is not None and key[1] not in active]:
+            del self._previous[key]
+        self._seen.clear()
+        self._overflow.clear()
+        self._update_gauges()
+        return stale
+
+    def _delta(self, key: tuple[str, str | None], current: list[float]) -> list[float] | None:
+        previous = self._previous.get(key)
+        self._previous[key] = current
+        if previous is None:
+            return current
+        return counter_delta(previous, current)
+
+    def update(self, metrics: dict[str, Any], default_model: str) -> dict[str, ModelDelta]:
+        spec = self.spec
+        deltas: dict[str, ModelDelta] = {}
+
+        for kind, histogram in (("ttft", spec.ttft_histogram), ("itl", spec.itl_histogram)):
+            if histogram is None:
+                continue
+            for name, (bounds, current) in group_histogram(
+                metrics, histogram, spec.model_label
+            ).items():
+                change = self._delta((histogram, name), current)
+                if change is None:
+                    continue
+                counts = [change[0]] + [change[i] - change[i - 1] for i in range(1, len(bounds))]
+                model_delta = deltas.setdefault(self.resolve(name, default_model), ModelDelta())
+                merged = getattr(model_delta, kind)
+                if merged is None:
+                    setattr(model_delta, kind, HistogramDelta(bounds, counts, change[-1]))
+                elif merged.bounds == bounds:
+                    merged.counts = [a + b for a, b in zip(merged.counts, counts)]
+                    merged.sum += change[-1]
+
+        for kind, counter in (
+            ("prefill_tokens", spec.prefill_tokens_counter),
+            ("decode_tokens", spec.decode_tokens_counter),
+            ("requests", spec.requests_counter),
+        ):
+            if counter is None:
+                continue
+            for name, value in group_by_label(metrics, counter, spec.model_label).items():
+                change = self._delta((counter, name), [value])
+                if change is None:
+                    continue
+                model_delta = deltas.setdefault(self.resolve(name, default_model), ModelDelta())
+                setattr(model_delta, kind, (getattr(model_delta, kind) or 0.0) + change[0])
+
+        self._update_gauges()
+        return deltas
+
+    def _update_gauges(self) -> None:
+        labels = {"backend": self.spec.backend, "endpoint": self.endpoint}
+        MODEL_BREAKDOWN_MODELS.labels(**labels).set(len(self.models))
+        MODEL_BREAKDOWN_OVERFLOW_MODELS.labels(**labels).set(len(self._overflow))
@@ -0,0 +1,18 @@
+from exporters.registry import Gauge
+
+MODEL_BREAKDOWN_MODELS = Gauge(
+    "model_breakdown_models",
+    "Number of upstream models and adapters exported under their own model label",
+    ["backend", "endpoint"],
+)
+
+MODEL_BREAKDOWN_OVERFLOW_MODELS = Gauge(
+    "model_breakdown_overflow_models",
+    "Number of upstream models and adapters folded into the __other__ model label",
+    ["backend", "endpoint"],
+)
+
+METRICS = [
+    MODEL_BREAKDOWN_MODELS,
+    MODEL_BREAKDOWN_OVERFLOW_MODELS,
+]
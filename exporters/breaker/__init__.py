@@ -0,0 +1,3 @@
+from exporters.breaker.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,99 @@
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from exporters.breaker.metrics import (
+    EXPORTER_TARGET_CIRCUIT_STATE,
+    EXPORTER_TARGET_CIRCUIT_TRANSITIONS,
+    EXPORTER_TARGET_REQUESTS_SKIPPED,
+)
+from exporters.config import settings
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+BREAKER_SETTINGS = {
+    "breaker_failure_threshold": "failure_threshold",
+    "breaker_min_backoff": "min_backoff",
+    "breaker_max_backoff": "max_backoff",
+    "breaker_jitter": "jitter",
+}
+
+
+@dataclass
+class CircuitBreaker:
+    exporter: str
+    target: str
+    failure_threshold: int = field(default_factory=lambda: settings.breaker_failure_threshold)
+    min_backoff: float = field(default_factory=lambda: settings.breaker_min_backoff)
+    max_backoff: float = field(default_factory=lambda: settings.breaker_max_backoff)
+    jitter: float = field(default_factory=lambda: settings.breaker_jitter)
+    seed: int | None = None
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    def __post_init__(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.retry_at = 0.0
+        self._random = random.Random(self.seed)
+        self._labels = {"exporter": self.exporter, "target": self.target}
+        self._set_state_gauges()
+
+    def reconfigure(self, changes: dict[str, Any]) -> None:
+        for name, attribute in BREAKER_SETTINGS.items():
+            if name in changes:
+                setattr(self, attribute, changes[name])
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = self.clock()
+        if now >= self.retry_at:
+            self.retry_at = now + self.min_backoff
+            if self.state == OPEN:
+                self._transition(HALF_OPEN)
+            return True
+        EXPORTER_TARGET_REQUESTS_SKIPPED.labels(**self._labels).inc()
+        return False
+
+    def record_success(self) -> bool:
+        recovered = self.state != CLOSED
+        self.failures = 0
+        self.opens = 0
+        if recovered:
+            self._transition(CLOSED)
+        return recovered
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opens += 1
+            backoff = min(self.max_backoff, self.min_backoff * 2 ** (self.opens - 1))
+            backoff *= 1 + self._random.uniform(-self.jitter, self.jitter)
+            self.retry_at = self.clock() + backoff
+            self._transition(OPEN, backoff=round(backoff, 3))
+
+    def _transition(self, state: str, **fields: float) -> None:
+        previous, self.state = self.state, state
+        self._set_state_gauges()
+        EXPORTER_TARGET_CIRCUIT_TRANSITIONS.labels(**self._labels, state=state).inc()
+        log = logger.warning if state == OPEN else logger.info
+        log("Target circuit changed", **self._labels, previous=previous, state=state, **fields)
+
+    def _set_state_gauges(self) -> None:
+        for name in STATES:
+            EXPORTER_TARGET_CIRCUIT_STATE.labels(**self._labels, state=name).set(
+                1 if name == self.state else 0
+            )
@@ -0,0 +1,25 @@
+from exporters.registry import Counter, Gauge
+
+EXPORTER_TARGET_CIRCUIT_STATE = Gauge(
+    "exporter_target_circuit_state",
+    "Circuit breaker state of the scraped target (1 for the active state)",
+    ["exporter", "target", "state"],
+)
+
+EXPORTER_TARGET_CIRCUIT_TRANSITIONS = Counter(
+    "exporter_target_circuit_transitions",
+    "Circuit breaker transitions into each state",
+    ["exporter", "target", "state"],
+)
+
+EXPORTER_TARGET_REQUESTS_SKIPPED = Counter(
+    "exporter_target_requests_skipped",
+    "Requests to the target skipped while its circuit was open",
+    ["exporter", "target"],
+)
+
+METRICS = [
+    EXPORTER_TARGET_CIRCUIT_STATE,
+    EXPORTER_TARGET_CIRCUIT_TRANSITIONS,
+    EXPORTER_TARGET_REQUESTS_SKIPPED,
+]
@@ -1,7 +1,11 @@
-from pydantic_settings import BaseSettings
+from typing import Any
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+
     vllm_endpoint: str = "http://localhost:8000"
     tgi_endpoint: str = "http://localhost:8080"
     prometheus_port: int = 9090
@@ -10,11 +14,109 @@ class Settings(BaseSettings):
     exporter_port_vllm: int = 8000
     exporter_port_tgi: int = 8001
     exporter_port_gpu: int = 9400
+    exporter_port_probe: int = 8002
+    exporter_port_correlator: int = 8003
+    exporter_port_tracing: int = 8004
+    exporter_port_logs: int = 8006
+    exporter_port_efficiency: int = 8007
     log_level: str = "INFO"
-
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    config_reload_interval: float = 5.0
+    model_label_limit: int = 50
+    model_refresh_interval: float = 300.0
+    payload_cache_enabled: bool = True
+    http_connect_timeout: float = 2.0
+    http_read_timeout: float = 30.0
+    http_connections_per_target: int = 4
+    http_keepalive_per_target: int = 2
+    http_keepalive_expiry: float = 60.0
+    http2: bool = False
+    http_uds_paths: dict[str, str] = {}
+    breaker_failure_threshold: int = 3
+    breaker_min_backoff: float = 5.0
+    breaker_max_backoff: float = 300.0
+    breaker_jitter: float = 0.2
+    poll_adaptive: bool = True
+    poll_min_interval: float = 1.0
+    poll_max_interval: float = 30.0
+    poll_jitter: float = 0.1
+    poll_fast_change: float = 0.1
+    poll_steady_change: float = 0.02
+    gpu_process_metrics: bool = True
+    gpu_nvml_enabled: bool = True
+    gpu_proc_root: str = "/proc"
+    gpu_memory_bound_vram_threshold: float = 0.90
+    gpu_memory_bound_compute_threshold: float = 0.50
+    remote_write_url: str = ""
+    remote_write_shards: int = 4
+    remote_write_queue_capacity: int = 10000
+    remote_write_max_samples_per_send: int = 500
+    remote_write_batch_send_deadline: float = 5.0
+    otlp_endpoint: str = ""
+    otlp_headers: dict[str, str] = {}
+    otlp_compression: str = "gzip"
+    otlp_queue_capacity: int = 64
+    otlp_max_points_per_request: int = 2000
+    otlp_exponential_max_size: int = 160
+    probe_backend: str = "vllm"
+    probe_interval: float = 30.0
+    probe_prompts: list[str] = ["Explain what a GPU is in one sentence."]
+    probe_max_tokens: int = 32
+    probe_concurrency: int = 4
+    probe_rate_limit: float = 2.0
+    probe_probes_per_cycle: int = 4
+    recording_enabled: bool = True
+    recording_windows: list[float] = [60.0, 300.0]
+    recording_quantiles: list[float] = [0.5, 0.9, 0.99]
+    queue_analytics_enabled: bool = True
+    queue_ewma_window: float = 30.0
+    autoscaling_max_age: float = 60.0
+    slo_enabled: bool = True
+    slo_ttft_seconds: float = 5.0
+    slo_ttft_objective: float = 0.99
+    slo_itl_seconds: float = 0.1
+    slo_itl_objective: float = 0.99
+    slo_error_objective: float = 0.999
+    slo_windows: list[float] = [300.0, 1800.0, 3600.0, 21600.0]
+    slo_budget_period: float = 2592000.0
+    correlator_interval: float = 1.0
+    correlator_window: float = 30.0
+    correlator_gpu_ids: list[int] = []
+    tracing_backend: str = "vllm"
+    tracing_model: str = "unknown"
+    tracing_ingest_port: int = 8005
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_slow_ttft_seconds: float = 2.0
+    tracing_slow_e2e_seconds: float = 60.0
+    tracing_baseline_ratio: float = 0.01
+    tracing_max_pending: int = 10000
+    tracing_pending_timeout: float = 600.0
+    tracing_exemplar_window: float = 60.0
+    tracing_queue_capacity: int = 1024
+    tracing_max_spans_per_request: int = 512
+    logs_backend: str = "vllm"
+    logs_model: str = "unknown"
+    logs_paths: list[str] = []
+    logs_from_start: bool = False
+    logs_poll_interval: float = 1.0
+    efficiency_servers: dict[str, str] = {}
+    efficiency_gpu_map: dict[str, list[str]] = {}
+    efficiency_interval: float = 15.0
+    efficiency_power_interval: float = 1.0
+    efficiency_nvidia_smi_power_interval: float = 5.0
+    efficiency_energy_price_per_kwh: float = 0.0
+    efficiency_gpu_hourly_cost: float = 0.0
 
 
 settings = Settings()
+
+
+def reload_settings(env_file: str | None = None) -> dict[str, Any]:
+    current = Settings(_env_file=env_file) if env_file is not None else Settings()
+    changes = {
+        name: value
+        for name in Settings.model_fields
+        if (value := getattr(current, name)) != getattr(settings, name)
+    }
+    for name, value in changes.items():
+        setattr(settings, name, value)
+    return changes
@@ -0,0 +1,3 @@
+from exporters.correlator.metrics import *
+
+__all__ = ["METRICS"]
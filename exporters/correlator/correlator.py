@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import socket
+import time
+from collections import deque
+from typing import Any
+
+import structlog
+from prometheus_client import start_http_server
+
+from exporters.config import settings
+from exporters.correlator.metrics import (
+    CORRELATOR_SAMPLE_SKEW_SECONDS,
+    GPU_DECODE_ITL_BATCH_ELASTICITY,
+    GPU_DECODE_REGIME,
+    GPU_DECODE_TOKENS_PER_SECOND,
+    GPU_PREFILL_TOKENS_PER_SECOND,
+    GPU_TOKENS_PER_SECOND,
+)
+from exporters.correlator.regime import (
+    REGIMES,
+    AlignedSample,
+    RegimeSummary,
+    RegimeThresholds,
+    classify_regime,
+    summarize,
+)
+from exporters.efficiency.mapping import GPUMapper
+from exporters.gpu_exporter.exporter import GPUExporter, GPUMetrics
+from exporters.gpu_exporter.processes import NVMLProcessSampler
+from exporters.recording.recorder import mean_series, sum_series
+from exporters.remote_write.writer import RemoteWriter
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+logger = structlog.get_logger()
+
+
+class DecodeRegimeCorrelator:
+    def __init__(
+        self,
+        endpoint: str = settings.vllm_endpoint,
+        port: int = settings.exporter_port_correlator,
+        model: str = "unknown",
+        interval: float = settings.correlator_interval,
+        window: float = settings.correlator_window,
+        gpu_ids: list[int] | None = None,
+        thresholds: RegimeThresholds | None = None,
+    ):
+        self.port = port
+        self.interval = interval
+        self.window = window
+        self.thresholds = thresholds or RegimeThresholds()
+        self.window_samples = max(self.thresholds.min_samples, round(window / interval))
+        gpu_ids = settings.correlator_gpu_ids if gpu_ids is None else gpu_ids
+        self.gpu_ids = set(gpu_ids) if gpu_ids else None
+        self.mapper = GPUMapper(settings.efficiency_gpu_map, settings.gpu_proc_root)
+        self.serving_gpus = 0
+        self.gpu_exporter = GPUExporter()
+        self.vllm_exporter = VLLMExporter(endpoint=endpoint, model=model)
+        self.regimes: dict[tuple[str, str], str] = {}
+        self._samples: dict[tuple[str, str], deque[AlignedSample]] = {}
+        self._running = False
+        self.remote_writer: RemoteWriter | None = None
+
+    @property
+    def model(self) -> str:
+        return self.vllm_exporter.model
+
+    async def sample(self) -> tuple[list[GPUMetrics], dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        gpu_done = vllm_done = started
+
+        async def collect_gpu() -> list[GPUMetrics]:
+            nonlocal gpu_done
+            result = await loop.run_in_executor(None, self.gpu_exporter.collect_metrics)
+            gpu_done = time.monotonic()
+            return result
+
+        async def collect_vllm() -> dict[str, Any]:
+            nonlocal vllm_done
+            result = await self.vllm_exporter.fetch_metrics()
+            vllm_done = time.monotonic()
+            return result
+
+        gpu_metrics, vllm_metrics = await asyncio.gather(collect_gpu(), collect_vllm())
+        self.observe(
+            gpu_metrics, vllm_metrics, (started + gpu_done) / 2, (started + vllm_done) / 2
+        )
+        return gpu_metrics, vllm_metrics
+
+    def serving(self, gpus: list[GPUMetrics]) -> list[GPUMetrics]:
+        if self.gpu_ids is not None:
+            return [gpu for gpu in gpus if gpu.gpu_id in self.gpu_ids]
+        return self.mapper.resolve(self.vllm_exporter.endpoint, gpus)[1]
+
+    def observe(
+        self,
+        gpu_metrics_list: list[GPUMetrics],
+        vllm_metrics: dict[str, Any],
+        gpu_time: float,
+        vllm_time: float,
+    ) -> None:
+        if not gpu_metrics_list or not vllm_metrics:
+            return
+        # Every family is summed across its series so all inputs describe the
+        # same set of engines; KV cache usage is a fraction, so it is averaged.
+        running = sum_series(vllm_metrics, "vllm:num_requests_running") or 0.0
+        kv_cache = mean_series(vllm_metrics, "vllm:gpu_cache_usage_perc") or 0.0
+        generation_tokens = sum_series(vllm_metrics, "vllm:generation_tokens_total") or 0.0
+        prompt_tokens = sum_series(vllm_metrics, "vllm:prompt_tokens_total") or 0.0
+        itl_sum = sum_series(vllm_metrics, "vllm:time_per_output_token_seconds_sum") or 0.0
+        itl_count = sum_series(vllm_metrics, "vllm:time_per_output_token_seconds_count") or 0.0
+
+        serving = self.serving(gpu_metrics_list)
+        self.serving_gpus = len(serving)
+        keys = {(str(gpu.gpu_id), gpu.gpu_uuid) for gpu in serving}
+        for key in [key for key in self._samples if key not in keys]:
+            del self._samples[key]
+        for gpu in serving:
+            key = (str(gpu.gpu_id), gpu.gpu_uuid)
+            window = self._samples.get(key)
+            if window is None:
+                window = self._samples[key] = deque(maxlen=self.window_samples)
+            elif window and (
+                generation_tokens < window[-1].generation_tokens
+                or prompt_tokens < window[-1].prompt_tokens
+                or itl_count < window[-1].itl_count
+            ):
+                window.clear()
+            window.append(
+                AlignedSample(
+                    timestamp=(gpu_time + vllm_time) / 2,
+                    skew=abs(gpu_time - vllm_time),
+                    memory_bandwidth_util=gpu.memory_bandwidth_util,
+                    compute_util=gpu.compute_utilization,
+                    clock_sm=gpu.clock_sm,
+                    running=running,
+                    kv_cache_usage=kv_cache,
+                    generation_tokens=generation_tokens,
+                    itl_sum=itl_sum,
+                    itl_count=itl_count,
+                    prompt_tokens=prompt_tokens,
+                )
+            )
+
+    def classify(self) -> dict[tuple[str, str], RegimeSummary]:
+        summaries: dict[tuple[str, str], RegimeSummary] = {}
+        for key, window in self._samples.items():
+            summary = summarize(list(window), self.thresholds.min_batch_spread)
+            regime = classify_regime(summary, self.thresholds)
+            if regime is None:
+                continue
+            summaries[key] = summary
+            if self.regimes.get(key) != regime:
+                logger.info(
+                    "Decode regime changed",
+                    gpu_id=key[0],
+                    previous=self.regimes.get(key),
+                    regime=regime,
+                )
+            self.regimes[key] = regime
+        return summaries
+
+    def update_prometheus_metrics(self, summaries: dict[tuple[str, str], RegimeSummary]) -> None:
+        max_skew = 0.0
+        gpus = max(self.serving_gpus, 1)
+        for (gpu_id, gpu_uuid), summary in summaries.items():
+            labels = {"gpu_id": gpu_id, "gpu_uuid": gpu_uuid, "model": self.model}
+            regime = self.regimes[(gpu_id, gpu_uuid)]
+            for name in REGIMES:
+                GPU_DECODE_REGIME.labels(**labels, regime=name).set(1 if name == regime else 0)
+            if summary.itl_batch_elasticity is not None:
+                GPU_DECODE_ITL_BATCH_ELASTICITY.labels(**labels).set(
+                    summary.itl_batch_elasticity
+                )
+            decode = summary.tokens_per_second / gpus
+            prefill = summary.prefill_tokens_per_second / gpus
+            GPU_DECODE_TOKENS_PER_SECOND.labels(**labels).set(decode)
+            GPU_PREFILL_TOKENS_PER_SECOND.labels(**labels).set(prefill)
+            GPU_TOKENS_PER_SECOND.labels(**labels).set(decode + prefill)
+            max_skew = max(max_skew, summary.max_skew)
+        if summaries:
+            CORRELATOR_SAMPLE_SKEW_SECONDS.labels(model=self.model).set(max_skew)
+
+    async def collect_loop(self) -> None:
+        self._running = True
+        if self.remote_writer is not None:
+            self.remote_writer.start()
+        logger.info(
+            "Starting decode regime correlator",
+            endpoint=self.vllm_exporter.endpoint,
+            interval=self.interval,
+            window=self.window,
+        )
+
+        await self.vllm_exporter.fetch_model_info()
+
+        while self._running:
+            started = time.monotonic()
+            try:
+                gpu_metrics, vllm_metrics = await self.sample()
+                if gpu_metrics:
+                    self.gpu_exporter.update_prometheus_metrics(gpu_metrics)
+                if vllm_metrics:
+                    self.vllm_exporter.update_prometheus_metrics(vllm_metrics)
+                self.update_prometheus_metrics(self.classify())
+                if self.remote_writer is not None:
+                    self.remote_writer.push()
+            except Exception as e:
+                logger.error("Error correlating GPU and vLLM metrics", error=str(e))
+
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self) -> None:
+        self._running = False
+        logger.info("Stopping decode regime correlator")
+
+    def run(self) -> None:
+        logging.basicConfig(level=settings.log_level)
+        start_http_server(self.port)
+        if settings.remote_write_url:
+            self.remote_writer = RemoteWriter(
+                external_labels={"job": "correlator", "instance": socket.gethostname()}
+            )
+        if settings.gpu_process_metrics and settings.gpu_nvml_enabled:
+            self.gpu_exporter.nvml = NVMLProcessSampler()
+        logger.info(f"Decode regime correlator started on port {self.port}")
+
+        loop = asyncio.get_event_loop()
+        try:
+            loop.run_until_complete(self.collect_loop())
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            if self.remote_writer is not None:
+                loop.run_until_complete(self.remote_writer.stop())
+            if self.gpu_exporter.nvml is not None:
+                self.gpu_exporter.nvml.close()
+            loop.close()
+
+
+def main() -> None:
+    correlator = DecodeRegimeCorrelator()
+    correlator.run()
+
+
+if __name__ == "__main__":
+    main()
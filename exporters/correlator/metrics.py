@@ -0,0 +1,46 @@
+from exporters.registry import Gauge
+
+GPU_DECODE_REGIME = Gauge(
+    "gpu_decode_regime",
+    "Decode regime of the GPU over the correlation window (1 for the active regime)",
+    ["gpu_id", "gpu_uuid", "model", "regime"],
+)
+
+GPU_DECODE_ITL_BATCH_ELASTICITY = Gauge(
+    "gpu_decode_itl_batch_elasticity",
+    "Elasticity of inter-token latency to decode batch size over the correlation window",
+    ["gpu_id", "gpu_uuid", "model"],
+)
+
+GPU_DECODE_TOKENS_PER_SECOND = Gauge(
+    "gpu_decode_tokens_per_second",
+    "Generation throughput per serving GPU over the correlation window",
+    ["gpu_id", "gpu_uuid", "model"],
+)
+
+GPU_PREFILL_TOKENS_PER_SECOND = Gauge(
+    "gpu_prefill_tokens_per_second",
+    "Prompt prefill throughput per serving GPU over the correlation window",
+    ["gpu_id", "gpu_uuid", "model"],
+)
+
+GPU_TOKENS_PER_SECOND = Gauge(
+    "gpu_tokens_per_second",
+    "Prefill plus decode throughput attributed to the GPU (split across the serving GPUs)",
+    ["gpu_id", "gpu_uuid", "model"],
+)
+
+CORRELATOR_SAMPLE_SKEW_SECONDS = Gauge(
+    "correlator_sample_skew_seconds",
+    "Largest clock skew between paired GPU and inference-server samples in the window",
+    ["model"],
+)
+
+METRICS = [
+    GPU_DECODE_REGIME,
+    GPU_DECODE_ITL_BATCH_ELASTICITY,
+    GPU_DECODE_TOKENS_PER_SECOND,
+    GPU_PREFILL_TOKENS_PER_SECOND,
+    GPU_TOKENS_PER_SECOND,
+    CORRELATOR_SAMPLE_SKEW_SECONDS,
+]
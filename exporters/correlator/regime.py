@@ -0,0 +1,126 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+MEMORY_BANDWIDTH_BOUND = "memory_bandwidth_bound"
+COMPUTE_BOUND = "compute_bound"
+BATCH_LIMITED = "batch_limited"
+IDLE = "idle"
+REGIMES = (MEMORY_BANDWIDTH_BOUND, COMPUTE_BOUND, BATCH_LIMITED, IDLE)
+
+
+@dataclass(frozen=True)
+class RegimeThresholds:
+    underutilized: float = 0.35
+    kv_cache_saturated: float = 0.90
+    compute_elasticity: float = 0.5
+    min_batch_spread: float = 2.0
+    min_samples: int = 3
+
+
+@dataclass(frozen=True)
+class AlignedSample:
+    timestamp: float
+    skew: float
+    memory_bandwidth_util: float
+    compute_util: float
+    clock_sm: int
+    running: float
+    kv_cache_usage: float
+    generation_tokens: float
+    itl_sum: float
+    itl_count: float
+    prompt_tokens: float = 0.0
+
+
+@dataclass
+class RegimeSummary:
+    samples: int
+    duration: float
+    memory_bandwidth_util: float
+    compute_pressure: float
+    batch_size: float
+    kv_cache_usage: float
+    tokens_per_second: float
+    itl: float | None
+    itl_batch_elasticity: float | None
+    max_skew: float
+    prefill_tokens_per_second: float = 0.0
+
+
+def _itl_points(samples: Sequence[AlignedSample]) -> list[tuple[float, float]]:
+    points = []
+    for previous, current in zip(samples, samples[1:]):
+        count = current.itl_count - previous.itl_count
+        if count > 0:
+            itl = (current.itl_sum - previous.itl_sum) / count
+            points.append(((previous.running + current.running) / 2, itl))
+    return points
+
+
+def itl_batch_elasticity(
+    points: Sequence[tuple[float, float]], min_batch_spread: float
+) -> float | None:
+    if len(points) < 2:
+        return None
+    batches = [batch for batch, _ in points]
+    if max(batches) - min(batches) < min_batch_spread:
+        return None
+    n = len(points)
+    mean_batch = sum(batches) / n
+    mean_itl = sum(itl for _, itl in points) / n
+    variance = sum((batch - mean_batch) ** 2 for batch in batches)
+    if variance <= 0 or mean_itl <= 0:
+        return None
+    slope = sum((batch - mean_batch) * (itl - mean_itl) for batch, itl in points) / variance
+    return slope * mean_batch / mean_itl
+
+
+def summarize(samples: Sequence[AlignedSample], min_batch_spread: float = 2.0) -> RegimeSummary:
+    n = len(samples)
+    if n == 0:
+        return RegimeSummary(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, None, None, 0.0)
+    first, last = samples[0], samples[-1]
+    duration = last.timestamp - first.timestamp
+    peak_clock = max(sample.clock_sm for sample in samples)
+    compute_pressure = sum(
+        sample.compute_util * (sample.clock_sm / peak_clock if peak_clock > 0 else 1.0)
+        for sample in samples
+    )
+    tokens = last.generation_tokens - first.generation_tokens
+    prompt_tokens = last.prompt_tokens - first.prompt_tokens
+    itl_count = last.itl_count - first.itl_count
+    return RegimeSummary(
+        samples=n,
+        duration=duration,
+        memory_bandwidth_util=sum(s.memory_bandwidth_util for s in samples) / n,
+        compute_pressure=compute_pressure / n,
+        batch_size=sum(s.running for s in samples) / n,
+        kv_cache_usage=sum(s.kv_cache_usage for s in samples) / n,
+        tokens_per_second=tokens / duration if duration > 0 and tokens > 0 else 0.0,
+        itl=(last.itl_sum - first.itl_sum) / itl_count if itl_count > 0 else None,
+        itl_batch_elasticity=itl_batch_elasticity(_itl_points(samples), min_batch_spread),
+        max_skew=max(sample.skew for sample in samples),
+        prefill_tokens_per_second=(
+            prompt_tokens / duration if duration > 0 and prompt_tokens > 0 else 0.0
+        ),
+    )
+
+
+def classify_regime(summary: RegimeSummary, thresholds: RegimeThresholds) -> str | None:
+    if summary.samples < thresholds.min_samples:
+        return None
+    if summary.tokens_per_second <= 0 or summary.batch_size < 1:
+        return IDLE
+    underutilized = (
+        summary.memory_bandwidth_util < thresholds.underutilized
+        and summary.compute_pressure < thresholds.underutilized
+    )
+    if underutilized and summary.kv_cache_usage < thresholds.kv_cache_saturated:
+        return BATCH_LIMITED
+    if summary.itl_batch_elasticity is not None:
+        if summary.itl_batch_elasticity >= thresholds.compute_elasticity:
+            return COMPUTE_BOUND
+        return MEMORY_BANDWIDTH_BOUND
+    if summary.compute_pressure > summary.memory_bandwidth_util:
+        return COMPUTE_BOUND
+    return MEMORY_BANDWIDTH_BOUND
@@ -0,0 +1,3 @@
+from exporters.efficiency.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,354 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from exporters.autoscaling.server import start_http_server
+from exporters.autoscaling.signals import SIGNALS
+from exporters.breakdown.breakdown import OTHER_MODEL, ModelDelta, remove_model_series
+from exporters.config import settings
+from exporters.efficiency.mapping import SOURCE_NONE, SOURCES, GPUMapper
+from exporters.efficiency.metrics import (
+    EFFICIENCY_COST_PER_MILLION_TOKENS,
+    EFFICIENCY_ENERGY_JOULES,
+    EFFICIENCY_POWER_SAMPLES,
+    EFFICIENCY_SERVER_GPUS,
+    EFFICIENCY_SERVER_POWER_WATTS,
+    EFFICIENCY_TOKENS_PER_JOULE,
+)
+from exporters.efficiency.metrics import METRICS as EFFICIENCY_METRICS
+from exporters.efficiency.power import (
+    EnergyMeter,
+    NvidiaSmiPowerReader,
+    NVMLPowerReader,
+    power_reader,
+)
+from exporters.gpu_exporter.exporter import GPUExporter, GPUMetrics
+from exporters.reload.watcher import ConfigWatcher, remove_endpoint_series
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.transport.pool import ClientPool
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+logger = structlog.get_logger()
+
+JOULES_PER_KWH = 3.6e6
+BACKEND_EXPORTERS: dict[str, type[VLLMExporter] | type[TGIExporter]] = {
+    "vllm": VLLMExporter,
+    "tgi": TGIExporter,
+}
+EFFICIENCY_MODEL_METRICS = (
+    EFFICIENCY_TOKENS_PER_JOULE,
+    EFFICIENCY_COST_PER_MILLION_TOKENS,
+    EFFICIENCY_ENERGY_JOULES,
+)
+EFFICIENCY_SETTINGS = {
+    "efficiency_interval": "interval",
+    "efficiency_power_interval": "power_interval",
+    "efficiency_energy_price_per_kwh": "energy_price_per_kwh",
+    "efficiency_gpu_hourly_cost": "gpu_hourly_cost",
+    "model_refresh_interval": "mapping_interval",
+}
+
+
+def server_backends(servers: dict[str, str]) -> dict[str, str]:
+    servers = {endpoint.rstrip("/"): backend for endpoint, backend in servers.items()}
+    servers = servers or {settings.vllm_endpoint.rstrip("/"): "vllm"}
+    for backend in servers.values():
+        if backend not in BACKEND_EXPORTERS:
+            raise ValueError(f"Unsupported efficiency backend: {backend}")
+    return servers
+
+
+def busy_seconds(delta: ModelDelta) -> float:
+    return sum(histogram.sum for histogram in (delta.ttft, delta.itl) if histogram is not None)
+
+
+def attribution_weights(deltas: dict[str, ModelDelta]) -> dict[str, float]:
+    for weight in (busy_seconds, lambda delta: delta.tokens or 0.0):
+        weights = {model: max(weight(delta), 0.0) for model, delta in deltas.items()}
+        total = sum(weights.values())
+        if total > 0:
+            return {model: value / total for model, value in weights.items()}
+    return {model: 1 / len(deltas) for model in deltas}
+
+
+@dataclass
+class ServerTarget:
+    backend: str
+    exporter: VLLMExporter | TGIExporter
+    gpus: list[str] = field(default_factory=list)
+    source: str = SOURCE_NONE
+    energy: dict[str, float] = field(default_factory=dict)
+    collected_at: float | None = None
+    models: set[str] = field(default_factory=set)
+    cost_models: set[str] = field(default_factory=set)
+    active: bool = True
+
+    @property
+    def endpoint(self) -> str:
+        return self.exporter.endpoint
+
+
+class EfficiencyCollector:
+    def __init__(
+        self,
+        servers: dict[str, str] | None = None,
+        gpu_map: dict[str, list[str]] | None = None,
+        port: int = settings.exporter_port_efficiency,
+        interval: float = settings.efficiency_interval,
+        power_interval: float = settings.efficiency_power_interval,
+        energy_price_per_kwh: float = settings.efficiency_energy_price_per_kwh,
+        gpu_hourly_cost: float = settings.efficiency_gpu_hourly_cost,
+        mapping_interval: float = settings.model_refresh_interval,
+        reader: NVMLPowerReader | NvidiaSmiPowerReader | None = None,
+    ):
+        servers = server_backends(settings.efficiency_servers if servers is None else servers)
+        self.pool = ClientPool("efficiency")
+        self.targets = [self._target(endpoint, backend) for endpoint, backend in servers.items()]
+        self.mapper = GPUMapper(
+            settings.efficiency_gpu_map if gpu_map is None else gpu_map, settings.gpu_proc_root
+        )
+        self.port = port
+        self.interval = interval
+        self.power_interval = power_interval
+        self.energy_price_per_kwh = energy_price_per_kwh
+        self.gpu_hourly_cost = gpu_hourly_cost
+        self.mapping_interval = mapping_interval
+        self.gpu_exporter = GPUExporter()
+        self.meter = EnergyMeter()
+        self.reader = reader
+        self.watcher: ConfigWatcher | None = None
+        self._mapped_at: float | None = None
+        self._running = False
+
+    def _target(self, endpoint: str, backend: str) -> ServerTarget:
+        return ServerTarget(backend, BACKEND_EXPORTERS[backend](endpoint=endpoint, pool=self.pool))
+
+    async def set_servers(self, servers: dict[str, str]) -> None:
+        servers = server_backends(servers)
+        kept = [target for target in self.targets if servers.get(target.endpoint) == target.backend]
+        removed = [target for target in self.targets if target not in kept]
+        known = {target.endpoint for target in kept}
+        added = [
+            self._target(endpoint, backend)
+            for endpoint, backend in servers.items()
+            if endpoint not in known
+        ]
+        for target in removed:
+            await self.remove_target(target)
+        self.targets = kept + added
+        if removed or added:
+            self._mapped_at = None
+            logger.info(
+                "Updated efficiency servers",
+                added=[target.endpoint for target in added],
+                removed=[target.endpoint for target in removed],
+            )
+
+    async def remove_target(self, target: ServerTarget) -> None:
+        target.active = False
+        await self.pool.release(target.endpoint)
+        SIGNALS.remove(target.endpoint)
+        remove_endpoint_series(target.endpoint, EFFICIENCY_METRICS)
+
+    async def apply_settings(self, changes: dict[str, Any]) -> None:
+        for name, attribute in EFFICIENCY_SETTINGS.items():
+            if name in changes:
+                setattr(self, attribute, changes[name])
+        if "efficiency_gpu_map" in changes:
+            self.mapper = GPUMapper(changes["efficiency_gpu_map"], settings.gpu_proc_root)
+            self._mapped_at = None
+        if "efficiency_nvidia_smi_power_interval" in changes and isinstance(
+            self.reader, NvidiaSmiPowerReader
+        ):
+            self.reader.min_interval = changes["efficiency_nvidia_smi_power_interval"]
+        if "efficiency_servers" in changes or (
+            "vllm_endpoint" in changes and not settings.efficiency_servers
+        ):
+            await self.set_servers(settings.efficiency_servers)
+        for target in self.targets:
+            target.exporter.reconfigure(changes)
+
+    def map_gpus(self, gpus: list[GPUMetrics]) -> None:
+        self._mapped_at = time.monotonic()
+        for target in self.targets:
+            source, mapped = self.mapper.resolve(target.endpoint, gpus, len(self.targets))
+            gpu_uuids = [gpu.gpu_uuid for gpu in mapped]
+            if (source, gpu_uuids) != (target.source, target.gpus):
+                logger.info(
+                    "Mapped inference server to GPUs",
+                    endpoint=target.endpoint,
+                    source=source,
+                    gpus=gpu_uuids,
+                )
+            target.source, target.gpus = source, gpu_uuids
+            for name in SOURCES:
+                EFFICIENCY_SERVER_GPUS.labels(
+                    backend=target.backend, endpoint=target.endpoint, source=name
+                ).set(len(gpu_uuids) if name == source else 0)
+
+    def _mapping_due(self) -> bool:
+        return self._mapped_at is None or (
+            self.mapping_interval > 0
+            and time.monotonic() - self._mapped_at >= self.mapping_interval
+        )
+
+    def sample_power(self, timestamp: float, readings: dict[str, float]) -> None:
+        self.meter.add(timestamp, readings)
+        if readings and self.reader is not None:
+            EFFICIENCY_POWER_SAMPLES.labels(reader=self.reader.name).inc(len(readings))
+
+    def _sharers(self) -> dict[str, int]:
+        sharers: dict[str, int] = {}
+        for target in self.targets:
+            for uuid in target.gpus:
+                sharers[uuid] = sharers.get(uuid, 0) + 1
+        return sharers
+
+    def account(self, target: ServerTarget, metrics: dict[str, Any], now: float) -> None:
+        exporter = target.exporter
+        deltas = exporter.breakdown.update(metrics, exporter.model)
+        previous_energy = target.energy
+        target.energy = {
+            uuid: joules
+            for uuid in target.gpus
+            if (joules := self.meter.energy(uuid)) is not None
+        }
+        previous_time, target.collected_at = target.collected_at, now
+        if previous_time is None or now <= previous_time:
+            return
+
+        elapsed = now - previous_time
+        sharers = self._sharers()
+        joules = sum(
+            (target.energy[uuid] - previous_energy[uuid]) / sharers[uuid]
+            for uuid in target.energy
+            if uuid in previous_energy
+        )
+        gpu_hours = sum(elapsed / 3600 / sharers[uuid] for uuid in target.gpus)
+        cost = joules / JOULES_PER_KWH * self.energy_price_per_kwh + (
+            gpu_hours * self.gpu_hourly_cost
+        )
+        EFFICIENCY_SERVER_POWER_WATTS.labels(
+            backend=target.backend, endpoint=target.endpoint
+        ).set(joules / elapsed)
+
+        deltas = deltas or {exporter.model: ModelDelta()}
+        priced = self.energy_price_per_kwh > 0 or self.gpu_hourly_cost > 0
+        for model, share in attribution_weights(deltas).items():
+            labels = {"backend": target.backend, "model": model, "endpoint": target.endpoint}
+            target.models.add(model)
+            tokens = deltas[model].tokens or 0.0
+            model_joules = joules * share
+            EFFICIENCY_ENERGY_JOULES.labels(**labels).inc(model_joules)
+            EFFICIENCY_TOKENS_PER_JOULE.labels(**labels).set(
+                tokens / model_joules if model_joules > 0 else 0.0
+            )
+            if priced and tokens > 0:
+                EFFICIENCY_COST_PER_MILLION_TOKENS.labels(**labels).set(
+                    cost * share / tokens * 1e6
+                )
+                target.cost_models.add(model)
+            elif model in target.cost_models:
+                EFFICIENCY_COST_PER_MILLION_TOKENS.remove(*labels.values())
+                target.cost_models.discard(model)
+
+    async def refresh_models(self, target: ServerTarget) -> None:
+        await target.exporter.fetch_model_info()
+        self.prune_models(target)
+
+    def prune_models(self, target: ServerTarget) -> None:
+        exporter = target.exporter
+        active = set(exporter.breakdown.models) | {exporter.model, OTHER_MODEL}
+        for model in target.models - active:
+            remove_model_series(EFFICIENCY_MODEL_METRICS, model, target.endpoint)
+            target.cost_models.discard(model)
+        target.models &= active
+
+    async def power_loop(self, reader: NVMLPowerReader | NvidiaSmiPowerReader) -> None:
+        loop = asyncio.get_running_loop()
+        while self._running:
+            started = time.monotonic()
+            try:
+                readings = await loop.run_in_executor(None, reader.read)
+                self.sample_power((started + time.monotonic()) / 2, readings)
+            except Exception as e:
+                logger.error("Error sampling GPU power", error=str(e))
+            interval = max(self.power_interval, reader.min_interval)
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def collect(self, target: ServerTarget) -> None:
+        if target.exporter._model_refresh_due():
+            await self.refresh_models(target)
+        metrics = await target.exporter.fetch_metrics()
+        if metrics and target.active:
+            self.account(target, metrics, time.monotonic())
+            target.exporter.publish_signals(metrics)
+
+    async def collect_loop(self) -> None:
+        self._running = True
+        loop = asyncio.get_running_loop()
+        if self.reader is None:
+            self.reader = power_reader(settings.gpu_nvml_enabled)
+        reader = self.reader
+        logger.info(
+            "Starting efficiency collector",
+            servers=[target.endpoint for target in self.targets],
+            interval=self.interval,
+            power_interval=max(self.power_interval, reader.min_interval),
+            reader=reader.name,
+        )
+        await asyncio.gather(*(self.refresh_models(target) for target in self.targets))
+        power_task = asyncio.create_task(self.power_loop(reader))
+        if self.watcher is not None:
+            self.watcher.start()
+        try:
+            while self._running:
+                started = time.monotonic()
+                try:
+                    if self._mapping_due():
+                        gpus = await loop.run_in_executor(None, self.gpu_exporter.collect_metrics)
+                        if gpus:
+                            self.map_gpus(gpus)
+                    await asyncio.gather(*(self.collect(target) for target in self.targets))
+                except Exception as e:
+                    logger.error("Error computing token efficiency", error=str(e))
+
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            self._running = False
+            await power_task
+
+    def stop(self) -> None:
+        self._running = False
+        logger.info("Stopping efficiency collector")
+
+    def run(self) -> None:
+        logging.basicConfig(level=settings.log_level)
+        start_http_server(self.port)
+        self.watcher = ConfigWatcher("efficiency", self.apply_settings)
+        logger.info(f"Efficiency collector started on port {self.port}")
+
+        loop = asyncio.get_event_loop()
+        try:
+            loop.run_until_complete(self.collect_loop())
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            loop.run_until_complete(self.watcher.stop())
+            if self.reader is not None:
+                self.reader.close()
+            loop.run_until_complete(self.pool.aclose())
+            loop.close()
+
+
+def main() -> None:
+    collector = EfficiencyCollector()
+    collector.run()
+
+
+if __name__ == "__main__":
+    main()
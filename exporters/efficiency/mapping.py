@@ -0,0 +1,171 @@
+import os
+import socket
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from exporters.gpu_exporter.exporter import GPUMetrics
+
+SOURCE_CONFIG = "config"
+SOURCE_PID = "pid"
+SOURCE_CUDA_VISIBLE_DEVICES = "cuda_visible_devices"
+SOURCE_ALL = "all"
+SOURCE_NONE = "none"
+SOURCES = (SOURCE_CONFIG, SOURCE_PID, SOURCE_CUDA_VISIBLE_DEVICES, SOURCE_ALL, SOURCE_NONE)
+
+TCP_LISTEN = "0A"
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1", "0.0.0.0"})
+
+
+def endpoint_port(endpoint: str) -> int | None:
+    parts = urlsplit(endpoint)
+    if parts.hostname not in LOCAL_HOSTS | {socket.gethostname()}:
+        return None
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if port is None:
+        return 443 if parts.scheme == "https" else 80
+    return port
+
+
+def select_devices(spec: Iterable[str], gpus: Sequence[GPUMetrics]) -> list[GPUMetrics]:
+    by_index = {str(gpu.gpu_id): gpu for gpu in gpus}
+    selected: list[GPUMetrics] = []
+    for device in spec:
+        device = device.strip()
+        if not device:
+            continue
+        gpu = by_index.get(device)
+        if gpu is None and device.startswith("GPU-"):
+            matches = [gpu for gpu in gpus if gpu.gpu_uuid.startswith(device)]
+            gpu = matches[0] if len(matches) == 1 else None
+        if gpu is None:
+            break
+        if gpu not in selected:
+            selected.append(gpu)
+    return selected
+
+
+class ProcessTable:
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = Path(proc_root)
+
+    def _pids(self) -> list[int]:
+        try:
+            return [int(entry.name) for entry in os.scandir(self.proc_root) if entry.name.isdigit()]
+        except OSError:
+            return []
+
+    def listening_inodes(self, port: int) -> set[str]:
+        inodes: set[str] = set()
+        for table in ("tcp", "tcp6"):
+            try:
+                lines = (self.proc_root / "net" / table).read_text().splitlines()[1:]
+            except OSError:
+                continue
+            for line in lines:
+                fields = line.split()
+                if len(fields) < 10 or fields[3] != TCP_LISTEN:
+                    continue
+                if int(fields[1].rsplit(":", 1)[1], 16) == port:
+                    inodes.add(fields[9])
+        return inodes
+
+    def socket_owner(self, inodes: set[str]) -> int | None:
+        if not inodes:
+            return None
+        targets = {f"socket:[{inode}]" for inode in inodes}
+        for pid in sorted(self._pids()):
+            fd_dir = self.proc_root / str(pid) / "fd"
+            try:
+                entries = list(os.scandir(fd_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if os.readlink(entry.path) in targets:
+                        return pid
+                except OSError:
+                    continue
+        return None
+
+    def descendants(self, pid: int) -> set[int]:
+        children: dict[int, list[int]] = {}
+        for child in self._pids():
+            try:
+                stat = (self.proc_root / str(child) / "stat").read_text()
+            except OSError:
+                continue
+            parent = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(parent, []).append(child)
+        tree = {pid}
+        pending = [pid]
+        while pending:
+            for child in children.get(pending.pop(), ()):
+                if child not in tree:
+                    tree.add(child)
+                    pending.append(child)
+        return tree
+
+    def environ(self, pid: int, name: str) -> str | None:
+        try:
+            data = (self.proc_root / str(pid) / "environ").read_bytes()
+        except OSError:
+            return None
+        prefix = f"{name}=".encode()
+        for entry in data.split(b"\0"):
+            if entry.startswith(prefix):
+                return entry[len(prefix) :].decode(errors="replace")
+        return None
+
+    def alive(self, pid: int) -> bool:
+        return (self.proc_root / str(pid)).exists()
+
+
+class GPUMapper:
+    def __init__(
+        self,
+        gpu_map: dict[str, list[str]] | None = None,
+        proc_root: str = "/proc",
+    ):
+        self.gpu_map = {
+            endpoint.rstrip("/"): devices for endpoint, devices in (gpu_map or {}).items()
+        }
+        self.processes = ProcessTable(proc_root)
+        self._server_pids: dict[str, int] = {}
+
+    def server_pid(self, endpoint: str) -> int | None:
+        pid = self._server_pids.get(endpoint)
+        if pid is not None and self.processes.alive(pid):
+            return pid
+        self._server_pids.pop(endpoint, None)
+        port = endpoint_port(endpoint)
+        if port is None:
+            return None
+        pid = self.processes.socket_owner(self.processes.listening_inodes(port))
+        if pid is not None:
+            self._server_pids[endpoint] = pid
+        return pid
+
+    def resolve(
+        self, endpoint: str, gpus: Sequence[GPUMetrics], servers: int = 1
+    ) -> tuple[str, list[GPUMetrics]]:
+        devices = self.gpu_map.get(endpoint)
+        if devices is not None:
+            return SOURCE_CONFIG, select_devices(devices, gpus)
+
+        pid = self.server_pid(endpoint)
+        if pid is not None:
+            tree = self.processes.descendants(pid)
+            owned = [gpu for gpu in gpus if any(p.pid in tree for p in gpu.processes)]
+            if owned:
+                return SOURCE_PID, owned
+            visible = self.processes.environ(pid, "CUDA_VISIBLE_DEVICES")
+            if visible is not None:
+                return SOURCE_CUDA_VISIBLE_DEVICES, select_devices(visible.split(","), gpus)
+
+        if servers == 1:
+            return SOURCE_ALL, list(gpus)
+        return SOURCE_NONE, []
@@ -0,0 +1,46 @@
+from exporters.registry import Counter, Gauge
+
+EFFICIENCY_TOKENS_PER_JOULE = Gauge(
+    "efficiency_tokens_per_joule",
+    "Prefill plus decode tokens per joule of attributed GPU energy over the last window",
+    ["backend", "model", "endpoint"],
+)
+
+EFFICIENCY_COST_PER_MILLION_TOKENS = Gauge(
+    "efficiency_cost_per_million_tokens",
+    "Estimated energy plus GPU-hour cost per million tokens over the last window",
+    ["backend", "model", "endpoint"],
+)
+
+EFFICIENCY_ENERGY_JOULES = Counter(
+    "efficiency_energy_joules",
+    "GPU energy attributed to the model",
+    ["backend", "model", "endpoint"],
+)
+
+EFFICIENCY_SERVER_POWER_WATTS = Gauge(
+    "efficiency_server_power_watts",
+    "Average power drawn by the GPUs mapped to the server over the last window",
+    ["backend", "endpoint"],
+)
+
+EFFICIENCY_SERVER_GPUS = Gauge(
+    "efficiency_server_gpus",
+    "GPUs mapped to the server, by mapping source",
+    ["backend", "endpoint", "source"],
+)
+
+EFFICIENCY_POWER_SAMPLES = Counter(
+    "efficiency_power_samples",
+    "Power readings integrated into GPU energy",
+    ["reader"],
+)
+
+METRICS = [
+    EFFICIENCY_TOKENS_PER_JOULE,
+    EFFICIENCY_COST_PER_MILLION_TOKENS,
+    EFFICIENCY_ENERGY_JOULES,
+    EFFICIENCY_SERVER_POWER_WATTS,
+    EFFICIENCY_SERVER_GPUS,
+    EFFICIENCY_POWER_SAMPLES,
+]
@@ -0,0 +1,118 @@
+import subprocess
+
+import structlog
+
+from exporters.config import settings
+
+try:
+    import pynvml
+except ImportError:  # pragma: no cover - optional dependency
+    pynvml = None
+
+logger = structlog.get_logger()
+
+NVIDIA_SMI_POWER_ARGS = ["--query-gpu=uuid,power.draw", "--format=csv,noheader,nounits"]
+NVIDIA_SMI_TIMEOUT = 5.0
+
+
+def parse_power_csv(output: str) -> dict[str, float]:
+    readings: dict[str, float] = {}
+    for line in output.splitlines():
+        uuid, _, watts = line.partition(",")
+        try:
+            readings[uuid.strip()] = float(watts)
+        except ValueError:
+            continue
+    return readings
+
+
+class NVMLPowerReader:
+    name = "nvml"
+    min_interval = 0.0
+
+    def __init__(self) -> None:
+        self.available = False
+        self._handles: dict[str, object] = {}
+        if pynvml is None:
+            return
+        try:
+            pynvml.nvmlInit()
+            for index in range(pynvml.nvmlDeviceGetCount()):
+                handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+                uuid = pynvml.nvmlDeviceGetUUID(handle)
+                self._handles[uuid.decode() if isinstance(uuid, bytes) else uuid] = handle
+        except pynvml.NVMLError as e:
+            logger.info("NVML unavailable, sampling power through nvidia-smi", error=str(e))
+            return
+        self.available = True
+
+    def read(self) -> dict[str, float]:
+        readings: dict[str, float] = {}
+        for uuid, handle in self._handles.items():
+            try:
+                readings[uuid] = pynvml.nvmlDeviceGetPowerUsage(handle) / 1000
+            except pynvml.NVMLError:
+                continue
+        return readings
+
+    def close(self) -> None:
+        if self.available:
+            self.available = False
+            pynvml.nvmlShutdown()
+
+
+class NvidiaSmiPowerReader:
+    name = "nvidia-smi"
+
+    def __init__(self, nvidia_smi_path: str = "nvidia-smi", min_interval: float | None = None):
+        self.nvidia_smi_path = nvidia_smi_path
+        self.min_interval = (
+            settings.efficiency_nvidia_smi_power_interval if min_interval is None else min_interval
+        )
+
+    def read(self) -> dict[str, float]:
+        try:
+            result = subprocess.run(
+                [self.nvidia_smi_path, *NVIDIA_SMI_POWER_ARGS],
+                capture_output=True,
+                text=True,
+                timeout=NVIDIA_SMI_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning("nvidia-smi power query failed", error=str(e))
+            return {}
+        if result.returncode != 0:
+            return {}
+        return parse_power_csv(result.stdout)
+
+    def close(self) -> None:
+        pass
+
+
+class EnergyMeter:
+    def __init__(self) -> None:
+        self.joules: dict[str, float] = {}
+        self._last: dict[str, tuple[float, float]] = {}
+
+    def add(self, timestamp: float, readings: dict[str, float]) -> None:
+        for uuid, watts in readings.items():
+            last = self._last.get(uuid)
+            self._last[uuid] = (timestamp, watts)
+            if last is None:
+                self.joules.setdefault(uuid, 0.0)
+                continue
+            elapsed = timestamp - last[0]
+            if elapsed > 0:
+                self.joules[uuid] += (last[1] + watts) / 2 * elapsed
+
+    def energy(self, uuid: str) -> float | None:
+        return self.joules.get(uuid)
+
+
+def power_reader(enabled_nvml: bool = True) -> NVMLPowerReader | NvidiaSmiPowerReader:
+    if enabled_nvml:
+        reader = NVMLPowerReader()
+        if reader.available:
+            return reader
+    return NvidiaSmiPowerReader()
+
@@ -1,8 +1,14 @@
 import asyncio
+import io
 import logging
+import socket
 import subprocess
+import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from typing import Any
 
 import structlog
@@ -24,17 +30,67 @@ from exporters.gpu_exporter.metrics import (
     GPU_POWER_LIMIT_WATTS,
     GPU_POWER_UTILIZATION,
     GPU_PROCESS_COUNT,
+    GPU_PROCESS_MEMORY_BYTES,
+    GPU_PROCESS_SM_UTILIZATION,
     GPU_TEMPERATURE_CELSIUS,
     GPU_VRAM_FREE_BYTES,
     GPU_VRAM_TOTAL_BYTES,
     GPU_VRAM_UTILIZATION,
     GPU_VRAM_USED_BYTES,
 )
+from exporters.gpu_exporter.processes import ContainerResolver, GPUProcess, NVMLProcessSampler
+from exporters.otlp.exporter import OTLPExporter
+from exporters.reload.watcher import ConfigWatcher
+from exporters.remote_write.writer import RemoteWriter
+from exporters.scheduler.scheduler import AdaptiveInterval
 
 logger = structlog.get_logger()
 
-MEMORY_BOUND_VRAM_THRESHOLD = 0.90
-MEMORY_BOUND_COMPUTE_THRESHOLD = 0.50
+ProcessKey = tuple[str, str, str, str, str]
+
+NVIDIA_SMI_TIMEOUT = 30.0
+NVIDIA_SMI_READ_SIZE = 64 * 1024
+NVIDIA_SMI_ARGS = [
+    "-q",
+    "-x",
+    "--query-gpu=index,name,uuid,utilization.gpu,utilization.memory,memory.used,memory.total,memory.free,temperature.gpu,power.draw,power.limit,fan.speed,clocks.current.sm,clocks.current.memory,pcie.tx_throughput,pcie.rx_throughput",
+]
+
+GPU_FIELDS = frozenset(
+    {
+        "gpu_id",
+        "minor_number",
+        "product_name",
+        "uuid",
+        "fb_memory_usage/used",
+        "fb_memory_usage/total",
+        "fb_memory_usage/free",
+        "utilization/gpu_util",
+        "utilization/memory_util",
+        "temperature/gpu_temp",
+        "power_readings/power_draw",
+        "power_readings/default_power_limit",
+        "power_readings/power_limit",
+        "fan_speed",
+        "clocks/sm_clock",
+        "clocks/mem_clock",
+        "pci/tx_throughput/value",
+        "pci/rx_throughput/value",
+        "encoder_stats/utilization",
+        "decoder_stats/utilization",
+    }
+)
+GPU_PROCESS_PATH = "processes/process_info"
+GPU_FIELD_PARENTS = frozenset(
+    path[:i]
+    for path in GPU_FIELDS | {GPU_PROCESS_PATH}
+    for i, char in enumerate(path)
+    if char == "/"
+)
+
+
+class NvidiaSmiError(RuntimeError):
+    pass
 
 
 @dataclass
@@ -60,53 +116,46 @@ class GPUMetrics:
     decoder_util: float
     process_count: int
     is_memory_bound: bool
+    processes: list[GPUProcess] = field(default_factory=list)
 
 
 class GPUExporter:
     def __init__(self, port: int = settings.exporter_port_gpu):
         self.port = port
         self._running = False
+        self.remote_writer: RemoteWriter | None = None
+        self.otlp_exporter: OTLPExporter | None = None
+        self.watcher: ConfigWatcher | None = None
         self._nvidia_smi_path = "nvidia-smi"
+        self.container_resolver = ContainerResolver(settings.gpu_proc_root)
+        self.nvml: NVMLProcessSampler | None = None
+        self._process_labels: set[ProcessKey] = set()
+        self._process_sm_labels: set[ProcessKey] = set()
+        self.schedule: AdaptiveInterval | None = None
 
-    def _run_nvidia_smi(self, args: list[str]) -> str:
-        try:
-            result = subprocess.run(
-                [self._nvidia_smi_path] + args,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
-                logger.error("nvidia-smi failed", stderr=result.stderr)
-                return ""
-            return result.stdout
-        except subprocess.TimeoutExpired:
-            logger.error("nvidia-smi timed out")
-            return ""
-        except FileNotFoundError:
-            logger.error("nvidia-smi not found")
-            return ""
-
-    def _parse_xml_output(self, xml_output: str) -> ET.Element | None:
-        try:
-            return ET.fromstring(xml_output)
-        except ET.ParseError as e:
-            logger.error("Failed to parse nvidia-smi XML output", error=str(e))
-            return None
+    async def apply_settings(self, changes: dict[str, Any]) -> None:
+        if self.schedule is not None:
+            self.schedule.reconfigure(changes)
 
     def _safe_float(self, value: str | None, default: float = 0.0) -> float:
         if value is None:
             return default
+        parts = value.split()
+        if not parts:
+            return default
         try:
-            return float(value)
+            return float(parts[0])
         except ValueError:
             return default
 
     def _safe_int(self, value: str | None, default: int = 0) -> int:
         if value is None:
             return default
+        parts = value.split()
+        if not parts:
+            return default
         try:
-            return int(float(value))
+            return int(float(parts[0]))
         except ValueError:
             return default
 
@@ -122,138 +171,187 @@ class GPUExporter:
             return int(float(memory_str[:-2]))
         return self._safe_int(memory_str)
 
-    def collect_metrics(self) -> list[GPUMetrics]:
-        xml_output = self._run_nvidia_smi(
-            [
-                "-q",
-                "-x",
-                "--query-gpu=index,name,uuid,utilization.gpu,utilization.memory,memory.used,memory.total,memory.free,temperature.gpu,power.draw,power.limit,fan.speed,clocks.current.sm,clocks.current.memory,pcie.tx_throughput,pcie.rx_throughput",
-            ]
-        )
-
-        if not xml_output:
-            return []
+    def _stream_nvidia_smi(self, args: list[str]) -> Iterator[bytes]:
+        # stderr goes to a file so a chatty nvidia-smi cannot fill the pipe and
+        # block while stdout is still being read.
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(
+                    [self._nvidia_smi_path] + args,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                )
+            except FileNotFoundError:
+                logger.error("nvidia-smi not found")
+                raise NvidiaSmiError("nvidia-smi not found") from None
 
-        root = self._parse_xml_output(xml_output)
-        if root is None:
-            return []
+            timed_out = threading.Event()
 
-        metrics_list: list[GPUMetrics] = []
+            def kill_on_timeout() -> None:
+                timed_out.set()
+                process.kill()
 
-        for gpu in root.findall(".//gpu"):
+            timer = threading.Timer(NVIDIA_SMI_TIMEOUT, kill_on_timeout)
+            timer.start()
+            stdout = process.stdout
+            assert isinstance(stdout, io.BufferedReader)
             try:
-                gpu_id = self._safe_int(gpu.findtext("gpu_id") or gpu.get("id", "0"))
-                gpu_name = gpu.findtext("product_name") or "Unknown"
-                gpu_uuid = gpu.findtext("uuid") or "Unknown"
-
-                fb_memory = gpu.find("fb_memory_usage")
-                if fb_memory is not None:
-                    vram_used = self._parse_memory(fb_memory.findtext("used"))
-                    vram_total = self._parse_memory(fb_memory.findtext("total"))
-                    vram_free = self._parse_memory(fb_memory.findtext("free"))
-                else:
-                    vram_used = vram_total = vram_free = 0
-
-                vram_utilization = vram_used / vram_total if vram_total > 0 else 0.0
-
-                utilization = gpu.find("utilization")
-                if utilization is not None:
-                    compute_utilization = self._safe_float(utilization.findtext("gpu_util")) / 100
-                    memory_bandwidth_util = (
-                        self._safe_float(utilization.findtext("memory_util")) / 100
-                    )
-                else:
-                    compute_utilization = memory_bandwidth_util = 0.0
-
-                temperature = self._safe_int(gpu.findtext("temperature/gpu_temp"))
+                while chunk := stdout.read1(NVIDIA_SMI_READ_SIZE):
+                    yield chunk
+                returncode = process.wait()
+            finally:
+                timer.cancel()
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                stdout.close()
+
+            if timed_out.is_set():
+                logger.error("nvidia-smi timed out")
+                raise NvidiaSmiError("nvidia-smi timed out")
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+                logger.error("nvidia-smi failed", stderr=stderr)
+                raise NvidiaSmiError(f"nvidia-smi exited with {returncode}")
+
+    def _parse_gpu_stream(self, chunks: Iterable[bytes | str]) -> list[GPUMetrics]:
+        parser: ET.XMLPullParser[ET.Element] = ET.XMLPullParser(events=("end",))
+        metrics_list: list[GPUMetrics] = []
+        fed = False
+
+        def drain() -> None:
+            for event in parser.read_events():
+                elem = event[-1]
+                if not isinstance(elem, ET.Element) or elem.tag != "gpu":
+                    continue
+                metrics = self._build_gpu_metrics(elem, len(metrics_list))
+                if metrics is not None:
+                    metrics_list.append(metrics)
+                # Drop the subtree once extracted so memory stays bounded by a
+                # single <gpu> element rather than the whole document.
+                elem.clear()
 
-                power_readings = gpu.find("power_readings")
-                if power_readings is not None:
-                    power_draw = self._safe_float(
-                        power_readings.findtext("power_draw"), default=0.0
-                    )
-                    power_limit = self._safe_float(
-                        power_readings.findtext("default_power_limit")
-                        or power_readings.findtext("power_limit"),
-                        default=0.0,
-                    )
-                else:
-                    power_draw = power_limit = 0.0
-
-                fan_speed = self._safe_int(gpu.findtext("fan_speed"))
-
-                clocks = gpu.find("clocks")
-                if clocks is not None:
-                    clock_sm = self._safe_int(clocks.findtext("sm_clock"))
-                    clock_memory = self._safe_int(clocks.findtext("mem_clock"))
-                else:
-                    clock_sm = clock_memory = 0
-
-                pcie = gpu.find("pci")
-                if pcie is not None:
-                    tx_throughput = pcie.find("tx_throughput")
-                    rx_throughput = pcie.find("rx_throughput")
-                    pcie_tx = (
-                        self._safe_int(tx_throughput.findtext("value"))
-                        if tx_throughput is not None
-                        else 0
-                    )
-                    pcie_rx = (
-                        self._safe_int(rx_throughput.findtext("value"))
-                        if rx_throughput is not None
-                        else 0
-                    )
-                else:
-                    pcie_tx = pcie_rx = 0
-
-                encoder_util = decoder_util = 0.0
-                encoder_stats = gpu.find("encoder_stats")
-                if encoder_stats is not None:
-                    encoder_util = self._safe_float(encoder_stats.findtext("utilization")) / 100
-                decoder_stats = gpu.find("decoder_stats")
-                if decoder_stats is not None:
-                    decoder_util = self._safe_float(decoder_stats.findtext("utilization")) / 100
-
-                processes = gpu.find("processes")
-                process_count = (
-                    len(processes.findall("process_info")) if processes is not None else 0
-                )
+        try:
+            for chunk in chunks:
+                if chunk:
+                    fed = True
+                    parser.feed(chunk)
+                    drain()
+            if not fed:
+                return []
+            parser.close()
+            drain()
+        except ET.ParseError as e:
+            logger.error("Failed to parse nvidia-smi XML output", error=str(e))
+            return []
+        return metrics_list
 
-                is_memory_bound = (
-                    vram_utilization > MEMORY_BOUND_VRAM_THRESHOLD
-                    and compute_utilization < MEMORY_BOUND_COMPUTE_THRESHOLD
-                )
+    def _extract_gpu_fields(
+        self, gpu: ET.Element
+    ) -> tuple[dict[str, str | None], list[GPUProcess]]:
+        fields: dict[str, str | None] = dict.fromkeys(GPU_FIELDS)
+        processes: list[GPUProcess] = []
+        pending = [(child, child.tag) for child in gpu]
+        while pending:
+            elem, path = pending.pop()
+            if path in GPU_FIELDS:
+                fields[path] = elem.text
+            elif path == GPU_PROCESS_PATH:
+                process = self._parse_process(elem)
+                if process is not None:
+                    processes.append(process)
+            elif path in GPU_FIELD_PARENTS:
+                pending.extend((child, f"{path}/{child.tag}") for child in elem)
+        processes.reverse()
+        return fields, processes
+
+    def _parse_process(self, elem: ET.Element) -> GPUProcess | None:
+        values = {child.tag: child.text for child in elem}
+        pid = self._safe_int(values.get("pid"), default=-1)
+        if pid < 0:
+            return None
+        return GPUProcess(
+            pid=pid,
+            process_name=values.get("process_name") or "Unknown",
+            process_type=values.get("type") or "",
+            used_memory=self._parse_memory(values.get("used_memory")),
+        )
 
-                metrics = GPUMetrics(
-                    gpu_id=gpu_id,
-                    gpu_name=gpu_name,
-                    gpu_uuid=gpu_uuid,
-                    vram_used=vram_used,
-                    vram_total=vram_total,
-                    vram_free=vram_free,
-                    vram_utilization=vram_utilization,
-                    compute_utilization=compute_utilization,
-                    temperature=temperature,
-                    power_draw=power_draw,
-                    power_limit=power_limit,
-                    fan_speed=fan_speed,
-                    clock_sm=clock_sm,
-                    clock_memory=clock_memory,
-                    pcie_tx=pcie_tx,
-                    pcie_rx=pcie_rx,
-                    memory_bandwidth_util=memory_bandwidth_util,
-                    encoder_util=encoder_util,
-                    decoder_util=decoder_util,
-                    process_count=process_count,
-                    is_memory_bound=is_memory_bound,
-                )
-                metrics_list.append(metrics)
-            except Exception as e:
-                logger.error("Error parsing GPU metrics", error=str(e))
-                continue
+    def _build_gpu_metrics(self, gpu: ET.Element, index: int) -> GPUMetrics | None:
+        try:
+            fields, processes = self._extract_gpu_fields(gpu)
+            gpu_id = self._safe_int(
+                fields["gpu_id"] or fields["minor_number"], default=index
+            )
+            vram_used = self._parse_memory(fields["fb_memory_usage/used"])
+            vram_total = self._parse_memory(fields["fb_memory_usage/total"])
+            vram_free = self._parse_memory(fields["fb_memory_usage/free"])
+            vram_utilization = vram_used / vram_total if vram_total > 0 else 0.0
+            compute_utilization = self._safe_float(fields["utilization/gpu_util"]) / 100
+            is_memory_bound = (
+                vram_utilization > settings.gpu_memory_bound_vram_threshold
+                and compute_utilization < settings.gpu_memory_bound_compute_threshold
+            )
+            return GPUMetrics(
+                gpu_id=gpu_id,
+                gpu_name=fields["product_name"] or "Unknown",
+                gpu_uuid=fields["uuid"] or "Unknown",
+                vram_used=vram_used,
+                vram_total=vram_total,
+                vram_free=vram_free,
+                vram_utilization=vram_utilization,
+                compute_utilization=compute_utilization,
+                temperature=self._safe_int(fields["temperature/gpu_temp"]),
+                power_draw=self._safe_float(fields["power_readings/power_draw"]),
+                power_limit=self._safe_float(
+                    fields["power_readings/default_power_limit"]
+                    or fields["power_readings/power_limit"]
+                ),
+                fan_speed=self._safe_int(fields["fan_speed"]),
+                clock_sm=self._safe_int(fields["clocks/sm_clock"]),
+                clock_memory=self._safe_int(fields["clocks/mem_clock"]),
+                pcie_tx=self._safe_int(fields["pci/tx_throughput/value"]),
+                pcie_rx=self._safe_int(fields["pci/rx_throughput/value"]),
+                memory_bandwidth_util=self._safe_float(fields["utilization/memory_util"]) / 100,
+                encoder_util=self._safe_float(fields["encoder_stats/utilization"]) / 100,
+                decoder_util=self._safe_float(fields["decoder_stats/utilization"]) / 100,
+                process_count=len(processes),
+                is_memory_bound=is_memory_bound,
+                processes=processes,
+            )
+        except Exception as e:
+            logger.error("Error parsing GPU metrics", error=str(e), bus_id=gpu.get("id"))
+            return None
 
+    def collect_metrics(self) -> list[GPUMetrics]:
+        try:
+            metrics_list = self._parse_gpu_stream(self._stream_nvidia_smi(NVIDIA_SMI_ARGS))
+        except NvidiaSmiError:
+            return []
+        if settings.gpu_process_metrics:
+            self._attribute_processes(metrics_list)
         return metrics_list
 
+    def _attribute_processes(self, metrics_list: list[GPUMetrics]) -> None:
+        live_pids: set[int] = set()
+        for metrics in metrics_list:
+            sm_utilization = (
+                self.nvml.sm_utilization(metrics.gpu_uuid) if self.nvml is not None else {}
+            )
+            for process in metrics.processes:
+                live_pids.add(process.pid)
+                process.container = self.container_resolver.resolve(process.pid)
+                process.sm_utilization = sm_utilization.get(process.pid)
+        self.container_resolver.evict(live_pids)
+
+    def poll_signals(self, metrics_list: list[GPUMetrics]) -> dict[str, float]:
+        signals: dict[str, float] = {}
+        for metrics in metrics_list:
+            signals[f"compute:{metrics.gpu_id}"] = metrics.compute_utilization
+            signals[f"memory_bandwidth:{metrics.gpu_id}"] = metrics.memory_bandwidth_util
+        return signals
+
     def update_prometheus_metrics(self, metrics_list: list[GPUMetrics]) -> None:
         for metrics in metrics_list:
             labels = {
@@ -287,15 +385,62 @@ class GPUExporter:
             GPU_PROCESS_COUNT.labels(**labels).set(metrics.process_count)
             GPU_MEMORY_BOUND_FLAG.labels(**labels).set(1 if metrics.is_memory_bound else 0)
 
+        if settings.gpu_process_metrics:
+            self._update_process_metrics(metrics_list)
+
+    def _update_process_metrics(self, metrics_list: list[GPUMetrics]) -> None:
+        memory: dict[ProcessKey, int] = {}
+        sm_utilization: dict[ProcessKey, float] = {}
+        for metrics in metrics_list:
+            for process in metrics.processes:
+                key: ProcessKey = (
+                    str(metrics.gpu_id),
+                    metrics.gpu_uuid,
+                    str(process.pid),
+                    process.process_name,
+                    process.container,
+                )
+                memory[key] = memory.get(key, 0) + process.used_memory
+                if process.sm_utilization is not None:
+                    sm_utilization[key] = sm_utilization.get(key, 0.0) + process.sm_utilization
+
+        for key, used in memory.items():
+            GPU_PROCESS_MEMORY_BYTES.labels(*key).set(used)
+        for key, utilization in sm_utilization.items():
+            GPU_PROCESS_SM_UTILIZATION.labels(*key).set(utilization)
+
+        # NVML has no utilization sample for a process that was idle since the
+        # last query; keep its last value until the process exits.
+        for key in self._process_labels - memory.keys():
+            GPU_PROCESS_MEMORY_BYTES.remove(*key)
+        for key in self._process_sm_labels - memory.keys():
+            GPU_PROCESS_SM_UTILIZATION.remove(*key)
+        self._process_labels = set(memory)
+        self._process_sm_labels = (self._process_sm_labels & memory.keys()) | sm_utilization.keys()
+
     async def collect_loop(self, interval: float = 15.0) -> None:
         self._running = True
+        if self.remote_writer is not None:
+            self.remote_writer.start()
+        if self.otlp_exporter is not None:
+            self.otlp_exporter.start()
+        if self.watcher is not None:
+            self.watcher.start()
         logger.info("Starting GPU exporter collection loop")
+        self.schedule = AdaptiveInterval("gpu", socket.gethostname(), interval)
+        phase = self.schedule.initial_delay()
 
         while self._running:
+            started = time.monotonic()
             try:
                 metrics_list = self.collect_metrics()
                 if metrics_list:
                     self.update_prometheus_metrics(metrics_list)
+                    self.schedule.observe(self.poll_signals(metrics_list))
+                    if self.remote_writer is not None:
+                        self.remote_writer.push()
+                    if self.otlp_exporter is not None:
+                        self.otlp_exporter.push()
                     logger.debug(
                         "Updated GPU metrics",
                         gpu_count=len(metrics_list),
@@ -304,7 +449,8 @@ class GPUExporter:
             except Exception as e:
                 logger.error("Error collecting GPU metrics", error=str(e))
 
-            await asyncio.sleep(interval)
+            await asyncio.sleep(self.schedule.next_delay(time.monotonic() - started) + phase)
+            phase = 0.0
 
     def stop(self) -> None:
         self._running = False
@@ -313,6 +459,15 @@ class GPUExporter:
     def run(self, interval: float = 15.0) -> None:
         logging.basicConfig(level=settings.log_level)
         start_http_server(self.port)
+        if settings.remote_write_url:
+            self.remote_writer = RemoteWriter(
+                external_labels={"job": "gpu-exporter", "instance": socket.gethostname()}
+            )
+        if settings.otlp_endpoint:
+            self.otlp_exporter = OTLPExporter(service_name="gpu-exporter")
+        if settings.gpu_process_metrics and settings.gpu_nvml_enabled:
+            self.nvml = NVMLProcessSampler()
+        self.watcher = ConfigWatcher("gpu", self.apply_settings)
         logger.info(f"GPU exporter started on port {self.port}")
 
         loop = asyncio.get_event_loop()
@@ -321,6 +476,13 @@ class GPUExporter:
         except KeyboardInterrupt:
             self.stop()
         finally:
+            loop.run_until_complete(self.watcher.stop())
+            if self.remote_writer is not None:
+                loop.run_until_complete(self.remote_writer.stop())
+            if self.otlp_exporter is not None:
+                loop.run_until_complete(self.otlp_exporter.stop())
+            if self.nvml is not None:
+                self.nvml.close()
             loop.close()
 
 
@@ -1,4 +1,4 @@
-from prometheus_client import Gauge
+from exporters.registry import Gauge
 
 GPU_VRAM_USED_BYTES = Gauge(
     "gpu_vram_used_bytes",
@@ -108,6 +108,18 @@ GPU_PROCESS_COUNT = Gauge(
     ["gpu_id", "gpu_name", "gpu_uuid"],
 )
 
+GPU_PROCESS_MEMORY_BYTES = Gauge(
+    "gpu_process_memory_bytes",
+    "GPU memory used by a process in bytes",
+    ["gpu_id", "gpu_uuid", "pid", "process_name", "container"],
+)
+
+GPU_PROCESS_SM_UTILIZATION = Gauge(
+    "gpu_process_sm_utilization_ratio",
+    "SM utilization attributed to a process (0-1, requires NVML)",
+    ["gpu_id", "gpu_uuid", "pid", "process_name", "container"],
+)
+
 GPU_MEMORY_BOUND_FLAG = Gauge(
     "gpu_memory_bound_flag",
     "Flag indicating if GPU is memory bound (1) or not (0)",
@@ -133,5 +145,7 @@ METRICS = [
     GPU_ENCODER_UTILIZATION,
     GPU_DECODER_UTILIZATION,
     GPU_PROCESS_COUNT,
+    GPU_PROCESS_MEMORY_BYTES,
+    GPU_PROCESS_SM_UTILIZATION,
     GPU_MEMORY_BOUND_FLAG,
 ]
@@ -0,0 +1,104 @@
+import re
+from collections.abc import Collection
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+try:
+    import pynvml
+except ImportError:  # pragma: no cover - optional dependency
+    pynvml = None
+
+logger = structlog.get_logger()
+
+CONTAINER_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+CONTAINER_ID_LENGTH = 12
+
+
+@dataclass
+class GPUProcess:
+    pid: int
+    process_name: str
+    process_type: str
+    used_memory: int
+    container: str = ""
+    sm_utilization: float | None = None
+
+
+def parse_container_id(cgroup: str) -> str:
+    ids = CONTAINER_ID_PATTERN.findall(cgroup)
+    return ids[-1][:CONTAINER_ID_LENGTH] if ids else ""
+
+
+class ContainerResolver:
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = Path(proc_root)
+        self._containers: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._containers)
+
+    def resolve(self, pid: int) -> str:
+        container = self._containers.get(pid)
+        if container is None:
+            container = self._read_container(pid)
+            self._containers[pid] = container
+        return container
+
+    def evict(self, live_pids: Collection[int]) -> int:
+        stale = [pid for pid in self._containers if pid not in live_pids]
+        for pid in stale:
+            del self._containers[pid]
+        return len(stale)
+
+    def _read_container(self, pid: int) -> str:
+        try:
+            cgroup = (self.proc_root / str(pid) / "cgroup").read_text()
+        except OSError:
+            return ""
+        return parse_container_id(cgroup)
+
+
+class NVMLProcessSampler:
+    def __init__(self) -> None:
+        self.available = False
+        self._handles: dict[str, Any] = {}
+        self._last_seen: dict[str, int] = {}
+        if pynvml is None:
+            return
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError as e:
+            logger.info("NVML unavailable, per-process SM utilization disabled", error=str(e))
+            return
+        self.available = True
+
+    def sm_utilization(self, gpu_uuid: str) -> dict[int, float]:
+        if not self.available:
+            return {}
+        try:
+            handle = self._handles.get(gpu_uuid)
+            if handle is None:
+                handle = pynvml.nvmlDeviceGetHandleByUUID(gpu_uuid)
+                self._handles[gpu_uuid] = handle
+            samples = pynvml.nvmlDeviceGetProcessUtilization(
+                handle, self._last_seen.get(gpu_uuid, 0)
+            )
+        except pynvml.NVMLError:
+            return {}
+
+        latest: dict[int, tuple[int, float]] = {}
+        for sample in samples:
+            seen = latest.get(sample.pid)
+            if seen is None or sample.timeStamp >= seen[0]:
+                latest[sample.pid] = (sample.timeStamp, sample.smUtil / 100)
+        if latest:
+            self._last_seen[gpu_uuid] = max(timestamp for timestamp, _ in latest.values())
+        return {pid: utilization for pid, (_, utilization) in latest.items()}
+
+    def close(self) -> None:
+        if self.available:
+            self.available = False
+            pynvml.nvmlShutdown()
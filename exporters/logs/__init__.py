@@ -0,0 +1,3 @@
+from exporters.logs.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+from collections.abc import Iterable
+
+import structlog
+from prometheus_client import Histogram, start_http_server
+
+from exporters.config import settings
+from exporters.logs.metrics import (
+    LOG_FILE_REOPENS,
+    LOG_LINES_READ,
+    LOG_REQUEST_E2E_SECONDS,
+    LOG_REQUEST_GENERATION_TOKENS,
+    LOG_REQUEST_PROMPT_TOKENS,
+    LOG_REQUEST_QUEUE_SECONDS,
+    LOG_REQUESTS_PARSED,
+)
+from exporters.logs.patterns import PARSERS, RequestRecord
+from exporters.logs.tailer import FileTailer, Inotify, LineBuffer
+from exporters.registry import DeltaHistogramChild
+from exporters.tracing.collector import BACKEND_ENDPOINTS, LATENCY_HISTOGRAMS
+
+logger = structlog.get_logger()
+
+STDIN = "-"
+
+
+class LogCollector:
+    def __init__(
+        self,
+        backend: str = settings.logs_backend,
+        paths: list[str] | None = None,
+        model: str = settings.logs_model,
+        endpoint: str | None = None,
+        port: int = settings.exporter_port_logs,
+        from_start: bool = settings.logs_from_start,
+        poll_interval: float = settings.logs_poll_interval,
+    ):
+        if backend not in PARSERS:
+            raise ValueError(f"Unsupported log backend: {backend}")
+        paths = list(settings.logs_paths if paths is None else paths) or [STDIN]
+        self.backend = backend
+        self.parse = PARSERS[backend]
+        self.model = model
+        self.endpoint = (endpoint or BACKEND_ENDPOINTS[backend]).rstrip("/")
+        self.port = port
+        self.poll_interval = poll_interval
+        self.read_stdin = STDIN in paths
+        self.tailers = [FileTailer(path, from_start) for path in paths if path != STDIN]
+        self._observers: dict[str, tuple[DeltaHistogramChild | Histogram, ...]] = {}
+        self._running = False
+        self._wake: asyncio.Event | None = None
+        self._inotify: Inotify | None = None
+
+    def _children(self, model: str) -> tuple[DeltaHistogramChild | Histogram, ...]:
+        children = self._observers.get(model)
+        if children is None:
+            labels = {"model": model, "endpoint": self.endpoint}
+            histograms = LATENCY_HISTOGRAMS[self.backend]
+            children = self._observers[model] = (
+                histograms["ttft"].labels(**labels),
+                histograms["itl"].labels(**labels),
+                LOG_REQUEST_E2E_SECONDS.labels(backend=self.backend, **labels),
+                LOG_REQUEST_QUEUE_SECONDS.labels(backend=self.backend, **labels),
+                LOG_REQUEST_PROMPT_TOKENS.labels(backend=self.backend, **labels),
+                LOG_REQUEST_GENERATION_TOKENS.labels(backend=self.backend, **labels),
+            )
+        return children
+
+    def record(self, record: RequestRecord) -> None:
+        ttft, itl, e2e, queue, prompt_tokens, generation_tokens = self._children(
+            record.model or self.model
+        )
+        if record.ttft is not None:
+            ttft.observe(record.ttft)
+        if record.time_per_token is not None:
+            itl.observe(record.time_per_token)
+        if record.e2e is not None:
+            e2e.observe(record.e2e)
+        if record.queue_time is not None:
+            queue.observe(record.queue_time)
+        if record.prompt_tokens is not None:
+            prompt_tokens.observe(record.prompt_tokens)
+        if record.generation_tokens is not None:
+            generation_tokens.observe(record.generation_tokens)
+
+    def process_lines(self, lines: Iterable[str], source: str) -> int:
+        parse = self.parse
+        read = parsed = 0
+        for line in lines:
+            read += 1
+            record = parse(line)
+            if record is not None:
+                self.record(record)
+                parsed += 1
+        LOG_LINES_READ.labels(backend=self.backend, source=source).inc(read)
+        if parsed:
+            LOG_REQUESTS_PARSED.labels(backend=self.backend, source=source).inc(parsed)
+        return parsed
+
+    def poll(self) -> int:
+        parsed = 0
+        for tailer in self.tailers:
+            lines, reopened = tailer.read()
+            if reopened is not None:
+                LOG_FILE_REOPENS.labels(source=tailer.path, reason=reopened).inc()
+                logger.info("Reopened log file", path=tailer.path, reason=reopened)
+            if lines:
+                parsed += self.process_lines(lines, tailer.path)
+        return parsed
+
+    def _on_inotify(self) -> None:
+        assert self._inotify is not None and self._wake is not None
+        if self._inotify.drain():
+            self._wake.set()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop) -> None:
+        if not self.tailers:
+            return
+        self._inotify = Inotify.create()
+        if self._inotify is None:
+            logger.warning("inotify unavailable, polling log files", interval=self.poll_interval)
+            return
+        for tailer in self.tailers:
+            self._inotify.watch(os.path.dirname(os.path.abspath(tailer.path)))
+        loop.add_reader(self._inotify.fd, self._on_inotify)
+
+    def _read_stdin(self, loop: asyncio.AbstractEventLoop, fd: int | None = None) -> None:
+        fd = sys.stdin.fileno() if fd is None else fd
+        buffer = LineBuffer()
+        while True:
+            data = os.read(fd, 1 << 16)
+            lines = buffer.feed(data, final=not data)
+            if lines:
+                loop.call_soon_threadsafe(self.process_lines, lines, STDIN)
+            if not data:
+                logger.info("Reached end of stdin")
+                return
+
+    async def tail_loop(self) -> None:
+        self._running = True
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._watch(loop)
+        if self.read_stdin:
+            threading.Thread(target=self._read_stdin, args=(loop,), daemon=True).start()
+        logger.info(
+            "Starting log collector",
+            backend=self.backend,
+            paths=[tailer.path for tailer in self.tailers],
+            stdin=self.read_stdin,
+            inotify=self._inotify is not None,
+        )
+
+        while self._running:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error("Error reading server logs", error=str(e))
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+        logger.info("Stopping log collector")
+
+    def close(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._inotify is not None:
+            loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        for tailer in self.tailers:
+            tailer.close()
+
+    def run(self) -> None:
+        logging.basicConfig(level=settings.log_level)
+        start_http_server(self.port)
+        logger.info(f"Log collector started on port {self.port}")
+
+        loop = asyncio.get_event_loop()
+        try:
+            loop.run_until_complete(self.tail_loop())
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            self.close(loop)
+            loop.close()
+
+
+def main() -> None:
+    collector = LogCollector()
+    collector.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from exporters.registry import Counter, Histogram
+
+LOG_LINES_READ = Counter(
+    "log_lines_read_total",
+    "Total number of server log lines read by the log collector",
+    ["backend", "source"],
+)
+
+LOG_REQUESTS_PARSED = Counter(
+    "log_requests_parsed_total",
+    "Total number of completed requests parsed from server logs",
+    ["backend", "source"],
+)
+
+LOG_FILE_REOPENS = Counter(
+    "log_file_reopens_total",
+    "Total number of times a tailed log file was reopened after rotation or truncation",
+    ["source", "reason"],
+)
+
+LOG_REQUEST_E2E_SECONDS = Histogram(
+    "log_request_e2e_seconds",
+    "End-to-end request latency parsed from server logs",
+    ["backend", "model", "endpoint"],
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0],
+)
+
+LOG_REQUEST_QUEUE_SECONDS = Histogram(
+    "log_request_queue_seconds",
+    "Time requests spent queued before scheduling, parsed from server logs",
+    ["backend", "model", "endpoint"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+LOG_REQUEST_PROMPT_TOKENS = Histogram(
+    "log_request_prompt_tokens",
+    "Prompt token count per request, parsed from server logs",
+    ["backend", "model", "endpoint"],
+    buckets=[16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768],
+)
+
+LOG_REQUEST_GENERATION_TOKENS = Histogram(
+    "log_request_generation_tokens",
+    "Generated token count per request, parsed from server logs",
+    ["backend", "model", "endpoint"],
+    buckets=[1, 8, 32, 64, 128, 256, 512, 1024, 2048, 4096],
+)
+
+METRICS = [
+    LOG_LINES_READ,
+    LOG_REQUESTS_PARSED,
+    LOG_FILE_REOPENS,
+    LOG_REQUEST_E2E_SECONDS,
+    LOG_REQUEST_QUEUE_SECONDS,
+    LOG_REQUEST_PROMPT_TOKENS,
+    LOG_REQUEST_GENERATION_TOKENS,
+]
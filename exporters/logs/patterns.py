@@ -0,0 +1,123 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+DURATION_UNITS = {"ns": 1e-9, "µs": 1e-6, "us": 1e-6, "ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}
+DURATION = re.compile(r"([0-9]*\.?[0-9]+)(ns|µs|us|ms|s|m|h)?")
+
+VLLM_ANCHOR = "Finished request"
+VLLM_FINISHED = re.compile(r"Finished request (?P<request_id>[^\s.,:]+)[.,:]?\s*(?P<fields>.*)")
+VLLM_FIELD = re.compile(r"(\w+)=\"?([^\s,\"]+)")
+
+TGI_ANCHOR = "Success"
+TGI_SUCCESS = re.compile(
+    r'total_time="(?P<total_time>[^"]+)" validation_time="(?P<validation_time>[^"]+)" '
+    r'queue_time="(?P<queue_time>[^"]+)" inference_time="(?P<inference_time>[^"]+)" '
+    r'time_per_token="(?P<time_per_token>[^"]+)"'
+)
+
+PROMPT_TOKEN_FIELDS = ("prompt_tokens", "num_prompt_tokens")
+GENERATION_TOKEN_FIELDS = ("generation_tokens", "num_generation_tokens", "output_tokens")
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    request_id: str | None = None
+    model: str | None = None
+    ttft: float | None = None
+    e2e: float | None = None
+    queue_time: float | None = None
+    time_per_token: float | None = None
+    prompt_tokens: int | None = None
+    generation_tokens: int | None = None
+
+
+def parse_duration(text: str) -> float | None:
+    match = DURATION.fullmatch(text.strip())
+    if match is None:
+        return None
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+
+
+def _first_int(fields: dict[str, str], names: tuple[str, ...]) -> int | None:
+    for name in names:
+        if name in fields:
+            try:
+                return int(float(fields[name]))
+            except ValueError:
+                return None
+    return None
+
+
+def _seconds(fields: dict[str, str], name: str) -> float | None:
+    value = fields.get(name)
+    return parse_duration(value) if value is not None else None
+
+
+def _elapsed(fields: dict[str, str], start: str, end: str) -> float | None:
+    try:
+        return max(0.0, float(fields[end]) - float(fields[start]))
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_vllm_line(line: str) -> RequestRecord | None:
+    if VLLM_ANCHOR not in line:
+        return None
+    match = VLLM_FINISHED.search(line)
+    if match is None:
+        return None
+    fields = dict(VLLM_FIELD.findall(match.group("fields")))
+    if not fields:
+        return None
+    ttft = _seconds(fields, "ttft")
+    if ttft is None:
+        ttft = _elapsed(fields, "arrival_time", "first_token_time")
+    e2e = _seconds(fields, "e2e")
+    if e2e is None:
+        e2e = _elapsed(fields, "arrival_time", "finished_time")
+    queue_time = _seconds(fields, "queue_time")
+    if queue_time is None:
+        queue_time = _seconds(fields, "time_in_queue")
+    if queue_time is None:
+        queue_time = _elapsed(fields, "arrival_time", "first_scheduled_time")
+    generation_tokens = _first_int(fields, GENERATION_TOKEN_FIELDS)
+    time_per_token = None
+    if ttft is not None and e2e is not None and generation_tokens and generation_tokens > 1:
+        time_per_token = max(0.0, e2e - ttft) / (generation_tokens - 1)
+    return RequestRecord(
+        request_id=match.group("request_id"),
+        model=fields.get("model"),
+        ttft=ttft,
+        e2e=e2e,
+        queue_time=queue_time,
+        time_per_token=time_per_token,
+        prompt_tokens=_first_int(fields, PROMPT_TOKEN_FIELDS),
+        generation_tokens=generation_tokens,
+    )
+
+
+def parse_tgi_line(line: str) -> RequestRecord | None:
+    if TGI_ANCHOR not in line:
+        return None
+    match = TGI_SUCCESS.search(line)
+    if match is None:
+        return None
+    total_time = parse_duration(match.group("total_time"))
+    inference_time = parse_duration(match.group("inference_time"))
+    time_per_token = parse_duration(match.group("time_per_token"))
+    generation_tokens = None
+    if inference_time is not None and time_per_token:
+        generation_tokens = round(inference_time / time_per_token)
+    return RequestRecord(
+        e2e=total_time,
+        queue_time=parse_duration(match.group("queue_time")),
+        time_per_token=time_per_token,
+        generation_tokens=generation_tokens,
+    )
+
+
+PARSERS: dict[str, Callable[[str], RequestRecord | None]] = {
+    "vllm": parse_vllm_line,
+    "tgi": parse_tgi_line,
+}
@@ -0,0 +1,137 @@
+import ctypes
+import ctypes.util
+import os
+from typing import BinaryIO
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+ROTATED = "rotated"
+TRUNCATED = "truncated"
+CREATED = "created"
+
+
+class Inotify:
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches: dict[str, int] = {}
+
+    @classmethod
+    def create(cls) -> "Inotify | None":
+        try:
+            return cls()
+        except (AttributeError, OSError):
+            return None
+
+    def watch(self, directory: str) -> None:
+        if directory in self._watches:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        self._watches[directory] = wd
+
+    def drain(self) -> bool:
+        woken = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return woken
+            if not data:
+                return woken
+            woken = True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LineBuffer:
+    def __init__(self) -> None:
+        self._partial = b""
+
+    def feed(self, data: bytes, final: bool = False) -> list[str]:
+        data = self._partial + data
+        end = len(data) if final else data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        if end == 0:
+            return []
+        return data[:end].decode("utf-8", "replace").splitlines()
+
+    def clear(self) -> None:
+        self._partial = b""
+
+
+class FileTailer:
+    def __init__(self, path: str, from_start: bool = False, read_size: int = 1 << 20):
+        self.path = path
+        self.read_size = read_size
+        self._file: BinaryIO | None = None
+        self._identity: tuple[int, int] | None = None
+        self._position = 0
+        self._buffer = LineBuffer()
+        self._open(from_start)
+
+    def _open(self, from_start: bool) -> bool:
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(handle.fileno())
+        self._file = handle
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._position = 0 if from_start else stat.st_size
+        handle.seek(self._position)
+        return True
+
+    def _drain(self) -> bytes:
+        assert self._file is not None
+        chunks = []
+        while True:
+            chunk = self._file.read(self.read_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self._position += len(chunk)
+        return b"".join(chunks)
+
+    def read(self) -> tuple[list[str], str | None]:
+        if self._file is None:
+            if not self._open(from_start=True):
+                return [], None
+            return self._buffer.feed(self._drain()), CREATED
+
+        lines = self._buffer.feed(self._drain())
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return lines, None
+
+        if (stat.st_dev, stat.st_ino) != self._identity:
+            lines.extend(self._buffer.feed(b"", final=True))
+            self.close()
+            if self._open(from_start=True):
+                lines.extend(self._buffer.feed(self._drain()))
+            return lines, ROTATED
+        if stat.st_size < self._position:
+            self._buffer.clear()
+            self._position = 0
+            self._file.seek(0)
+            lines.extend(self._buffer.feed(self._drain()))
+            return lines, TRUNCATED
+        return lines, None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,3 @@
+from exporters.otlp.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,400 @@
+import asyncio
+import gzip
+import math
+import re
+import socket
+import time
+from collections.abc import Iterable
+from dataclasses import replace
+from importlib.metadata import PackageNotFoundError, version
+
+import httpx
+import structlog
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.metrics_core import Metric
+
+from exporters.config import settings
+from exporters.otlp.metrics import (
+    OTLP_EXPORT_PAYLOAD_BYTES,
+    OTLP_EXPORT_POINTS_DROPPED,
+    OTLP_EXPORT_POINTS_SENT,
+    OTLP_EXPORT_QUEUE_CAPACITY,
+    OTLP_EXPORT_QUEUE_DEPTH,
+    OTLP_EXPORT_RETRIES,
+    OTLP_EXPORT_SEND_DURATION,
+)
+from exporters.otlp.protobuf import (
+    ExponentialHistogramPoint,
+    HistogramPoint,
+    NumberPoint,
+    OTLPMetric,
+    encode_export_request,
+)
+from exporters.recording.window import bucket_midpoints
+
+logger = structlog.get_logger()
+
+SCOPE_NAME = "token-path-observability"
+try:
+    SCOPE_VERSION = version(SCOPE_NAME)
+except PackageNotFoundError:  # pragma: no cover - running from a source checkout
+    SCOPE_VERSION = "unknown"
+
+OTLP_METRICS_PATH = "/v1/metrics"
+OTLP_RETRYABLE_STATUS = {429, 502, 503, 504}
+EXPONENTIAL_HISTOGRAM_PATTERN = re.compile(r"_(ttft|itl)_seconds$")
+EXPONENTIAL_MAX_SCALE = 20
+EXPONENTIAL_MIN_SCALE = -10
+UNIT_SUFFIXES = (
+    ("_seconds", "s"),
+    ("_bytes", "By"),
+    ("_ratio", "1"),
+    ("_celsius", "Cel"),
+    ("_watts", "W"),
+    ("_hertz", "Hz"),
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def metric_unit(name: str) -> str:
+    for suffix, unit in UNIT_SUFFIXES:
+        if name.endswith(suffix):
+            return unit
+    return ""
+
+
+def exponential_index(value: float, scale: int) -> int:
+    return math.ceil(math.log2(value) * 2.0**scale) - 1
+
+
+def exponential_buckets(
+    values: Iterable[tuple[float, int]], max_size: int = 160
+) -> tuple[int, int, int, tuple[int, ...]]:
+    zero_count = 0
+    positive: list[tuple[float, int]] = []
+    for value, count in values:
+        if count <= 0:
+            continue
+        if value <= 0:
+            zero_count += count
+        else:
+            positive.append((value, count))
+    if not positive:
+        return 0, zero_count, 0, ()
+
+    low = min(value for value, _ in positive)
+    high = max(value for value, _ in positive)
+    scale = EXPONENTIAL_MAX_SCALE
+    while (
+        scale > EXPONENTIAL_MIN_SCALE
+        and exponential_index(high, scale) - exponential_index(low, scale) >= max_size
+    ):
+        scale -= 1
+    offset = exponential_index(low, scale)
+    counts = [0] * (exponential_index(high, scale) - offset + 1)
+    for value, count in positive:
+        counts[exponential_index(value, scale) - offset] += count
+    return scale, zero_count, offset, tuple(counts)
+
+
+def split_batches(metrics: list[OTLPMetric], max_points: int) -> list[list[OTLPMetric]]:
+    batches: list[list[OTLPMetric]] = []
+    batch: list[OTLPMetric] = []
+    room = max_points
+    for metric in metrics:
+        points = metric.points
+        while points:
+            chunk, points = points[:room], points[room:]
+            batch.append(replace(metric, points=chunk))
+            room -= len(chunk)
+            if room == 0:
+                batches.append(batch)
+                batch, room = [], max_points
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _point_count(batch: list[OTLPMetric]) -> int:
+    return sum(len(metric.points) for metric in batch)
+
+
+class OTLPExporter:
+    def __init__(
+        self,
+        endpoint: str = settings.otlp_endpoint,
+        service_name: str = "token-path-exporter",
+        headers: dict[str, str] | None = None,
+        compression: str = settings.otlp_compression,
+        queue_capacity: int = settings.otlp_queue_capacity,
+        max_points_per_request: int = settings.otlp_max_points_per_request,
+        exponential_max_size: int = settings.otlp_exponential_max_size,
+        min_backoff: float = 0.05,
+        max_backoff: float = 5.0,
+        max_retries: int = 5,
+        timeout: float = 10.0,
+        resource_attributes: dict[str, str] | None = None,
+        registry: CollectorRegistry = REGISTRY,
+    ):
+        if compression not in ("gzip", "none"):
+            raise ValueError(f"Unsupported OTLP compression: {compression}")
+        endpoint = endpoint.rstrip("/")
+        self.endpoint = (
+            endpoint if endpoint.endswith(OTLP_METRICS_PATH) else endpoint + OTLP_METRICS_PATH
+        )
+        self.headers = {
+            "Content-Type": "application/x-protobuf",
+            "User-Agent": f"{SCOPE_NAME}/{SCOPE_VERSION}",
+            **(headers if headers is not None else settings.otlp_headers),
+        }
+        if compression == "gzip":
+            self.headers["Content-Encoding"] = "gzip"
+        self.compression = compression
+        self.queue_capacity = queue_capacity
+        self.max_points_per_request = max(1, max_points_per_request)
+        self.exponential_max_size = exponential_max_size
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.resource = tuple(
+            sorted(
+                {
+                    "service.name": service_name,
+                    "host.name": socket.gethostname(),
+                    **(resource_attributes or {}),
+                }.items()
+            )
+        )
+        self.registry = registry
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self._queue: asyncio.Queue[list[OTLPMetric] | None] = asyncio.Queue(
+            maxsize=queue_capacity
+        )
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._started_ns = time.time_ns()
+        self._previous: dict[tuple[str, Labels], tuple[int, list[float]]] = {}
+        OTLP_EXPORT_QUEUE_CAPACITY.labels(endpoint=self.endpoint).set(queue_capacity)
+
+    def collect_metrics(self, now_ns: int | None = None) -> list[OTLPMetric]:
+        now = time.time_ns() if now_ns is None else now_ns
+        metrics: list[OTLPMetric] = []
+        for family in self.registry.collect():
+            if family.type == "gauge":
+                metric = self._gauge(family, now)
+            elif family.type == "counter":
+                metric = self._sum(family, now)
+            elif family.type == "histogram":
+                metric = self._histogram(family, now)
+            else:
+                continue
+            if metric.points:
+                metrics.append(metric)
+        return metrics
+
+    def _new_metric(self, family: Metric, kind: str, monotonic: bool = False) -> OTLPMetric:
+        return OTLPMetric(
+            family.name, family.documentation, metric_unit(family.name), kind, [], monotonic
+        )
+
+    def _delta(
+        self, name: str, labels: Labels, current: list[float], created_ns: int, now: int
+    ) -> tuple[int, list[float]]:
+        previous = self._previous.get((name, labels))
+        self._previous[(name, labels)] = (now, current)
+        if previous is None:
+            return created_ns, current
+        start, before = previous
+        if len(before) != len(current) or any(v < b for v, b in zip(current, before)):
+            return start, current
+        return start, [v - b for v, b in zip(current, before)]
+
+    def _gauge(self, family: Metric, now: int) -> OTLPMetric:
+        metric = self._new_metric(family, "gauge")
+        for sample in family.samples:
+            labels = tuple(sorted(sample.labels.items()))
+            metric.points.append(NumberPoint(labels, now, now, sample.value))
+        return metric
+
+    def _sum(self, family: Metric, now: int) -> OTLPMetric:
+        metric = self._new_metric(family, "sum", monotonic=True)
+        totals: dict[Labels, float] = {}
+        created: dict[Labels, int] = {}
+        for sample in family.samples:
+            labels = tuple(sorted(sample.labels.items()))
+            if sample.name.endswith("_created"):
+                created[labels] = int(sample.value * 1e9)
+            else:
+                totals[labels] = sample.value
+        for labels, total in totals.items():
+            start, (delta,) = self._delta(
+                family.name, labels, [total], created.get(labels, self._started_ns), now
+            )
+            metric.points.append(NumberPoint(labels, start, now, delta))
+        return metric
+
+    def _histogram(self, family: Metric, now: int) -> OTLPMetric:
+        exponential = EXPONENTIAL_HISTOGRAM_PATTERN.search(family.name) is not None
+        metric = self._new_metric(family, "exponential_histogram" if exponential else "histogram")
+        buckets: dict[Labels, dict[float, float]] = {}
+        sums: dict[Labels, float] = {}
+        created: dict[Labels, int] = {}
+        for sample in family.samples:
+            labels = tuple(sorted((k, v) for k, v in sample.labels.items() if k != "le"))
+            if sample.name.endswith("_bucket"):
+                buckets.setdefault(labels, {})[float(sample.labels["le"])] = sample.value
+            elif sample.name.endswith("_sum"):
+                sums[labels] = sample.value
+            elif sample.name.endswith("_created"):
+                created[labels] = int(sample.value * 1e9)
+
+        for labels, cumulative in buckets.items():
+            bounds = tuple(sorted(cumulative))
+            start, delta = self._delta(
+                family.name,
+                labels,
+                [sums.get(labels, 0.0)] + [cumulative[bound] for bound in bounds],
+                created.get(labels, self._started_ns),
+                now,
+            )
+            total, cumulative_delta = delta[0], delta[1:]
+            counts = [
+                round(count - (cumulative_delta[i - 1] if i else 0.0))
+                for i, count in enumerate(cumulative_delta)
+            ]
+            if exponential:
+                scale, zero_count, offset, bucket_counts = exponential_buckets(
+                    zip(bucket_midpoints(bounds), counts), self.exponential_max_size
+                )
+                metric.points.append(
+                    ExponentialHistogramPoint(
+                        attributes=labels,
+                        start_time_ns=start,
+                        time_ns=now,
+                        count=sum(counts),
+                        sum=total,
+                        scale=scale,
+                        zero_count=zero_count,
+                        offset=offset,
+                        bucket_counts=bucket_counts,
+                    )
+                )
+            else:
+                metric.points.append(
+                    HistogramPoint(
+                        labels, start, now, sum(counts), total, bounds[:-1], tuple(counts)
+                    )
+                )
+        return metric
+
+    def enqueue(self, metrics: list[OTLPMetric]) -> int:
+        dropped = 0
+        for batch in split_batches(metrics, self.max_points_per_request):
+            try:
+                self._queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                dropped += _point_count(batch)
+        if dropped:
+            OTLP_EXPORT_POINTS_DROPPED.labels(endpoint=self.endpoint, reason="queue_full").inc(
+                dropped
+            )
+            logger.warning("OTLP export queue full, dropping data points", dropped=dropped)
+        self._update_queue_depth()
+        return dropped
+
+    def push(self) -> int:
+        return self.enqueue(self.collect_metrics())
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("Started OTLP metrics export", endpoint=self.endpoint)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        if self._task is not None:
+            _, pending = await asyncio.wait([self._task], timeout=timeout)
+            for task in pending:
+                task.cancel()
+            self._task = None
+        await self.client.aclose()
+        logger.info("Stopped OTLP metrics export", endpoint=self.endpoint)
+
+    def _update_queue_depth(self) -> None:
+        OTLP_EXPORT_QUEUE_DEPTH.labels(endpoint=self.endpoint).set(self._queue.qsize())
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._queue.get()
+            if batch is not None:
+                await self._send_with_retry(batch)
+            self._update_queue_depth()
+            if batch is None or (self._stopping and self._queue.empty()):
+                return
+
+    def _encode(self, batch: list[OTLPMetric]) -> bytes:
+        payload = encode_export_request(self.resource, SCOPE_NAME, SCOPE_VERSION, batch)
+        if self.compression == "gzip":
+            return gzip.compress(payload, compresslevel=6)
+        return payload
+
+    def _retry_after(self, response: httpx.Response, backoff: float) -> float:
+        try:
+            return min(float(response.headers.get("Retry-After", backoff)), self.max_backoff)
+        except ValueError:
+            return backoff
+
+    async def _send_with_retry(self, batch: list[OTLPMetric]) -> bool:
+        points = _point_count(batch)
+        payload = self._encode(batch)
+        OTLP_EXPORT_PAYLOAD_BYTES.labels(endpoint=self.endpoint).observe(len(payload))
+        backoff = self.min_backoff
+        for attempt in range(self.max_retries + 1):
+            delay = backoff
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    self.endpoint, content=payload, headers=self.headers
+                )
+            except httpx.HTTPError as e:
+                logger.warning("OTLP export failed", error=str(e), attempt=attempt)
+            else:
+                OTLP_EXPORT_SEND_DURATION.labels(endpoint=self.endpoint).observe(
+                    time.perf_counter() - start
+                )
+                if response.is_success:
+                    OTLP_EXPORT_POINTS_SENT.labels(endpoint=self.endpoint).inc(points)
+                    return True
+                if response.status_code not in OTLP_RETRYABLE_STATUS:
+                    logger.error(
+                        "OTLP export rejected",
+                        status=response.status_code,
+                        body=response.text[:256],
+                    )
+                    OTLP_EXPORT_POINTS_DROPPED.labels(
+                        endpoint=self.endpoint, reason="rejected"
+                    ).inc(points)
+                    return False
+                delay = self._retry_after(response, backoff)
+                logger.warning(
+                    "OTLP export failed", status=response.status_code, attempt=attempt
+                )
+            if attempt == self.max_retries or (self._stopping and attempt > 0):
+                break
+            OTLP_EXPORT_RETRIES.labels(endpoint=self.endpoint).inc()
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+        OTLP_EXPORT_POINTS_DROPPED.labels(endpoint=self.endpoint, reason="retries_exhausted").inc(
+            points
+        )
+        return False
@@ -0,0 +1,55 @@
+from exporters.registry import Counter, Gauge, Histogram
+
+OTLP_EXPORT_QUEUE_DEPTH = Gauge(
+    "otlp_export_queue_depth_batches",
+    "Number of OTLP export batches waiting to be sent",
+    ["endpoint"],
+)
+
+OTLP_EXPORT_QUEUE_CAPACITY = Gauge(
+    "otlp_export_queue_capacity_batches",
+    "Maximum number of OTLP export batches the queue can hold",
+    ["endpoint"],
+)
+
+OTLP_EXPORT_POINTS_SENT = Counter(
+    "otlp_export_data_points_sent_total",
+    "Total number of data points successfully exported over OTLP",
+    ["endpoint"],
+)
+
+OTLP_EXPORT_POINTS_DROPPED = Counter(
+    "otlp_export_data_points_dropped_total",
+    "Total number of data points dropped before reaching the OTLP endpoint",
+    ["endpoint", "reason"],
+)
+
+OTLP_EXPORT_RETRIES = Counter(
+    "otlp_export_retries_total",
+    "Total number of OTLP export batch retries",
+    ["endpoint"],
+)
+
+OTLP_EXPORT_SEND_DURATION = Histogram(
+    "otlp_export_send_duration_seconds",
+    "Duration of OTLP export requests in seconds",
+    ["endpoint"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+
+OTLP_EXPORT_PAYLOAD_BYTES = Histogram(
+    "otlp_export_payload_bytes",
+    "Size of compressed OTLP export request bodies in bytes",
+    ["endpoint"],
+    buckets=[1024, 4096, 16384, 65536, 262144, 1048576, 4194304],
+)
+
+METRICS = [
+    OTLP_EXPORT_QUEUE_DEPTH,
+    OTLP_EXPORT_QUEUE_CAPACITY,
+    OTLP_EXPORT_POINTS_SENT,
+    OTLP_EXPORT_POINTS_DROPPED,
+    OTLP_EXPORT_RETRIES,
+    OTLP_EXPORT_SEND_DURATION,
+    OTLP_EXPORT_PAYLOAD_BYTES,
+]
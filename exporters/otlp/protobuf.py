@@ -0,0 +1,280 @@
+import struct
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from exporters.remote_write.protobuf import (
+    WIRE_I64,
+    encode_bytes_field,
+    encode_double_field,
+    encode_key,
+    encode_string_field,
+    encode_varint,
+    encode_varint_field,
+)
+
+AGGREGATION_TEMPORALITY_DELTA = 1
+AGGREGATION_TEMPORALITY_CUMULATIVE = 2
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+def encode_fixed64_field(field_number: int, value: int) -> bytes:
+    return encode_key(field_number, WIRE_I64) + struct.pack("<Q", value)
+
+
+def encode_sint_field(field_number: int, value: int) -> bytes:
+    return encode_varint_field(field_number, (value << 1) ^ (value >> 63))
+
+
+def encode_packed_fixed64_field(field_number: int, values: Sequence[int]) -> bytes:
+    return encode_bytes_field(field_number, struct.pack(f"<{len(values)}Q", *values))
+
+
+def encode_packed_double_field(field_number: int, values: Sequence[float]) -> bytes:
+    return encode_bytes_field(field_number, struct.pack(f"<{len(values)}d", *values))
+
+
+def encode_packed_varint_field(field_number: int, values: Sequence[int]) -> bytes:
+    return encode_bytes_field(field_number, b"".join(encode_varint(v) for v in values))
+
+
+def encode_any_value(value: str | int | float) -> bytes:
+    if isinstance(value, bool):
+        return encode_varint_field(2, int(value))
+    if isinstance(value, int):
+        return encode_varint_field(3, value)
+    if isinstance(value, float):
+        return encode_double_field(4, value)
+    return encode_string_field(1, value)
+
+
+def encode_attributes(
+    field_number: int, attributes: Iterable[tuple[str, str | int | float]]
+) -> bytes:
+    return b"".join(
+        encode_bytes_field(
+            field_number,
+            encode_string_field(1, key) + encode_bytes_field(2, encode_any_value(value)),
+        )
+        for key, value in attributes
+    )
+
+
+@dataclass(frozen=True)
+class NumberPoint:
+    attributes: tuple[tuple[str, str], ...]
+    start_time_ns: int
+    time_ns: int
+    value: float
+
+
+@dataclass(frozen=True)
+class HistogramPoint:
+    attributes: tuple[tuple[str, str], ...]
+    start_time_ns: int
+    time_ns: int
+    count: int
+    sum: float
+    bounds: tuple[float, ...]
+    bucket_counts: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class ExponentialHistogramPoint:
+    attributes: tuple[tuple[str, str], ...]
+    start_time_ns: int
+    time_ns: int
+    count: int
+    sum: float
+    scale: int
+    zero_count: int
+    offset: int
+    bucket_counts: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class SpanEvent:
+    name: str
+    time_ns: int
+    attributes: tuple[tuple[str, str | int | float], ...] = ()
+
+
+@dataclass
+class Span:
+    trace_id: bytes
+    span_id: bytes
+    name: str
+    start_time_ns: int
+    end_time_ns: int
+    parent_span_id: bytes = b""
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: tuple[tuple[str, str | int | float], ...] = ()
+    events: list[SpanEvent] = field(default_factory=list)
+    status_code: int = 0
+    status_message: str = ""
+
+
+@dataclass
+class OTLPMetric:
+    name: str
+    description: str
+    unit: str
+    kind: str
+    points: list[NumberPoint | HistogramPoint | ExponentialHistogramPoint] = field(
+        default_factory=list
+    )
+    monotonic: bool = False
+
+
+def encode_number_point(point: NumberPoint) -> bytes:
+    return (
+        encode_fixed64_field(2, point.start_time_ns)
+        + encode_fixed64_field(3, point.time_ns)
+        + encode_double_field(4, point.value)
+        + encode_attributes(7, point.attributes)
+    )
+
+
+def encode_histogram_point(point: HistogramPoint) -> bytes:
+    return (
+        encode_fixed64_field(2, point.start_time_ns)
+        + encode_fixed64_field(3, point.time_ns)
+        + encode_fixed64_field(4, point.count)
+        + encode_double_field(5, point.sum)
+        + encode_packed_fixed64_field(6, point.bucket_counts)
+        + encode_packed_double_field(7, point.bounds)
+        + encode_attributes(9, point.attributes)
+    )
+
+
+def encode_exponential_histogram_point(point: ExponentialHistogramPoint) -> bytes:
+    positive = encode_sint_field(1, point.offset) + encode_packed_varint_field(
+        2, point.bucket_counts
+    )
+    return (
+        encode_attributes(1, point.attributes)
+        + encode_fixed64_field(2, point.start_time_ns)
+        + encode_fixed64_field(3, point.time_ns)
+        + encode_fixed64_field(4, point.count)
+        + encode_double_field(5, point.sum)
+        + encode_sint_field(6, point.scale)
+        + encode_fixed64_field(7, point.zero_count)
+        + encode_bytes_field(8, positive)
+    )
+
+
+PointT = TypeVar("PointT", NumberPoint, HistogramPoint, ExponentialHistogramPoint)
+
+
+def typed_points(metric: OTLPMetric, point_type: type[PointT]) -> list[PointT]:
+    points: list[PointT] = []
+    for point in metric.points:
+        if not isinstance(point, point_type):
+            raise ValueError(
+                f"OTLP {metric.kind} metric {metric.name} has a {type(point).__name__}"
+            )
+        points.append(point)
+    return points
+
+
+def encode_metric(metric: OTLPMetric) -> bytes:
+    header = (
+        encode_string_field(1, metric.name)
+        + encode_string_field(2, metric.description)
+        + encode_string_field(3, metric.unit)
+    )
+    if metric.kind == "gauge":
+        body = b"".join(
+            encode_bytes_field(1, encode_number_point(p)) for p in typed_points(metric, NumberPoint)
+        )
+        return header + encode_bytes_field(5, body)
+    if metric.kind == "sum":
+        body = b"".join(
+            encode_bytes_field(1, encode_number_point(p)) for p in typed_points(metric, NumberPoint)
+        )
+        body += encode_varint_field(2, AGGREGATION_TEMPORALITY_DELTA)
+        body += encode_varint_field(3, int(metric.monotonic))
+        return header + encode_bytes_field(7, body)
+    if metric.kind == "histogram":
+        body = b"".join(
+            encode_bytes_field(1, encode_histogram_point(p))
+            for p in typed_points(metric, HistogramPoint)
+        )
+        body += encode_varint_field(2, AGGREGATION_TEMPORALITY_DELTA)
+        return header + encode_bytes_field(9, body)
+    if metric.kind == "exponential_histogram":
+        body = b"".join(
+            encode_bytes_field(1, encode_exponential_histogram_point(p))
+            for p in typed_points(metric, ExponentialHistogramPoint)
+        )
+        body += encode_varint_field(2, AGGREGATION_TEMPORALITY_DELTA)
+        return header + encode_bytes_field(10, body)
+    raise ValueError(f"Unsupported OTLP metric kind: {metric.kind}")
+
+
+def _encode_resource_scope(
+    resource: Iterable[tuple[str, str]], scope_name: str, scope_version: str
+) -> tuple[bytes, bytes]:
+    scope = encode_string_field(1, scope_name) + encode_string_field(2, scope_version)
+    return encode_bytes_field(1, encode_attributes(1, resource)), encode_bytes_field(1, scope)
+
+
+def encode_export_request(
+    resource: Iterable[tuple[str, str]],
+    scope_name: str,
+    scope_version: str,
+    metrics: Iterable[OTLPMetric],
+) -> bytes:
+    resource_field, scope_field = _encode_resource_scope(resource, scope_name, scope_version)
+    scope_metrics = scope_field + b"".join(
+        encode_bytes_field(2, encode_metric(metric)) for metric in metrics
+    )
+    return encode_bytes_field(1, resource_field + encode_bytes_field(2, scope_metrics))
+
+
+def encode_span(span: Span) -> bytes:
+    parts = [
+        encode_bytes_field(1, span.trace_id),
+        encode_bytes_field(2, span.span_id),
+    ]
+    if span.parent_span_id:
+        parts.append(encode_bytes_field(4, span.parent_span_id))
+    parts += [
+        encode_string_field(5, span.name),
+        encode_varint_field(6, span.kind),
+        encode_fixed64_field(7, span.start_time_ns),
+        encode_fixed64_field(8, span.end_time_ns),
+        encode_attributes(9, span.attributes),
+    ]
+    parts.extend(
+        encode_bytes_field(
+            11,
+            encode_fixed64_field(1, event.time_ns)
+            + encode_string_field(2, event.name)
+            + encode_attributes(3, event.attributes),
+        )
+        for event in span.events
+    )
+    if span.status_code:
+        parts.append(
+            encode_bytes_field(
+                15,
+                encode_string_field(2, span.status_message)
+                + encode_varint_field(3, span.status_code),
+            )
+        )
+    return b"".join(parts)
+
+
+def encode_trace_export_request(
+    resource: Iterable[tuple[str, str]],
+    scope_name: str,
+    scope_version: str,
+    spans: Iterable[Span],
+) -> bytes:
+    resource_field, scope_field = _encode_resource_scope(resource, scope_name, scope_version)
+    scope_spans = scope_field + b"".join(encode_bytes_field(2, encode_span(s)) for s in spans)
+    return encode_bytes_field(1, resource_field + encode_bytes_field(2, scope_spans))
@@ -0,0 +1,3 @@
+from exporters.payload.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,119 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from exporters.config import settings
+from exporters.payload.metrics import (
+    EXPORTER_PAYLOAD_CACHE_CPU_SAVED,
+    EXPORTER_PAYLOAD_CACHE_FAMILIES,
+)
+from exporters.registry import series_removals
+
+HELP_PREFIX = "# HELP "
+FAMILY_SEPARATOR = "\n" + HELP_PREFIX
+UNNAMED_FAMILY = ""
+SAMPLE_SUFFIXES = ("_bucket", "_sum", "_count", "_total", "_created")
+
+Parser = Callable[[str], dict[str, Any]]
+
+
+def split_families(text: str) -> dict[str, str]:
+    chunks = text.split(FAMILY_SEPARATOR)
+    head = chunks[0]
+    families: dict[str, str] = {}
+    if head.startswith(HELP_PREFIX):
+        chunks[0] = head[len(HELP_PREFIX) :]
+    else:
+        chunks = chunks[1:]
+        if any(line and not line.startswith("#") for line in head.split("\n")):
+            families[UNNAMED_FAMILY] = head
+    for chunk in chunks:
+        header, _, body = chunk.partition("\n")
+        name = header.split(" ", 1)[0]
+        body = body.rstrip("\n")
+        families[name] = f"{families[name]}\n{body}" if name in families else body
+    return families
+
+
+def family_changed(changed: frozenset[str] | None, *names: str) -> bool:
+    if changed is None:
+        return True
+    for name in names:
+        if name in changed:
+            return True
+        for suffix in SAMPLE_SUFFIXES:
+            if name.endswith(suffix) and name[: -len(suffix)] in changed:
+                return True
+    return False
+
+
+class PayloadCache:
+    def __init__(
+        self,
+        exporter: str,
+        target: str,
+        parse: Parser,
+        enabled: bool | None = None,
+    ):
+        self.exporter = exporter
+        self.target = target
+        self.parse_text = parse
+        self.enabled = settings.payload_cache_enabled if enabled is None else enabled
+        self._families: dict[str, tuple[int, dict[str, Any]]] = {}
+        self._metrics: dict[str, Any] | None = None
+        self._changed: frozenset[str] | None = None
+        self._removals = series_removals()
+        self._parse_seconds = 0.0
+        self._parsed_bytes = 0
+
+    def invalidate(self) -> None:
+        self._families = {}
+        self._metrics = None
+
+    def changed_families(self, metrics: dict[str, Any]) -> frozenset[str] | None:
+        return self._changed if metrics is self._metrics else None
+
+    def parse(self, text: str) -> dict[str, Any]:
+        removals = series_removals()
+        if not self.enabled or removals != self._removals:
+            self._removals = removals
+            self.invalidate()
+        if not self.enabled:
+            return self.parse_text(text)
+
+        previous = self._families
+        families: dict[str, tuple[int, dict[str, Any]]] = {}
+        metrics: dict[str, Any] = {}
+        changed: set[str] = set()
+        hits = hit_bytes = 0
+        for name, body in split_families(text).items():
+            digest = hash(body)
+            cached = previous.get(name)
+            if cached is not None and cached[0] == digest:
+                parsed = cached[1]
+                hits += 1
+                hit_bytes += len(body)
+            else:
+                started = time.thread_time()
+                parsed = self.parse_text(body)
+                self._parse_seconds += time.thread_time() - started
+                self._parsed_bytes += len(body)
+                changed.add(name)
+            families[name] = (digest, parsed)
+            metrics.update(parsed)
+        changed.update(previous.keys() - families.keys())
+
+        self._families = families
+        self._metrics = metrics
+        self._changed = None if UNNAMED_FAMILY in changed else frozenset(changed)
+        self._record(hits, len(families) - hits, hit_bytes)
+        return metrics
+
+    def _record(self, hits: int, misses: int, hit_bytes: int) -> None:
+        labels = {"exporter": self.exporter, "target": self.target}
+        EXPORTER_PAYLOAD_CACHE_FAMILIES.labels(**labels, result="hit").inc(hits)
+        EXPORTER_PAYLOAD_CACHE_FAMILIES.labels(**labels, result="miss").inc(misses)
+        if hit_bytes and self._parsed_bytes:
+            EXPORTER_PAYLOAD_CACHE_CPU_SAVED.labels(**labels).inc(
+                hit_bytes * self._parse_seconds / self._parsed_bytes
+            )
@@ -0,0 +1,18 @@
+from exporters.registry import Counter
+
+EXPORTER_PAYLOAD_CACHE_FAMILIES = Counter(
+    "exporter_payload_cache_families",
+    "Metric families in the target's payload, by whether they matched the previous payload",
+    ["exporter", "target", "result"],
+)
+
+EXPORTER_PAYLOAD_CACHE_CPU_SAVED = Counter(
+    "exporter_payload_cache_cpu_saved_seconds",
+    "Estimated parse CPU time skipped for families unchanged since the previous payload",
+    ["exporter", "target"],
+)
+
+METRICS = [
+    EXPORTER_PAYLOAD_CACHE_FAMILIES,
+    EXPORTER_PAYLOAD_CACHE_CPU_SAVED,
+]
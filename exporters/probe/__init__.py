@@ -0,0 +1,3 @@
+from exporters.probe.metrics import *
+
+__all__ = ["METRICS"]
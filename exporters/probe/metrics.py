@@ -0,0 +1,49 @@
+from exporters.registry import Counter, Gauge, Histogram
+
+PROBE_TTFT_SECONDS = Histogram(
+    "probe_ttft_seconds",
+    "Client-observed time to first token of synthetic probes in seconds",
+    ["model", "endpoint", "backend"],
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+
+PROBE_ITL_SECONDS = Histogram(
+    "probe_itl_seconds",
+    "Client-observed inter-token latency of synthetic probes in seconds",
+    ["model", "endpoint", "backend"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+PROBE_E2E_SECONDS = Histogram(
+    "probe_e2e_seconds",
+    "Client-observed end-to-end latency of synthetic probes in seconds",
+    ["model", "endpoint", "backend"],
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0],
+)
+
+PROBE_TOKENS_RECEIVED = Counter(
+    "probe_tokens_received_total",
+    "Total number of streamed tokens received by synthetic probes",
+    ["model", "endpoint", "backend"],
+)
+
+PROBE_REQUESTS_TOTAL = Counter(
+    "probe_requests_total",
+    "Total number of synthetic probes sent",
+    ["model", "endpoint", "backend", "status"],
+)
+
+PROBE_IN_FLIGHT = Gauge(
+    "probe_in_flight",
+    "Number of synthetic probes currently streaming",
+    ["model", "endpoint", "backend"],
+)
+
+METRICS = [
+    PROBE_TTFT_SECONDS,
+    PROBE_ITL_SECONDS,
+    PROBE_E2E_SECONDS,
+    PROBE_TOKENS_RECEIVED,
+    PROBE_REQUESTS_TOTAL,
+    PROBE_IN_FLIGHT,
+]
@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import logging
+import socket
+import time
+from typing import Any
+
+import httpx
+import structlog
+from prometheus_client import start_http_server
+
+from exporters.config import settings
+from exporters.probe.metrics import (
+    PROBE_E2E_SECONDS,
+    PROBE_IN_FLIGHT,
+    PROBE_ITL_SECONDS,
+    PROBE_REQUESTS_TOTAL,
+    PROBE_TOKENS_RECEIVED,
+    PROBE_TTFT_SECONDS,
+)
+from exporters.probe.stream import BACKENDS, StreamTiming, stream_completion
+from exporters.remote_write.writer import RemoteWriter
+
+logger = structlog.get_logger()
+
+
+def record_timing(timing: StreamTiming, labels: dict[str, str]) -> None:
+    if not timing.ok:
+        PROBE_REQUESTS_TOTAL.labels(**labels, status="error").inc()
+        return
+    PROBE_REQUESTS_TOTAL.labels(**labels, status="success").inc()
+    PROBE_TTFT_SECONDS.labels(**labels).observe(timing.ttft or 0.0)
+    itl_histogram = PROBE_ITL_SECONDS.labels(**labels)
+    for itl in timing.itl:
+        itl_histogram.observe(itl)
+    PROBE_E2E_SECONDS.labels(**labels).observe(timing.e2e)
+    PROBE_TOKENS_RECEIVED.labels(**labels).inc(timing.tokens)
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class TokenPathProber:
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        backend: str = settings.probe_backend,
+        port: int = settings.exporter_port_probe,
+        model: str = "unknown",
+        prompts: list[str] | None = None,
+        max_tokens: int = settings.probe_max_tokens,
+        concurrency: int = settings.probe_concurrency,
+        rate_limit: float = settings.probe_rate_limit,
+        probes_per_cycle: int = settings.probe_probes_per_cycle,
+        timeout: float = 60.0,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported probe backend: {backend}")
+        if endpoint is None:
+            endpoint = settings.tgi_endpoint if backend == "tgi" else settings.vllm_endpoint
+        self.endpoint = endpoint.rstrip("/")
+        self.backend = backend
+        self.port = port
+        self.model = model
+        self.prompts = prompts or settings.probe_prompts
+        self.max_tokens = max_tokens
+        self.concurrency = max(1, concurrency)
+        self.probes_per_cycle = probes_per_cycle
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+            ),
+        )
+        self.rate_limiter = RateLimiter(rate_limit, burst=self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._prompt_cycle = itertools.cycle(self.prompts)
+        self._running = False
+        self.remote_writer: RemoteWriter | None = None
+
+    @property
+    def labels(self) -> dict[str, str]:
+        return {"model": self.model, "endpoint": self.endpoint, "backend": self.backend}
+
+    async def fetch_model_info(self) -> dict[str, Any]:
+        path = "/info" if self.backend == "tgi" else "/v1/models"
+        try:
+            response = await self.client.get(f"{self.endpoint}{path}")
+            response.raise_for_status()
+            data: dict[str, Any] = response.json()
+            if self.backend == "tgi" and data.get("model_id"):
+                self.model = data["model_id"]
+            elif data.get("data"):
+                self.model = data["data"][0].get("id", "unknown")
+            return data
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch model info", error=str(e))
+            return {}
+
+    async def probe(self, prompt: str | None = None) -> StreamTiming:
+        prompt = prompt if prompt is not None else next(self._prompt_cycle)
+        async with self._semaphore:
+            await self.rate_limiter.acquire()
+            in_flight = PROBE_IN_FLIGHT.labels(**self.labels)
+            in_flight.inc()
+            try:
+                timing = await stream_completion(
+                    self.client, self.backend, self.endpoint, self.model, prompt, self.max_tokens
+                )
+            finally:
+                in_flight.dec()
+        self.record(timing)
+        return timing
+
+    def record(self, timing: StreamTiming) -> None:
+        if not timing.ok:
+            logger.warning("Probe failed", endpoint=self.endpoint, error=timing.error)
+        record_timing(timing, self.labels)
+
+    async def probe_cycle(self) -> list[StreamTiming]:
+        return await asyncio.gather(*(self.probe() for _ in range(self.probes_per_cycle)))
+
+    async def probe_loop(self, interval: float = 30.0) -> None:
+        self._running = True
+        if self.remote_writer is not None:
+            self.remote_writer.start()
+        logger.info(
+            "Starting token path probe loop", endpoint=self.endpoint, backend=self.backend
+        )
+
+        await self.fetch_model_info()
+
+        while self._running:
+            try:
+                timings = await self.probe_cycle()
+                if self.remote_writer is not None:
+                    self.remote_writer.push()
+                logger.debug(
+                    "Completed probe cycle",
+                    model=self.model,
+                    succeeded=sum(1 for t in timings if t.ok),
+                    total=len(timings),
+                )
+            except Exception as e:
+                logger.error("Error running probes", error=str(e))
+
+            await asyncio.sleep(interval)
+
+    def stop(self) -> None:
+        self._running = False
+        logger.info("Stopping token path prober")
+
+    def run(self, interval: float = settings.probe_interval) -> None:
+        logging.basicConfig(level=settings.log_level)
+        start_http_server(self.port)
+        if settings.remote_write_url:
+            self.remote_writer = RemoteWriter(
+                external_labels={"job": "probe-exporter", "instance": socket.gethostname()}
+            )
+        logger.info(f"Token path prober started on port {self.port}")
+
+        loop = asyncio.get_event_loop()
+        try:
+            loop.run_until_complete(self.probe_loop(interval))
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            if self.remote_writer is not None:
+                loop.run_until_complete(self.remote_writer.stop())
+            loop.close()
+
+
+def main() -> None:
+    prober = TokenPathProber()
+    prober.run()
+
+
+if __name__ == "__main__":
+    main()
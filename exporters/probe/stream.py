@@ -0,0 +1,93 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+BACKENDS = ("vllm", "tgi")
+
+
+@dataclass
+class StreamTiming:
+    start: float
+    token_times: list[float] = field(default_factory=list)
+    end: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.token_times)
+
+    @property
+    def ttft(self) -> float | None:
+        return self.token_times[0] - self.start if self.token_times else None
+
+    @property
+    def itl(self) -> list[float]:
+        times = self.token_times
+        return [times[i] - times[i - 1] for i in range(1, len(times))]
+
+    @property
+    def e2e(self) -> float:
+        return self.end - self.start
+
+    @property
+    def tokens(self) -> int:
+        return len(self.token_times)
+
+
+def build_stream_request(
+    backend: str, endpoint: str, model: str, prompt: str, max_tokens: int
+) -> tuple[str, dict[str, Any]]:
+    if backend == "tgi":
+        return f"{endpoint}/generate_stream", {
+            "inputs": prompt,
+            "parameters": {"max_new_tokens": max_tokens},
+        }
+    return f"{endpoint}/v1/completions", {
+        "model": model,
+        "prompt": prompt,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+
+def count_event_tokens(backend: str, data: str) -> int:
+    if data == "[DONE]":
+        return 0
+    event = json.loads(data)
+    if "error" in event:
+        raise ValueError(str(event["error"]))
+    if backend == "tgi":
+        token = event.get("token") or {}
+        return 0 if not token or token.get("special") else 1
+    choices = event.get("choices") or []
+    return 1 if choices and choices[0].get("text") else 0
+
+
+async def stream_completion(
+    client: httpx.AsyncClient,
+    backend: str,
+    endpoint: str,
+    model: str,
+    prompt: str,
+    max_tokens: int,
+) -> StreamTiming:
+    url, payload = build_stream_request(backend, endpoint, model, prompt, max_tokens)
+    timing = StreamTiming(start=time.perf_counter())
+    try:
+        async with client.stream("POST", url, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                arrived = time.perf_counter()
+                if not line.startswith("data:"):
+                    continue
+                for _ in range(count_event_tokens(backend, line[5:].strip())):
+                    timing.token_times.append(arrived)
+    except (httpx.HTTPError, ValueError) as e:
+        timing.error = type(e).__name__
+    timing.end = time.perf_counter()
+    if timing.error is None and not timing.token_times:
+        timing.error = "EmptyStream"
+    return timing
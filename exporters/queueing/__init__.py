@@ -0,0 +1,3 @@
+from exporters.queueing.metrics import *
+
+__all__ = ["METRICS"]
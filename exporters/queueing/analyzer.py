@@ -0,0 +1,113 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from exporters.config import settings
+from exporters.queueing.metrics import (
+    TOKEN_PATH_QUEUE_ARRIVAL_RATE,
+    TOKEN_PATH_QUEUE_COMPLETION_RATE,
+    TOKEN_PATH_QUEUE_GROWTH_RATE,
+    TOKEN_PATH_QUEUE_PREDICTED_WAIT_SECONDS,
+)
+from exporters.recording.recorder import sum_series
+
+
+@dataclass(frozen=True)
+class QueueSpec:
+    backend: str
+    queue_gauge: str
+    running_gauge: str | None = None
+    completion_counters: tuple[str, ...] = ()
+    tokens_counter: str | None = None
+
+
+@dataclass(frozen=True)
+class QueueSample:
+    timestamp: float
+    queued: float
+    running: float
+    completed: float
+    tokens: float | None = None
+
+
+def ewma(previous: float | None, value: float, elapsed: float, window: float) -> float:
+    if previous is None or window <= 0:
+        return value
+    alpha = 1.0 - math.exp(-elapsed / window)
+    return previous + alpha * (value - previous)
+
+
+def littles_law_wait(queued: float, completion_rate: float) -> float | None:
+    if queued <= 0:
+        return 0.0
+    if completion_rate <= 0:
+        return None
+    return queued / completion_rate
+
+
+class QueueAnalyzer:
+    def __init__(self, spec: QueueSpec, window: float | None = None):
+        self.spec = spec
+        self.window = settings.queue_ewma_window if window is None else window
+        self.arrival_rate: float | None = None
+        self.completion_rate: float | None = None
+        self.predicted_wait: float | None = None
+        self.token_rate: float | None = None
+        self._previous: QueueSample | None = None
+
+    def sample(self, metrics: dict[str, Any], timestamp: float) -> QueueSample | None:
+        queued = sum_series(metrics, self.spec.queue_gauge)
+        completed = [
+            value
+            for name in self.spec.completion_counters
+            if (value := sum_series(metrics, name)) is not None
+        ]
+        if queued is None or not completed:
+            return None
+        running = sum_series(metrics, self.spec.running_gauge or "")
+        tokens = sum_series(metrics, self.spec.tokens_counter or "")
+        return QueueSample(timestamp, queued, running or 0.0, sum(completed), tokens)
+
+    def record(
+        self, metrics: dict[str, Any], labels: dict[str, str], timestamp: float | None = None
+    ) -> None:
+        now = time.monotonic() if timestamp is None else timestamp
+        current = self.sample(metrics, now)
+        if current is None:
+            return
+        previous, self._previous = self._previous, current
+        if previous is None or now <= previous.timestamp:
+            return
+
+        elapsed = now - previous.timestamp
+        completed = current.completed - previous.completed
+        if completed < 0:
+            completed = current.completed
+        in_system = current.queued + current.running - previous.queued - previous.running
+        arrived = max(0.0, completed + in_system)
+        self.arrival_rate = ewma(self.arrival_rate, arrived / elapsed, elapsed, self.window)
+        self.completion_rate = ewma(
+            self.completion_rate, completed / elapsed, elapsed, self.window
+        )
+        wait = littles_law_wait(current.queued, self.completion_rate)
+        if wait is not None:
+            self.predicted_wait = wait
+        if current.tokens is not None and previous.tokens is not None:
+            tokens = current.tokens - previous.tokens
+            if tokens < 0:
+                tokens = current.tokens
+            self.token_rate = ewma(self.token_rate, tokens / elapsed, elapsed, self.window)
+        self.update_prometheus_metrics(labels)
+
+    def update_prometheus_metrics(self, labels: dict[str, str]) -> None:
+        if self.arrival_rate is None or self.completion_rate is None:
+            return
+        base = {**labels, "backend": self.spec.backend}
+        TOKEN_PATH_QUEUE_ARRIVAL_RATE.labels(**base).set(self.arrival_rate)
+        TOKEN_PATH_QUEUE_COMPLETION_RATE.labels(**base).set(self.completion_rate)
+        TOKEN_PATH_QUEUE_GROWTH_RATE.labels(**base).set(
+            self.arrival_rate - self.completion_rate
+        )
+        if self.predicted_wait is not None:
+            TOKEN_PATH_QUEUE_PREDICTED_WAIT_SECONDS.labels(**base).set(self.predicted_wait)
@@ -0,0 +1,33 @@
+from exporters.registry import Gauge
+
+TOKEN_PATH_QUEUE_ARRIVAL_RATE = Gauge(
+    "token_path_queue_arrival_rate",
+    "Requests arriving per second, smoothed, from completions and the change in queued "
+    "and running requests",
+    ["model", "endpoint", "backend"],
+)
+
+TOKEN_PATH_QUEUE_COMPLETION_RATE = Gauge(
+    "token_path_queue_completion_rate",
+    "Requests completing per second, smoothed",
+    ["model", "endpoint", "backend"],
+)
+
+TOKEN_PATH_QUEUE_GROWTH_RATE = Gauge(
+    "token_path_queue_growth_rate",
+    "Smoothed arrival rate minus completion rate; positive while the backlog grows",
+    ["model", "endpoint", "backend"],
+)
+
+TOKEN_PATH_QUEUE_PREDICTED_WAIT_SECONDS = Gauge(
+    "token_path_queue_predicted_wait_seconds",
+    "Expected time a request waits in the queue, from Little's law",
+    ["model", "endpoint", "backend"],
+)
+
+METRICS = [
+    TOKEN_PATH_QUEUE_ARRIVAL_RATE,
+    TOKEN_PATH_QUEUE_COMPLETION_RATE,
+    TOKEN_PATH_QUEUE_GROWTH_RATE,
+    TOKEN_PATH_QUEUE_PREDICTED_WAIT_SECONDS,
+]
@@ -0,0 +1,3 @@
+from exporters.recording.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,39 @@
+from exporters.registry import Gauge
+
+TOKEN_PATH_TTFT_QUANTILE_SECONDS = Gauge(
+    "token_path_ttft_quantile_seconds",
+    "Time to first token quantile over a sliding window, computed in the exporter",
+    ["model", "endpoint", "backend", "window", "quantile"],
+)
+
+TOKEN_PATH_ITL_QUANTILE_SECONDS = Gauge(
+    "token_path_itl_quantile_seconds",
+    "Inter-token latency quantile over a sliding window, computed in the exporter",
+    ["model", "endpoint", "backend", "window", "quantile"],
+)
+
+TOKEN_PATH_TOKENS_PER_SECOND = Gauge(
+    "token_path_tokens_per_second",
+    "Generated tokens per second over a sliding window",
+    ["model", "endpoint", "backend", "window"],
+)
+
+TOKEN_PATH_PREFILL_TOKENS_PER_SECOND = Gauge(
+    "token_path_prefill_tokens_per_second",
+    "Prompt tokens prefilled per second over a sliding window",
+    ["model", "endpoint", "backend", "window"],
+)
+
+TOKEN_PATH_PREEMPTIONS_PER_SECOND = Gauge(
+    "token_path_preemptions_per_second",
+    "Request preemptions per second over a sliding window",
+    ["model", "endpoint", "backend", "window"],
+)
+
+METRICS = [
+    TOKEN_PATH_TTFT_QUANTILE_SECONDS,
+    TOKEN_PATH_ITL_QUANTILE_SECONDS,
+    TOKEN_PATH_TOKENS_PER_SECOND,
+    TOKEN_PATH_PREFILL_TOKENS_PER_SECOND,
+    TOKEN_PATH_PREEMPTIONS_PER_SECOND,
+]
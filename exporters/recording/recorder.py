@@ -0,0 +1,181 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from exporters.recording.metrics import (
+    TOKEN_PATH_ITL_QUANTILE_SECONDS,
+    TOKEN_PATH_PREEMPTIONS_PER_SECOND,
+    TOKEN_PATH_PREFILL_TOKENS_PER_SECOND,
+    TOKEN_PATH_TOKENS_PER_SECOND,
+    TOKEN_PATH_TTFT_QUANTILE_SECONDS,
+)
+from exporters.recording.window import SlidingWindow, format_window, histogram_quantile
+
+DEFAULT_WINDOWS = (60.0, 300.0)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass(frozen=True)
+class RecordingSpec:
+    backend: str
+    ttft_histogram: str | None = None
+    itl_histogram: str | None = None
+    tokens_counter: str | None = None
+    prefill_tokens_counter: str | None = None
+    preemptions_counter: str | None = None
+
+
+def sum_series(metrics: dict[str, Any], name: str) -> float | None:
+    value = metrics.get(name)
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return float(sum(item.get("value", 0.0) for item in value))
+    return float(value)
+
+
+def mean_series(metrics: dict[str, Any], name: str) -> float | None:
+    value = metrics.get(name)
+    if isinstance(value, list):
+        return float(sum(item.get("value", 0.0) for item in value)) / len(value) if value else None
+    return sum_series(metrics, name)
+
+
+def histogram_buckets(
+    metrics: dict[str, Any], name: str
+) -> tuple[tuple[float, ...], list[float]] | None:
+    items = metrics.get(f"{name}_bucket")
+    if not isinstance(items, list):
+        return None
+    cumulative: dict[float, float] = {}
+    for item in items:
+        le = item.get("labels", {}).get("le")
+        if le is None:
+            continue
+        try:
+            bound = float(le)
+        except ValueError:
+            continue
+        cumulative[bound] = cumulative.get(bound, 0.0) + item.get("value", 0.0)
+    if not cumulative:
+        return None
+    bounds = tuple(sorted(cumulative))
+    return bounds, [cumulative[bound] for bound in bounds]
+
+
+def counter_delta(previous: list[float] | None, current: list[float]) -> list[float] | None:
+    if previous is None or len(previous) != len(current):
+        return None
+    if any(value < before for value, before in zip(current, previous)):
+        return current
+    return [value - before for value, before in zip(current, previous)]
+
+
+class WindowedRecorder:
+    def __init__(
+        self,
+        spec: RecordingSpec,
+        windows: tuple[float, ...] | list[float] = DEFAULT_WINDOWS,
+        quantiles: tuple[float, ...] | list[float] = DEFAULT_QUANTILES,
+    ):
+        self.spec = spec
+        self.windows = tuple(windows)
+        self.quantiles = tuple(quantiles)
+        self._window_labels = {window: format_window(window) for window in self.windows}
+        self._quantile_labels = {q: f"{q:g}" for q in self.quantiles}
+        self._started: float | None = None
+        self._previous: dict[str, list[float]] = {}
+        self._bounds: dict[str, tuple[float, ...]] = {}
+        self._sliding: dict[tuple[str, float], SlidingWindow] = {}
+
+    def record(
+        self, metrics: dict[str, Any], labels: dict[str, str], timestamp: float | None = None
+    ) -> None:
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._started is None:
+            self._started = now
+
+        for kind, name in (("ttft", self.spec.ttft_histogram), ("itl", self.spec.itl_histogram)):
+            if name is not None:
+                self._record_histogram(kind, name, metrics, now)
+        for kind, name in (
+            ("tokens", self.spec.tokens_counter),
+            ("prefill_tokens", self.spec.prefill_tokens_counter),
+            ("preemptions", self.spec.preemptions_counter),
+        ):
+            if name is not None:
+                value = sum_series(metrics, name)
+                if value is not None:
+                    self._add(kind, now, self._delta(kind, [value]))
+
+        self.update_prometheus_metrics(labels, now)
+
+    def _record_histogram(
+        self, kind: str, name: str, metrics: dict[str, Any], now: float
+    ) -> None:
+        buckets = histogram_buckets(metrics, name)
+        if buckets is None:
+            return
+        bounds, cumulative = buckets
+        if self._bounds.get(kind) != bounds:
+            self._bounds[kind] = bounds
+            self._previous.pop(kind, None)
+            for window in self.windows:
+                self._sliding.pop((kind, window), None)
+        delta = self._delta(kind, cumulative)
+        if delta is not None:
+            delta = [delta[0]] + [delta[i] - delta[i - 1] for i in range(1, len(delta))]
+        self._add(kind, now, delta)
+
+    def _delta(self, kind: str, current: list[float]) -> list[float] | None:
+        previous = self._previous.get(kind)
+        self._previous[kind] = current
+        return counter_delta(previous, current)
+
+    def _add(self, kind: str, now: float, delta: list[float] | None) -> None:
+        for window in self.windows:
+            sliding = self._sliding.get((kind, window))
+            if sliding is None:
+                width = len(delta) if delta is not None else len(self._previous[kind])
+                sliding = self._sliding[(kind, window)] = SlidingWindow(window, width)
+            if delta is None:
+                sliding.advance(now)
+            else:
+                sliding.add(now, delta)
+
+    def rate(self, kind: str, window: float, now: float) -> float | None:
+        sliding = self._sliding.get((kind, window))
+        if sliding is None or self._started is None:
+            return None
+        elapsed = min(window, now - self._started)
+        if elapsed <= 0:
+            return None
+        return max(0.0, sliding.totals[0]) / elapsed
+
+    def quantile(self, kind: str, q: float, window: float) -> float | None:
+        sliding = self._sliding.get((kind, window))
+        if sliding is None:
+            return None
+        return histogram_quantile(q, self._bounds[kind], sliding.totals)
+
+    def update_prometheus_metrics(self, labels: dict[str, str], now: float) -> None:
+        base = {**labels, "backend": self.spec.backend}
+        for window, window_label in self._window_labels.items():
+            for kind, gauge in (
+                ("tokens", TOKEN_PATH_TOKENS_PER_SECOND),
+                ("prefill_tokens", TOKEN_PATH_PREFILL_TOKENS_PER_SECOND),
+                ("preemptions", TOKEN_PATH_PREEMPTIONS_PER_SECOND),
+            ):
+                rate = self.rate(kind, window, now)
+                if rate is not None:
+                    gauge.labels(**base, window=window_label).set(rate)
+            for kind, gauge in (
+                ("ttft", TOKEN_PATH_TTFT_QUANTILE_SECONDS),
+                ("itl", TOKEN_PATH_ITL_QUANTILE_SECONDS),
+            ):
+                for q, quantile_label in self._quantile_labels.items():
+                    value = self.quantile(kind, q, window)
+                    if value is not None:
+                        gauge.labels(**base, window=window_label, quantile=quantile_label).set(
+                            value
+                        )
@@ -0,0 +1,83 @@
+import math
+from collections.abc import Sequence
+
+DEFAULT_SLOTS = 60
+
+
+def format_window(seconds: float) -> str:
+    if seconds >= 3600 and seconds % 3600 == 0:
+        return f"{int(seconds // 3600)}h"
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{int(seconds // 60)}m"
+    return f"{seconds:g}s"
+
+
+class SlidingWindow:
+    def __init__(self, window: float, width: int = 1, slots: int = DEFAULT_SLOTS):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.width = width
+        self.slot_width = window / slots
+        self.totals = [0.0] * width
+        self._slots = [[0.0] * width for _ in range(slots)]
+        self._head: int | None = None
+
+    def advance(self, timestamp: float) -> None:
+        current = int(timestamp // self.slot_width)
+        if self._head is None:
+            self._head = current
+            return
+        if current <= self._head:
+            return
+        slots = len(self._slots)
+        for slot_id in range(max(self._head + 1, current - slots + 1), current + 1):
+            slot = self._slots[slot_id % slots]
+            for i, value in enumerate(slot):
+                if value:
+                    self.totals[i] -= value
+                    slot[i] = 0.0
+        self._head = current
+
+    def add(self, timestamp: float, values: Sequence[float]) -> None:
+        self.advance(timestamp)
+        assert self._head is not None
+        slot = self._slots[self._head % len(self._slots)]
+        for i, value in enumerate(values):
+            if value:
+                slot[i] += value
+                self.totals[i] += value
+
+    def reset(self) -> None:
+        self.totals = [0.0] * self.width
+        self._slots = [[0.0] * self.width for _ in self._slots]
+        self._head = None
+
+
+def histogram_quantile(q: float, bounds: Sequence[float], counts: Sequence[float]) -> float:
+    total = sum(counts)
+    if total <= 0 or not bounds:
+        return math.nan
+    rank = q * total
+    cumulative = 0.0
+    lower = 0.0
+    for bound, count in zip(bounds, counts):
+        if count > 0 and cumulative + count >= rank:
+            if math.isinf(bound):
+                return lower
+            if bound <= 0:
+                return bound
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        if not math.isinf(bound):
+            lower = bound
+    return lower
+
+
+def bucket_midpoints(bounds: Sequence[float]) -> list[float]:
+    midpoints = []
+    lower = 0.0
+    for upper in bounds:
+        midpoints.append(lower if math.isinf(upper) else (lower + upper) / 2)
+        lower = upper
+    return midpoints
@@ -0,0 +1,185 @@
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, ClassVar
+
+import prometheus_client
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.registry import REGISTRY, Collector, CollectorRegistry
+from prometheus_client.samples import Exemplar
+
+_removals = 0
+
+
+def series_removals() -> int:
+    return _removals
+
+
+class DeferredMetric:
+    metric_type: ClassVar[type[Collector]]
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._deferred_args = args
+        self._deferred_kwargs = kwargs
+        self._deferred_metric: Collector | None = None
+        self._deferred_lock = threading.Lock()
+
+    @property
+    def constructed(self) -> bool:
+        return self._deferred_metric is not None
+
+    def construct(self) -> Collector:
+        metric = self._deferred_metric
+        if metric is None:
+            with self._deferred_lock:
+                metric = self._deferred_metric
+                if metric is None:
+                    metric = self.metric_type(*self._deferred_args, **self._deferred_kwargs)
+                    self._deferred_metric = metric
+        return metric
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_deferred"):
+            raise AttributeError(name)
+        value = getattr(self.construct(), name)
+        if callable(value):
+            self.__dict__[name] = value
+        return value
+
+    def __repr__(self) -> str:
+        state = "constructed" if self.constructed else "deferred"
+        return f"<{type(self).__name__} {self._deferred_args[0]!r} {state}>"
+
+
+class Counter(DeferredMetric):
+    metric_type = prometheus_client.Counter
+
+
+class Gauge(DeferredMetric):
+    metric_type = prometheus_client.Gauge
+
+
+class Histogram(DeferredMetric):
+    metric_type = prometheus_client.Histogram
+
+
+class DeltaHistogramChild:
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self._lock = threading.Lock()
+        self._counts = [0.0] * len(upper_bounds)
+        self._exemplars: list[Exemplar | None] = [None] * len(upper_bounds)
+        self._sum = 0.0
+
+    def observe(self, amount: float, exemplar: dict[str, str] | None = None) -> None:
+        index = bisect.bisect_left(self.upper_bounds, amount)
+        with self._lock:
+            self._counts[index] += 1.0
+            self._sum += amount
+            if exemplar is not None:
+                self._exemplars[index] = Exemplar(exemplar, amount, time.time())
+
+    def add(self, counts: Sequence[float], sum_value: float) -> None:
+        if len(counts) != len(self.upper_bounds):
+            raise ValueError("Bucket counts do not match the histogram buckets")
+        if any(count < 0 for count in counts) or sum_value < 0:
+            raise ValueError("Histogram deltas must not be negative")
+        with self._lock:
+            for index, count in enumerate(counts):
+                self._counts[index] += count
+            self._sum += sum_value
+
+    def buckets(self) -> tuple[list[tuple[str, float] | tuple[str, float, Exemplar]], float]:
+        with self._lock:
+            counts = list(self._counts)
+            exemplars = list(self._exemplars)
+            sum_value = self._sum
+        cumulative = 0.0
+        buckets: list[tuple[str, float] | tuple[str, float, Exemplar]] = []
+        for bound, count, exemplar in zip(self.upper_bounds, counts, exemplars):
+            cumulative += count
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            if exemplar is None:
+                buckets.append((le, cumulative))
+            else:
+                buckets.append((le, cumulative, exemplar))
+        return buckets, sum_value
+
+
+class DeltaHistogramCollector(Collector):
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = prometheus_client.Histogram.DEFAULT_BUCKETS,
+        registry: CollectorRegistry | None = REGISTRY,
+    ):
+        upper_bounds = tuple(sorted(float(bound) for bound in buckets))
+        if not upper_bounds or not math.isinf(upper_bounds[-1]):
+            upper_bounds += (math.inf,)
+        self._name = name
+        self._documentation = documentation
+        self._labelnames = tuple(labelnames)
+        self.upper_bounds = upper_bounds
+        self._lock = threading.Lock()
+        self._metrics: dict[tuple[str, ...], DeltaHistogramChild] = {}
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *labelvalues: Any, **labelkwargs: Any) -> DeltaHistogramChild:
+        if labelkwargs:
+            if labelvalues or set(labelkwargs) != set(self._labelnames):
+                raise ValueError("Incorrect label names")
+            labelvalues = tuple(labelkwargs[name] for name in self._labelnames)
+        if len(labelvalues) != len(self._labelnames):
+            raise ValueError("Incorrect label count")
+        key = tuple(str(value) for value in labelvalues)
+        with self._lock:
+            child = self._metrics.get(key)
+            if child is None:
+                child = self._metrics[key] = DeltaHistogramChild(self.upper_bounds)
+        return child
+
+    def remove(self, *labelvalues: Any) -> None:
+        with self._lock:
+            self._metrics.pop(tuple(str(value) for value in labelvalues), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics = {}
+
+    def describe(self) -> list[HistogramMetricFamily]:
+        return [HistogramMetricFamily(self._name, self._documentation, labels=self._labelnames)]
+
+    def collect(self) -> Iterator[HistogramMetricFamily]:
+        family = HistogramMetricFamily(self._name, self._documentation, labels=self._labelnames)
+        with self._lock:
+            children = list(self._metrics.items())
+        for key, child in children:
+            buckets, sum_value = child.buckets()
+            family.add_metric(list(key), buckets, sum_value)
+        yield family
+
+
+class DeltaHistogram(DeferredMetric):
+    metric_type = DeltaHistogramCollector
+
+
+def remove_series(collectors: Iterable[DeferredMetric], **match: str) -> None:
+    global _removals
+    for collector in collectors:
+        if not collector.constructed:
+            continue
+        names = collector._labelnames
+        if not set(match) <= set(names):
+            continue
+        with collector._lock:
+            keys = list(collector._metrics)
+        for key in keys:
+            labels = dict(zip(names, key))
+            if all(labels[name] == value for name, value in match.items()):
+                collector.remove(*key)
+                _removals += 1
@@ -0,0 +1,3 @@
+from exporters.reload.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,18 @@
+from exporters.registry import Counter, Gauge
+
+CONFIG_RELOADS = Counter(
+    "config_reloads",
+    "Configuration reload attempts by result",
+    ["exporter", "result"],
+)
+
+CONFIG_LAST_RELOAD_TIMESTAMP = Gauge(
+    "config_last_reload_timestamp_seconds",
+    "Unix time of the last applied configuration change",
+    ["exporter"],
+)
+
+METRICS = [
+    CONFIG_RELOADS,
+    CONFIG_LAST_RELOAD_TIMESTAMP,
+]
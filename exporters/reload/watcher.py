@@ -0,0 +1,137 @@
+import asyncio
+import signal
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+import structlog
+from pydantic import ValidationError
+
+from exporters.breakdown.metrics import METRICS as BREAKDOWN_METRICS
+from exporters.breaker.metrics import METRICS as BREAKER_METRICS
+from exporters.config import Settings, reload_settings, settings
+from exporters.payload.metrics import METRICS as PAYLOAD_METRICS
+from exporters.queueing.metrics import METRICS as QUEUEING_METRICS
+from exporters.recording.metrics import METRICS as RECORDING_METRICS
+from exporters.registry import DeferredMetric, remove_series
+from exporters.reload.metrics import CONFIG_LAST_RELOAD_TIMESTAMP, CONFIG_RELOADS
+from exporters.scheduler.metrics import METRICS as SCHEDULER_METRICS
+from exporters.slo.metrics import METRICS as SLO_METRICS
+
+logger = structlog.get_logger()
+
+RESTART_SETTINGS = (
+    "exporter_port_",
+    "log_level",
+    "http_",
+    "remote_write_",
+    "otlp_",
+    "queue_analytics_enabled",
+    "recording_",
+    "slo_",
+)
+ENDPOINT_METRICS = (*BREAKDOWN_METRICS, *QUEUEING_METRICS, *RECORDING_METRICS, *SLO_METRICS)
+TARGET_METRICS = (*BREAKER_METRICS, *PAYLOAD_METRICS, *SCHEDULER_METRICS)
+
+ApplySettings = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def remove_endpoint_series(endpoint: str, collectors: Iterable[DeferredMetric] = ()) -> None:
+    remove_series((*collectors, *ENDPOINT_METRICS), endpoint=endpoint)
+    remove_series(TARGET_METRICS, target=endpoint)
+
+
+class ConfigWatcher:
+    def __init__(
+        self,
+        exporter: str,
+        apply: ApplySettings,
+        path: str | None = None,
+        interval: float = settings.config_reload_interval,
+    ):
+        self.exporter = exporter
+        self.apply = apply
+        env_file = Settings.model_config.get("env_file")
+        if env_file is not None and not isinstance(env_file, (str, Path)):
+            env_file = env_file[-1] if env_file else None
+        self.path = Path(path or env_file or ".env")
+        self.interval = interval
+        self._requested = asyncio.Event()
+        self._running = False
+        self._task: asyncio.Task[None] | None = None
+        self._signal_loop: asyncio.AbstractEventLoop | None = None
+        self._mtime = self._stat()
+
+    def _stat(self) -> int | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._running = True
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.request)
+            self._signal_loop = loop
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            logger.warning("SIGHUP reload unavailable, watching config file only")
+        self._task = asyncio.create_task(self.watch())
+        logger.info("Watching configuration", path=str(self.path), interval=self.interval)
+
+    async def stop(self) -> None:
+        self._running = False
+        self._requested.set()
+        if self._signal_loop is not None:
+            self._signal_loop.remove_signal_handler(signal.SIGHUP)
+            self._signal_loop = None
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def request(self) -> None:
+        self._requested.set()
+
+    async def watch(self) -> None:
+        while self._running:
+            try:
+                await asyncio.wait_for(
+                    self._requested.wait(), self.interval if self.interval > 0 else None
+                )
+            except TimeoutError:
+                pass
+            if not self._running:
+                break
+            requested = self._requested.is_set()
+            self._requested.clear()
+            mtime = self._stat()
+            if requested or mtime != self._mtime:
+                self._mtime = mtime
+                await self.reload()
+
+    async def reload(self) -> dict[str, Any]:
+        try:
+            changes = reload_settings(str(self.path))
+        except ValidationError as e:
+            CONFIG_RELOADS.labels(exporter=self.exporter, result="invalid").inc()
+            logger.error("Invalid configuration, keeping current settings", error=str(e))
+            return {}
+        if not changes:
+            CONFIG_RELOADS.labels(exporter=self.exporter, result="unchanged").inc()
+            return changes
+
+        logger.info("Configuration changed", exporter=self.exporter, settings=sorted(changes))
+        restart = sorted(name for name in changes if name.startswith(RESTART_SETTINGS))
+        if restart:
+            logger.warning("Settings take effect after restart", settings=restart)
+        try:
+            await self.apply(changes)
+        except Exception as e:
+            CONFIG_RELOADS.labels(exporter=self.exporter, result="failed").inc()
+            logger.error("Error applying configuration", exporter=self.exporter, error=str(e))
+            return changes
+        CONFIG_RELOADS.labels(exporter=self.exporter, result="applied").inc()
+        CONFIG_LAST_RELOAD_TIMESTAMP.labels(exporter=self.exporter).set_to_current_time()
+        return changes
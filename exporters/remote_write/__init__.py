@@ -0,0 +1,3 @@
+from exporters.remote_write.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,47 @@
+from exporters.registry import Counter, Gauge, Histogram
+
+REMOTE_WRITE_QUEUE_DEPTH = Gauge(
+    "remote_write_queue_depth_samples",
+    "Number of samples waiting in the remote-write shard queue",
+    ["url", "shard"],
+)
+
+REMOTE_WRITE_QUEUE_CAPACITY = Gauge(
+    "remote_write_queue_capacity_samples",
+    "Maximum number of samples a remote-write shard queue can hold",
+    ["url"],
+)
+
+REMOTE_WRITE_SAMPLES_SENT = Counter(
+    "remote_write_samples_sent_total",
+    "Total number of samples successfully sent to the remote-write endpoint",
+    ["url"],
+)
+
+REMOTE_WRITE_SAMPLES_DROPPED = Counter(
+    "remote_write_samples_dropped_total",
+    "Total number of samples dropped before reaching the remote-write endpoint",
+    ["url", "reason"],
+)
+
+REMOTE_WRITE_RETRIES = Counter(
+    "remote_write_retries_total",
+    "Total number of remote-write batch retries",
+    ["url"],
+)
+
+REMOTE_WRITE_SEND_DURATION = Histogram(
+    "remote_write_send_duration_seconds",
+    "Duration of remote-write batch sends in seconds",
+    ["url"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+
+METRICS = [
+    REMOTE_WRITE_QUEUE_DEPTH,
+    REMOTE_WRITE_QUEUE_CAPACITY,
+    REMOTE_WRITE_SAMPLES_SENT,
+    REMOTE_WRITE_SAMPLES_DROPPED,
+    REMOTE_WRITE_RETRIES,
+    REMOTE_WRITE_SEND_DURATION,
+]
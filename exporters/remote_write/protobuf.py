@@ -0,0 +1,64 @@
+import struct
+from collections.abc import Iterable
+
+WIRE_VARINT = 0
+WIRE_I64 = 1
+WIRE_LEN = 2
+
+
+def encode_varint(value: int) -> bytes:
+    if value < 0:
+        value += 1 << 64
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def encode_key(field_number: int, wire_type: int) -> bytes:
+    return encode_varint((field_number << 3) | wire_type)
+
+
+def encode_varint_field(field_number: int, value: int) -> bytes:
+    return encode_key(field_number, WIRE_VARINT) + encode_varint(value)
+
+
+def encode_double_field(field_number: int, value: float) -> bytes:
+    return encode_key(field_number, WIRE_I64) + struct.pack("<d", value)
+
+
+def encode_bytes_field(field_number: int, value: bytes) -> bytes:
+    return encode_key(field_number, WIRE_LEN) + encode_varint(len(value)) + value
+
+
+def encode_string_field(field_number: int, value: str) -> bytes:
+    return encode_bytes_field(field_number, value.encode("utf-8"))
+
+
+def encode_label(name: str, value: str) -> bytes:
+    return encode_string_field(1, name) + encode_string_field(2, value)
+
+
+def encode_sample(value: float, timestamp_ms: int) -> bytes:
+    return encode_double_field(1, value) + encode_varint_field(2, timestamp_ms)
+
+
+def encode_timeseries(
+    labels: Iterable[tuple[str, str]], samples: Iterable[tuple[float, int]]
+) -> bytes:
+    parts = [encode_bytes_field(1, encode_label(k, v)) for k, v in labels]
+    parts.extend(encode_bytes_field(2, encode_sample(v, ts)) for v, ts in samples)
+    return b"".join(parts)
+
+
+def encode_write_request(
+    series: Iterable[tuple[Iterable[tuple[str, str]], Iterable[tuple[float, int]]]],
+) -> bytes:
+    return b"".join(
+        encode_bytes_field(1, encode_timeseries(labels, samples)) for labels, samples in series
+    )
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import httpx
+import structlog
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from exporters.config import settings
+from exporters.remote_write.metrics import (
+    REMOTE_WRITE_QUEUE_CAPACITY,
+    REMOTE_WRITE_QUEUE_DEPTH,
+    REMOTE_WRITE_RETRIES,
+    REMOTE_WRITE_SAMPLES_DROPPED,
+    REMOTE_WRITE_SAMPLES_SENT,
+    REMOTE_WRITE_SEND_DURATION,
+)
+from exporters.remote_write.protobuf import encode_write_request
+
+try:
+    import cramjam
+except ImportError:  # pragma: no cover - optional dependency
+    cramjam = None  # type: ignore[assignment]
+
+logger = structlog.get_logger()
+
+REMOTE_WRITE_HEADERS = {
+    "Content-Encoding": "snappy",
+    "Content-Type": "application/x-protobuf",
+    "User-Agent": "token-path-observability",
+    "X-Prometheus-Remote-Write-Version": "0.1.0",
+}
+
+CREATED_SUFFIX_TYPES = {"counter", "histogram", "summary"}
+
+
+@dataclass(frozen=True)
+class RemoteWriteSample:
+    labels: tuple[tuple[str, str], ...]
+    value: float
+    timestamp_ms: int
+
+
+class RemoteWriter:
+    def __init__(
+        self,
+        url: str = settings.remote_write_url,
+        shards: int = settings.remote_write_shards,
+        queue_capacity: int = settings.remote_write_queue_capacity,
+        max_samples_per_send: int = settings.remote_write_max_samples_per_send,
+        batch_send_deadline: float = settings.remote_write_batch_send_deadline,
+        min_backoff: float = 0.03,
+        max_backoff: float = 5.0,
+        max_retries: int = 10,
+        timeout: float = 30.0,
+        external_labels: dict[str, str] | None = None,
+        registry: CollectorRegistry = REGISTRY,
+    ):
+        if cramjam is None:
+            raise RuntimeError(
+                "Remote-write push mode requires snappy support: "
+                "pip install 'token-path-observability[remote-write]'"
+            )
+        self.url = url
+        self.shards = max(1, shards)
+        self.queue_capacity = queue_capacity
+        self.max_samples_per_send = max_samples_per_send
+        self.batch_send_deadline = batch_send_deadline
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.external_labels = external_labels or {}
+        self.registry = registry
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self._queues: list[asyncio.Queue[RemoteWriteSample | None]] = [
+            asyncio.Queue(maxsize=queue_capacity) for _ in range(self.shards)
+        ]
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stopping = False
+        REMOTE_WRITE_QUEUE_CAPACITY.labels(url=self.url).set(queue_capacity)
+
+    def collect_samples(self) -> list[RemoteWriteSample]:
+        timestamp_ms = int(time.time() * 1000)
+        samples: list[RemoteWriteSample] = []
+        for metric in self.registry.collect():
+            skip_created = metric.type in CREATED_SUFFIX_TYPES
+            for sample in metric.samples:
+                if skip_created and sample.name.endswith("_created"):
+                    continue
+                labels = {**self.external_labels, **sample.labels, "__name__": sample.name}
+                sample_ms = int(float(sample.timestamp) * 1000) if sample.timestamp else None
+                samples.append(
+                    RemoteWriteSample(
+                        labels=tuple(sorted(labels.items())),
+                        value=sample.value,
+                        timestamp_ms=sample_ms or timestamp_ms,
+                    )
+                )
+        return samples
+
+    def enqueue(self, samples: list[RemoteWriteSample]) -> int:
+        dropped = 0
+        for sample in samples:
+            queue = self._queues[hash(sample.labels) % self.shards]
+            try:
+                queue.put_nowait(sample)
+            except asyncio.QueueFull:
+                dropped += 1
+        if dropped:
+            REMOTE_WRITE_SAMPLES_DROPPED.labels(url=self.url, reason="queue_full").inc(dropped)
+            logger.warning("Remote-write queue full, dropping samples", dropped=dropped)
+        self._update_queue_depth()
+        return dropped
+
+    def push(self) -> int:
+        return self.enqueue(self.collect_samples())
+
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run_shard(shard)) for shard in range(self.shards)
+        ]
+        logger.info("Started remote-write shards", url=self.url, shards=self.shards)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        for queue in self._queues:
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            self._tasks = []
+        await self.client.aclose()
+        logger.info("Stopped remote-write shards", url=self.url)
+
+    def _update_queue_depth(self) -> None:
+        for shard, queue in enumerate(self._queues):
+            REMOTE_WRITE_QUEUE_DEPTH.labels(url=self.url, shard=str(shard)).set(queue.qsize())
+
+    async def _run_shard(self, shard: int) -> None:
+        queue = self._queues[shard]
+        while True:
+            batch = await self._next_batch(queue)
+            if batch:
+                await self._send_with_retry(batch)
+            self._update_queue_depth()
+            if self._stopping and queue.empty():
+                return
+
+    async def _next_batch(
+        self, queue: asyncio.Queue[RemoteWriteSample | None]
+    ) -> list[RemoteWriteSample]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_send_deadline
+        batch: list[RemoteWriteSample] = []
+        while len(batch) < self.max_samples_per_send:
+            if queue.empty():
+                if self._stopping:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    if batch:
+                        break
+                    deadline = loop.time() + self.batch_send_deadline
+                    continue
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except TimeoutError:
+                    continue
+            else:
+                item = queue.get_nowait()
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+
+    def _encode(self, batch: list[RemoteWriteSample]) -> bytes:
+        series: dict[tuple[tuple[str, str], ...], list[tuple[float, int]]] = {}
+        for sample in batch:
+            series.setdefault(sample.labels, []).append((sample.value, sample.timestamp_ms))
+        return bytes(cramjam.snappy.compress_raw(encode_write_request(series.items())))
+
+    async def _send_with_retry(self, batch: list[RemoteWriteSample]) -> bool:
+        payload = self._encode(batch)
+        backoff = self.min_backoff
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    self.url, content=payload, headers=REMOTE_WRITE_HEADERS
+                )
+            except httpx.HTTPError as e:
+                logger.warning("Remote-write send failed", error=str(e), attempt=attempt)
+            else:
+                REMOTE_WRITE_SEND_DURATION.labels(url=self.url).observe(
+                    time.perf_counter() - start
+                )
+                if response.is_success:
+                    REMOTE_WRITE_SAMPLES_SENT.labels(url=self.url).inc(len(batch))
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    logger.error(
+                        "Remote-write batch rejected",
+                        status=response.status_code,
+                        body=response.text[:256],
+                    )
+                    REMOTE_WRITE_SAMPLES_DROPPED.labels(url=self.url, reason="rejected").inc(
+                        len(batch)
+                    )
+                    return False
+                logger.warning(
+                    "Remote-write send failed", status=response.status_code, attempt=attempt
+                )
+            if attempt == self.max_retries or (self._stopping and attempt > 0):
+                break
+            REMOTE_WRITE_RETRIES.labels(url=self.url).inc()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+        REMOTE_WRITE_SAMPLES_DROPPED.labels(url=self.url, reason="retries_exhausted").inc(
+            len(batch)
+        )
+        return False
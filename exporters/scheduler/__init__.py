@@ -0,0 +1,3 @@
+from exporters.scheduler.metrics import *
+
+__all__ = ["METRICS"]
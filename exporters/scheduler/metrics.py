@@ -0,0 +1,18 @@
+from exporters.registry import Gauge
+
+EXPORTER_POLL_INTERVAL_SECONDS = Gauge(
+    "exporter_poll_interval_seconds",
+    "Effective interval between collections of the target",
+    ["exporter", "target"],
+)
+
+EXPORTER_POLL_CHANGE_RATIO = Gauge(
+    "exporter_poll_change_ratio",
+    "Largest relative change of the target's load signals since the previous collection",
+    ["exporter", "target"],
+)
+
+METRICS = [
+    EXPORTER_POLL_INTERVAL_SECONDS,
+    EXPORTER_POLL_CHANGE_RATIO,
+]
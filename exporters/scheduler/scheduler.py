@@ -0,0 +1,82 @@
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+from exporters.config import settings
+from exporters.scheduler.metrics import (
+    EXPORTER_POLL_CHANGE_RATIO,
+    EXPORTER_POLL_INTERVAL_SECONDS,
+)
+
+POLL_SETTINGS = {
+    "poll_min_interval": "min_interval",
+    "poll_max_interval": "max_interval",
+    "poll_jitter": "jitter",
+    "poll_adaptive": "adaptive",
+    "poll_fast_change": "fast_change",
+    "poll_steady_change": "steady_change",
+}
+
+
+@dataclass
+class AdaptiveInterval:
+    exporter: str
+    target: str
+    interval: float = 15.0
+    min_interval: float = field(default_factory=lambda: settings.poll_min_interval)
+    max_interval: float = field(default_factory=lambda: settings.poll_max_interval)
+    jitter: float = field(default_factory=lambda: settings.poll_jitter)
+    adaptive: bool = field(default_factory=lambda: settings.poll_adaptive)
+    fast_change: float = field(default_factory=lambda: settings.poll_fast_change)
+    steady_change: float = field(default_factory=lambda: settings.poll_steady_change)
+    speedup: float = 0.5
+    slowdown: float = 1.25
+    floors: dict[str, float] = field(default_factory=dict)
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.adaptive:
+            self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        self.change = 0.0
+        self._previous: dict[str, float] = {}
+        self._random = random.Random(self.seed)
+        self._labels = {"exporter": self.exporter, "target": self.target}
+        EXPORTER_POLL_INTERVAL_SECONDS.labels(**self._labels).set(self.interval)
+
+    def reconfigure(self, changes: dict[str, Any]) -> None:
+        for name, attribute in POLL_SETTINGS.items():
+            if name in changes:
+                setattr(self, attribute, changes[name])
+        if self.adaptive:
+            self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        EXPORTER_POLL_INTERVAL_SECONDS.labels(**self._labels).set(self.interval)
+
+    def change_ratio(self, signals: dict[str, float]) -> float | None:
+        change = None
+        for name, value in signals.items():
+            previous = self._previous.get(name)
+            self._previous[name] = value
+            if previous is None:
+                continue
+            scale = max(abs(previous), abs(value), self.floors.get(name, 1.0))
+            change = max(change or 0.0, abs(value - previous) / scale)
+        return change
+
+    def observe(self, signals: dict[str, float]) -> float:
+        change = self.change_ratio(signals) if self.adaptive else None
+        if change is not None:
+            self.change = change
+            if change >= self.fast_change:
+                self.interval = max(self.min_interval, self.interval * self.speedup)
+            elif change <= self.steady_change:
+                self.interval = min(self.max_interval, self.interval * self.slowdown)
+            EXPORTER_POLL_CHANGE_RATIO.labels(**self._labels).set(self.change)
+            EXPORTER_POLL_INTERVAL_SECONDS.labels(**self._labels).set(self.interval)
+        return self.interval
+
+    def initial_delay(self) -> float:
+        return self._random.uniform(0.0, self.interval * self.jitter)
+
+    def next_delay(self, elapsed: float = 0.0) -> float:
+        jittered = self.interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+        return max(0.0, jittered - elapsed)
@@ -0,0 +1,10 @@
+from exporters.simulator.nvidia_smi import NvidiaSmiSimulator
+from exporters.simulator.payloads import TGIMetricsSimulator, VLLMMetricsSimulator
+from exporters.simulator.server import MockInferenceServer
+
+__all__ = [
+    "MockInferenceServer",
+    "NvidiaSmiSimulator",
+    "TGIMetricsSimulator",
+    "VLLMMetricsSimulator",
+]
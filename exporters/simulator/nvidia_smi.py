@@ -0,0 +1,191 @@
+import os
+import random
+import sys
+import time
+import uuid
+from xml.sax.saxutils import escape
+
+PROCESS_NAMES = ["python3", "/usr/bin/python3 -m vllm.entrypoints.openai.api_server",
+                 "text-generation-launcher", "/opt/conda/bin/jupyter-lab"]
+
+
+class NvidiaSmiSimulator:
+    def __init__(
+        self,
+        num_gpus: int = 8,
+        processes_per_gpu: int = 2,
+        product_name: str = "NVIDIA H100 80GB HBM3",
+        memory_mib: int = 81559,
+        power_limit: float = 700.0,
+        supported_clocks: int = 96,
+        seed: int | None = None,
+    ):
+        self.num_gpus = num_gpus
+        self.processes_per_gpu = processes_per_gpu
+        self.product_name = product_name
+        self.memory_mib = memory_mib
+        self.power_limit = power_limit
+        self.supported_clocks = supported_clocks
+        self._random = random.Random(seed)
+        self._uuids = [
+            f"GPU-{uuid.UUID(int=self._random.getrandbits(128))}" for _ in range(num_gpus)
+        ]
+        self._supported_clocks_xml = self._render_supported_clocks()
+        self._pids = [
+            [self._random.randint(1000, 4_000_000) for _ in range(processes_per_gpu)]
+            for _ in range(num_gpus)
+        ]
+
+    def _render_supported_clocks(self) -> str:
+        graphics = "".join(
+            f"\t\t\t\t<supported_graphics_clock>{1980 - 15 * i} MHz</supported_graphics_clock>\n"
+            for i in range(self.supported_clocks)
+        )
+        return (
+            "\t\t<supported_clocks>\n"
+            "\t\t\t<supported_mem_clock>\n"
+            "\t\t\t\t<value>2619 MHz</value>\n"
+            f"{graphics}"
+            "\t\t\t</supported_mem_clock>\n"
+            "\t\t</supported_clocks>\n"
+        )
+
+    def _ecc_xml(self) -> str:
+        counters = "".join(
+            f"\t\t\t\t<{name}>0</{name}>\n"
+            for name in ("sram_correctable", "sram_uncorrectable", "dram_correctable",
+                         "dram_uncorrectable")
+        )
+        return (
+            "\t\t<ecc_errors>\n"
+            f"\t\t\t<volatile>\n{counters}\t\t\t</volatile>\n"
+            f"\t\t\t<aggregate>\n{counters}\t\t\t</aggregate>\n"
+            "\t\t</ecc_errors>\n"
+        )
+
+    def _gpu_xml(self, index: int) -> str:
+        r = self._random
+        bus_id = f"00000000:{0x18 + index * 0x10:02X}:00.0"
+        processes = []
+        process_memory = 0
+        for slot, pid in enumerate(self._pids[index]):
+            used = r.randint(512, self.memory_mib // max(1, self.processes_per_gpu))
+            process_memory += used
+            name = PROCESS_NAMES[(index + slot) % len(PROCESS_NAMES)]
+            processes.append(
+                "\t\t\t<process_info>\n"
+                "\t\t\t\t<gpu_instance_id>N/A</gpu_instance_id>\n"
+                "\t\t\t\t<compute_instance_id>N/A</compute_instance_id>\n"
+                f"\t\t\t\t<pid>{pid}</pid>\n"
+                "\t\t\t\t<type>C</type>\n"
+                f"\t\t\t\t<process_name>{escape(name)}</process_name>\n"
+                f"\t\t\t\t<used_memory>{used} MiB</used_memory>\n"
+                "\t\t\t</process_info>\n"
+            )
+        used_mib = min(self.memory_mib, process_memory + 512)
+        gpu_util = r.randint(0, 100)
+        memory_util = r.randint(0, 100)
+        power_draw = self.power_limit * (0.2 + 0.75 * gpu_util / 100)
+        return (
+            f'\t<gpu id="{bus_id}">\n'
+            f"\t\t<product_name>{escape(self.product_name)}</product_name>\n"
+            "\t\t<product_brand>NVIDIA</product_brand>\n"
+            "\t\t<product_architecture>Hopper</product_architecture>\n"
+            "\t\t<persistence_mode>Enabled</persistence_mode>\n"
+            f"\t\t<uuid>{self._uuids[index]}</uuid>\n"
+            f"\t\t<minor_number>{index}</minor_number>\n"
+            "\t\t<pci>\n"
+            f"\t\t\t<pci_bus>{0x18 + index * 0x10:02X}</pci_bus>\n"
+            "\t\t\t<pci_device>00</pci_device>\n"
+            "\t\t\t<pci_domain>0000</pci_domain>\n"
+            f"\t\t\t<pci_bus_id>{bus_id}</pci_bus_id>\n"
+            f"\t\t\t<tx_util>{r.randint(0, 500000)} KB/s</tx_util>\n"
+            f"\t\t\t<rx_util>{r.randint(0, 500000)} KB/s</rx_util>\n"
+            "\t\t</pci>\n"
+            "\t\t<fan_speed>N/A</fan_speed>\n"
+            "\t\t<performance_state>P0</performance_state>\n"
+            "\t\t<fb_memory_usage>\n"
+            f"\t\t\t<total>{self.memory_mib} MiB</total>\n"
+            "\t\t\t<reserved>551 MiB</reserved>\n"
+            f"\t\t\t<used>{used_mib} MiB</used>\n"
+            f"\t\t\t<free>{self.memory_mib - used_mib} MiB</free>\n"
+            "\t\t</fb_memory_usage>\n"
+            "\t\t<bar1_memory_usage>\n"
+            "\t\t\t<total>131072 MiB</total>\n"
+            "\t\t\t<used>1 MiB</used>\n"
+            "\t\t\t<free>131071 MiB</free>\n"
+            "\t\t</bar1_memory_usage>\n"
+            "\t\t<compute_mode>Default</compute_mode>\n"
+            "\t\t<utilization>\n"
+            f"\t\t\t<gpu_util>{gpu_util} %</gpu_util>\n"
+            f"\t\t\t<memory_util>{memory_util} %</memory_util>\n"
+            "\t\t\t<encoder_util>0 %</encoder_util>\n"
+            "\t\t\t<decoder_util>0 %</decoder_util>\n"
+            "\t\t</utilization>\n"
+            "\t\t<encoder_stats>\n"
+            "\t\t\t<session_count>0</session_count>\n"
+            "\t\t\t<average_fps>0</average_fps>\n"
+            "\t\t\t<average_latency>0</average_latency>\n"
+            "\t\t</encoder_stats>\n"
+            f"{self._ecc_xml()}"
+            "\t\t<temperature>\n"
+            f"\t\t\t<gpu_temp>{r.randint(30, 85)} C</gpu_temp>\n"
+            "\t\t\t<gpu_temp_max_threshold>92 C</gpu_temp_max_threshold>\n"
+            f"\t\t\t<memory_temp>{r.randint(30, 85)} C</memory_temp>\n"
+            "\t\t</temperature>\n"
+            "\t\t<power_readings>\n"
+            "\t\t\t<power_state>P0</power_state>\n"
+            f"\t\t\t<power_draw>{power_draw:.2f} W</power_draw>\n"
+            f"\t\t\t<current_power_limit>{self.power_limit:.2f} W</current_power_limit>\n"
+            f"\t\t\t<default_power_limit>{self.power_limit:.2f} W</default_power_limit>\n"
+            "\t\t</power_readings>\n"
+            "\t\t<clocks>\n"
+            f"\t\t\t<graphics_clock>{r.randint(1000, 1980)} MHz</graphics_clock>\n"
+            f"\t\t\t<sm_clock>{r.randint(1000, 1980)} MHz</sm_clock>\n"
+            "\t\t\t<mem_clock>2619 MHz</mem_clock>\n"
+            "\t\t\t<video_clock>1755 MHz</video_clock>\n"
+            "\t\t</clocks>\n"
+            f"{self._supported_clocks_xml}"
+            "\t\t<processes>\n"
+            f"{''.join(processes)}"
+            "\t\t</processes>\n"
+            "\t</gpu>\n"
+        )
+
+    def render(self) -> str:
+        gpus = "".join(self._gpu_xml(index) for index in range(self.num_gpus))
+        return (
+            '<?xml version="1.0" ?>\n'
+            '<!DOCTYPE nvidia_smi_log SYSTEM "nvsmi_device_v12.dtd">\n'
+            "<nvidia_smi_log>\n"
+            f"\t<timestamp>{time.strftime('%a %b %d %H:%M:%S %Y')}</timestamp>\n"
+            "\t<driver_version>550.54.15</driver_version>\n"
+            "\t<cuda_version>12.4</cuda_version>\n"
+            f"\t<attached_gpus>{self.num_gpus}</attached_gpus>\n"
+            f"{gpus}"
+            "</nvidia_smi_log>\n"
+        )
+
+
+def main() -> int:
+    # Drop-in replacement for `nvidia-smi -q -x`; configured through the
+    # environment because the GPU exporter controls the command-line arguments.
+    latency = float(os.environ.get("SIM_NVIDIA_SMI_LATENCY", "0"))
+    error_rate = float(os.environ.get("SIM_NVIDIA_SMI_ERROR_RATE", "0"))
+    seed = os.environ.get("SIM_NVIDIA_SMI_SEED")
+    simulator = NvidiaSmiSimulator(
+        num_gpus=int(os.environ.get("SIM_NVIDIA_SMI_GPUS", "8")),
+        processes_per_gpu=int(os.environ.get("SIM_NVIDIA_SMI_PROCESSES", "2")),
+        seed=int(seed) if seed is not None else None,
+    )
+    if latency > 0:
+        time.sleep(latency)
+    if error_rate and random.random() < error_rate:
+        print("Unable to determine the device handle for GPU: Unknown Error", file=sys.stderr)
+        return 15
+    sys.stdout.write(simulator.render())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+import bisect
+import math
+import random
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+VLLM_TTFT_BUCKETS = [
+    0.001, 0.005, 0.01, 0.02, 0.04, 0.06, 0.08, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+]
+VLLM_TPOT_BUCKETS = [0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 2.5]
+VLLM_E2E_BUCKETS = [1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+TOKEN_COUNT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+TGI_DURATION_BUCKETS = [
+    0.001, 0.0023, 0.0052, 0.012, 0.027, 0.062, 0.14, 0.32, 0.73, 1.67, 3.81, 8.7, 19.9, 45.4,
+]
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class SimulatedMetrics(ABC):
+    def __init__(self, seed: int | None = None, reset_probability: float = 0.0):
+        self.reset_probability = reset_probability
+        self._random = random.Random(seed)
+        self._families: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[str, float]] = {}
+        self._bounds: dict[str, Sequence[float]] = {}
+        self._histograms: dict[str, dict[str, list[float]]] = {}
+
+    def _declare(self, name: str, metric_type: str, help_text: str) -> None:
+        if name not in self._families:
+            self._families[name] = (metric_type, help_text)
+            self._values[name] = {}
+
+    def gauge(self, name: str, help_text: str, labels: str, value: float) -> None:
+        self._declare(name, "gauge", help_text)
+        self._values[name][labels] = value
+
+    def inc(self, name: str, help_text: str, labels: str, amount: float) -> None:
+        self._declare(name, "counter", help_text)
+        series = self._values[name]
+        series[labels] = series.get(labels, 0.0) + amount
+
+    def observe(
+        self,
+        name: str,
+        help_text: str,
+        bounds: Sequence[float],
+        labels: str,
+        values: Sequence[float],
+    ) -> None:
+        self._declare(name, "histogram", help_text)
+        self._bounds[name] = bounds
+        # Per-bucket (non-cumulative) counts, then +Inf, then sum.
+        state = self._histograms.setdefault(name, {}).setdefault(
+            labels, [0.0] * (len(bounds) + 2)
+        )
+        for value in values:
+            state[bisect.bisect_left(bounds, value)] += 1
+            state[-1] += value
+
+    def reset_counters(self) -> None:
+        for name, (metric_type, _) in self._families.items():
+            if metric_type == "counter":
+                self._values[name] = dict.fromkeys(self._values[name], 0.0)
+        for series in self._histograms.values():
+            for labels in series:
+                series[labels] = [0.0] * len(series[labels])
+
+    @abstractmethod
+    def step(self) -> None: ...
+
+    def render(self) -> str:
+        if self.reset_probability and self._random.random() < self.reset_probability:
+            self.reset_counters()
+        self.step()
+        lines: list[str] = []
+        for name, (metric_type, help_text) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type != "histogram":
+                for labels, value in self._values[name].items():
+                    series = f"{name}{{{labels}}}" if labels else name
+                    lines.append(f"{series} {_format_value(value)}")
+                continue
+            bounds = self._bounds[name]
+            for labels, state in self._histograms[name].items():
+                prefix = f"{labels}," if labels else ""
+                cumulative = 0.0
+                for bound, count in zip(bounds, state):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{prefix}le="{bound}"}} {_format_value(cumulative)}'
+                    )
+                cumulative += state[len(bounds)]
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {_format_value(cumulative)}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {_format_value(state[-1])}")
+                lines.append(f"{name}_count{suffix} {_format_value(cumulative)}")
+        lines.append("")
+        return "\n".join(lines)
+
+    def series_count(self) -> int:
+        count = sum(len(series) for series in self._values.values())
+        for name, series in self._histograms.items():
+            count += len(series) * (len(self._bounds[name]) + 3)
+        return count
+
+    def _lognormal(self, median: float, sigma: float, n: int) -> list[float]:
+        mu = math.log(median)
+        return [self._random.lognormvariate(mu, sigma) for _ in range(n)]
+
+
+class VLLMMetricsSimulator(SimulatedMetrics):
+    def __init__(
+        self,
+        model: str = "meta-llama/Llama-3.1-8B-Instruct",
+        num_models: int = 1,
+        num_adapters: int = 0,
+        num_gpus: int = 1,
+        requests_per_step: int = 20,
+        seed: int | None = None,
+        reset_probability: float = 0.0,
+    ):
+        super().__init__(seed=seed, reset_probability=reset_probability)
+        self.model = model
+        # vLLM labels every family with the served model name only; LoRA
+        # adapters show up in vllm:lora_requests_info and /v1/models.
+        self.models = [model, *(f"served-model-{i:04d}" for i in range(1, num_models))]
+        self.adapters = [f"lora-adapter-{i:04d}" for i in range(num_adapters)]
+        self.num_gpus = num_gpus
+        self.requests_per_step = requests_per_step
+        self.step()
+
+    def step(self) -> None:
+        r = self._random
+        total_tokens = 0.0
+        for model_name in self.models:
+            labels = f'model_name="{model_name}"'
+            requests = r.randint(0, self.requests_per_step)
+            prompt_tokens = [float(r.randint(16, 4096)) for _ in range(requests)]
+            generation_tokens = [float(r.randint(1, 1024)) for _ in range(requests)]
+            total_tokens += sum(prompt_tokens) + sum(generation_tokens)
+
+            self.gauge(
+                "vllm:num_requests_running",
+                "Number of requests currently running on GPU.",
+                labels,
+                r.randint(0, 64),
+            )
+            self.gauge(
+                "vllm:num_requests_waiting",
+                "Number of requests waiting to be processed.",
+                labels,
+                r.randint(0, 32),
+            )
+            self.gauge(
+                "vllm:num_requests_swapped",
+                "Number of requests swapped to CPU.",
+                labels,
+                r.randint(0, 4),
+            )
+            self.gauge(
+                "vllm:gpu_cache_usage_perc",
+                "GPU KV-cache usage. 1 means 100 percent usage.",
+                labels,
+                r.random(),
+            )
+            self.gauge(
+                "vllm:cpu_cache_usage_perc",
+                "CPU KV-cache usage. 1 means 100 percent usage.",
+                labels,
+                r.random() * 0.1,
+            )
+            self.gauge(
+                "vllm:num_batched_tokens",
+                "Number of tokens in the current batch.",
+                labels,
+                r.randint(0, 8192),
+            )
+            self.gauge(
+                "vllm:num_generations",
+                "Number of live generations.",
+                labels,
+                r.randint(0, 64),
+            )
+            self.inc(
+                "vllm:prompt_tokens_total",
+                "Number of prefill tokens processed.",
+                labels,
+                sum(prompt_tokens),
+            )
+            self.inc(
+                "vllm:generation_tokens_total",
+                "Number of generation tokens processed.",
+                labels,
+                sum(generation_tokens),
+            )
+            self.inc(
+                "vllm:num_preemptions_total",
+                "Cumulative number of preemption from the engine.",
+                labels,
+                r.randint(0, 2),
+            )
+            self.inc(
+                "vllm:num_requests_total",
+                "Number of requests processed.",
+                labels,
+                requests,
+            )
+            for reason in ("stop", "length"):
+                self.inc(
+                    "vllm:request_success_total",
+                    "Count of successfully processed requests.",
+                    f'{labels},finished_reason="{reason}"',
+                    r.randint(0, requests) if reason == "stop" else r.randint(0, 2),
+                )
+            self.inc(
+                "vllm:spec_decoding_accepted_tokens_total",
+                "Number of accepted speculative tokens.",
+                labels,
+                r.randint(0, 100),
+            )
+            self.inc(
+                "vllm:spec_decoding_rejected_tokens_total",
+                "Number of rejected speculative tokens.",
+                labels,
+                r.randint(0, 20),
+            )
+            self.observe(
+                "vllm:time_to_first_token_seconds",
+                "Histogram of time to first token in seconds.",
+                VLLM_TTFT_BUCKETS,
+                labels,
+                self._lognormal(0.15, 0.8, requests),
+            )
+            self.observe(
+                "vllm:time_per_output_token_seconds",
+                "Histogram of time per output token in seconds.",
+                VLLM_TPOT_BUCKETS,
+                labels,
+                self._lognormal(0.03, 0.5, requests * 8),
+            )
+            self.observe(
+                "vllm:e2e_request_latency_seconds",
+                "Histogram of end to end request latency in seconds.",
+                VLLM_E2E_BUCKETS,
+                labels,
+                self._lognormal(6.0, 0.7, requests),
+            )
+            self.observe(
+                "vllm:request_prompt_tokens",
+                "Number of prefill tokens processed.",
+                TOKEN_COUNT_BUCKETS,
+                labels,
+                prompt_tokens,
+            )
+            self.observe(
+                "vllm:request_generation_tokens",
+                "Number of generation tokens processed.",
+                TOKEN_COUNT_BUCKETS,
+                labels,
+                generation_tokens,
+            )
+
+        self.inc("vllm:total_tokens", "Total number of tokens processed.", "", total_tokens)
+        for gpu in range(self.num_gpus):
+            labels = f'gpu="{gpu}"'
+            self.gauge(
+                "vllm:gpu_memory_total_bytes",
+                "Total GPU memory in bytes.",
+                labels,
+                80 * 1024**3,
+            )
+            self.gauge(
+                "vllm:gpu_memory_used_bytes",
+                "GPU memory used in bytes.",
+                labels,
+                int(72 * 1024**3 + r.random() * 4 * 1024**3),
+            )
+        running = ",".join(self.adapters[: min(len(self.adapters), 8)])
+        self.gauge(
+            "vllm:lora_requests_info",
+            "Running stats on lora requests.",
+            f'max_lora="{max(1, len(self.adapters))}",running_lora_adapters="{running}",'
+            f'waiting_lora_adapters=""',
+            1.0,
+        )
+
+
+class TGIMetricsSimulator(SimulatedMetrics):
+    def __init__(
+        self,
+        num_gpus: int = 1,
+        num_adapters: int = 0,
+        requests_per_step: int = 20,
+        seed: int | None = None,
+        reset_probability: float = 0.0,
+    ):
+        super().__init__(seed=seed, reset_probability=reset_probability)
+        self.num_gpus = num_gpus
+        self.adapters = [f"lora-adapter-{i:04d}" for i in range(num_adapters)]
+        self.requests_per_step = requests_per_step
+        self.step()
+
+    def step(self) -> None:
+        r = self._random
+        requests = r.randint(0, self.requests_per_step)
+        self.gauge("tgi_queue_size", "Number of requests in the queue.", "", r.randint(0, 32))
+        self.gauge("tgi_batch_size", "Current batch size.", "", r.randint(0, 64))
+        self.gauge(
+            "tgi_batch_current_size", "Current batch size.", "", r.randint(0, 64)
+        )
+        self.gauge(
+            "tgi_batch_current_max_tokens",
+            "Maximum tokens for the current batch.",
+            "",
+            r.randint(0, 16384),
+        )
+        self.gauge(
+            "tgi_request_count", "Number of requests in progress.", "", r.randint(0, 64)
+        )
+        self.inc("tgi_request_success", "Number of successful requests.", "", requests)
+        self.inc("tgi_request_failure", "Number of failed requests.", "", r.randint(0, 1))
+        self.inc("tgi_validation_error", "Number of validation errors.", "", r.randint(0, 1))
+        self.inc("tgi_inferencer_error", "Number of inferencer errors.", "", 0)
+        self.inc(
+            "tgi_decoder_tokens", "Number of decode tokens.", "", requests * r.randint(1, 512)
+        )
+        self.inc(
+            "tgi_prefill_tokens", "Number of prefill tokens.", "", requests * r.randint(16, 2048)
+        )
+        adapter_labels = (
+            [f'adapter_id="{a}"' for a in ["base", *self.adapters]] if self.adapters else [""]
+        )
+        for labels in adapter_labels:
+            self.observe(
+                "tgi_request_duration",
+                "Request duration in seconds.",
+                TGI_DURATION_BUCKETS,
+                labels,
+                self._lognormal(4.0, 0.7, requests),
+            )
+            self.observe(
+                "tgi_request_queue_duration",
+                "Time spent in the queue in seconds.",
+                TGI_DURATION_BUCKETS,
+                labels,
+                self._lognormal(0.05, 1.0, requests),
+            )
+            self.observe(
+                "tgi_request_mean_time_per_token_duration",
+                "Mean time per token in seconds.",
+                TGI_DURATION_BUCKETS,
+                labels,
+                self._lognormal(0.03, 0.4, requests),
+            )
+            self.observe(
+                "tgi_request_generated_tokens",
+                "Number of generated tokens per request.",
+                [float(b) for b in TOKEN_COUNT_BUCKETS],
+                labels,
+                [float(r.randint(1, 1024)) for _ in range(requests)],
+            )
+            for method in ("prefill", "decode"):
+                self.observe(
+                    "tgi_batch_inference_duration",
+                    "Batch inference duration in seconds.",
+                    TGI_DURATION_BUCKETS,
+                    f'{labels + "," if labels else ""}method="{method}"',
+                    self._lognormal(0.05 if method == "prefill" else 0.02, 0.5, requests),
+                )
+        for gpu in range(self.num_gpus):
+            self.gauge(
+                f"gpu_memory_{gpu}_used",
+                f"GPU {gpu} memory used in bytes.",
+                "",
+                int(70 * 1024**3 + r.random() * 6 * 1024**3),
+            )
+            self.gauge(
+                f"gpu_memory_{gpu}_total",
+                f"GPU {gpu} total memory in bytes.",
+                "",
+                80 * 1024**3,
+            )
@@ -0,0 +1,256 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from exporters.simulator.payloads import (
+    SimulatedMetrics,
+    TGIMetricsSimulator,
+    VLLMMetricsSimulator,
+)
+
+
+class MockInferenceServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model: str = "mock-model",
+        ttft: float = 0.05,
+        itl: float = 0.01,
+        jitter: float = 0.1,
+        default_max_tokens: int = 16,
+        backend: str = "vllm",
+        num_models: int = 1,
+        num_adapters: int = 0,
+        num_gpus: int = 1,
+        metrics_latency: float = 0.0,
+        error_rate: float = 0.0,
+        reset_probability: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.model = model
+        self.ttft = ttft
+        self.itl = itl
+        self.jitter = jitter
+        self.default_max_tokens = default_max_tokens
+        self.backend = backend
+        self.metrics_latency = metrics_latency
+        self.error_rate = error_rate
+        self.metrics: SimulatedMetrics
+        self.models = [model]
+        if backend == "tgi":
+            tgi = TGIMetricsSimulator(
+                num_gpus=num_gpus,
+                num_adapters=num_adapters,
+                seed=seed,
+                reset_probability=reset_probability,
+            )
+            self.metrics, self.adapters = tgi, tgi.adapters
+        else:
+            vllm = VLLMMetricsSimulator(
+                model=model,
+                num_models=num_models,
+                num_adapters=num_adapters,
+                num_gpus=num_gpus,
+                seed=seed,
+                reset_probability=reset_probability,
+            )
+            self.metrics, self.models, self.adapters = vllm, vllm.models, vllm.adapters
+        self.metrics_requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    @property
+    def endpoint(self) -> str:
+        host = self._server.server_address[0]
+        return f"http://{host.decode() if isinstance(host, bytes) else host}:{self.port}"
+
+    def _delay(self, base: float) -> float:
+        if base <= 0:
+            return 0.0
+        with self._lock:
+            return max(0.0, base * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def _should_fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def render_metrics(self) -> str:
+        with self._lock:
+            self.metrics_requests += 1
+            return self.metrics.render()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                if server._should_fail():
+                    self._send_json({"error": "simulated failure"}, status=500)
+                elif self.path == "/metrics":
+                    if server.metrics_latency > 0:
+                        time.sleep(server._delay(server.metrics_latency))
+                    self._send_text(server.render_metrics())
+                elif self.path == "/v1/models":
+                    models = [*server.models, *server.adapters]
+                    self._send_json(
+                        {"object": "list", "data": [{"id": m, "object": "model"} for m in models]}
+                    )
+                elif self.path == "/info":
+                    self._send_json({"model_id": server.model})
+                elif self.path == "/health":
+                    self._send_json({})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if server._should_fail():
+                    self._send_json({"error": "simulated failure"}, status=500)
+                elif self.path == "/v1/completions":
+                    max_tokens = int(payload.get("max_tokens") or server.default_max_tokens)
+                    self._stream(max_tokens, tgi=False)
+                elif self.path == "/generate_stream":
+                    parameters = payload.get("parameters") or {}
+                    max_tokens = int(
+                        parameters.get("max_new_tokens") or server.default_max_tokens
+                    )
+                    self._stream(max_tokens, tgi=True)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _stream(self, max_tokens: int, tgi: bool) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(server._delay(server.ttft))
+                for i in range(max_tokens):
+                    if i:
+                        time.sleep(server._delay(server.itl))
+                    event: dict[str, Any]
+                    if tgi:
+                        event = {
+                            "token": {"id": i, "text": f" tok{i}", "special": False},
+                            "generated_text": None,
+                        }
+                    else:
+                        event = {
+                            "object": "text_completion",
+                            "model": server.model,
+                            "choices": [{"index": 0, "text": f" tok{i}"}],
+                        }
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                if not tgi:
+                    self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+            def _send_text(self, body: str) -> None:
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_json(self, body: Any, status: int = 200) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "MockInferenceServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock vLLM/TGI inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--ttft", type=float, default=0.05, help="Base TTFT in seconds")
+    parser.add_argument("--itl", type=float, default=0.01, help="Base ITL in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Relative latency jitter")
+    parser.add_argument("--backend", choices=("vllm", "tgi"), default="vllm")
+    parser.add_argument(
+        "--models", type=int, default=1, help="Number of served model names in /metrics (vLLM)"
+    )
+    parser.add_argument("--adapters", type=int, default=0, help="Number of LoRA adapters")
+    parser.add_argument("--gpus", type=int, default=1, help="Number of GPUs in /metrics")
+    parser.add_argument(
+        "--metrics-latency", type=float, default=0.0, help="Base /metrics latency in seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500"
+    )
+    parser.add_argument(
+        "--reset-probability",
+        type=float,
+        default=0.0,
+        help="Probability that counters reset before a /metrics scrape",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockInferenceServer(
+        host=args.host,
+        port=args.port,
+        model=args.model,
+        ttft=args.ttft,
+        itl=args.itl,
+        jitter=args.jitter,
+        backend=args.backend,
+        num_models=args.models,
+        num_adapters=args.adapters,
+        num_gpus=args.gpus,
+        metrics_latency=args.metrics_latency,
+        error_rate=args.error_rate,
+        reset_probability=args.reset_probability,
+        seed=args.seed,
+    )
+    print(f"Mock inference server listening on {server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
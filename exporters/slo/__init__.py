@@ -0,0 +1,3 @@
+from exporters.slo.metrics import *
+
+__all__ = ["METRICS"]
@@ -0,0 +1,175 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from exporters.config import Settings, settings
+from exporters.recording.recorder import counter_delta, histogram_buckets, sum_series
+from exporters.recording.window import SlidingWindow, format_window
+from exporters.slo.metrics import (
+    SLO_ALERT_FIRING,
+    SLO_BURN_RATE,
+    SLO_ERROR_BUDGET_REMAINING,
+    SLO_OBJECTIVE_RATIO,
+)
+
+BUDGET_SLOTS = 720
+
+
+@dataclass(frozen=True)
+class SLOSpec:
+    backend: str
+    ttft_histogram: str | None = None
+    itl_histogram: str | None = None
+    success_counter: str | None = None
+    failure_counter: str | None = None
+
+
+@dataclass(frozen=True)
+class SLO:
+    name: str
+    objective: float
+    threshold: float | None = None
+
+    @property
+    def error_budget(self) -> float:
+        return 1.0 - self.objective
+
+
+@dataclass(frozen=True)
+class BurnRateAlert:
+    severity: str
+    long_window: float
+    short_window: float
+    burn_rate: float
+
+
+BURN_RATE_ALERTS = (
+    BurnRateAlert("page", 3600.0, 300.0, 14.4),
+    BurnRateAlert("ticket", 21600.0, 1800.0, 6.0),
+)
+
+
+def default_slos(config: Settings = settings) -> list[SLO]:
+    return [
+        SLO("ttft", config.slo_ttft_objective, config.slo_ttft_seconds),
+        SLO("itl", config.slo_itl_objective, config.slo_itl_seconds),
+        SLO("errors", config.slo_error_objective),
+    ]
+
+
+def latency_good_total(
+    metrics: dict[str, Any], histogram: str, threshold: float
+) -> tuple[float, float] | None:
+    buckets = histogram_buckets(metrics, histogram)
+    if buckets is None:
+        return None
+    bounds, cumulative = buckets
+    good = 0.0
+    for bound, count in zip(bounds, cumulative):
+        if bound > threshold:
+            break
+        good = count
+    return good, cumulative[-1]
+
+
+class SLOEngine:
+    def __init__(
+        self,
+        spec: SLOSpec,
+        slos: list[SLO] | None = None,
+        windows: list[float] | tuple[float, ...] = tuple(settings.slo_windows),
+        budget_period: float = settings.slo_budget_period,
+        alerts: tuple[BurnRateAlert, ...] = BURN_RATE_ALERTS,
+    ):
+        self.spec = spec
+        self.slos = [slo for slo in (slos or default_slos()) if self._source(slo) is not None]
+        self.windows = tuple(windows)
+        self.budget_period = budget_period
+        self.alerts = tuple(
+            alert
+            for alert in alerts
+            if alert.long_window in self.windows and alert.short_window in self.windows
+        )
+        self._window_labels = {window: format_window(window) for window in self.windows}
+        self._previous: dict[str, list[float]] = {}
+        self._sliding: dict[tuple[str, float], SlidingWindow] = {
+            (slo.name, window): SlidingWindow(window, width=2)
+            for slo in self.slos
+            for window in self.windows
+        }
+        self._budget: dict[str, SlidingWindow] = {
+            slo.name: SlidingWindow(budget_period, width=2, slots=BUDGET_SLOTS)
+            for slo in self.slos
+        }
+
+    def _source(self, slo: SLO) -> str | None:
+        if slo.name == "ttft":
+            return self.spec.ttft_histogram
+        if slo.name == "itl":
+            return self.spec.itl_histogram
+        if slo.name == "errors" and self.spec.failure_counter is not None:
+            return self.spec.success_counter
+        return None
+
+    def good_total(self, slo: SLO, metrics: dict[str, Any]) -> tuple[float, float] | None:
+        source = self._source(slo)
+        if source is None:
+            return None
+        if slo.threshold is not None:
+            return latency_good_total(metrics, source, slo.threshold)
+        success = sum_series(metrics, source)
+        failure = sum_series(metrics, self.spec.failure_counter or "")
+        if success is None and failure is None:
+            return None
+        success = success or 0.0
+        return success, success + (failure or 0.0)
+
+    def record(
+        self, metrics: dict[str, Any], labels: dict[str, str], timestamp: float | None = None
+    ) -> None:
+        now = time.monotonic() if timestamp is None else timestamp
+        for slo in self.slos:
+            current = self.good_total(slo, metrics)
+            if current is None:
+                continue
+            previous = self._previous.get(slo.name)
+            self._previous[slo.name] = list(current)
+            delta = counter_delta(previous, list(current))
+            # Bad events are recorded directly so the windows hold [bad, total].
+            values = [delta[1] - delta[0], delta[1]] if delta is not None else [0.0, 0.0]
+            for window in self.windows:
+                self._sliding[(slo.name, window)].add(now, values)
+            self._budget[slo.name].add(now, values)
+        self.update_prometheus_metrics(labels)
+
+    def burn_rate(self, slo: SLO, window: float) -> float:
+        bad, total = self._sliding[(slo.name, window)].totals
+        if total <= 0 or slo.error_budget <= 0:
+            return 0.0
+        return max(0.0, bad) / total / slo.error_budget
+
+    def error_budget_remaining(self, slo: SLO) -> float:
+        bad, total = self._budget[slo.name].totals
+        if total <= 0 or slo.error_budget <= 0:
+            return 1.0
+        return 1.0 - max(0.0, bad) / total / slo.error_budget
+
+    def firing(self, slo: SLO, alert: BurnRateAlert) -> bool:
+        return (
+            self.burn_rate(slo, alert.long_window) > alert.burn_rate
+            and self.burn_rate(slo, alert.short_window) > alert.burn_rate
+        )
+
+    def update_prometheus_metrics(self, labels: dict[str, str]) -> None:
+        for slo in self.slos:
+            slo_labels = {**labels, "backend": self.spec.backend, "slo": slo.name}
+            SLO_OBJECTIVE_RATIO.labels(**slo_labels).set(slo.objective)
+            for window, window_label in self._window_labels.items():
+                SLO_BURN_RATE.labels(**slo_labels, window=window_label).set(
+                    self.burn_rate(slo, window)
+                )
+            SLO_ERROR_BUDGET_REMAINING.labels(**slo_labels).set(self.error_budget_remaining(slo))
+            for alert in self.alerts:
+                SLO_ALERT_FIRING.labels(**slo_labels, severity=alert.severity).set(
+                    1 if self.firing(slo, alert) else 0
+                )
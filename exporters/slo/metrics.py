@@ -0,0 +1,32 @@
+from exporters.registry import Gauge
+
+SLO_OBJECTIVE_RATIO = Gauge(
+    "slo_objective_ratio",
+    "Target fraction of good events for the SLO",
+    ["model", "endpoint", "backend", "slo"],
+)
+
+SLO_BURN_RATE = Gauge(
+    "slo_burn_rate",
+    "Error budget burn rate over the window (1 consumes the budget exactly over the period)",
+    ["model", "endpoint", "backend", "slo", "window"],
+)
+
+SLO_ERROR_BUDGET_REMAINING = Gauge(
+    "slo_error_budget_remaining_ratio",
+    "Fraction of the error budget left over the budget period (negative when overspent)",
+    ["model", "endpoint", "backend", "slo"],
+)
+
+SLO_ALERT_FIRING = Gauge(
+    "slo_alert_firing",
+    "Multi-window burn-rate alert state evaluated in the exporter (1 firing, 0 ok)",
+    ["model", "endpoint", "backend", "slo", "severity"],
+)
+
+METRICS = [
+    SLO_OBJECTIVE_RATIO,
+    SLO_BURN_RATE,
+    SLO_ERROR_BUDGET_REMAINING,
+    SLO_ALERT_FIRING,
+]
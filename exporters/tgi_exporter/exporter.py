@@ -1,14 +1,33 @@
 import asyncio
 import logging
 import re
+import socket
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
 import structlog
-from prometheus_client import start_http_server
 
+from exporters.autoscaling.server import start_http_server
+from exporters.autoscaling.signals import SIGNALS, TargetSignals
+from exporters.breakdown.breakdown import (
+    BreakdownSpec,
+    ModelBreakdown,
+    observe_delta,
+    remove_model_series,
+)
+from exporters.breaker.breaker import CircuitBreaker
 from exporters.config import settings
+from exporters.otlp.exporter import OTLPExporter
+from exporters.payload.cache import PayloadCache, family_changed
+from exporters.queueing.analyzer import QueueAnalyzer, QueueSpec
+from exporters.recording.recorder import RecordingSpec, WindowedRecorder
+from exporters.reload.watcher import ConfigWatcher, remove_endpoint_series
+from exporters.remote_write.writer import RemoteWriter
+from exporters.scheduler.scheduler import AdaptiveInterval
+from exporters.slo.engine import SLOEngine, SLOSpec
+from exporters.tgi_exporter.metrics import METRICS as TGI_METRICS
 from exporters.tgi_exporter.metrics import (
     TGI_BATCH_SIZE,
     TGI_DECODE_TOKENS,
@@ -25,9 +44,52 @@ from exporters.tgi_exporter.metrics import (
     TGI_TTFT_SECONDS,
     TGI_VALIDATION_ERRORS,
 )
+from exporters.transport.pool import ClientPool
 
 logger = structlog.get_logger()
 
+TGI_RECORDING_SPEC = RecordingSpec(
+    backend="tgi",
+    itl_histogram="tgi_request_mean_time_per_token_duration",
+    tokens_counter="tgi_decoder_tokens",
+    prefill_tokens_counter="tgi_prefill_tokens",
+)
+
+TGI_SLO_SPEC = SLOSpec(
+    backend="tgi",
+    itl_histogram="tgi_request_mean_time_per_token_duration",
+    success_counter="tgi_request_success",
+    failure_counter="tgi_request_failure",
+)
+
+TGI_QUEUE_SPEC = QueueSpec(
+    backend="tgi",
+    queue_gauge="tgi_queue_size",
+    running_gauge="tgi_request_count",
+    completion_counters=("tgi_request_success", "tgi_request_failure"),
+    tokens_counter="tgi_decoder_tokens",
+)
+
+TGI_BREAKDOWN_SPEC = BreakdownSpec(
+    backend="tgi",
+    model_label="adapter_id",
+    itl_histogram="tgi_request_mean_time_per_token_duration",
+    decode_tokens_counter="tgi_request_generated_tokens_sum",
+    requests_counter="tgi_request_duration_count",
+    default_models=("base",),
+)
+
+TGI_MODEL_METRICS = (
+    TGI_ITL_SECONDS,
+    TGI_TIME_PER_TOKEN,
+    TGI_TOKENS_GENERATED_TOTAL,
+    TGI_REQUESTS_TOTAL,
+)
+
+TGI_TOTAL_FAMILIES = ("tgi_decoder_tokens", "tgi_prefill_tokens", "tgi_request_success")
+
+TGI_POLL_SIGNAL_FLOORS = {"queue": 8.0, "batch": 8.0, "running": 8.0}
+
 
 @dataclass
 class TGIMetrics:
@@ -52,22 +114,59 @@ class TGIExporter:
         endpoint: str = settings.tgi_endpoint,
         port: int = settings.exporter_port_tgi,
         model: str = "unknown",
+        pool: ClientPool | None = None,
     ):
         self.endpoint = endpoint.rstrip("/")
         self.port = port
         self.model = model
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.pool = pool or ClientPool("tgi")
         self._running = False
+        self.remote_writer: RemoteWriter | None = None
+        self.otlp_exporter: OTLPExporter | None = None
+        self.watcher: ConfigWatcher | None = None
+        self.model_refresh_interval = settings.model_refresh_interval
+        self.schedule: AdaptiveInterval | None = None
+        self._reset_target_state()
+
+    def _reset_target_state(self) -> None:
+        self.breaker = CircuitBreaker("tgi", self.endpoint)
         self._previous_metrics: dict[str, Any] = {}
+        self.recorder: WindowedRecorder | None = (
+            WindowedRecorder(
+                TGI_RECORDING_SPEC, settings.recording_windows, settings.recording_quantiles
+            )
+            if settings.recording_enabled
+            else None
+        )
+        self.slo_engine: SLOEngine | None = (
+            SLOEngine(TGI_SLO_SPEC) if settings.slo_enabled else None
+        )
+        self.queue_analyzer: QueueAnalyzer | None = (
+            QueueAnalyzer(TGI_QUEUE_SPEC, settings.queue_ewma_window)
+            if settings.queue_analytics_enabled
+            else None
+        )
+        self.breakdown = ModelBreakdown(TGI_BREAKDOWN_SPEC, self.endpoint)
+        self.payload = PayloadCache("tgi", self.endpoint, self._parse_prometheus_metrics)
+        self._models_refreshed: float | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.pool.client(self.endpoint)
 
     async def fetch_metrics(self) -> dict[str, Any]:
+        if not self.breaker.allow():
+            return {}
         try:
             response = await self.client.get(f"{self.endpoint}/metrics")
             response.raise_for_status()
-            return self._parse_prometheus_metrics(response.text)
         except httpx.HTTPError as e:
+            self.breaker.record_failure()
             logger.error("Failed to fetch TGI metrics", error=str(e))
             return {}
+        if self.breaker.record_success():
+            await self.fetch_model_info()
+        return self.payload.parse(response.text)
 
     async def fetch_health(self) -> dict[str, Any]:
         try:
@@ -79,17 +178,68 @@ class TGIExporter:
             return {}
 
     async def fetch_model_info(self) -> dict[str, Any]:
+        if not self.breaker.closed:
+            return {}
+        self._models_refreshed = time.monotonic()
         try:
             response = await self.client.get(f"{self.endpoint}/info")
             response.raise_for_status()
             data = response.json()
             if data.get("model_id"):
                 self.model = data["model_id"]
+                self.refresh_models([self.model])
             return data
         except httpx.HTTPError as e:
+            self._models_refreshed = None
             logger.error("Failed to fetch model info", error=str(e))
             return {}
 
+    def refresh_models(self, models: list[str]) -> None:
+        for stale in self.breakdown.set_known_models(models, self.model):
+            remove_model_series(TGI_MODEL_METRICS, stale, self.endpoint)
+            logger.info("Removed series for unloaded adapter", model=stale)
+        self.payload.invalidate()
+
+    async def retarget(self, endpoint: str) -> None:
+        previous = self.endpoint
+        await self.pool.release(previous)
+        SIGNALS.remove(previous)
+        remove_endpoint_series(previous, TGI_METRICS)
+        self.endpoint = endpoint.rstrip("/")
+        self.model = "unknown"
+        self._reset_target_state()
+        if self.schedule is not None:
+            self.schedule = AdaptiveInterval(
+                "tgi", self.endpoint, self.schedule.interval, floors=TGI_POLL_SIGNAL_FLOORS
+            )
+        logger.info("Switched TGI exporter target", previous=previous, endpoint=self.endpoint)
+
+    def reconfigure(self, changes: dict[str, Any]) -> None:
+        self.breaker.reconfigure(changes)
+        if self.schedule is not None:
+            self.schedule.reconfigure(changes)
+        if "model_refresh_interval" in changes:
+            self.model_refresh_interval = changes["model_refresh_interval"]
+        if "model_label_limit" in changes:
+            self.breakdown.max_models = changes["model_label_limit"]
+            self.payload.invalidate()
+        if "payload_cache_enabled" in changes:
+            self.payload.enabled = changes["payload_cache_enabled"]
+        if "queue_ewma_window" in changes and self.queue_analyzer is not None:
+            self.queue_analyzer.window = changes["queue_ewma_window"]
+
+    async def apply_settings(self, changes: dict[str, Any]) -> None:
+        endpoint = changes.get("tgi_endpoint")
+        if endpoint is not None and endpoint.rstrip("/") != self.endpoint:
+            await self.retarget(endpoint)
+        self.reconfigure(changes)
+
+    def _model_refresh_due(self) -> bool:
+        return self._models_refreshed is None or (
+            self.model_refresh_interval > 0
+            and time.monotonic() - self._models_refreshed >= self.model_refresh_interval
+        )
+
     def _parse_prometheus_metrics(self, metrics_text: str) -> dict[str, Any]:
         metrics: dict[str, Any] = {}
         for line in metrics_text.split("\n"):
@@ -140,32 +290,108 @@ class TGIExporter:
                 result.append(item)
         return result
 
+    def poll_signals(self, metrics: dict[str, Any]) -> dict[str, float]:
+        return {
+            "queue": self._extract_metric_value(metrics, "tgi_queue_size"),
+            "batch": self._extract_metric_value(metrics, "tgi_batch_size"),
+            "running": self._extract_metric_value(metrics, "tgi_request_count"),
+        }
+
     def update_prometheus_metrics(self, metrics: dict[str, Any]) -> None:
         labels = {"model": self.model, "endpoint": self.endpoint}
-
-        queue_length = self._extract_metric_value(metrics, "tgi_queue_size")
-        TGI_QUEUE_LENGTH.labels(**labels).set(queue_length)
-
-        batch_size = self._extract_metric_value(metrics, "tgi_batch_size")
-        TGI_BATCH_SIZE.labels(**labels).set(batch_size)
-
-        requests_in_progress = self._extract_metric_value(metrics, "tgi_request_count")
-        TGI_REQUESTS_IN_PROGRESS.labels(**labels).set(requests_in_progress)
-
-        ttft_values = self._extract_metric_with_labels(metrics, "tgi_time_to_first_token")
-        for item in ttft_values:
-            TGI_TTFT_SECONDS.labels(**labels).observe(item.get("value", 0))
-
-        itl_values = self._extract_metric_with_labels(metrics, "tgi_inter_token_latency")
-        for item in itl_values:
-            TGI_ITL_SECONDS.labels(**labels).observe(item.get("value", 0))
-            TGI_TIME_PER_TOKEN.labels(**labels).observe(item.get("value", 0))
+        changed = self.payload.changed_families(metrics)
+
+        if family_changed(changed, "tgi_queue_size"):
+            queue_length = self._extract_metric_value(metrics, "tgi_queue_size")
+            TGI_QUEUE_LENGTH.labels(**labels).set(queue_length)
+
+        if family_changed(changed, "tgi_batch_size"):
+            batch_size = self._extract_metric_value(metrics, "tgi_batch_size")
+            TGI_BATCH_SIZE.labels(**labels).set(batch_size)
+
+        if family_changed(changed, "tgi_request_count"):
+            requests_in_progress = self._extract_metric_value(metrics, "tgi_request_count")
+            TGI_REQUESTS_IN_PROGRESS.labels(**labels).set(requests_in_progress)
+
+        if family_changed(changed, "tgi_time_to_first_token"):
+            ttft_values = self._extract_metric_with_labels(metrics, "tgi_time_to_first_token")
+            for item in ttft_values:
+                TGI_TTFT_SECONDS.labels(**labels).observe(item.get("value", 0))
+
+        if family_changed(changed, *TGI_BREAKDOWN_SPEC.families, *TGI_TOTAL_FAMILIES):
+            self._update_token_counters(metrics, labels)
+
+        if family_changed(changed, "tgi_request_failure"):
+            failed_requests = self._extract_metric_value(metrics, "tgi_request_failure")
+            prev_failed = self._previous_metrics.get("failed_requests", 0)
+            if failed_requests > prev_failed:
+                TGI_REQUESTS_TOTAL.labels(**labels, status="failed").inc(
+                    failed_requests - prev_failed
+                )
+            self._previous_metrics["failed_requests"] = failed_requests
+
+        if family_changed(changed, "tgi_validation_error"):
+            validation_errors = self._extract_metric_value(metrics, "tgi_validation_error")
+            prev_validation = self._previous_metrics.get("validation_errors", 0)
+            if validation_errors > prev_validation:
+                TGI_VALIDATION_ERRORS.labels(**labels).inc(validation_errors - prev_validation)
+            self._previous_metrics["validation_errors"] = validation_errors
+
+        if family_changed(changed, "tgi_inferencer_error"):
+            inferencer_errors = self._extract_metric_value(metrics, "tgi_inferencer_error")
+            prev_inferencer = self._previous_metrics.get("inferencer_errors", 0)
+            if inferencer_errors > prev_inferencer:
+                TGI_INFERENCER_ERRORS.labels(**labels).inc(inferencer_errors - prev_inferencer)
+            self._previous_metrics["inferencer_errors"] = inferencer_errors
+
+        if changed is None or any("gpu_memory" in family for family in changed):
+            for gpu_id, gpu_metrics in self._extract_gpu_memory(metrics).items():
+                gpu_labels = {**labels, "gpu_id": str(gpu_id)}
+                TGI_GPU_MEMORY_USED.labels(**gpu_labels).set(gpu_metrics["used"])
+                TGI_GPU_MEMORY_TOTAL.labels(**gpu_labels).set(gpu_metrics["total"])
+
+        if self.recorder is not None:
+            self.recorder.record(metrics, labels)
+        if self.slo_engine is not None:
+            self.slo_engine.record(metrics, labels)
+        self.publish_signals(metrics)
+
+    def publish_signals(self, metrics: dict[str, Any]) -> None:
+        queue = self.queue_analyzer
+        if queue is not None:
+            queue.record(metrics, {"model": self.model, "endpoint": self.endpoint})
+        SIGNALS.update(
+            TargetSignals(
+                backend="tgi",
+                endpoint=self.endpoint,
+                model=self.model,
+                queue_depth=self._extract_metric_value(metrics, "tgi_queue_size"),
+                arrival_rate=queue.arrival_rate if queue is not None else None,
+                completion_rate=queue.completion_rate if queue is not None else None,
+                tokens_per_second=queue.token_rate if queue is not None else None,
+            )
+        )
+
+    def _update_token_counters(self, metrics: dict[str, Any], labels: dict[str, str]) -> None:
+        deltas = self.breakdown.update(metrics, self.model)
+        for model, delta in deltas.items():
+            model_labels = {"model": model, "endpoint": self.endpoint}
+            if delta.itl is not None:
+                observe_delta(TGI_ITL_SECONDS.labels(**model_labels), delta.itl)
+                observe_delta(TGI_TIME_PER_TOKEN.labels(**model_labels), delta.itl)
+            if delta.tokens:
+                TGI_TOKENS_GENERATED_TOTAL.labels(**model_labels).inc(delta.tokens)
+            if delta.requests:
+                TGI_REQUESTS_TOTAL.labels(**model_labels, status="success").inc(delta.requests)
+        tokens_by_model = any(delta.tokens is not None for delta in deltas.values())
+        requests_by_model = any(delta.requests is not None for delta in deltas.values())
 
         decode_tokens = self._extract_metric_value(metrics, "tgi_decoder_tokens")
         prev_decode = self._previous_metrics.get("decode_tokens", 0)
         if decode_tokens > prev_decode:
             TGI_DECODE_TOKENS.labels(**labels).inc(decode_tokens - prev_decode)
-            TGI_TOKENS_GENERATED_TOTAL.labels(**labels).inc(decode_tokens - prev_decode)
+            if not tokens_by_model:
+                TGI_TOKENS_GENERATED_TOTAL.labels(**labels).inc(decode_tokens - prev_decode)
         self._previous_metrics["decode_tokens"] = decode_tokens
 
         prefill_tokens = self._extract_metric_value(metrics, "tgi_prefill_tokens")
@@ -176,35 +402,12 @@ class TGIExporter:
 
         total_requests = self._extract_metric_value(metrics, "tgi_request_success")
         prev_requests = self._previous_metrics.get("total_requests", 0)
-        if total_requests > prev_requests:
+        if total_requests > prev_requests and not requests_by_model:
             TGI_REQUESTS_TOTAL.labels(**labels, status="success").inc(
                 total_requests - prev_requests
             )
         self._previous_metrics["total_requests"] = total_requests
 
-        failed_requests = self._extract_metric_value(metrics, "tgi_request_failure")
-        prev_failed = self._previous_metrics.get("failed_requests", 0)
-        if failed_requests > prev_failed:
-            TGI_REQUESTS_TOTAL.labels(**labels, status="failed").inc(failed_requests - prev_failed)
-        self._previous_metrics["failed_requests"] = failed_requests
-
-        validation_errors = self._extract_metric_value(metrics, "tgi_validation_error")
-        prev_validation = self._previous_metrics.get("validation_errors", 0)
-        if validation_errors > prev_validation:
-            TGI_VALIDATION_ERRORS.labels(**labels).inc(validation_errors - prev_validation)
-        self._previous_metrics["validation_errors"] = validation_errors
-
-        inferencer_errors = self._extract_metric_value(metrics, "tgi_inferencer_error")
-        prev_inferencer = self._previous_metrics.get("inferencer_errors", 0)
-        if inferencer_errors > prev_inferencer:
-            TGI_INFERENCER_ERRORS.labels(**labels).inc(inferencer_errors - prev_inferencer)
-        self._previous_metrics["inferencer_errors"] = inferencer_errors
-
-        for gpu_id, gpu_metrics in self._extract_gpu_memory(metrics).items():
-            gpu_labels = {**labels, "gpu_id": str(gpu_id)}
-            TGI_GPU_MEMORY_USED.labels(**gpu_labels).set(gpu_metrics["used"])
-            TGI_GPU_MEMORY_TOTAL.labels(**gpu_labels).set(gpu_metrics["total"])
-
     def _extract_gpu_memory(self, metrics: dict[str, Any]) -> dict[int, dict[str, int]]:
         gpu_memory: dict[int, dict[str, int]] = {}
         gpu_memory_pattern = re.compile(r"gpu_memory_(\d+)_used")
@@ -230,20 +433,40 @@ class TGIExporter:
 
     async def collect_loop(self, interval: float = 15.0) -> None:
         self._running = True
+        if self.remote_writer is not None:
+            self.remote_writer.start()
+        if self.otlp_exporter is not None:
+            self.otlp_exporter.start()
+        if self.watcher is not None:
+            self.watcher.start()
         logger.info("Starting TGI exporter collection loop", endpoint=self.endpoint)
 
         await self.fetch_model_info()
+        self.schedule = AdaptiveInterval(
+            "tgi", self.endpoint, interval, floors=TGI_POLL_SIGNAL_FLOORS
+        )
+        phase = self.schedule.initial_delay()
 
         while self._running:
+            started = time.monotonic()
             try:
+                if self._model_refresh_due():
+                    await self.fetch_model_info()
+                endpoint = self.endpoint
                 metrics = await self.fetch_metrics()
-                if metrics:
+                if metrics and endpoint == self.endpoint:
                     self.update_prometheus_metrics(metrics)
+                    self.schedule.observe(self.poll_signals(metrics))
+                    if self.remote_writer is not None:
+                        self.remote_writer.push()
+                    if self.otlp_exporter is not None:
+                        self.otlp_exporter.push()
                     logger.debug("Updated TGI metrics", model=self.model)
             except Exception as e:
                 logger.error("Error collecting TGI metrics", error=str(e))
 
-            await asyncio.sleep(interval)
+            await asyncio.sleep(self.schedule.next_delay(time.monotonic() - started) + phase)
+            phase = 0.0
 
     def stop(self) -> None:
         self._running = False
@@ -252,6 +475,13 @@ class TGIExporter:
     def run(self, interval: float = 15.0) -> None:
         logging.basicConfig(level=settings.log_level)
         start_http_server(self.port)
+        if settings.remote_write_url:
+            self.remote_writer = RemoteWriter(
+                external_labels={"job": "tgi-exporter", "instance": socket.gethostname()}
+            )
+        if settings.otlp_endpoint:
+            self.otlp_exporter = OTLPExporter(service_name="tgi-exporter")
+        self.watcher = ConfigWatcher("tgi", self.apply_settings)
         logger.info(f"TGI exporter started on port {self.port}")
 
         loop = asyncio.get_event_loop()
@@ -260,6 +490,11 @@ class TGIExporter:
         except KeyboardInterrupt:
             self.stop()
         finally:
+            loop.run_until_complete(self.watcher.stop())
+            if self.remote_writer is not None:
+                loop.run_until_complete(self.remote_writer.stop())
+            if self.otlp_exporter is not None:
+                loop.run_until_complete(self.otlp_exporter.stop())
             loop.close()
 
 
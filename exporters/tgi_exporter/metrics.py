@@ -1,13 +1,13 @@
-from prometheus_client import Counter, Gauge, Histogram
+from exporters.registry import Counter, DeltaHistogram, Gauge
 
-TGI_TTFT_SECONDS = Histogram(
+TGI_TTFT_SECONDS = DeltaHistogram(
     "tgi_ttft_seconds",
     "Time to first token in seconds",
     ["model", "endpoint"],
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
 )
 
-TGI_ITL_SECONDS = Histogram(
+TGI_ITL_SECONDS = DeltaHistogram(
     "tgi_itl_seconds",
     "Inter-token latency in seconds",
     ["model", "endpoint"],
@@ -68,7 +68,7 @@ TGI_PREFILL_TOKENS = Counter(
     ["model", "endpoint"],
 )
 
-TGI_TIME_PER_TOKEN = Histogram(
+TGI_TIME_PER_TOKEN = DeltaHistogram(
     "tgi_time_per_token_seconds",
     "Time spent generating each token",
     ["model", "endpoint"],
@@ -0,0 +1,3 @@
+from exporters.tracing.metrics import *
+
+__all__ = ["METRICS"]
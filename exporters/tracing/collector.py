@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import structlog
+from prometheus_client import start_http_server
+
+from exporters.config import settings
+from exporters.tgi_exporter.metrics import TGI_ITL_SECONDS, TGI_TTFT_SECONDS
+from exporters.tracing.events import LifecycleEvent, parse_events
+from exporters.tracing.exemplars import ExemplarReservoir, exemplar_labels
+from exporters.tracing.metrics import (
+    TRACE_EVENTS_RECEIVED,
+    TRACE_EVICTED_REQUESTS,
+    TRACE_PENDING_REQUESTS,
+    TRACE_REQUESTS,
+)
+from exporters.tracing.sampler import DROP, SamplingPolicy, TailSampler
+from exporters.tracing.sink import OTLPTraceSink
+from exporters.tracing.trace import RequestTrace
+from exporters.vllm_exporter.metrics import VLLM_ITL_SECONDS, VLLM_TTFT_SECONDS
+
+logger = structlog.get_logger()
+
+LATENCY_HISTOGRAMS = {
+    "vllm": {"ttft": VLLM_TTFT_SECONDS, "itl": VLLM_ITL_SECONDS},
+    "tgi": {"ttft": TGI_TTFT_SECONDS, "itl": TGI_ITL_SECONDS},
+}
+BACKEND_ENDPOINTS = {"vllm": settings.vllm_endpoint, "tgi": settings.tgi_endpoint}
+EVENTS_PATH = "/v1/events"
+
+
+def _int_attribute(trace: RequestTrace, name: str) -> int | None:
+    value = trace.attributes.get(name)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return None
+
+
+class TraceCollector:
+    def __init__(
+        self,
+        backend: str = settings.tracing_backend,
+        model: str = settings.tracing_model,
+        endpoint: str | None = None,
+        port: int = settings.exporter_port_tracing,
+        ingest_port: int = settings.tracing_ingest_port,
+        sampler: TailSampler | None = None,
+        sink: OTLPTraceSink | None = None,
+        max_pending: int = settings.tracing_max_pending,
+        pending_timeout: float = settings.tracing_pending_timeout,
+        exemplar_window: float = settings.tracing_exemplar_window,
+    ):
+        if backend not in LATENCY_HISTOGRAMS:
+            raise ValueError(f"Unsupported tracing backend: {backend}")
+        self.backend = backend
+        self.model = model
+        self.endpoint = (endpoint or BACKEND_ENDPOINTS[backend]).rstrip("/")
+        self.port = port
+        self.ingest_port = ingest_port
+        self.sampler = sampler or TailSampler(SamplingPolicy())
+        self.sink = sink
+        self.max_pending = max_pending
+        self.pending_timeout = pending_timeout
+        self.exemplar_window = exemplar_window
+        self.pending: OrderedDict[str, RequestTrace] = OrderedDict()
+        self._reservoirs: dict[tuple[str, str], ExemplarReservoir] = {}
+        self._running = False
+        self._server: ThreadingHTTPServer | None = None
+
+    def ingest(self, event: LifecycleEvent, now: float | None = None) -> str | None:
+        TRACE_EVENTS_RECEIVED.labels(backend=self.backend).inc()
+        trace = self.pending.get(event.request_id)
+        if trace is None:
+            trace = RequestTrace(event.request_id, time.monotonic() if now is None else now)
+            self.pending[event.request_id] = trace
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                TRACE_EVICTED_REQUESTS.labels(backend=self.backend, reason="buffer_full").inc()
+        trace.add(event)
+        decision = None
+        if trace.complete:
+            del self.pending[event.request_id]
+            decision = self.complete(trace, now)
+        TRACE_PENDING_REQUESTS.labels(backend=self.backend).set(len(self.pending))
+        return decision
+
+    def ingest_many(self, events: list[LifecycleEvent]) -> None:
+        for event in events:
+            self.ingest(event)
+
+    def complete(self, trace: RequestTrace, now: float | None = None) -> str:
+        now = time.monotonic() if now is None else now
+        decision = self.sampler.decide(trace)
+        TRACE_REQUESTS.labels(backend=self.backend, decision=decision).inc()
+        model = str(trace.attributes.get("model", self.model))
+        trace_id = os.urandom(16) if decision != DROP else None
+        if not trace.failed:
+            for kind, value in (("ttft", trace.ttft), ("itl", trace.mean_itl)):
+                if value is not None:
+                    self._observe(kind, model, value, trace, trace_id, now)
+        if trace_id is not None and self.sink is not None:
+            self.sink.enqueue(trace.to_spans(trace_id, self.backend, model))
+        return decision
+
+    def _observe(
+        self,
+        kind: str,
+        model: str,
+        value: float,
+        trace: RequestTrace,
+        trace_id: bytes | None,
+        now: float,
+    ) -> None:
+        histogram = LATENCY_HISTOGRAMS[self.backend][kind].labels(
+            model=model, endpoint=self.endpoint
+        )
+        reservoir = self._reservoirs.get((kind, model))
+        if reservoir is None:
+            reservoir = self._reservoirs[(kind, model)] = ExemplarReservoir(
+                histogram.upper_bounds, self.exemplar_window
+            )
+        if not reservoir.offer(value, now, traced=trace_id is not None):
+            histogram.observe(value)
+            return
+        exemplar = exemplar_labels(
+            trace.request_id,
+            _int_attribute(trace, "prompt_tokens"),
+            _int_attribute(trace, "output_tokens"),
+            trace_id.hex() if trace_id is not None else None,
+        )
+        histogram.observe(value, exemplar=exemplar)
+
+    def expire(self, now: float | None = None) -> int:
+        now = time.monotonic() if now is None else now
+        expired = 0
+        while self.pending:
+            trace = next(iter(self.pending.values()))
+            if now - trace.received < self.pending_timeout:
+                break
+            self.pending.popitem(last=False)
+            expired += 1
+        if expired:
+            TRACE_EVICTED_REQUESTS.labels(backend=self.backend, reason="timeout").inc(expired)
+        TRACE_PENDING_REQUESTS.labels(backend=self.backend).set(len(self.pending))
+        return expired
+
+    def start_ingest_server(self, loop: asyncio.AbstractEventLoop) -> None:
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                if self.path != EVENTS_PATH:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                events = parse_events(body)
+                loop.call_soon_threadsafe(collector.ingest_many, events)
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", self.ingest_port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Listening for lifecycle events", port=self.ingest_port, path=EVENTS_PATH)
+
+    async def expire_loop(self, interval: float = 10.0) -> None:
+        self._running = True
+        if self.sink is not None:
+            self.sink.start()
+        self.start_ingest_server(asyncio.get_running_loop())
+        logger.info("Starting trace collector", backend=self.backend, endpoint=self.endpoint)
+
+        while self._running:
+            try:
+                self.expire()
+            except Exception as e:
+                logger.error("Error expiring pending traces", error=str(e))
+
+            await asyncio.sleep(interval)
+
+    def stop(self) -> None:
+        self._running = False
+        logger.info("Stopping trace collector")
+
+    def run(self, interval: float = 10.0) -> None:
+        logging.basicConfig(level=settings.log_level)
+        start_http_server(self.port)
+        if self.sink is None and settings.tracing_otlp_endpoint:
+            self.sink = OTLPTraceSink(service_name=f"{self.backend}-tracing")
+        logger.info(f"Trace collector started on port {self.port}")
+
+        loop = asyncio.get_event_loop()
+        try:
+            loop.run_until_complete(self.expire_loop(interval))
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            if self._server is not None:
+                self._server.shutdown()
+            if self.sink is not None:
+                loop.run_until_complete(self.sink.stop())
+            loop.close()
+
+
+def main() -> None:
+    collector = TraceCollector()
+    collector.run()
+
+
+if __name__ == "__main__":
+    main()
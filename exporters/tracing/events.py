@@ -0,0 +1,65 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+QUEUED = "queued"
+SCHEDULED = "scheduled"
+PREFILL_DONE = "prefill_done"
+FIRST_TOKEN = "first_token"
+LAST_TOKEN = "last_token"
+PREEMPTED = "preempted"
+ERROR = "error"
+ABORTED = "aborted"
+
+EVENTS = (QUEUED, SCHEDULED, PREFILL_DONE, FIRST_TOKEN, LAST_TOKEN, PREEMPTED, ERROR, ABORTED)
+TERMINAL_EVENTS = frozenset((LAST_TOKEN, ERROR, ABORTED))
+
+
+@dataclass(frozen=True)
+class LifecycleEvent:
+    request_id: str
+    event: str
+    timestamp: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+def event_from_dict(data: dict[str, Any]) -> LifecycleEvent | None:
+    try:
+        request_id = str(data["request_id"])
+        event = str(data["event"])
+        timestamp = float(data["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if event not in EVENTS:
+        return None
+    attributes = {
+        k: v
+        for k, v in data.items()
+        if k not in ("request_id", "event", "timestamp") and isinstance(v, (str, int, float))
+    }
+    return LifecycleEvent(request_id, event, timestamp, attributes)
+
+
+def parse_events(payload: bytes) -> list[LifecycleEvent]:
+    text = payload.decode("utf-8", errors="replace").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            return []
+    else:
+        items = []
+        for line in text.splitlines():
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    events = []
+    for item in items:
+        if isinstance(item, dict):
+            event = event_from_dict(item)
+            if event is not None:
+                events.append(event)
+    return events
@@ -0,0 +1,46 @@
+import bisect
+import math
+from collections.abc import Sequence
+
+EXEMPLAR_MAX_RUNES = 128
+
+
+def exemplar_labels(
+    request_id: str,
+    prompt_tokens: int | None = None,
+    output_tokens: int | None = None,
+    trace_id: str | None = None,
+) -> dict[str, str]:
+    labels: dict[str, str] = {}
+    if trace_id is not None:
+        labels["trace_id"] = trace_id
+    if prompt_tokens is not None:
+        labels["prompt_tokens"] = str(prompt_tokens)
+    if output_tokens is not None:
+        labels["output_tokens"] = str(output_tokens)
+    used = sum(len(key) + len(value) for key, value in labels.items())
+    budget = EXEMPLAR_MAX_RUNES - len("request_id") - used
+    if budget > 0:
+        labels["request_id"] = request_id[-budget:]
+    return labels
+
+
+class ExemplarReservoir:
+    def __init__(self, bounds: Sequence[float], window: float = 60.0):
+        self.bounds = [b for b in bounds if not math.isinf(b)]
+        self.window = window
+        self._slots: list[tuple[float, bool, float] | None] = [None] * (len(self.bounds) + 1)
+
+    def bucket(self, value: float) -> int:
+        return bisect.bisect_left(self.bounds, value)
+
+    def offer(self, value: float, now: float, traced: bool = False) -> bool:
+        index = self.bucket(value)
+        slot = self._slots[index]
+        if slot is None or now - slot[0] >= self.window:
+            self._slots[index] = (now, traced, value)
+            return True
+        if (traced, value) <= slot[1:]:
+            return False
+        self._slots[index] = (slot[0], traced, value)
+        return True
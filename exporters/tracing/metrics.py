@@ -0,0 +1,53 @@
+from exporters.registry import Counter, Gauge
+
+TRACE_EVENTS_RECEIVED = Counter(
+    "trace_lifecycle_events_received_total",
+    "Total number of request lifecycle events ingested",
+    ["backend"],
+)
+
+TRACE_REQUESTS = Counter(
+    "trace_requests_total",
+    "Total number of completed requests by tail-sampling decision",
+    ["backend", "decision"],
+)
+
+TRACE_PENDING_REQUESTS = Gauge(
+    "trace_pending_requests",
+    "Number of in-flight requests buffered awaiting a sampling decision",
+    ["backend"],
+)
+
+TRACE_EVICTED_REQUESTS = Counter(
+    "trace_evicted_requests_total",
+    "Total number of in-flight requests evicted before completing",
+    ["backend", "reason"],
+)
+
+TRACE_EXPORT_QUEUE_DEPTH = Gauge(
+    "trace_export_queue_depth_traces",
+    "Number of sampled traces waiting to be exported",
+    ["endpoint"],
+)
+
+TRACE_SPANS_EXPORTED = Counter(
+    "trace_spans_exported_total",
+    "Total number of spans successfully exported over OTLP",
+    ["endpoint"],
+)
+
+TRACE_SPANS_DROPPED = Counter(
+    "trace_spans_dropped_total",
+    "Total number of sampled spans dropped before reaching the OTLP endpoint",
+    ["endpoint", "reason"],
+)
+
+METRICS = [
+    TRACE_EVENTS_RECEIVED,
+    TRACE_REQUESTS,
+    TRACE_PENDING_REQUESTS,
+    TRACE_EVICTED_REQUESTS,
+    TRACE_EXPORT_QUEUE_DEPTH,
+    TRACE_SPANS_EXPORTED,
+    TRACE_SPANS_DROPPED,
+]
@@ -0,0 +1,39 @@
+import random
+from dataclasses import dataclass
+
+from exporters.config import settings
+from exporters.tracing.trace import RequestTrace
+
+KEEP_ERROR = "error"
+KEEP_PREEMPTED = "preempted"
+KEEP_SLOW_TTFT = "slow_ttft"
+KEEP_SLOW_E2E = "slow_e2e"
+KEEP_BASELINE = "baseline"
+DROP = "dropped"
+
+
+@dataclass(frozen=True)
+class SamplingPolicy:
+    slow_ttft: float = settings.tracing_slow_ttft_seconds
+    slow_e2e: float = settings.tracing_slow_e2e_seconds
+    baseline_ratio: float = settings.tracing_baseline_ratio
+
+
+class TailSampler:
+    def __init__(self, policy: SamplingPolicy | None = None, rng: random.Random | None = None):
+        self.policy = policy or SamplingPolicy()
+        self.rng = rng or random.Random()
+
+    def decide(self, trace: RequestTrace) -> str:
+        if trace.failed:
+            return KEEP_ERROR
+        if trace.preemptions:
+            return KEEP_PREEMPTED
+        ttft = trace.ttft
+        if ttft is not None and ttft >= self.policy.slow_ttft:
+            return KEEP_SLOW_TTFT
+        if trace.e2e >= self.policy.slow_e2e:
+            return KEEP_SLOW_E2E
+        if self.rng.random() < self.policy.baseline_ratio:
+            return KEEP_BASELINE
+        return DROP
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import socket
+
+import httpx
+import structlog
+
+from exporters.config import settings
+from exporters.otlp.exporter import OTLP_RETRYABLE_STATUS, SCOPE_NAME, SCOPE_VERSION
+from exporters.otlp.protobuf import Span, encode_trace_export_request
+from exporters.tracing.metrics import (
+    TRACE_EXPORT_QUEUE_DEPTH,
+    TRACE_SPANS_DROPPED,
+    TRACE_SPANS_EXPORTED,
+)
+
+logger = structlog.get_logger()
+
+OTLP_TRACES_PATH = "/v1/traces"
+
+
+class OTLPTraceSink:
+    def __init__(
+        self,
+        endpoint: str = settings.tracing_otlp_endpoint,
+        service_name: str = "token-path-tracing",
+        queue_capacity: int = settings.tracing_queue_capacity,
+        max_spans_per_request: int = settings.tracing_max_spans_per_request,
+        min_backoff: float = 0.05,
+        max_backoff: float = 5.0,
+        max_retries: int = 5,
+        timeout: float = 10.0,
+    ):
+        endpoint = endpoint.rstrip("/")
+        self.endpoint = (
+            endpoint if endpoint.endswith(OTLP_TRACES_PATH) else endpoint + OTLP_TRACES_PATH
+        )
+        self.headers = {
+            "Content-Type": "application/x-protobuf",
+            "Content-Encoding": "gzip",
+            "User-Agent": f"{SCOPE_NAME}/{SCOPE_VERSION}",
+        }
+        self.max_spans_per_request = max(1, max_spans_per_request)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.resource = (("host.name", socket.gethostname()), ("service.name", service_name))
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self._queue: asyncio.Queue[list[Span] | None] = asyncio.Queue(maxsize=queue_capacity)
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    def enqueue(self, spans: list[Span]) -> bool:
+        try:
+            self._queue.put_nowait(spans)
+        except asyncio.QueueFull:
+            TRACE_SPANS_DROPPED.labels(endpoint=self.endpoint, reason="queue_full").inc(
+                len(spans)
+            )
+            return False
+        TRACE_EXPORT_QUEUE_DEPTH.labels(endpoint=self.endpoint).set(self._queue.qsize())
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("Started OTLP trace export", endpoint=self.endpoint)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        if self._task is not None:
+            _, pending = await asyncio.wait([self._task], timeout=timeout)
+            for task in pending:
+                task.cancel()
+            self._task = None
+        await self.client.aclose()
+        logger.info("Stopped OTLP trace export", endpoint=self.endpoint)
+
+    async def _run(self) -> None:
+        while True:
+            trace = await self._queue.get()
+            done = trace is None
+            batch = trace or []
+            while not done and len(batch) < self.max_spans_per_request and not self._queue.empty():
+                trace = self._queue.get_nowait()
+                if trace is None:
+                    done = True
+                else:
+                    batch.extend(trace)
+            if batch:
+                await self._send_with_retry(batch)
+            TRACE_EXPORT_QUEUE_DEPTH.labels(endpoint=self.endpoint).set(self._queue.qsize())
+            if done or (self._stopping and self._queue.empty()):
+                return
+
+    async def _send_with_retry(self, spans: list[Span]) -> bool:
+        payload = gzip.compress(
+            encode_trace_export_request(self.resource, SCOPE_NAME, SCOPE_VERSION, spans),
+            compresslevel=6,
+        )
+        backoff = self.min_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(
+                    self.endpoint, content=payload, headers=self.headers
+                )
+            except httpx.HTTPError as e:
+                logger.warning("OTLP trace export failed", error=str(e), attempt=attempt)
+            else:
+                if response.is_success:
+                    TRACE_SPANS_EXPORTED.labels(endpoint=self.endpoint).inc(len(spans))
+                    return True
+                if response.status_code not in OTLP_RETRYABLE_STATUS:
+                    logger.error("OTLP trace export rejected", status=response.status_code)
+                    TRACE_SPANS_DROPPED.labels(endpoint=self.endpoint, reason="rejected").inc(
+                        len(spans)
+                    )
+                    return False
+                logger.warning(
+                    "OTLP trace export failed", status=response.status_code, attempt=attempt
+                )
+            if attempt == self.max_retries or (self._stopping and attempt > 0):
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+        TRACE_SPANS_DROPPED.labels(endpoint=self.endpoint, reason="retries_exhausted").inc(
+            len(spans)
+        )
+        return False
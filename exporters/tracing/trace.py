@@ -0,0 +1,145 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+from exporters.otlp.protobuf import (
+    SPAN_KIND_SERVER,
+    STATUS_CODE_ERROR,
+    STATUS_CODE_OK,
+    Span,
+    SpanEvent,
+)
+from exporters.tracing.events import (
+    ABORTED,
+    ERROR,
+    FIRST_TOKEN,
+    LAST_TOKEN,
+    PREEMPTED,
+    PREFILL_DONE,
+    QUEUED,
+    SCHEDULED,
+    TERMINAL_EVENTS,
+    LifecycleEvent,
+)
+
+PHASES = (
+    ("queue", (QUEUED,), (SCHEDULED,)),
+    ("prefill", (SCHEDULED,), (PREFILL_DONE, FIRST_TOKEN)),
+    ("decode", (FIRST_TOKEN,), (LAST_TOKEN, ERROR, ABORTED)),
+)
+
+
+def _ns(timestamp: float) -> int:
+    return int(timestamp * 1e9)
+
+
+@dataclass
+class RequestTrace:
+    request_id: str
+    received: float
+    timestamps: dict[str, float] = field(default_factory=dict)
+    preemptions: list[float] = field(default_factory=list)
+    attributes: dict[str, Any] = field(default_factory=dict)
+    terminal: str | None = None
+
+    def add(self, event: LifecycleEvent) -> None:
+        if event.event == PREEMPTED:
+            self.preemptions.append(event.timestamp)
+        else:
+            self.timestamps.setdefault(event.event, event.timestamp)
+        self.attributes.update(event.attributes)
+        if event.event in TERMINAL_EVENTS and self.terminal is None:
+            self.terminal = event.event
+
+    @property
+    def complete(self) -> bool:
+        return self.terminal is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.terminal in (ERROR, ABORTED)
+
+    @property
+    def start(self) -> float:
+        return min([*self.timestamps.values(), *self.preemptions])
+
+    @property
+    def end(self) -> float:
+        if self.terminal is not None:
+            return self.timestamps[self.terminal]
+        return max([*self.timestamps.values(), *self.preemptions])
+
+    @property
+    def e2e(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ttft(self) -> float | None:
+        first_token = self.timestamps.get(FIRST_TOKEN)
+        if first_token is None:
+            return None
+        arrival = self.timestamps.get(QUEUED, self.timestamps.get(SCHEDULED, self.start))
+        return max(0.0, first_token - arrival)
+
+    @property
+    def mean_itl(self) -> float | None:
+        first_token = self.timestamps.get(FIRST_TOKEN)
+        last_token = self.timestamps.get(LAST_TOKEN)
+        output_tokens = self.attributes.get("output_tokens")
+        if first_token is None or last_token is None or not isinstance(output_tokens, int):
+            return None
+        if output_tokens < 2:
+            return None
+        return max(0.0, last_token - first_token) / (output_tokens - 1)
+
+    def _first(self, events: tuple[str, ...]) -> float | None:
+        for event in events:
+            if event in self.timestamps:
+                return self.timestamps[event]
+        return None
+
+    def to_spans(self, trace_id: bytes, backend: str, model: str) -> list[Span]:
+        attributes: list[tuple[str, str | int | float]] = [
+            ("request.id", self.request_id),
+            ("llm.backend", backend),
+            ("llm.model", model),
+            ("llm.preemptions", len(self.preemptions)),
+        ]
+        if self.ttft is not None:
+            attributes.append(("llm.ttft_seconds", self.ttft))
+        attributes.extend(
+            sorted(
+                (f"llm.{key}", value) for key, value in self.attributes.items() if key != "model"
+            )
+        )
+        root = Span(
+            trace_id=trace_id,
+            span_id=os.urandom(8),
+            name=f"{backend}.request",
+            start_time_ns=_ns(self.start),
+            end_time_ns=_ns(self.end),
+            kind=SPAN_KIND_SERVER,
+            attributes=tuple(attributes),
+            events=[SpanEvent(PREEMPTED, _ns(t)) for t in sorted(self.preemptions)],
+            status_code=STATUS_CODE_ERROR if self.failed else STATUS_CODE_OK,
+            status_message=str(self.attributes.get("error", self.terminal)) if self.failed else "",
+        )
+        spans = [root]
+        for name, starts, ends in PHASES:
+            start, end = self._first(starts), self._first(ends)
+            if start is None or end is None or end < start:
+                continue
+            spans.append(
+                Span(
+                    trace_id=trace_id,
+                    span_id=os.urandom(8),
+                    parent_span_id=root.span_id,
+                    name=name,
+                    start_time_ns=_ns(start),
+                    end_time_ns=_ns(end),
+                    events=[
+                        SpanEvent(PREEMPTED, _ns(t)) for t in self.preemptions if start <= t <= end
+                    ],
+                )
+            )
+        return spans
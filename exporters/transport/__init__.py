@@ -0,0 +1,3 @@
+from exporters.transport.metrics import *
+
+__all__ = ["METRICS"]
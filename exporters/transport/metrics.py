@@ -0,0 +1,25 @@
+from exporters.registry import Counter, Gauge
+
+HTTP_CLIENT_REQUESTS = Counter(
+    "http_client_requests",
+    "Requests sent to the target",
+    ["pool", "target"],
+)
+
+HTTP_CLIENT_CONNECTIONS_OPENED = Counter(
+    "http_client_connections_opened",
+    "New TCP or Unix socket connections opened to the target",
+    ["pool", "target"],
+)
+
+HTTP_POOL_MAX_CONNECTIONS = Gauge(
+    "http_pool_max_connections",
+    "Connection limit of the client pool, scaled with its targets",
+    ["pool"],
+)
+
+METRICS = [
+    HTTP_CLIENT_REQUESTS,
+    HTTP_CLIENT_CONNECTIONS_OPENED,
+    HTTP_POOL_MAX_CONNECTIONS,
+]
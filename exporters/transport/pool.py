@@ -0,0 +1,172 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+import httpx
+import structlog
+
+from exporters.config import settings
+from exporters.transport.metrics import (
+    HTTP_CLIENT_CONNECTIONS_OPENED,
+    HTTP_CLIENT_REQUESTS,
+    HTTP_POOL_MAX_CONNECTIONS,
+)
+
+try:
+    import h2
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+logger = structlog.get_logger()
+
+CONNECT_EVENTS = frozenset(
+    {"connection.connect_tcp.complete", "connection.connect_unix_socket.complete"}
+)
+
+Tracer = Callable[[str, dict[str, Any]], Coroutine[Any, Any, None]]
+
+
+def target_timeout(
+    connect: float = settings.http_connect_timeout, read: float = settings.http_read_timeout
+) -> httpx.Timeout:
+    return httpx.Timeout(read, connect=connect)
+
+
+def request_target(url: httpx.URL) -> str:
+    return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+
+class ClientPool:
+    def __init__(
+        self,
+        name: str,
+        connections_per_target: int = settings.http_connections_per_target,
+        keepalive_per_target: int = settings.http_keepalive_per_target,
+        keepalive_expiry: float = settings.http_keepalive_expiry,
+        http2: bool = settings.http2,
+        uds_paths: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+    ):
+        if http2 and h2 is None:
+            logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+            http2 = False
+        uds_paths = settings.http_uds_paths if uds_paths is None else uds_paths
+        self.name = name
+        self.connections_per_target = connections_per_target
+        self.keepalive_per_target = keepalive_per_target
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.uds_paths = {endpoint.rstrip("/"): path for endpoint, path in uds_paths.items()}
+        self.timeout = timeout or target_timeout()
+        self.targets: dict[str, None] = {}
+        self._shared: httpx.AsyncClient | None = None
+        self._limits: dict[str | None, httpx.Limits] = {}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._retired: list[httpx.AsyncClient] = []
+        self._closing: set[asyncio.Task[None]] = set()
+        self._tracers: dict[str, Tracer] = {}
+
+    def limits(self, targets: int) -> httpx.Limits:
+        targets = max(targets, 1)
+        return httpx.Limits(
+            max_connections=self.connections_per_target * targets,
+            max_keepalive_connections=self.keepalive_per_target * targets,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client(self, endpoint: str) -> httpx.AsyncClient:
+        endpoint = endpoint.rstrip("/")
+        client = self._clients.get(endpoint)
+        if client is not None:
+            return client
+        uds = self.uds_paths.get(endpoint)
+        if uds is not None:
+            client = self._build(endpoint, 1, uds)
+        else:
+            self.targets[endpoint] = None
+            client = self._rebuild_shared()
+        self._clients[endpoint] = client
+        self.update_metrics()
+        return client
+
+    async def release(self, endpoint: str) -> None:
+        endpoint = endpoint.rstrip("/")
+        client = self._clients.pop(endpoint, None)
+        if client is None:
+            return
+        if endpoint in self.targets:
+            del self.targets[endpoint]
+            if self.targets:
+                self._rebuild_shared()
+            else:
+                self._shared = None
+                del self._limits[None]
+                self._retire(client)
+        else:
+            del self._limits[endpoint]
+            await client.aclose()
+        self.update_metrics()
+
+    def _build(self, key: str | None, targets: int, uds: str | None = None) -> httpx.AsyncClient:
+        limits = self._limits[key] = self.limits(targets)
+        return httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(limits=limits, http2=self.http2, uds=uds),
+            timeout=self.timeout,
+            event_hooks={"request": [self._on_request]},
+        )
+
+    def _rebuild_shared(self) -> httpx.AsyncClient:
+        previous = self._shared
+        shared = self._shared = self._build(None, len(self.targets))
+        for endpoint, client in self._clients.items():
+            if client is previous:
+                self._clients[endpoint] = shared
+        if previous is not None:
+            self._retire(previous)
+        return shared
+
+    def _retire(self, client: httpx.AsyncClient) -> None:
+        self._retired.append(client)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._close_retired(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_retired(self, client: httpx.AsyncClient) -> None:
+        # Requests already sent through the old client finish or time out first.
+        await asyncio.sleep((self.timeout.connect or 0.0) + (self.timeout.read or 0.0))
+        await client.aclose()
+        self._retired.remove(client)
+
+    def _tracer(self, target: str) -> Tracer:
+        tracer = self._tracers.get(target)
+        if tracer is None:
+            opened = HTTP_CLIENT_CONNECTIONS_OPENED.labels(pool=self.name, target=target)
+
+            async def tracer(event: str, info: dict[str, Any]) -> None:
+                if event in CONNECT_EVENTS:
+                    opened.inc()
+
+            self._tracers[target] = tracer
+        return tracer
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        target = request_target(request.url)
+        request.extensions["trace"] = self._tracer(target)
+        HTTP_CLIENT_REQUESTS.labels(pool=self.name, target=target).inc()
+
+    def update_metrics(self) -> None:
+        HTTP_POOL_MAX_CONNECTIONS.labels(pool=self.name).set(
+            sum(limits.max_connections or 0 for limits in self._limits.values())
+        )
+
+    async def aclose(self) -> None:
+        for task in list(self._closing):
+            task.cancel()
+        clients = [*self._clients.values(), *self._retired]
+        for client in {id(client): client for client in clients}.values():
+            await client.aclose()
+        self._retired.clear()
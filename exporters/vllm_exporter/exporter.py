@@ -1,21 +1,43 @@
 import asyncio
 import logging
+import socket
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
 import structlog
-from prometheus_client import start_http_server
 
+from exporters.autoscaling.server import start_http_server
+from exporters.autoscaling.signals import SIGNALS, TargetSignals
+from exporters.breakdown.breakdown import (
+    BreakdownSpec,
+    ModelBreakdown,
+    observe_delta,
+    remove_model_series,
+)
+from exporters.breaker.breaker import CircuitBreaker
 from exporters.config import settings
+from exporters.otlp.exporter import OTLPExporter
+from exporters.payload.cache import PayloadCache, family_changed
+from exporters.queueing.analyzer import QueueAnalyzer, QueueSpec
+from exporters.recording.recorder import RecordingSpec, WindowedRecorder
+from exporters.reload.watcher import ConfigWatcher, remove_endpoint_series
+from exporters.remote_write.writer import RemoteWriter
+from exporters.scheduler.scheduler import AdaptiveInterval
+from exporters.slo.engine import SLOEngine, SLOSpec
+from exporters.transport.pool import ClientPool
+from exporters.vllm_exporter.metrics import METRICS as VLLM_METRICS
 from exporters.vllm_exporter.metrics import (
     VLLM_BATCH_SIZE,
+    VLLM_DECODE_TOKENS,
     VLLM_GPU_MEMORY_TOTAL,
     VLLM_GPU_MEMORY_USED,
     VLLM_ITL_SECONDS,
     VLLM_KV_CACHE_USAGE,
     VLLM_NUM_LIVE_GENERATIONS,
     VLLM_NUM_PREEMPTED,
+    VLLM_PREFILL_TOKENS,
     VLLM_QUEUE_LENGTH,
     VLLM_REQUESTS_IN_PROGRESS,
     VLLM_REQUESTS_TOTAL,
@@ -28,6 +50,55 @@ from exporters.vllm_exporter.metrics import (
 
 logger = structlog.get_logger()
 
+VLLM_RECORDING_SPEC = RecordingSpec(
+    backend="vllm",
+    ttft_histogram="vllm:time_to_first_token_seconds",
+    itl_histogram="vllm:time_per_output_token_seconds",
+    tokens_counter="vllm:generation_tokens_total",
+    prefill_tokens_counter="vllm:prompt_tokens_total",
+    preemptions_counter="vllm:num_preemptions_total",
+)
+
+VLLM_SLO_SPEC = SLOSpec(
+    backend="vllm",
+    ttft_histogram="vllm:time_to_first_token_seconds",
+    itl_histogram="vllm:time_per_output_token_seconds",
+)
+
+VLLM_QUEUE_SPEC = QueueSpec(
+    backend="vllm",
+    queue_gauge="vllm:num_requests_waiting",
+    running_gauge="vllm:num_requests_running",
+    completion_counters=("vllm:request_success_total",),
+    tokens_counter="vllm:generation_tokens_total",
+)
+
+VLLM_BREAKDOWN_SPEC = BreakdownSpec(
+    backend="vllm",
+    model_label="model_name",
+    ttft_histogram="vllm:time_to_first_token_seconds",
+    itl_histogram="vllm:time_per_output_token_seconds",
+    prefill_tokens_counter="vllm:prompt_tokens_total",
+    decode_tokens_counter="vllm:generation_tokens_total",
+    requests_counter="vllm:request_success_total",
+)
+
+VLLM_MODEL_METRICS = (
+    VLLM_TTFT_SECONDS,
+    VLLM_ITL_SECONDS,
+    VLLM_TIME_PER_TOKEN,
+    VLLM_TOKENS_GENERATED_TOTAL,
+    VLLM_PREFILL_TOKENS,
+    VLLM_DECODE_TOKENS,
+    VLLM_REQUESTS_TOTAL,
+)
+
+VLLM_TOTAL_FAMILIES = ("vllm:total_tokens", "vllm:num_requests_total")
+
+VLLM_GPU_MEMORY_FAMILIES = ("vllm:gpu_memory_used_bytes", "vllm:gpu_memory_total_bytes")
+
+VLLM_POLL_SIGNAL_FLOORS = {"queue": 8.0, "running": 8.0}
+
 
 @dataclass
 class VLLMMetrics:
@@ -54,22 +125,59 @@ class VLLMExporter:
         endpoint: str = settings.vllm_endpoint,
         port: int = settings.exporter_port_vllm,
         model: str = "unknown",
+        pool: ClientPool | None = None,
     ):
         self.endpoint = endpoint.rstrip("/")
         self.port = port
         self.model = model
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.pool = pool or ClientPool("vllm")
         self._running = False
+        self.remote_writer: RemoteWriter | None = None
+        self.otlp_exporter: OTLPExporter | None = None
+        self.watcher: ConfigWatcher | None = None
+        self.model_refresh_interval = settings.model_refresh_interval
+        self.schedule: AdaptiveInterval | None = None
+        self._reset_target_state()
+
+    def _reset_target_state(self) -> None:
+        self.breaker = CircuitBreaker("vllm", self.endpoint)
         self._previous_metrics: dict[str, Any] = {}
+        self.recorder: WindowedRecorder | None = (
+            WindowedRecorder(
+                VLLM_RECORDING_SPEC, settings.recording_windows, settings.recording_quantiles
+            )
+            if settings.recording_enabled
+            else None
+        )
+        self.slo_engine: SLOEngine | None = (
+            SLOEngine(VLLM_SLO_SPEC) if settings.slo_enabled else None
+        )
+        self.queue_analyzer: QueueAnalyzer | None = (
+            QueueAnalyzer(VLLM_QUEUE_SPEC, settings.queue_ewma_window)
+            if settings.queue_analytics_enabled
+            else None
+        )
+        self.breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, self.endpoint)
+        self.payload = PayloadCache("vllm", self.endpoint, self._parse_prometheus_metrics)
+        self._models_refreshed: float | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.pool.client(self.endpoint)
 
     async def fetch_metrics(self) -> dict[str, Any]:
+        if not self.breaker.allow():
+            return {}
         try:
             response = await self.client.get(f"{self.endpoint}/metrics")
             response.raise_for_status()
-            return self._parse_prometheus_metrics(response.text)
         except httpx.HTTPError as e:
+            self.breaker.record_failure()
             logger.error("Failed to fetch vLLM metrics", error=str(e))
             return {}
+        if self.breaker.record_success():
+            await self.fetch_model_info()
+        return self.payload.parse(response.text)
 
     async def fetch_health(self) -> dict[str, Any]:
         try:
@@ -81,17 +189,70 @@ class VLLMExporter:
             return {}
 
     async def fetch_model_info(self) -> dict[str, Any]:
+        if not self.breaker.closed:
+            return {}
+        self._models_refreshed = time.monotonic()
         try:
             response = await self.client.get(f"{self.endpoint}/v1/models")
             response.raise_for_status()
             data = response.json()
-            if data.get("data"):
-                self.model = data["data"][0].get("id", "unknown")
+            models = data.get("data") or []
+            if models:
+                base = next((model for model in models if not model.get("parent")), models[0])
+                self.model = base.get("id", "unknown")
+                self.refresh_models([model["id"] for model in models if model.get("id")])
             return data
         except httpx.HTTPError as e:
+            self._models_refreshed = None
             logger.error("Failed to fetch model info", error=str(e))
             return {}
 
+    def refresh_models(self, models: list[str]) -> None:
+        for stale in self.breakdown.set_known_models(models, self.model):
+            remove_model_series(VLLM_MODEL_METRICS, stale, self.endpoint)
+            logger.info("Removed series for unloaded model", model=stale)
+        self.payload.invalidate()
+
+    async def retarget(self, endpoint: str) -> None:
+        previous = self.endpoint
+        await self.pool.release(previous)
+        SIGNALS.remove(previous)
+        remove_endpoint_series(previous, VLLM_METRICS)
+        self.endpoint = endpoint.rstrip("/")
+        self.model = "unknown"
+        self._reset_target_state()
+        if self.schedule is not None:
+            self.schedule = AdaptiveInterval(
+                "vllm", self.endpoint, self.schedule.interval, floors=VLLM_POLL_SIGNAL_FLOORS
+            )
+        logger.info("Switched vLLM exporter target", previous=previous, endpoint=self.endpoint)
+
+    def reconfigure(self, changes: dict[str, Any]) -> None:
+        self.breaker.reconfigure(changes)
+        if self.schedule is not None:
+            self.schedule.reconfigure(changes)
+        if "model_refresh_interval" in changes:
+            self.model_refresh_interval = changes["model_refresh_interval"]
+        if "model_label_limit" in changes:
+            self.breakdown.max_models = changes["model_label_limit"]
+            self.payload.invalidate()
+        if "payload_cache_enabled" in changes:
+            self.payload.enabled = changes["payload_cache_enabled"]
+        if "queue_ewma_window" in changes and self.queue_analyzer is not None:
+            self.queue_analyzer.window = changes["queue_ewma_window"]
+
+    async def apply_settings(self, changes: dict[str, Any]) -> None:
+        endpoint = changes.get("vllm_endpoint")
+        if endpoint is not None and endpoint.rstrip("/") != self.endpoint:
+            await self.retarget(endpoint)
+        self.reconfigure(changes)
+
+    def _model_refresh_due(self) -> bool:
+        return self._models_refreshed is None or (
+            self.model_refresh_interval > 0
+            and time.monotonic() - self._models_refreshed >= self.model_refresh_interval
+        )
+
     def _parse_prometheus_metrics(self, metrics_text: str) -> dict[str, Any]:
         metrics: dict[str, Any] = {}
         for line in metrics_text.split("\n"):
@@ -125,77 +286,129 @@ class VLLMExporter:
             return value[0].get("value", default)
         return value if isinstance(value, (int, float)) else default
 
+    def poll_signals(self, metrics: dict[str, Any]) -> dict[str, float]:
+        return {
+            "queue": self._extract_metric_value(metrics, "vllm:num_requests_waiting"),
+            "running": self._extract_metric_value(metrics, "vllm:num_requests_running"),
+            "kv_cache": self._extract_metric_value(metrics, "vllm:gpu_cache_usage_perc"),
+        }
+
     def update_prometheus_metrics(self, metrics: dict[str, Any]) -> None:
         labels = {"model": self.model, "endpoint": self.endpoint}
+        changed = self.payload.changed_families(metrics)
 
-        queue_length = self._extract_metric_value(metrics, "vllm:num_requests_waiting")
-        VLLM_QUEUE_LENGTH.labels(**labels).set(queue_length)
-
-        batch_size = self._extract_metric_value(metrics, "vllm:num_batched_tokens")
-        VLLM_BATCH_SIZE.labels(**labels).set(batch_size)
-
-        kv_cache = self._extract_metric_value(metrics, "vllm:gpu_cache_usage_perc")
-        VLLM_KV_CACHE_USAGE.labels(**labels).set(kv_cache / 100 if kv_cache > 1 else kv_cache)
-
-        num_live = self._extract_metric_value(metrics, "vllm:num_generations")
-        VLLM_NUM_LIVE_GENERATIONS.labels(**labels).set(num_live)
-
-        num_running = self._extract_metric_value(metrics, "vllm:num_requests_running")
-        VLLM_REQUESTS_IN_PROGRESS.labels(**labels).set(num_running)
-
-        if "vllm:time_to_first_token_seconds" in metrics:
-            ttft_values = metrics["vllm:time_to_first_token_seconds"]
-            if isinstance(ttft_values, list):
-                for item in ttft_values:
-                    VLLM_TTFT_SECONDS.labels(**labels).observe(item.get("value", 0))
-
-        if "vllm:time_per_output_token_seconds" in metrics:
-            itl_values = metrics["vllm:time_per_output_token_seconds"]
-            if isinstance(itl_values, list):
-                for item in itl_values:
-                    VLLM_ITL_SECONDS.labels(**labels).observe(item.get("value", 0))
-                    VLLM_TIME_PER_TOKEN.labels(**labels).observe(item.get("value", 0))
-
-        total_tokens = self._extract_metric_value(metrics, "vllm:total_tokens")
-        prev_tokens = self._previous_metrics.get("total_tokens", 0)
-        if total_tokens > prev_tokens:
-            VLLM_TOKENS_GENERATED_TOTAL.labels(**labels).inc(total_tokens - prev_tokens)
-        self._previous_metrics["total_tokens"] = total_tokens
-
-        total_requests = self._extract_metric_value(metrics, "vllm:num_requests_total")
-        prev_requests = self._previous_metrics.get("total_requests", 0)
-        if total_requests > prev_requests:
-            VLLM_REQUESTS_TOTAL.labels(**labels, status="completed").inc(
-                total_requests - prev_requests
-            )
-        self._previous_metrics["total_requests"] = total_requests
+        if family_changed(changed, "vllm:num_requests_waiting"):
+            queue_length = self._extract_metric_value(metrics, "vllm:num_requests_waiting")
+            VLLM_QUEUE_LENGTH.labels(**labels).set(queue_length)
 
-        preempted = self._extract_metric_value(metrics, "vllm:num_preemptions_total")
-        prev_preempted = self._previous_metrics.get("preempted", 0)
-        if preempted > prev_preempted:
-            VLLM_NUM_PREEMPTED.labels(**labels).inc(preempted - prev_preempted)
-        self._previous_metrics["preempted"] = preempted
+        if family_changed(changed, "vllm:num_batched_tokens"):
+            batch_size = self._extract_metric_value(metrics, "vllm:num_batched_tokens")
+            VLLM_BATCH_SIZE.labels(**labels).set(batch_size)
 
-        spec_accepted = self._extract_metric_value(
-            metrics, "vllm:spec_decoding_accepted_tokens_total"
-        )
-        prev_accepted = self._previous_metrics.get("spec_accepted", 0)
-        if spec_accepted > prev_accepted:
-            VLLM_SPECULATIVE_ACCEPTED.labels(**labels).inc(spec_accepted - prev_accepted)
-        self._previous_metrics["spec_accepted"] = spec_accepted
+        if family_changed(changed, "vllm:gpu_cache_usage_perc"):
+            kv_cache = self._extract_metric_value(metrics, "vllm:gpu_cache_usage_perc")
+            VLLM_KV_CACHE_USAGE.labels(**labels).set(kv_cache / 100 if kv_cache > 1 else kv_cache)
+
+        if family_changed(changed, "vllm:num_generations"):
+            num_live = self._extract_metric_value(metrics, "vllm:num_generations")
+            VLLM_NUM_LIVE_GENERATIONS.labels(**labels).set(num_live)
+
+        if family_changed(changed, "vllm:num_requests_running"):
+            num_running = self._extract_metric_value(metrics, "vllm:num_requests_running")
+            VLLM_REQUESTS_IN_PROGRESS.labels(**labels).set(num_running)
+
+        if family_changed(changed, *VLLM_BREAKDOWN_SPEC.families, *VLLM_TOTAL_FAMILIES):
+            self._update_token_counters(metrics, labels)
+
+        if family_changed(changed, "vllm:num_preemptions_total"):
+            preempted = self._extract_metric_value(metrics, "vllm:num_preemptions_total")
+            prev_preempted = self._previous_metrics.get("preempted", 0)
+            if preempted > prev_preempted:
+                VLLM_NUM_PREEMPTED.labels(**labels).inc(preempted - prev_preempted)
+            self._previous_metrics["preempted"] = preempted
 
-        spec_rejected = self._extract_metric_value(
-            metrics, "vllm:spec_decoding_rejected_tokens_total"
+        if family_changed(changed, "vllm:spec_decoding_accepted_tokens_total"):
+            spec_accepted = self._extract_metric_value(
+                metrics, "vllm:spec_decoding_accepted_tokens_total"
+            )
+            prev_accepted = self._previous_metrics.get("spec_accepted", 0)
+            if spec_accepted > prev_accepted:
+                VLLM_SPECULATIVE_ACCEPTED.labels(**labels).inc(spec_accepted - prev_accepted)
+            self._previous_metrics["spec_accepted"] = spec_accepted
+
+        if family_changed(changed, "vllm:spec_decoding_rejected_tokens_total"):
+            spec_rejected = self._extract_metric_value(
+                metrics, "vllm:spec_decoding_rejected_tokens_total"
+            )
+            prev_rejected = self._previous_metrics.get("spec_rejected", 0)
+            if spec_rejected > prev_rejected:
+                VLLM_SPECULATIVE_REJECTED.labels(**labels).inc(spec_rejected - prev_rejected)
+            self._previous_metrics["spec_rejected"] = spec_rejected
+
+        if family_changed(changed, *VLLM_GPU_MEMORY_FAMILIES):
+            for gpu_id, gpu_metrics in self._extract_gpu_memory(metrics).items():
+                gpu_labels = {**labels, "gpu_id": str(gpu_id)}
+                VLLM_GPU_MEMORY_USED.labels(**gpu_labels).set(gpu_metrics["used"])
+                VLLM_GPU_MEMORY_TOTAL.labels(**gpu_labels).set(gpu_metrics["total"])
+
+        if self.recorder is not None:
+            self.recorder.record(metrics, labels)
+        if self.slo_engine is not None:
+            self.slo_engine.record(metrics, labels)
+        self.publish_signals(metrics)
+
+    def publish_signals(self, metrics: dict[str, Any]) -> None:
+        queue = self.queue_analyzer
+        if queue is not None:
+            queue.record(metrics, {"model": self.model, "endpoint": self.endpoint})
+        SIGNALS.update(
+            TargetSignals(
+                backend="vllm",
+                endpoint=self.endpoint,
+                model=self.model,
+                queue_depth=self._extract_metric_value(metrics, "vllm:num_requests_waiting"),
+                kv_cache_usage=self._extract_metric_value(metrics, "vllm:gpu_cache_usage_perc"),
+                arrival_rate=queue.arrival_rate if queue is not None else None,
+                completion_rate=queue.completion_rate if queue is not None else None,
+                tokens_per_second=queue.token_rate if queue is not None else None,
+            )
         )
-        prev_rejected = self._previous_metrics.get("spec_rejected", 0)
-        if spec_rejected > prev_rejected:
-            VLLM_SPECULATIVE_REJECTED.labels(**labels).inc(spec_rejected - prev_rejected)
-        self._previous_metrics["spec_rejected"] = spec_rejected
 
-        for gpu_id, gpu_metrics in self._extract_gpu_memory(metrics).items():
-            gpu_labels = {**labels, "gpu_id": str(gpu_id)}
-            VLLM_GPU_MEMORY_USED.labels(**gpu_labels).set(gpu_metrics["used"])
-            VLLM_GPU_MEMORY_TOTAL.labels(**gpu_labels).set(gpu_metrics["total"])
+    def _update_token_counters(self, metrics: dict[str, Any], labels: dict[str, str]) -> None:
+        deltas = self.breakdown.update(metrics, self.model)
+        for model, delta in deltas.items():
+            model_labels = {"model": model, "endpoint": self.endpoint}
+            if delta.ttft is not None:
+                observe_delta(VLLM_TTFT_SECONDS.labels(**model_labels), delta.ttft)
+            if delta.itl is not None:
+                observe_delta(VLLM_ITL_SECONDS.labels(**model_labels), delta.itl)
+                observe_delta(VLLM_TIME_PER_TOKEN.labels(**model_labels), delta.itl)
+            if delta.tokens:
+                VLLM_TOKENS_GENERATED_TOTAL.labels(**model_labels).inc(delta.tokens)
+            if delta.prefill_tokens:
+                VLLM_PREFILL_TOKENS.labels(**model_labels).inc(delta.prefill_tokens)
+            if delta.decode_tokens:
+                VLLM_DECODE_TOKENS.labels(**model_labels).inc(delta.decode_tokens)
+            if delta.requests:
+                VLLM_REQUESTS_TOTAL.labels(**model_labels, status="completed").inc(delta.requests)
+        tokens_by_model = any(delta.tokens is not None for delta in deltas.values())
+        requests_by_model = any(delta.requests is not None for delta in deltas.values())
+
+        if not tokens_by_model:
+            total_tokens = self._extract_metric_value(metrics, "vllm:total_tokens")
+            prev_tokens = self._previous_metrics.get("total_tokens", 0)
+            if total_tokens > prev_tokens:
+                VLLM_TOKENS_GENERATED_TOTAL.labels(**labels).inc(total_tokens - prev_tokens)
+            self._previous_metrics["total_tokens"] = total_tokens
+
+        if not requests_by_model:
+            total_requests = self._extract_metric_value(metrics, "vllm:num_requests_total")
+            prev_requests = self._previous_metrics.get("total_requests", 0)
+            if total_requests > prev_requests:
+                VLLM_REQUESTS_TOTAL.labels(**labels, status="completed").inc(
+                    total_requests - prev_requests
+                )
+            self._previous_metrics["total_requests"] = total_requests
 
     def _extract_gpu_memory(self, metrics: dict[str, Any]) -> dict[int, dict[str, int]]:
         gpu_memory: dict[int, dict[str, int]] = {}
@@ -215,20 +428,40 @@ class VLLMExporter:
 
     async def collect_loop(self, interval: float = 15.0) -> None:
         self._running = True
+        if self.remote_writer is not None:
+            self.remote_writer.start()
+        if self.otlp_exporter is not None:
+            self.otlp_exporter.start()
+        if self.watcher is not None:
+            self.watcher.start()
         logger.info("Starting vLLM exporter collection loop", endpoint=self.endpoint)
 
         await self.fetch_model_info()
+        self.schedule = AdaptiveInterval(
+            "vllm", self.endpoint, interval, floors=VLLM_POLL_SIGNAL_FLOORS
+        )
+        phase = self.schedule.initial_delay()
 
         while self._running:
+            started = time.monotonic()
             try:
+                if self._model_refresh_due():
+                    await self.fetch_model_info()
+                endpoint = self.endpoint
                 metrics = await self.fetch_metrics()
-                if metrics:
+                if metrics and endpoint == self.endpoint:
                     self.update_prometheus_metrics(metrics)
+                    self.schedule.observe(self.poll_signals(metrics))
+                    if self.remote_writer is not None:
+                        self.remote_writer.push()
+                    if self.otlp_exporter is not None:
+                        self.otlp_exporter.push()
                     logger.debug("Updated vLLM metrics", model=self.model)
             except Exception as e:
                 logger.error("Error collecting vLLM metrics", error=str(e))
 
-            await asyncio.sleep(interval)
+            await asyncio.sleep(self.schedule.next_delay(time.monotonic() - started) + phase)
+            phase = 0.0
 
     def stop(self) -> None:
         self._running = False
@@ -237,6 +470,13 @@ class VLLMExporter:
     def run(self, interval: float = 15.0) -> None:
         logging.basicConfig(level=settings.log_level)
         start_http_server(self.port)
+        if settings.remote_write_url:
+            self.remote_writer = RemoteWriter(
+                external_labels={"job": "vllm-exporter", "instance": socket.gethostname()}
+            )
+        if settings.otlp_endpoint:
+            self.otlp_exporter = OTLPExporter(service_name="vllm-exporter")
+        self.watcher = ConfigWatcher("vllm", self.apply_settings)
         logger.info(f"vLLM exporter started on port {self.port}")
 
         loop = asyncio.get_event_loop()
@@ -245,6 +485,11 @@ class VLLMExporter:
         except KeyboardInterrupt:
             self.stop()
         finally:
+            loop.run_until_complete(self.watcher.stop())
+            if self.remote_writer is not None:
+                loop.run_until_complete(self.remote_writer.stop())
+            if self.otlp_exporter is not None:
+                loop.run_until_complete(self.otlp_exporter.stop())
             loop.close()
 
 
@@ -1,13 +1,13 @@
-from prometheus_client import Counter, Gauge, Histogram
+from exporters.registry import Counter, DeltaHistogram, Gauge
 
-VLLM_TTFT_SECONDS = Histogram(
+VLLM_TTFT_SECONDS = DeltaHistogram(
     "vllm_ttft_seconds",
     "Time to first token in seconds",
     ["model", "endpoint"],
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
 )
 
-VLLM_ITL_SECONDS = Histogram(
+VLLM_ITL_SECONDS = DeltaHistogram(
     "vllm_itl_seconds",
     "Inter-token latency in seconds",
     ["model", "endpoint"],
@@ -20,6 +20,18 @@ VLLM_TOKENS_GENERATED_TOTAL = Counter(
     ["model", "endpoint"],
 )
 
+VLLM_PREFILL_TOKENS = Counter(
+    "vllm_prefill_tokens_total",
+    "Total prompt tokens processed in prefill",
+    ["model", "endpoint"],
+)
+
+VLLM_DECODE_TOKENS = Counter(
+    "vllm_decode_tokens_total",
+    "Total tokens generated in decode",
+    ["model", "endpoint"],
+)
+
 VLLM_REQUESTS_TOTAL = Counter(
     "vllm_requests_total",
     "Total number of requests processed",
@@ -68,7 +80,7 @@ VLLM_NUM_PREEMPTED = Counter(
     ["model", "endpoint"],
 )
 
-VLLM_TIME_PER_TOKEN = Histogram(
+VLLM_TIME_PER_TOKEN = DeltaHistogram(
     "vllm_time_per_token_seconds",
     "Time spent generating each token",
     ["model", "endpoint"],
@@ -97,6 +109,8 @@ METRICS = [
     VLLM_TTFT_SECONDS,
     VLLM_ITL_SECONDS,
     VLLM_TOKENS_GENERATED_TOTAL,
+    VLLM_PREFILL_TOKENS,
+    VLLM_DECODE_TOKENS,
     VLLM_REQUESTS_TOTAL,
     VLLM_REQUESTS_IN_PROGRESS,
     VLLM_QUEUE_LENGTH,
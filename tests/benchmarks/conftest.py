@@ -0,0 +1,163 @@
+import json
+import platform
+import tracemalloc
+from functools import cache
+from pathlib import Path
+
+import pytest
+
+from exporters.simulator.nvidia_smi import NvidiaSmiSimulator
+from exporters.simulator.payloads import TGIMetricsSimulator, VLLMMetricsSimulator
+
+SERIES_SCALES = [1_000, 10_000, 100_000]
+LOG_LINES = 50_000
+LOG_LINES_PER_SECOND = 50_000
+GPU_SCALES = [1, 8, 16]
+MIN_TIME_REGRESSION_SECONDS = 50e-6
+STARTUP_TIMEOUT = 10.0
+
+BENCHMARK_DIR = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --run-benchmarks")
+    for item in items:
+        if BENCHMARK_DIR in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+def pytest_configure(config):
+    config._benchmark_results = {}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = getattr(config, "_benchmark_results", {})
+    if not results or not config.getoption("--benchmark-save-baseline", default=False):
+        return
+    path = Path(config.getoption("--benchmark-baseline-file"))
+    baseline = _load_baseline(path)
+    baseline["machine"] = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "processor": platform.processor() or platform.machine(),
+        "system": platform.system(),
+    }
+    baseline["benchmarks"].update(results)
+    baseline["benchmarks"] = dict(sorted(baseline["benchmarks"].items()))
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def _load_baseline(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"version": 1, "machine": {}, "benchmarks": {}}
+
+
+@cache
+def vllm_payload(series: int, num_gpus: int = 8) -> str:
+    per_model = VLLMMetricsSimulator(num_gpus=0, seed=0).series_count()
+    models = max(1, series // per_model)
+    return VLLMMetricsSimulator(num_models=models, num_gpus=num_gpus, seed=0).render()
+
+
+@cache
+def tgi_payload(series: int, num_gpus: int = 8) -> str:
+    per_adapter = TGIMetricsSimulator(num_adapters=1, num_gpus=0, seed=0).series_count() // 2
+    adapters = max(0, series // per_adapter - 1)
+    return TGIMetricsSimulator(num_adapters=adapters, num_gpus=num_gpus, seed=0).render()
+
+
+@cache
+def nvidia_smi_xml(num_gpus: int) -> str:
+    return NvidiaSmiSimulator(num_gpus=num_gpus, processes_per_gpu=4, seed=0).render()
+
+
+@cache
+def server_log(backend: str, lines: int) -> tuple[str, ...]:
+    noise = "INFO 06-10 12:00:00 metrics.py:341] Avg prompt throughput: 512.3 tokens/s"
+    if backend == "vllm":
+        finished = (
+            "INFO 06-10 12:00:00 async_llm_engine.py:140] Finished request cmpl-{i}. "
+            "arrival_time=100.0 first_scheduled_time=100.05 first_token_time=100.25 "
+            "finished_time=102.25 prompt_tokens=512 generation_tokens={i_mod} model=bench-model"
+        )
+    else:
+        finished = (
+            "2024-01-10T12:00:00.123456Z  INFO generate{{parameters=GenerateParameters "
+            '{{ max_new_tokens: Some({i_mod}) }} total_time="1.0134s" validation_time="234µs" '
+            'queue_time="60.5µs" inference_time="1.0131s" time_per_token="50.65ms" '
+            'seed="None"}}: text_generation_router::server: router/src/server.rs:289: Success'
+        )
+    return tuple(
+        finished.format(i=i, i_mod=i % 512 + 2) if i % 4 == 0 else noise for i in range(lines)
+    )
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    config = request.config
+    name = request.node.nodeid.split("::", 1)[1]
+    if request.node.cls is not None:
+        benchmark.group = request.node.cls.__name__
+
+    def run(func, *args, rounds=10, setup=None):
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        def pedantic_setup():
+            if setup is not None:
+                setup()
+            return args, {}
+
+        result = benchmark.pedantic(
+            func, setup=pedantic_setup, rounds=rounds, iterations=1, warmup_rounds=1
+        )
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        if benchmark.stats is None:
+            return result
+
+        stats = benchmark.stats.stats
+        config._benchmark_results[name] = {
+            "min_seconds": stats.min,
+            "median_seconds": stats.median,
+            "ops_per_second": 1.0 / stats.median if stats.median else 0.0,
+            "peak_memory_bytes": peak,
+        }
+        if config.getoption("--benchmark-check"):
+            path = Path(config.getoption("--benchmark-baseline-file"))
+            expected = _load_baseline(path)["benchmarks"].get(name)
+            if expected is not None:
+                _check_regression(config, name, stats.min, peak, expected)
+        return result
+
+    return run
+
+
+def _check_regression(config, name: str, fastest: float, peak: int, expected: dict) -> None:
+    # The fastest round is the least noisy estimate of the code's own cost, so
+    # it is what gets compared; median and ops/s are kept for reporting.
+    max_time = config.getoption("--benchmark-max-time-regression")
+    max_memory = config.getoption("--benchmark-max-memory-regression")
+    failures = []
+    allowed = max(expected["min_seconds"] * max_time, MIN_TIME_REGRESSION_SECONDS)
+    if fastest > expected["min_seconds"] + allowed:
+        failures.append(
+            f"min time {fastest * 1000:.3f}ms vs baseline "
+            f"{expected['min_seconds'] * 1000:.3f}ms (+{max_time:.0%} allowed)"
+        )
+    if peak > expected["peak_memory_bytes"] * (1 + max_memory):
+        failures.append(
+            f"peak memory {peak / 1024:.1f}KiB vs baseline "
+            f"{expected['peak_memory_bytes'] / 1024:.1f}KiB (+{max_memory:.0%} allowed)"
+        )
+    if failures:
+        pytest.fail(f"{name} regressed: " + "; ".join(failures))
@@ -0,0 +1,259 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY, generate_latest
+
+from exporters.gpu_exporter.exporter import GPU_FIELDS, NVIDIA_SMI_READ_SIZE, GPUExporter
+from exporters.logs.collector import LogCollector
+from exporters.recording.recorder import WindowedRecorder
+from exporters.simulator.server import MockInferenceServer
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.vllm_exporter.exporter import VLLM_RECORDING_SPEC, VLLMExporter
+from tests.benchmarks.conftest import (
+    GPU_SCALES,
+    LOG_LINES,
+    LOG_LINES_PER_SECOND,
+    SERIES_SCALES,
+    STARTUP_TIMEOUT,
+    nvidia_smi_xml,
+    server_log,
+    tgi_payload,
+    vllm_payload,
+)
+
+EXPORTER_MODULES = {
+    "vllm": "exporters.vllm_exporter.exporter",
+    "tgi": "exporters.tgi_exporter.exporter",
+    "gpu": "exporters.gpu_exporter.exporter",
+}
+
+
+def _rounds(series: int) -> int:
+    return 3 if series >= 100_000 else 10
+
+
+def _chunks(payload: str, size: int = NVIDIA_SMI_READ_SIZE) -> list[bytes]:
+    data = payload.encode()
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _cold_import(module: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_seconds(importtime: str, module: str) -> float:
+    for line in importtime.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _first_scrape(backend: str, endpoint: str, ready: bytes) -> float:
+    port = _free_port()
+    env = {
+        **os.environ,
+        f"{backend.upper()}_ENDPOINT": endpoint,
+        f"EXPORTER_PORT_{backend.upper()}": str(port),
+    }
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", EXPORTER_MODULES[backend]],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < STARTUP_TIMEOUT:
+            try:
+                if ready in httpx.get(f"http://127.0.0.1:{port}/metrics").content:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise AssertionError(f"{backend} exporter did not export {ready!r} in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _parse_tree(payload: bytes) -> list[dict[str, str | None]]:
+    root = ET.fromstring(payload)
+    return [{path: gpu.findtext(path) for path in GPU_FIELDS} for gpu in root.iter("gpu")]
+
+
+class TestVLLMExporterBenchmarks:
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_parse_prometheus_metrics(self, measure, series):
+        exporter = VLLMExporter()
+        payload = vllm_payload(series)
+
+        result = measure(exporter._parse_prometheus_metrics, payload, rounds=_rounds(series))
+
+        assert "vllm:num_requests_running" in result
+
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_update_prometheus_metrics(self, measure, series):
+        exporter = VLLMExporter(model="bench-model")
+        metrics = exporter._parse_prometheus_metrics(vllm_payload(series))
+
+        measure(exporter.update_prometheus_metrics, metrics, rounds=_rounds(series))
+
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_collect_unchanged_payload(self, measure, series):
+        exporter = VLLMExporter(model="bench-model")
+        payload = vllm_payload(series)
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        def collect():
+            exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        measure(collect, rounds=_rounds(series))
+
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_extract_gpu_memory(self, measure, num_gpus):
+        exporter = VLLMExporter()
+        metrics = exporter._parse_prometheus_metrics(vllm_payload(10_000, num_gpus=num_gpus))
+
+        result = measure(exporter._extract_gpu_memory, metrics, rounds=200)
+
+        assert len(result) == num_gpus
+
+
+class TestTGIExporterBenchmarks:
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_parse_prometheus_metrics(self, measure, series):
+        exporter = TGIExporter()
+        payload = tgi_payload(series)
+
+        result = measure(exporter._parse_prometheus_metrics, payload, rounds=_rounds(series))
+
+        assert "tgi_queue_size" in result
+
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_update_prometheus_metrics(self, measure, series):
+        exporter = TGIExporter(model="bench-model")
+        metrics = exporter._parse_prometheus_metrics(tgi_payload(series))
+
+        measure(exporter.update_prometheus_metrics, metrics, rounds=_rounds(series))
+
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_extract_gpu_memory(self, measure, num_gpus):
+        exporter = TGIExporter()
+        metrics = exporter._parse_prometheus_metrics(tgi_payload(10_000, num_gpus=num_gpus))
+
+        measure(exporter._extract_gpu_memory, metrics, rounds=200)
+
+
+class TestGPUExporterBenchmarks:
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_collect_metrics(self, measure, num_gpus):
+        exporter = GPUExporter()
+        xml_output = nvidia_smi_xml(num_gpus)
+
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[xml_output]):
+            result = measure(exporter.collect_metrics, rounds=20)
+
+        assert len(result) == num_gpus
+
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_parse_gpu_stream(self, measure, num_gpus):
+        exporter = GPUExporter()
+        chunks = _chunks(nvidia_smi_xml(num_gpus))
+
+        result = measure(exporter._parse_gpu_stream, chunks, rounds=20)
+
+        assert len(result) == num_gpus
+
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_parse_tree_reference(self, measure, num_gpus):
+        payload = nvidia_smi_xml(num_gpus).encode()
+
+        result = measure(_parse_tree, payload, rounds=20)
+
+        assert len(result) == num_gpus
+
+    @pytest.mark.parametrize("num_gpus", GPU_SCALES)
+    def test_update_prometheus_metrics(self, measure, num_gpus):
+        exporter = GPUExporter()
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[nvidia_smi_xml(num_gpus)]):
+            metrics_list = exporter.collect_metrics()
+
+        measure(exporter.update_prometheus_metrics, metrics_list, rounds=20)
+
+
+class TestRecordingBenchmarks:
+    @pytest.mark.parametrize("series", SERIES_SCALES)
+    def test_record(self, measure, series):
+        metrics = VLLMExporter()._parse_prometheus_metrics(vllm_payload(series))
+        recorder = WindowedRecorder(VLLM_RECORDING_SPEC)
+        labels = {"model": "bench-model", "endpoint": "http://bench:8000"}
+        recorder.record(metrics, labels)
+
+        measure(recorder.record, metrics, labels, rounds=_rounds(series))
+
+
+class TestRegistryBenchmarks:
+    @pytest.mark.parametrize("models", [1, 10, 100])
+    def test_registry_serialization(self, measure, models):
+        payload = vllm_payload(1_000)
+        for i in range(models):
+            exporter = VLLMExporter(endpoint=f"http://replica-{i}:8000", model=f"model-{i}")
+            exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(payload))
+
+        result = measure(generate_latest, REGISTRY, rounds=20)
+
+        assert b"vllm_queue_length" in result
+
+
+class TestLogCollectorBenchmarks:
+    @pytest.mark.parametrize("backend", ["vllm", "tgi"])
+    def test_process_lines(self, measure, benchmark, backend):
+        lines = server_log(backend, LOG_LINES)
+        collector = LogCollector(backend=backend, paths=["-"], endpoint="http://bench:8000")
+
+        result = measure(collector.process_lines, lines, "bench", rounds=10)
+
+        assert result == LOG_LINES // 4
+        if benchmark.stats is not None:
+            assert LOG_LINES / benchmark.stats.stats.min >= LOG_LINES_PER_SECOND
+
+
+class TestStartupBenchmarks:
+    @pytest.mark.parametrize("backend", ["vllm", "tgi", "gpu"])
+    def test_cold_import(self, measure, benchmark, backend):
+        module = EXPORTER_MODULES[backend]
+
+        result = measure(_cold_import, module, rounds=5)
+
+        benchmark.extra_info["import_seconds"] = _import_seconds(result.stderr, module)
+
+    @pytest.mark.parametrize(
+        "backend, ready", [("vllm", b"vllm_queue_length{"), ("tgi", b"tgi_queue_length{")]
+    )
+    def test_time_to_first_scrape(self, measure, backend, ready):
+        server = MockInferenceServer(backend=backend, seed=0).start()
+        try:
+            elapsed = measure(_first_scrape, backend, server.endpoint, ready, rounds=3)
+        finally:
+            server.stop()
+
+        assert elapsed < STARTUP_TIMEOUT
@@ -100,3 +100,42 @@ def mock_nvidia_smi_xml():
     </gpu>
 </nvidia_smi_log>
 """
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("token-path benchmarks")
+    group.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the exporter hot-path benchmarks in tests/benchmarks",
+    )
+    group.addoption(
+        "--benchmark-baseline-file",
+        default="tests/benchmarks/baseline.json",
+        help="Machine-readable baseline used by --benchmark-save-baseline/--benchmark-check",
+    )
+    group.addoption(
+        "--benchmark-save-baseline",
+        action="store_true",
+        default=False,
+        help="Store the results of this run as the benchmark baseline",
+    )
+    group.addoption(
+        "--benchmark-check",
+        action="store_true",
+        default=False,
+        help="Fail benchmarks that regress against the stored baseline",
+    )
+    group.addoption(
+        "--benchmark-max-time-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase of fastest-round time before failing (default: 0.25)",
+    )
+    group.addoption(
+        "--benchmark-max-memory-regression",
+        type=float,
+        default=0.10,
+        help="Allowed relative increase of peak memory before failing (default: 0.10)",
+    )
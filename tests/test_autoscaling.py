@@ -0,0 +1,153 @@
+import socket
+import time
+
+import httpx
+import pytest
+
+from exporters.autoscaling.server import quantity, selected_model, start_http_server
+from exporters.autoscaling.signals import (
+    MAX_SIGNAL_VALUE,
+    SIGNALS,
+    ScalingSignals,
+    TargetSignals,
+)
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+
+
+def target(endpoint, model=MODEL, updated=None, **values):
+    values.setdefault("queue_depth", 0.0)
+    return TargetSignals(
+        backend="vllm",
+        endpoint=endpoint,
+        model=model,
+        updated=time.monotonic() if updated is None else updated,
+        timestamp=0.0,
+        **values,
+    )
+
+
+@pytest.fixture
+def signals():
+    signals = ScalingSignals()
+    signals.update(
+        target(
+            "http://a:8000", queue_depth=6, kv_cache_usage=0.9, arrival_rate=3.0, completion_rate=2.0
+        )
+    )
+    signals.update(
+        target(
+            "http://b:8000", queue_depth=2, kv_cache_usage=0.5, arrival_rate=3.0, completion_rate=2.0
+        )
+    )
+    signals.update(target("http://c:8000", model="other", queue_depth=3))
+    return signals
+
+
+@pytest.fixture
+def server(signals):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = start_http_server(port, addr="127.0.0.1", signals=signals)
+    yield f"http://127.0.0.1:{port}"
+    server.shutdown()
+
+
+class TestScalingSignals:
+    def test_models_aggregate_targets(self, signals):
+        models = signals.models()
+
+        llama = models[MODEL]
+        assert llama.targets == 2
+        assert llama.queue_depth == 8
+        assert llama.kv_cache_usage == pytest.approx(0.7)
+        assert llama.predicted_wait_seconds == 2.0
+        assert 0 <= llama.age_seconds < 1.0
+        assert models["other"].predicted_wait_seconds is None
+
+    def test_stale_and_removed_targets_are_dropped(self, signals):
+        signals.update(target("http://b:8000", queue_depth=2, updated=time.monotonic() - 120))
+        signals.remove("http://c:8000")
+
+        models = signals.models(max_age=60.0)
+
+        assert list(models) == [MODEL]
+        assert models[MODEL].targets == 1
+
+    def test_unbounded_wait_is_clamped(self):
+        signals = ScalingSignals()
+        signals.update(target("http://stuck:8000", queue_depth=4, completion_rate=0.0))
+
+        assert signals.models()[MODEL].as_dict()["predicted_wait_seconds"] == MAX_SIGNAL_VALUE
+
+
+class TestSignalsServer:
+    def test_all_models(self, server):
+        body = httpx.get(f"{server}/autoscaling/v1/models").json()
+
+        assert set(body["models"]) == {MODEL, "other"}
+        assert body["models"][MODEL]["queue_depth"] == 8
+
+    def test_single_model_path_keeps_slashes(self, server):
+        response = httpx.get(f"{server}/autoscaling/v1/models/{MODEL}")
+        missing = httpx.get(f"{server}/autoscaling/v1/models/unknown")
+
+        assert response.json()["kv_cache_usage"] == pytest.approx(0.7)
+        assert missing.status_code == 404
+
+    def test_external_metrics_value_list(self, server):
+        response = httpx.get(
+            f"{server}/apis/external.metrics.k8s.io/v1beta1/namespaces/default/queue_depth",
+            params={"labelSelector": f"model={MODEL}"},
+        )
+        unknown = httpx.get(
+            f"{server}/apis/external.metrics.k8s.io/v1beta1/namespaces/default/nope"
+        )
+
+        body = response.json()
+        assert body["kind"] == "ExternalMetricValueList"
+        assert body["items"] == [
+            {
+                "metricName": "queue_depth",
+                "metricLabels": {"model": MODEL},
+                "timestamp": "1970-01-01T00:00:00Z",
+                "value": "8000m",
+            }
+        ]
+        assert unknown.status_code == 404
+
+    def test_prometheus_metrics_still_served(self, server):
+        httpx.get(f"{server}/autoscaling/v1/models")
+
+        response = httpx.get(f"{server}/metrics")
+
+        assert response.status_code == 200
+        assert 'autoscaling_requests_total{code="200",route="models"}' in response.text
+
+    def test_quantity_and_selector(self):
+        assert quantity(0.7) == "700m"
+        assert selected_model("app=x,model==m") == "m"
+        assert selected_model("app=x") is None
+
+
+class TestExporterSignals:
+    def test_vllm_update_publishes_signals(self, mock_vllm_metrics):
+        exporter = VLLMExporter(endpoint="http://signals-vllm:8000", model="signals-model")
+
+        payload = mock_vllm_metrics.replace("usage_perc 75.5", "usage_perc 0.755")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(payload))
+
+        models = SIGNALS.models(max_age=0)
+        assert models["signals-model"].queue_depth == 10
+        assert models["signals-model"].kv_cache_usage == pytest.approx(0.755)
+
+    @pytest.mark.asyncio
+    async def test_retarget_drops_signals(self, mock_vllm_metrics):
+        exporter = VLLMExporter(endpoint="http://signals-old:8000", model="retarget-model")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(mock_vllm_metrics))
+
+        await exporter.retarget("http://signals-new:8000")
+
+        assert "retarget-model" not in SIGNALS.models(max_age=0)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import math
+
+import pytest
+
+from exporters.bench.cli import main, push_periodically
+from exporters.bench.results import (
+    RequestRecord,
+    build_results,
+    format_report,
+    percentile,
+    read_results,
+    write_results,
+)
+from exporters.bench.runner import BenchmarkRunner
+from exporters.bench.workload import WorkloadItem, load_workload
+from exporters.probe.stream import StreamTiming
+from exporters.simulator.server import MockInferenceServer
+
+
+@pytest.fixture
+def mock_server():
+    server = MockInferenceServer(ttft=0.01, itl=0.002, seed=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def workload():
+    return [WorkloadItem(prompt="hello", max_tokens=4), WorkloadItem(prompt="hi", max_tokens=6)]
+
+
+class TestWorkload:
+    def test_load_workload(self, tmp_path):
+        path = tmp_path / "workload.jsonl"
+        path.write_text(
+            json.dumps({"prompt": "hello", "max_tokens": 8})
+            + "\n\n"
+            + json.dumps({"prompt_tokens": 3, "output_tokens": 16})
+            + "\n"
+        )
+
+        items = load_workload(path)
+
+        assert items[0] == WorkloadItem(prompt="hello", max_tokens=8)
+        assert items[1] == WorkloadItem(prompt="token token token", max_tokens=16)
+
+    def test_load_workload_rejects_invalid_entry(self, tmp_path):
+        path = tmp_path / "workload.jsonl"
+        path.write_text(json.dumps({"max_tokens": 8}) + "\n")
+
+        with pytest.raises(ValueError, match="workload.jsonl:1"):
+            load_workload(path)
+
+
+class TestResults:
+    def test_percentile(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+        assert percentile([1.0], 0.99) == 1.0
+        assert math.isnan(percentile([], 0.5))
+
+    def test_columnar_round_trip(self, tmp_path):
+        records = [
+            RequestRecord(10.0, 5, 4, StreamTiming(start=10.0, token_times=[10.5, 10.6], end=10.7)),
+            RequestRecord(10.1, 2, 4, StreamTiming(start=10.1, end=10.2, error="HTTPStatusError")),
+        ]
+        results = build_results(records, origin=10.0, meta={"duration": 1.0})
+        path = tmp_path / "results.tpb"
+
+        write_results(path, results)
+        loaded = read_results(path)
+
+        assert len(loaded) == 2
+        assert loaded.ok_indices() == [0]
+        assert loaded.ttfts() == pytest.approx([0.5])
+        assert loaded.itls() == pytest.approx([0.1])
+        assert list(loaded.token_times(1)) == []
+        assert loaded.meta["errors"] == ["HTTPStatusError"]
+        assert "error HTTPStatusError: 1" in format_report(loaded)
+
+
+class TestBenchmarkRunner:
+    def test_rejects_open_loop_without_rate(self, workload):
+        with pytest.raises(ValueError):
+            BenchmarkRunner("http://localhost", workload, mode="open", rate=0)
+
+    @pytest.mark.asyncio
+    async def test_closed_loop(self, mock_server, workload):
+        runner = BenchmarkRunner(
+            mock_server.endpoint, workload, concurrency=3, num_requests=9, seed=1
+        )
+
+        records = await runner.run()
+
+        assert runner.model == "mock-model"
+        assert len(records) == 9
+        assert all(r.timing.ok for r in records)
+        assert all(r.timing.tokens == r.max_tokens for r in records)
+
+    @pytest.mark.asyncio
+    async def test_open_loop_tgi(self, mock_server, workload):
+        seen = []
+        runner = BenchmarkRunner(
+            mock_server.endpoint,
+            workload,
+            backend="tgi",
+            mode="open",
+            rate=200.0,
+            num_requests=10,
+            seed=1,
+            on_result=seen.append,
+        )
+
+        records = await runner.run()
+
+        assert len(records) == 10
+        assert len(seen) == 10
+        starts = sorted(r.scheduled for r in records)
+        assert starts[-1] - starts[0] > 0
+
+
+class TestCli:
+    def test_runs_against_mock_server(self, tmp_path, capsys):
+        output = tmp_path / "results.tpb"
+
+        exit_code = main(
+            ["--mock", "--num-requests", "4", "--max-tokens", "3", "--output", str(output),
+             "--slo-ttft", "5"]
+        )
+
+        report = capsys.readouterr().out
+        assert exit_code == 0
+        assert "requests: 4  succeeded: 4" in report
+        assert "TTFT <= 5.0s: 100.00% of requests" in report
+        assert len(read_results(output)) == 4
+
+    async def test_remote_write_pushes_once_per_interval(self):
+        class Writer:
+            pushes = 0
+
+            def push(self):
+                self.pushes += 1
+
+        writer = Writer()
+        pusher = asyncio.create_task(push_periodically(writer, 0.05))
+        await asyncio.sleep(0.13)
+        pusher.cancel()
+
+        assert 1 <= writer.pushes <= 3
@@ -0,0 +1,155 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.breakdown.breakdown import (
+    OTHER_MODEL,
+    HistogramDelta,
+    ModelBreakdown,
+    group_histogram,
+    observe_delta,
+)
+from exporters.registry import DeltaHistogram
+from exporters.simulator.payloads import TGIMetricsSimulator, VLLMMetricsSimulator
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.vllm_exporter.exporter import VLLM_BREAKDOWN_SPEC, VLLMExporter
+
+BREAKDOWN_HISTOGRAM = DeltaHistogram(
+    "test_breakdown_seconds", "Breakdown replay target", ["model"], buckets=[0.1, 1.0]
+)
+
+
+def ttft_series(model_name, counts, total):
+    bounds = ["0.1", "1.0", "+Inf"]
+    items = [
+        {"labels": {"model_name": model_name, "le": le}, "value": float(count)}
+        for le, count in zip(bounds, counts)
+    ]
+    return {
+        "vllm:time_to_first_token_seconds_bucket": items,
+        "vllm:time_to_first_token_seconds_sum": [
+            {"labels": {"model_name": model_name}, "value": total}
+        ],
+    }
+
+
+def tokens(**per_model):
+    return {
+        "vllm:generation_tokens_total": [
+            {"labels": {"model_name": name}, "value": float(value)}
+            for name, value in per_model.items()
+        ]
+    }
+
+
+class TestModelBreakdown:
+    def test_group_histogram_by_model(self):
+        metrics = ttft_series("lora-a", [1, 3, 4], 2.5)
+
+        grouped = group_histogram(metrics, "vllm:time_to_first_token_seconds", "model_name")
+
+        assert grouped == {"lora-a": ((0.1, 1.0, float("inf")), [1.0, 3.0, 4.0, 2.5])}
+
+    def test_histogram_deltas_per_model(self):
+        breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, "http://bd:8000")
+        breakdown.update(ttft_series("lora-a", [1, 3, 4], 2.5), "base")
+
+        deltas = breakdown.update(ttft_series("lora-a", [2, 5, 7], 4.0), "base")
+
+        ttft = deltas["lora-a"].ttft
+        assert ttft.counts == [1.0, 1.0, 1.0]
+        assert ttft.sum == pytest.approx(1.5)
+
+    def test_counter_reset_counts_current_value(self):
+        breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, "http://bd:8000")
+        breakdown.update(tokens(**{"lora-a": 100}), "base")
+
+        assert breakdown.update(tokens(**{"lora-a": 30}), "base")["lora-a"].tokens == 30
+
+    def test_default_model_and_unlabeled_series(self):
+        breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, "http://bd:8000")
+        metrics = {"vllm:prompt_tokens_total": 10.0, **tokens(base=5)}
+
+        deltas = breakdown.update(metrics, "base")
+
+        assert deltas["base"].tokens == 15
+        assert breakdown.models == {}
+
+    def test_cap_folds_extra_adapters_into_other(self):
+        breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, "http://cap:8000", max_models=2)
+
+        deltas = breakdown.update(tokens(a=1, b=2, c=3, d=4), "base")
+
+        assert list(breakdown.models) == ["a", "b"]
+        assert deltas[OTHER_MODEL].tokens == 7
+        labels = {"backend": "vllm", "endpoint": "http://cap:8000"}
+        assert REGISTRY.get_sample_value("model_breakdown_models", labels) == 2
+        assert REGISTRY.get_sample_value("model_breakdown_overflow_models", labels) == 2
+
+    def test_refresh_prunes_models_no_longer_served(self):
+        breakdown = ModelBreakdown(VLLM_BREAKDOWN_SPEC, "http://prune:8000", max_models=2)
+        breakdown.update(tokens(a=1, b=2), "base")
+        breakdown.set_known_models(["base", "a", "b"], "base")
+        breakdown.update(tokens(a=2), "base")
+
+        stale = breakdown.set_known_models(["base", "a", "c"], "base")
+
+        assert stale == ["b"]
+        assert list(breakdown.models) == ["a", "c"]
+
+    def test_observe_delta_replays_buckets(self):
+        child = BREAKDOWN_HISTOGRAM.labels(model="replay")
+
+        observe_delta(child, HistogramDelta((0.05, 0.5, float("inf")), [2.0, 3.0, 1.0], 2.0))
+
+        labels = {"model": "replay"}
+        assert REGISTRY.get_sample_value("test_breakdown_seconds_count", labels) == 6
+        assert REGISTRY.get_sample_value("test_breakdown_seconds_sum", labels) == 2.0
+        assert REGISTRY.get_sample_value(
+            "test_breakdown_seconds_bucket", {**labels, "le": "0.1"}
+        ) == 2
+
+
+class TestExporterBreakdown:
+    def test_vllm_series_carry_model_name(self):
+        simulator = VLLMMetricsSimulator(model="base-model", num_models=3, num_gpus=0, seed=1)
+        exporter = VLLMExporter(endpoint="http://breakdown-vllm:8000", model="base-model")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(simulator.render()))
+
+        for model in simulator.models:
+            labels = {"model": model, "endpoint": "http://breakdown-vllm:8000"}
+            assert REGISTRY.get_sample_value("vllm_ttft_seconds_count", labels)
+            assert REGISTRY.get_sample_value("vllm_tokens_generated_total", labels)
+
+    def test_vllm_prefill_and_decode_tokens_are_split(self):
+        exporter = VLLMExporter(endpoint="http://split:8000", model="base")
+        metrics = {"vllm:prompt_tokens_total": 300.0, **tokens(base=40)}
+
+        exporter.update_prometheus_metrics(metrics)
+
+        labels = {"model": "base", "endpoint": "http://split:8000"}
+        assert REGISTRY.get_sample_value("vllm_prefill_tokens_total", labels) == 300
+        assert REGISTRY.get_sample_value("vllm_decode_tokens_total", labels) == 40
+        assert REGISTRY.get_sample_value("vllm_tokens_generated_total", labels) == 340
+
+    def test_vllm_unloaded_adapter_series_are_removed(self):
+        exporter = VLLMExporter(endpoint="http://unload:8000", model="base")
+        exporter.update_prometheus_metrics(tokens(**{"lora-a": 10, "lora-b": 5}))
+        exporter.refresh_models(["base", "lora-a", "lora-b"])
+        exporter.update_prometheus_metrics(tokens(**{"lora-a": 12}))
+
+        exporter.refresh_models(["base", "lora-a"])
+
+        labels = {"model": "lora-b", "endpoint": "http://unload:8000"}
+        assert REGISTRY.get_sample_value("vllm_tokens_generated_total", labels) is None
+        labels["model"] = "lora-a"
+        assert REGISTRY.get_sample_value("vllm_tokens_generated_total", labels) == 12
+
+    def test_tgi_series_carry_adapter_id(self):
+        simulator = TGIMetricsSimulator(num_adapters=2, num_gpus=0, seed=1)
+        exporter = TGIExporter(endpoint="http://breakdown-tgi:8080", model="tgi-base")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(simulator.render()))
+
+        for model in ["tgi-base", *simulator.adapters]:
+            labels = {"model": model, "endpoint": "http://breakdown-tgi:8080"}
+            assert REGISTRY.get_sample_value("tgi_itl_seconds_count", labels) is not None
+            assert REGISTRY.get_sample_value("tgi_tokens_generated_total", labels) is not None
@@ -0,0 +1,178 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.breaker.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(target="http://breaker:8000", **kwargs):
+    options = {
+        "failure_threshold": 3,
+        "min_backoff": 5.0,
+        "max_backoff": 60.0,
+        "jitter": 0.2,
+        "seed": 1,
+        "clock": FakeClock(),
+    }
+    options.update(kwargs)
+    return CircuitBreaker("test", target, **options)
+
+
+def response(text="", json=None):
+    mock_response = MagicMock()
+    mock_response.text = text
+    mock_response.json.return_value = json or {}
+    mock_response.raise_for_status = MagicMock()
+    return mock_response
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        circuit = breaker(target="http://breaker-open:8000")
+
+        for _ in range(2):
+            circuit.record_failure()
+        assert circuit.state == CLOSED
+        circuit.record_failure()
+
+        assert circuit.state == OPEN
+        assert not circuit.allow()
+        labels = {"exporter": "test", "target": "http://breaker-open:8000"}
+        assert REGISTRY.get_sample_value(
+            "exporter_target_circuit_state", {**labels, "state": OPEN}
+        ) == 1
+        assert REGISTRY.get_sample_value(
+            "exporter_target_circuit_state", {**labels, "state": CLOSED}
+        ) == 0
+        assert REGISTRY.get_sample_value("exporter_target_requests_skipped_total", labels) == 1
+
+    def test_success_resets_failure_count(self):
+        circuit = breaker()
+        circuit.record_failure()
+        circuit.record_failure()
+
+        assert circuit.record_success() is False
+        circuit.record_failure()
+
+        assert circuit.state == CLOSED
+
+    def test_half_open_probe_success_closes(self):
+        circuit = breaker()
+        for _ in range(3):
+            circuit.record_failure()
+        circuit.clock.now = circuit.retry_at
+
+        assert circuit.allow()
+        assert circuit.state == HALF_OPEN
+        assert not circuit.allow()
+        assert circuit.record_success() is True
+        assert circuit.state == CLOSED
+
+    def test_backoff_doubles_with_jitter_up_to_max(self):
+        circuit = breaker()
+        backoffs = []
+        for _ in range(3):
+            circuit.record_failure()
+        for _ in range(6):
+            backoffs.append(circuit.retry_at - circuit.clock.now)
+            circuit.clock.now = circuit.retry_at
+            assert circuit.allow()
+            circuit.record_failure()
+
+        for expected, backoff in zip([5, 10, 20, 40, 60, 60], backoffs):
+            assert expected * 0.8 <= backoff <= expected * 1.2
+        assert circuit.state == OPEN
+
+    def test_unfinished_probe_is_retried_after_min_backoff(self):
+        circuit = breaker()
+        for _ in range(3):
+            circuit.record_failure()
+        circuit.clock.now = circuit.retry_at
+        assert circuit.allow()
+
+        circuit.clock.now += 5.0
+
+        assert circuit.allow()
+        assert circuit.state == HALF_OPEN
+
+
+class TestExporterCircuitBreaker:
+    @pytest.mark.asyncio
+    async def test_vllm_skips_open_target_and_refetches_models_on_recovery(
+        self, mock_vllm_metrics
+    ):
+        exporter = VLLMExporter(endpoint="http://breaker-vllm:8000")
+        exporter.breaker.clock = FakeClock()
+
+        with patch.object(exporter.client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = httpx.ConnectError("Connection refused")
+            for _ in range(5):
+                assert await exporter.fetch_metrics() == {}
+            assert mock_get.call_count == 3
+            assert exporter.breaker.state == OPEN
+
+            exporter.breaker.clock.now = exporter.breaker.retry_at
+            mock_get.side_effect = [
+                response(text=mock_vllm_metrics),
+                response(json={"data": [{"id": "llama-3-8b"}]}),
+            ]
+            metrics = await exporter.fetch_metrics()
+
+        assert "vllm:num_requests_running" in metrics
+        assert exporter.breaker.state == CLOSED
+        assert exporter.model == "llama-3-8b"
+        assert mock_get.call_args.args[0] == "http://breaker-vllm:8000/v1/models"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("exporter_type", [VLLMExporter, TGIExporter])
+    async def test_failed_poll_records_one_failure(self, exporter_type):
+        exporter = exporter_type(endpoint="http://breaker-poll:8000")
+        exporter.breaker.clock = FakeClock()
+
+        with patch.object(exporter.client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = httpx.ConnectError("Connection refused")
+            for _ in range(3):
+                if exporter._model_refresh_due():
+                    await exporter.fetch_model_info()
+                await exporter.fetch_metrics()
+            assert exporter.breaker.state == OPEN
+            assert mock_get.call_count == 6
+
+            await exporter.fetch_model_info()
+
+        assert mock_get.call_count == 6
+        assert exporter._model_refresh_due()
+
+    @pytest.mark.asyncio
+    async def test_failed_model_info_is_retried(self):
+        exporter = TGIExporter(endpoint="http://breaker-tgi:8080")
+        exporter.model_refresh_interval = 0
+
+        with patch.object(exporter.client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = httpx.ConnectError("Connection refused")
+            await exporter.fetch_model_info()
+            assert exporter._model_refresh_due()
+
+            mock_get.side_effect = None
+            mock_get.return_value = response(json={"model_id": "tgi-model"})
+            await exporter.fetch_model_info()
+
+        assert exporter.model == "tgi-model"
+        assert not exporter._model_refresh_due()
+
+    def test_client_uses_short_connect_timeout(self):
+        exporter = VLLMExporter()
+
+        assert exporter.client.timeout.connect < exporter.client.timeout.read
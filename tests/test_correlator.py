@@ -0,0 +1,286 @@
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.correlator.correlator import DecodeRegimeCorrelator
+from exporters.correlator.regime import (
+    BATCH_LIMITED,
+    COMPUTE_BOUND,
+    IDLE,
+    MEMORY_BANDWIDTH_BOUND,
+    AlignedSample,
+    RegimeThresholds,
+    classify_regime,
+    itl_batch_elasticity,
+    summarize,
+)
+from exporters.gpu_exporter.exporter import GPUMetrics
+from exporters.simulator import MockInferenceServer, NvidiaSmiSimulator
+
+
+def make_samples(
+    batches,
+    itl_for_batch,
+    memory_bandwidth_util=0.7,
+    compute_util=0.5,
+    kv_cache_usage=0.5,
+    tokens_per_step=100.0,
+):
+    samples = []
+    itl_sum = itl_count = tokens = 0.0
+    for i, batch in enumerate(batches):
+        if i:
+            itl_sum += itl_for_batch(batch) * 10
+            itl_count += 10
+            tokens += tokens_per_step
+        samples.append(
+            AlignedSample(
+                timestamp=float(i),
+                skew=0.001,
+                memory_bandwidth_util=memory_bandwidth_util,
+                compute_util=compute_util,
+                clock_sm=1980,
+                running=batch,
+                kv_cache_usage=kv_cache_usage,
+                generation_tokens=tokens,
+                itl_sum=itl_sum,
+                itl_count=itl_count,
+            )
+        )
+    return samples
+
+
+def gpu_metrics(gpu_id=0, memory_bandwidth_util=0.8, compute_util=0.4):
+    return GPUMetrics(
+        gpu_id=gpu_id,
+        gpu_name="NVIDIA H100 80GB HBM3",
+        gpu_uuid=f"GPU-{gpu_id}",
+        vram_used=72 * 1024**3,
+        vram_total=80 * 1024**3,
+        vram_free=8 * 1024**3,
+        vram_utilization=0.9,
+        compute_utilization=compute_util,
+        temperature=60,
+        power_draw=500.0,
+        power_limit=700.0,
+        fan_speed=0,
+        clock_sm=1980,
+        clock_memory=2619,
+        pcie_tx=0,
+        pcie_rx=0,
+        memory_bandwidth_util=memory_bandwidth_util,
+        encoder_util=0.0,
+        decoder_util=0.0,
+        process_count=1,
+        is_memory_bound=False,
+    )
+
+
+def vllm_metrics(step, running=16.0):
+    return {
+        "vllm:num_requests_running": [{"labels": {}, "value": running}],
+        "vllm:gpu_cache_usage_perc": [{"labels": {}, "value": 0.6}],
+        "vllm:generation_tokens_total": [
+            {"labels": {"model_name": "base"}, "value": 60.0 * step},
+            {"labels": {"model_name": "lora"}, "value": 40.0 * step},
+        ],
+        "vllm:prompt_tokens_total": [{"labels": {}, "value": 300.0 * step}],
+        "vllm:time_per_output_token_seconds_sum": [{"labels": {}, "value": 0.2 * step}],
+        "vllm:time_per_output_token_seconds_count": [{"labels": {}, "value": 10.0 * step}],
+    }
+
+
+class TestRegimeClassification:
+    def test_elasticity_flat_itl(self):
+        points = [(batch, 0.02) for batch in (4, 8, 16, 32)]
+
+        assert itl_batch_elasticity(points, min_batch_spread=2.0) == pytest.approx(0.0)
+
+    def test_elasticity_linear_itl(self):
+        points = [(batch, 0.001 * batch) for batch in (4, 8, 16, 32)]
+
+        assert itl_batch_elasticity(points, min_batch_spread=2.0) == pytest.approx(1.0)
+
+    def test_elasticity_requires_batch_spread(self):
+        points = [(16.0, 0.02), (16.5, 0.03)]
+
+        assert itl_batch_elasticity(points, min_batch_spread=2.0) is None
+
+    def test_memory_bandwidth_bound(self):
+        samples = make_samples([4, 8, 16, 32, 16, 8], lambda batch: 0.02)
+
+        summary = summarize(samples)
+
+        assert summary.itl == pytest.approx(0.02)
+        assert summary.tokens_per_second == pytest.approx(100.0)
+        assert classify_regime(summary, RegimeThresholds()) == MEMORY_BANDWIDTH_BOUND
+
+    def test_compute_bound(self):
+        samples = make_samples([4, 8, 16, 32, 16, 8], lambda batch: 0.001 * batch)
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) == COMPUTE_BOUND
+
+    def test_compute_bound_without_batch_spread(self):
+        samples = make_samples(
+            [64] * 6, lambda batch: 0.05, memory_bandwidth_util=0.5, compute_util=0.95
+        )
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) == COMPUTE_BOUND
+
+    def test_batch_limited(self):
+        samples = make_samples(
+            [2, 1, 2, 1, 2], lambda batch: 0.01, memory_bandwidth_util=0.1, compute_util=0.15
+        )
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) == BATCH_LIMITED
+
+    def test_saturated_kv_cache_is_not_batch_limited(self):
+        samples = make_samples(
+            [2, 2, 2, 2],
+            lambda batch: 0.01,
+            memory_bandwidth_util=0.1,
+            compute_util=0.05,
+            kv_cache_usage=0.97,
+        )
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) == MEMORY_BANDWIDTH_BOUND
+
+    def test_idle(self):
+        samples = make_samples([0, 0, 0, 0], lambda batch: 0.0, tokens_per_step=0.0)
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) == IDLE
+
+    def test_insufficient_samples(self):
+        samples = make_samples([8, 16], lambda batch: 0.02)
+
+        assert classify_regime(summarize(samples), RegimeThresholds()) is None
+
+
+class TestDecodeRegimeCorrelator:
+    def test_window_samples(self):
+        correlator = DecodeRegimeCorrelator(interval=0.5, window=30.0)
+
+        assert correlator.window_samples == 60
+
+    def test_observe_and_classify(self):
+        correlator = DecodeRegimeCorrelator(model="corr-model", interval=1.0, window=5.0)
+        for step in range(8):
+            correlator.observe(
+                [gpu_metrics(0), gpu_metrics(1)], vllm_metrics(step), step + 0.01, float(step)
+            )
+
+        summaries = correlator.classify()
+        correlator.update_prometheus_metrics(summaries)
+
+        assert len(correlator._samples[("0", "GPU-0")]) == 5
+        assert correlator.regimes[("0", "GPU-0")] == MEMORY_BANDWIDTH_BOUND
+        assert summaries[("1", "GPU-1")].max_skew == pytest.approx(0.01)
+        labels = {"gpu_id": "0", "gpu_uuid": "GPU-0", "model": "corr-model"}
+        assert REGISTRY.get_sample_value(
+            "gpu_decode_regime", {**labels, "regime": MEMORY_BANDWIDTH_BOUND}
+        ) == 1
+        assert REGISTRY.get_sample_value("gpu_decode_regime", {**labels, "regime": IDLE}) == 0
+        assert REGISTRY.get_sample_value("gpu_decode_tokens_per_second", labels) == 50.0
+        assert REGISTRY.get_sample_value("gpu_prefill_tokens_per_second", labels) == 150.0
+        assert REGISTRY.get_sample_value("gpu_tokens_per_second", labels) == 200.0
+
+    def test_gpu_filter(self):
+        correlator = DecodeRegimeCorrelator(gpu_ids=[1])
+
+        correlator.observe([gpu_metrics(0), gpu_metrics(1)], vllm_metrics(1), 0.0, 0.0)
+
+        assert list(correlator._samples) == [("1", "GPU-1")]
+
+    def test_tokens_split_across_serving_gpus_only(self):
+        correlator = DecodeRegimeCorrelator(model="split-model", interval=1.0, window=5.0)
+        gpus = [gpu_metrics(0), gpu_metrics(1), gpu_metrics(2)]
+        with patch.object(
+            correlator.mapper, "resolve", return_value=("config", gpus[:2])
+        ) as resolve:
+            for step in range(8):
+                correlator.observe(gpus, vllm_metrics(step), float(step), float(step))
+        correlator._samples[("1", "GPU-1")].clear()
+
+        correlator.update_prometheus_metrics(correlator.classify())
+
+        resolve.assert_called_with(correlator.vllm_exporter.endpoint, gpus)
+        assert list(correlator._samples) == [("0", "GPU-0"), ("1", "GPU-1")]
+        labels = {"gpu_id": "0", "gpu_uuid": "GPU-0", "model": "split-model"}
+        assert REGISTRY.get_sample_value("gpu_tokens_per_second", labels) == 200.0
+
+    def test_per_gpu_rates_sum_to_endpoint_total(self):
+        correlator = DecodeRegimeCorrelator(model="tp-model", interval=1.0, window=5.0)
+        gpus = [gpu_metrics(index) for index in range(4)]
+        for step in range(8):
+            correlator.observe(gpus, vllm_metrics(step), float(step), float(step))
+
+        correlator.update_prometheus_metrics(correlator.classify())
+
+        def total(name):
+            return sum(
+                REGISTRY.get_sample_value(
+                    name, {"gpu_id": str(index), "gpu_uuid": f"GPU-{index}", "model": "tp-model"}
+                )
+                for index in range(4)
+            )
+
+        assert total("gpu_decode_tokens_per_second") == pytest.approx(100.0)
+        assert total("gpu_prefill_tokens_per_second") == pytest.approx(300.0)
+        assert total("gpu_tokens_per_second") == pytest.approx(400.0)
+
+    def test_counter_reset_clears_window(self):
+        correlator = DecodeRegimeCorrelator()
+        for step in range(5):
+            correlator.observe([gpu_metrics()], vllm_metrics(step + 10), float(step), float(step))
+
+        correlator.observe([gpu_metrics()], vllm_metrics(1), 5.0, 5.0)
+
+        assert len(correlator._samples[("0", "GPU-0")]) == 1
+
+    def test_multi_series_inputs_are_summed(self):
+        correlator = DecodeRegimeCorrelator()
+        metrics = {
+            **vllm_metrics(2),
+            "vllm:num_requests_running": [
+                {"labels": {"model_name": "base"}, "value": 6.0},
+                {"labels": {"model_name": "other"}, "value": 10.0},
+            ],
+            "vllm:gpu_cache_usage_perc": [
+                {"labels": {"model_name": "base"}, "value": 0.2},
+                {"labels": {"model_name": "other"}, "value": 0.6},
+            ],
+            "vllm:time_per_output_token_seconds_count": [
+                {"labels": {"model_name": "base"}, "value": 15.0},
+                {"labels": {"model_name": "other"}, "value": 5.0},
+            ],
+        }
+
+        correlator.observe([gpu_metrics()], metrics, 0.0, 0.0)
+
+        sample = correlator._samples[("0", "GPU-0")][-1]
+        assert sample.running == 16.0
+        assert sample.kv_cache_usage == pytest.approx(0.4)
+        assert sample.generation_tokens == 200.0
+        assert sample.itl_count == 20.0
+
+    @pytest.mark.asyncio
+    async def test_sample_from_simulators(self):
+        server = MockInferenceServer(seed=1).start()
+        xml_output = NvidiaSmiSimulator(num_gpus=2, seed=1).render()
+        try:
+            correlator = DecodeRegimeCorrelator(endpoint=server.endpoint)
+            with patch.object(
+                correlator.gpu_exporter, "_stream_nvidia_smi", return_value=[xml_output]
+            ):
+                for _ in range(3):
+                    gpu_list, metrics = await correlator.sample()
+        finally:
+            await correlator.vllm_exporter.client.aclose()
+            server.stop()
+
+        assert len(gpu_list) == 2
+        assert "vllm:num_requests_running" in metrics
+        window = correlator._samples[("0", gpu_list[0].gpu_uuid)]
+        assert len(window) == 3
+        assert all(sample.skew >= 0 for sample in window)
@@ -0,0 +1,258 @@
+import os
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.breakdown.breakdown import HistogramDelta, ModelDelta
+from exporters.efficiency.collector import EfficiencyCollector, attribution_weights
+from exporters.efficiency.mapping import (
+    SOURCE_ALL,
+    SOURCE_CONFIG,
+    SOURCE_CUDA_VISIBLE_DEVICES,
+    SOURCE_NONE,
+    SOURCE_PID,
+    GPUMapper,
+    ProcessTable,
+    endpoint_port,
+    select_devices,
+)
+from exporters.efficiency.power import EnergyMeter, NvidiaSmiPowerReader, parse_power_csv
+from exporters.gpu_exporter.exporter import GPUMetrics
+from exporters.gpu_exporter.processes import GPUProcess
+
+SERVER_PORT = 8000
+SOCKET_INODE = "424242"
+
+
+def gpu(gpu_id, pids=()):
+    return GPUMetrics(
+        gpu_id=gpu_id,
+        gpu_name="NVIDIA H100 80GB HBM3",
+        gpu_uuid=f"GPU-{gpu_id}aaaa",
+        vram_used=0,
+        vram_total=0,
+        vram_free=0,
+        vram_utilization=0.0,
+        compute_utilization=0.0,
+        temperature=0,
+        power_draw=0.0,
+        power_limit=700.0,
+        fan_speed=0,
+        clock_sm=0,
+        clock_memory=0,
+        pcie_tx=0,
+        pcie_rx=0,
+        memory_bandwidth_util=0.0,
+        encoder_util=0.0,
+        decoder_util=0.0,
+        process_count=len(pids),
+        is_memory_bound=False,
+        processes=[GPUProcess(pid, "python3", "C", 1024) for pid in pids],
+    )
+
+
+def write_process(proc_root, pid, parent, environ=b""):
+    process = proc_root / str(pid)
+    (process / "fd").mkdir(parents=True)
+    (process / "stat").write_text(f"{pid} (vllm worker) S {parent} {pid} {pid} 0")
+    (process / "environ").write_bytes(environ)
+    return process
+
+
+@pytest.fixture
+def proc_root(tmp_path):
+    (tmp_path / "net").mkdir()
+    (tmp_path / "net" / "tcp").write_text(
+        "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid"
+        "  timeout inode\n"
+        f"   0: 00000000:{SERVER_PORT:04X} 00000000:0000 0A 00000000:00000000 00:00000000"
+        f" 00000000  1000        0 {SOCKET_INODE} 1 0000000000000000 100 0 0 10 0\n"
+    )
+    server = write_process(tmp_path, 100, 1, b"PATH=/bin\0CUDA_VISIBLE_DEVICES=GPU-1\0")
+    os.symlink(f"socket:[{SOCKET_INODE}]", server / "fd" / "7")
+    write_process(tmp_path, 101, 100)
+    write_process(tmp_path, 200, 1)
+    return tmp_path
+
+
+def vllm_tokens(prompt, generation):
+    return {
+        "vllm:prompt_tokens_total": [
+            {"labels": {"model_name": name}, "value": float(value)}
+            for name, value in prompt.items()
+        ],
+        "vllm:generation_tokens_total": [
+            {"labels": {"model_name": name}, "value": float(value)}
+            for name, value in generation.items()
+        ],
+    }
+
+
+class TestGPUMapping:
+    def test_endpoint_port_only_for_local_servers(self):
+        assert endpoint_port("http://localhost:8000") == 8000
+        assert endpoint_port("https://127.0.0.1") == 443
+        assert endpoint_port("http://vllm.internal:8000") is None
+
+    def test_select_devices_by_index_and_uuid_prefix(self):
+        gpus = [gpu(0), gpu(1), gpu(2)]
+
+        selected = select_devices(["2", "GPU-0", "2"], gpus)
+
+        assert [g.gpu_id for g in selected] == [2, 0]
+        assert select_devices(["1", "MIG-abc", "2"], gpus) == [gpus[1]]
+
+    def test_process_table(self, proc_root):
+        processes = ProcessTable(str(proc_root))
+
+        assert processes.socket_owner(processes.listening_inodes(SERVER_PORT)) == 100
+        assert processes.listening_inodes(9999) == set()
+        assert processes.descendants(100) == {100, 101}
+        assert processes.environ(100, "CUDA_VISIBLE_DEVICES") == "GPU-1"
+
+    def test_config_mapping_wins(self, proc_root):
+        mapper = GPUMapper({"http://localhost:8000/": ["1"]}, str(proc_root))
+
+        source, gpus = mapper.resolve("http://localhost:8000", [gpu(0, [101]), gpu(1)])
+
+        assert source == SOURCE_CONFIG
+        assert [g.gpu_id for g in gpus] == [1]
+
+    def test_pid_mapping_follows_server_process_tree(self, proc_root):
+        mapper = GPUMapper(proc_root=str(proc_root))
+
+        source, gpus = mapper.resolve(
+            "http://localhost:8000", [gpu(0, [101]), gpu(1, [200]), gpu(2, [100])]
+        )
+
+        assert source == SOURCE_PID
+        assert [g.gpu_id for g in gpus] == [0, 2]
+
+    def test_cuda_visible_devices_before_processes_appear(self, proc_root):
+        mapper = GPUMapper(proc_root=str(proc_root))
+
+        source, gpus = mapper.resolve("http://localhost:8000", [gpu(0), gpu(1)])
+
+        assert source == SOURCE_CUDA_VISIBLE_DEVICES
+        assert [g.gpu_id for g in gpus] == [1]
+
+    def test_unmapped_server_falls_back_to_all_gpus_only_when_alone(self, proc_root):
+        mapper = GPUMapper(proc_root=str(proc_root))
+        gpus = [gpu(0), gpu(1)]
+
+        assert mapper.resolve("http://vllm.internal:8000", gpus) == (SOURCE_ALL, gpus)
+        assert mapper.resolve("http://vllm.internal:8000", gpus, servers=2) == (SOURCE_NONE, [])
+
+
+class TestEnergyMeter:
+    def test_trapezoid_integration(self):
+        meter = EnergyMeter()
+
+        meter.add(0.0, {"GPU-0": 100.0})
+        meter.add(0.5, {"GPU-0": 300.0})
+        meter.add(1.0, {"GPU-0": 300.0, "GPU-1": 50.0})
+
+        assert meter.energy("GPU-0") == pytest.approx(250.0)
+        assert meter.energy("GPU-1") == 0.0
+        assert meter.energy("GPU-2") is None
+
+    def test_parse_power_csv(self):
+        output = "GPU-0aaaa, 312.45\nGPU-1aaaa, [N/A]\n"
+
+        assert parse_power_csv(output) == {"GPU-0aaaa": 312.45}
+
+    @pytest.mark.asyncio
+    async def test_nvidia_smi_power_interval_follows_settings(self):
+        collector = EfficiencyCollector(servers={}, reader=NvidiaSmiPowerReader(min_interval=5.0))
+
+        await collector.apply_settings({"efficiency_nvidia_smi_power_interval": 0.5})
+
+        assert collector.reader is not None
+        assert collector.reader.min_interval == 0.5
+
+
+class TestEfficiencyCollector:
+    def test_attribution_prefers_busy_time_over_tokens(self):
+        deltas = {
+            "base": ModelDelta(
+                itl=HistogramDelta((0.1, float("inf")), [1.0, 0.0], 3.0), decode_tokens=100.0
+            ),
+            "lora": ModelDelta(
+                itl=HistogramDelta((0.1, float("inf")), [1.0, 0.0], 1.0), decode_tokens=100.0
+            ),
+        }
+
+        assert attribution_weights(deltas) == {"base": 0.75, "lora": 0.25}
+        assert attribution_weights({"a": ModelDelta(), "b": ModelDelta()}) == {
+            "a": 0.5,
+            "b": 0.5,
+        }
+
+    def test_tokens_per_joule_and_cost_per_model(self):
+        endpoint = "http://efficiency:8000"
+        collector = EfficiencyCollector(
+            servers={endpoint: "vllm"},
+            gpu_map={endpoint: ["0", "1"]},
+            energy_price_per_kwh=0.36,
+            gpu_hourly_cost=3.6,
+        )
+        target = collector.targets[0]
+        target.exporter.model = "base"
+        collector.map_gpus([gpu(0), gpu(1), gpu(2)])
+        readings = {"GPU-0aaaa": 300.0, "GPU-1aaaa": 300.0, "GPU-2aaaa": 700.0}
+
+        collector.sample_power(0.0, readings)
+        collector.account(target, vllm_tokens({"base": 0, "lora": 0}, {"base": 0, "lora": 0}), 0.0)
+        collector.sample_power(10.0, readings)
+        collector.account(
+            target, vllm_tokens({"base": 1400, "lora": 700}, {"base": 600, "lora": 300}), 10.0
+        )
+
+        labels = {"backend": "vllm", "endpoint": endpoint}
+        assert REGISTRY.get_sample_value("efficiency_server_power_watts", labels) == 600.0
+        assert REGISTRY.get_sample_value(
+            "efficiency_server_gpus", {**labels, "source": SOURCE_CONFIG}
+        ) == 2
+        base = {**labels, "model": "base"}
+        assert REGISTRY.get_sample_value("efficiency_energy_joules_total", base) == 4000.0
+        assert REGISTRY.get_sample_value("efficiency_tokens_per_joule", base) == 0.5
+        assert REGISTRY.get_sample_value(
+            "efficiency_cost_per_million_tokens", base
+        ) == pytest.approx(0.0206 / 3000 * 1e6)
+
+    def test_shared_gpu_energy_is_split_between_servers(self):
+        collector = EfficiencyCollector(
+            servers={"http://shared-a:8000": "vllm", "http://shared-b:8080": "tgi"},
+            gpu_map={"http://shared-a:8000": ["0"], "http://shared-b:8080": ["0"]},
+        )
+        collector.map_gpus([gpu(0)])
+        for timestamp in (0.0, 4.0):
+            collector.sample_power(timestamp, {"GPU-0aaaa": 200.0})
+            for target in collector.targets:
+                collector.account(target, {}, timestamp)
+
+        for target in collector.targets:
+            labels = {"backend": target.backend, "endpoint": target.endpoint}
+            assert REGISTRY.get_sample_value("efficiency_server_power_watts", labels) == 100.0
+            assert REGISTRY.get_sample_value(
+                "efficiency_cost_per_million_tokens", {**labels, "model": "unknown"}
+            ) is None
+
+    def test_unloaded_model_series_are_removed(self):
+        endpoint = "http://efficiency-unload:8000"
+        collector = EfficiencyCollector(servers={endpoint: "vllm"}, gpu_map={endpoint: ["0"]})
+        target = collector.targets[0]
+        target.exporter.model = "base"
+        collector.map_gpus([gpu(0)])
+        for timestamp, lora in ((0.0, 0), (1.0, 10)):
+            collector.sample_power(timestamp, {"GPU-0aaaa": 100.0})
+            collector.account(target, vllm_tokens({}, {"base": 0, "lora": lora}), timestamp)
+        labels = {"backend": "vllm", "model": "lora", "endpoint": endpoint}
+        assert REGISTRY.get_sample_value("efficiency_energy_joules_total", labels) == 100.0
+
+        for _ in range(2):
+            target.exporter.refresh_models(["base"])
+            collector.prune_models(target)
+
+        assert REGISTRY.get_sample_value("efficiency_energy_joules_total", labels) is None
+        assert target.models == {"base"}
@@ -1,7 +1,37 @@
+import sys
+from pathlib import Path
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from exporters.gpu_exporter import exporter as gpu_exporter_module
+from exporters.gpu_exporter import processes as processes_module
+from exporters.gpu_exporter.exporter import GPUExporter, GPUMetrics, NvidiaSmiError
+from exporters.gpu_exporter.processes import (
+    ContainerResolver,
+    NVMLProcessSampler,
+    parse_container_id,
+)
+from exporters.simulator import NvidiaSmiSimulator
 
-from exporters.gpu_exporter.exporter import GPUExporter, GPUMetrics
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CONTAINER_ID = "3f4e" * 16
+
+
+@pytest.fixture
+def fake_nvidia_smi(tmp_path, monkeypatch):
+    script = tmp_path / "nvidia-smi"
+    script.write_text(
+        f"#!/bin/sh\nPYTHONPATH={REPO_ROOT} exec {sys.executable} "
+        '-m exporters.simulator.nvidia_smi "$@"\n'
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("SIM_NVIDIA_SMI_SEED", "0")
+    return str(script)
 
 
 class TestGPUExporter:
@@ -16,6 +46,8 @@ class TestGPUExporter:
         assert exporter._safe_float("42.5") == 42.5
         assert exporter._safe_float(None) == 0.0
         assert exporter._safe_float("invalid", default=10.0) == 10.0
+        assert exporter._safe_float("250.50 W") == 250.5
+        assert exporter._safe_float("", default=1.0) == 1.0
 
     def test_safe_int(self):
         exporter = GPUExporter()
@@ -24,6 +56,7 @@ class TestGPUExporter:
         assert exporter._safe_int("42.9") == 42
         assert exporter._safe_int(None) == 0
         assert exporter._safe_int("invalid", default=10) == 10
+        assert exporter._safe_int("1410 MHz") == 1410
 
     def test_parse_memory_mib(self):
         exporter = GPUExporter()
@@ -45,91 +78,174 @@ class TestGPUExporter:
 
         assert exporter._parse_memory(None) == 0
 
-    def test_run_nvidia_smi_success(self):
+    def test_parse_gpu_stream(self, mock_nvidia_smi_xml):
         exporter = GPUExporter()
 
-        with patch("subprocess.run") as mock_run:
-            mock_result = MagicMock()
-            mock_result.returncode = 0
-            mock_result.stdout = "test output"
-            mock_run.return_value = mock_result
-
-            result = exporter._run_nvidia_smi(["-q", "-x"])
+        result = exporter._parse_gpu_stream([mock_nvidia_smi_xml])
 
-            assert result == "test output"
-            mock_run.assert_called_once()
+        assert len(result) == 1
+        assert result[0].gpu_uuid == "GPU-12345678-1234-1234-1234-123456789012"
 
-    def test_run_nvidia_smi_failure(self):
+    def test_collect_metrics(self, mock_nvidia_smi_xml):
         exporter = GPUExporter()
 
-        with patch("subprocess.run") as mock_run:
-            mock_result = MagicMock()
-            mock_result.returncode = 1
-            mock_result.stderr = "error"
-            mock_run.return_value = mock_result
-
-            result = exporter._run_nvidia_smi(["-q", "-x"])
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[mock_nvidia_smi_xml]):
+            metrics_list = exporter.collect_metrics()
 
-            assert result == ""
+            assert len(metrics_list) == 1
+            metrics = metrics_list[0]
+            assert metrics.gpu_id == 0
+            assert metrics.gpu_name == "NVIDIA A100-SXM4-80GB"
+            assert metrics.vram_total > 0
+            assert metrics.vram_used > 0
+            assert metrics.compute_utilization == 0.75
 
-    def test_run_nvidia_smi_timeout(self):
+    def test_collect_metrics_empty_output(self):
         exporter = GPUExporter()
 
-        import subprocess
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[]):
+            metrics_list = exporter.collect_metrics()
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.side_effect = subprocess.TimeoutExpired("nvidia-smi", 30)
+            assert len(metrics_list) == 0
 
-            result = exporter._run_nvidia_smi(["-q", "-x"])
+    def test_parse_gpu_stream_chunked(self):
+        exporter = GPUExporter()
+        xml_output = NvidiaSmiSimulator(num_gpus=4, processes_per_gpu=2, seed=0).render()
+        data = xml_output.encode()
+        chunks = [data[i : i + 97] for i in range(0, len(data), 97)]
 
-            assert result == ""
+        metrics_list = exporter._parse_gpu_stream(chunks)
 
-    def test_run_nvidia_smi_not_found(self):
+        assert metrics_list == exporter._parse_gpu_stream([xml_output])
+        assert [m.gpu_id for m in metrics_list] == [0, 1, 2, 3]
+        assert all(m.process_count == 2 for m in metrics_list)
+        assert all(m.power_draw > 0 and m.clock_sm > 0 for m in metrics_list)
+
+    def test_parse_gpu_stream_truncated(self, mock_nvidia_smi_xml):
         exporter = GPUExporter()
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.side_effect = FileNotFoundError()
+        result = exporter._parse_gpu_stream([mock_nvidia_smi_xml[:-40]])
+
+        assert result == []
 
-            result = exporter._run_nvidia_smi(["-q", "-x"])
+    def test_parse_gpu_stream_invalid(self):
+        exporter = GPUExporter()
 
-            assert result == ""
+        assert exporter._parse_gpu_stream([b"not valid xml"]) == []
+        assert exporter._parse_gpu_stream(["not valid xml"]) == []
 
-    def test_parse_xml_output_success(self, mock_nvidia_smi_xml):
+    def test_stream_nvidia_smi(self, fake_nvidia_smi, monkeypatch):
+        monkeypatch.setenv("SIM_NVIDIA_SMI_GPUS", "16")
         exporter = GPUExporter()
+        exporter._nvidia_smi_path = fake_nvidia_smi
 
-        result = exporter._parse_xml_output(mock_nvidia_smi_xml)
+        metrics_list = exporter.collect_metrics()
 
-        assert result is not None
-        assert result.tag == "nvidia_smi_log"
+        assert [m.gpu_id for m in metrics_list] == list(range(16))
 
-    def test_parse_xml_output_invalid(self):
+    def test_stream_nvidia_smi_failure(self, fake_nvidia_smi, monkeypatch):
+        monkeypatch.setenv("SIM_NVIDIA_SMI_ERROR_RATE", "1")
         exporter = GPUExporter()
+        exporter._nvidia_smi_path = fake_nvidia_smi
 
-        result = exporter._parse_xml_output("not valid xml")
+        with pytest.raises(NvidiaSmiError):
+            list(exporter._stream_nvidia_smi(["-q", "-x"]))
+        assert exporter.collect_metrics() == []
 
-        assert result is None
+    def test_stream_nvidia_smi_timeout(self, fake_nvidia_smi, monkeypatch):
+        monkeypatch.setenv("SIM_NVIDIA_SMI_LATENCY", "5")
+        monkeypatch.setattr(gpu_exporter_module, "NVIDIA_SMI_TIMEOUT", 0.2)
+        exporter = GPUExporter()
+        exporter._nvidia_smi_path = fake_nvidia_smi
 
-    def test_collect_metrics(self, mock_nvidia_smi_xml):
+        with pytest.raises(NvidiaSmiError, match="timed out"):
+            list(exporter._stream_nvidia_smi(["-q", "-x"]))
+
+    def test_stream_nvidia_smi_with_noisy_stderr(self, fake_nvidia_smi, tmp_path, monkeypatch):
+        script = tmp_path / "noisy-nvidia-smi"
+        script.write_text(
+            f"#!/bin/sh\nhead -c 1000000 /dev/zero >&2\nexec {fake_nvidia_smi} \"$@\"\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setattr(gpu_exporter_module, "NVIDIA_SMI_TIMEOUT", 5.0)
         exporter = GPUExporter()
+        exporter._nvidia_smi_path = str(script)
 
-        with patch.object(exporter, "_run_nvidia_smi", return_value=mock_nvidia_smi_xml):
-            metrics_list = exporter.collect_metrics()
+        metrics_list = exporter.collect_metrics()
 
-            assert len(metrics_list) == 1
-            metrics = metrics_list[0]
-            assert metrics.gpu_id == 0
-            assert metrics.gpu_name == "NVIDIA A100-SXM4-80GB"
-            assert metrics.vram_total > 0
-            assert metrics.vram_used > 0
-            assert metrics.compute_utilization == 0.75
+        assert len(metrics_list) > 0
 
-    def test_collect_metrics_empty_output(self):
+    def test_stream_nvidia_smi_not_found(self, tmp_path):
         exporter = GPUExporter()
+        exporter._nvidia_smi_path = str(tmp_path / "missing")
+
+        assert exporter.collect_metrics() == []
+
+    def test_collect_metrics_processes(self, tmp_path):
+        xml_output = NvidiaSmiSimulator(num_gpus=2, processes_per_gpu=2, seed=0).render()
+        exporter = GPUExporter()
+        exporter.container_resolver = ContainerResolver(str(tmp_path))
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[xml_output]):
+            pid = exporter._parse_gpu_stream([xml_output])[0].processes[0].pid
+            (tmp_path / str(pid)).mkdir()
+            (tmp_path / str(pid) / "cgroup").write_text(f"0::/docker/{CONTAINER_ID}\n")
+            exporter.nvml = SimpleNamespace(sm_utilization=lambda uuid: {pid: 0.42})
 
-        with patch.object(exporter, "_run_nvidia_smi", return_value=""):
             metrics_list = exporter.collect_metrics()
 
-            assert len(metrics_list) == 0
+        process = metrics_list[0].processes[0]
+        assert process.pid == pid
+        assert process.container == CONTAINER_ID[:12]
+        assert process.sm_utilization == 0.42
+        assert process.used_memory > 0
+        assert metrics_list[0].processes[1].sm_utilization is None
+        assert len(exporter.container_resolver) == 4
+
+    def test_update_process_metrics_removes_exited(self):
+        xml_output = NvidiaSmiSimulator(num_gpus=1, processes_per_gpu=2, seed=3).render()
+        exporter = GPUExporter()
+        with patch.object(exporter, "_stream_nvidia_smi", return_value=[xml_output]):
+            metrics_list = exporter.collect_metrics()
+        exited = metrics_list[0].processes.pop()
+        labels = {
+            "gpu_id": "0",
+            "gpu_uuid": metrics_list[0].gpu_uuid,
+            "pid": str(exited.pid),
+            "process_name": exited.process_name,
+            "container": exited.container,
+        }
+
+        exporter.update_prometheus_metrics(metrics_list)
+        metrics_list[0].processes.append(exited)
+        exporter.update_prometheus_metrics(metrics_list)
+        assert REGISTRY.get_sample_value("gpu_process_memory_bytes", labels) == exited.used_memory
+
+        metrics_list[0].processes.remove(exited)
+        exporter.update_prometheus_metrics(metrics_list)
+        assert REGISTRY.get_sample_value("gpu_process_memory_bytes", labels) is None
+
+    def test_idle_process_keeps_sm_utilization_until_exit(self):
+        xml_output = NvidiaSmiSimulator(num_gpus=1, processes_per_gpu=1, seed=4).render()
+        exporter = GPUExporter()
+        metrics_list = exporter._parse_gpu_stream([xml_output])
+        process = metrics_list[0].processes[0]
+        labels = {
+            "gpu_id": "0",
+            "gpu_uuid": metrics_list[0].gpu_uuid,
+            "pid": str(process.pid),
+            "process_name": process.process_name,
+            "container": process.container,
+        }
+
+        process.sm_utilization = 0.7
+        exporter.update_prometheus_metrics(metrics_list)
+        process.sm_utilization = None
+        exporter.update_prometheus_metrics(metrics_list)
+        assert REGISTRY.get_sample_value("gpu_process_sm_utilization_ratio", labels) == 0.7
+
+        metrics_list[0].processes.clear()
+        exporter.update_prometheus_metrics(metrics_list)
+        assert REGISTRY.get_sample_value("gpu_process_sm_utilization_ratio", labels) is None
 
     def test_update_prometheus_metrics(self):
         exporter = GPUExporter()
@@ -161,8 +277,6 @@ class TestGPUExporter:
         exporter.update_prometheus_metrics([metrics])
 
     def test_memory_bound_detection(self):
-        exporter = GPUExporter()
-
         memory_bound = GPUMetrics(
             gpu_id=0,
             gpu_name="Test GPU",
@@ -190,8 +304,6 @@ class TestGPUExporter:
         assert memory_bound.is_memory_bound is True
 
     def test_not_memory_bound(self):
-        exporter = GPUExporter()
-
         not_bound = GPUMetrics(
             gpu_id=0,
             gpu_name="Test GPU",
@@ -223,3 +335,74 @@ class TestGPUExporter:
         exporter._running = True
         exporter.stop()
         assert exporter._running is False
+
+
+class TestContainerResolver:
+    def test_parse_container_id(self):
+        assert parse_container_id(f"0::/system.slice/docker-{CONTAINER_ID}.scope\n") == (
+            CONTAINER_ID[:12]
+        )
+        assert (
+            parse_container_id(
+                "12:memory:/kubepods/burstable/pod1234/"
+                f"cri-containerd-{CONTAINER_ID}.scope\n"
+            )
+            == CONTAINER_ID[:12]
+        )
+        assert parse_container_id("0::/user.slice/session-1.scope\n") == ""
+
+    def test_resolve_caches(self, tmp_path):
+        (tmp_path / "42").mkdir()
+        cgroup = tmp_path / "42" / "cgroup"
+        cgroup.write_text(f"0::/docker/{CONTAINER_ID}\n")
+        resolver = ContainerResolver(str(tmp_path))
+
+        assert resolver.resolve(42) == CONTAINER_ID[:12]
+        cgroup.unlink()
+        assert resolver.resolve(42) == CONTAINER_ID[:12]
+        assert resolver.resolve(43) == ""
+
+    def test_evict(self, tmp_path):
+        resolver = ContainerResolver(str(tmp_path))
+        for pid in (1, 2, 3):
+            resolver.resolve(pid)
+
+        assert resolver.evict({2}) == 2
+        assert len(resolver) == 1
+
+
+class TestNVMLProcessSampler:
+    def test_unavailable_without_pynvml(self, monkeypatch):
+        monkeypatch.setattr(processes_module, "pynvml", None)
+
+        sampler = NVMLProcessSampler()
+
+        assert sampler.available is False
+        assert sampler.sm_utilization("GPU-0") == {}
+
+    def test_sm_utilization(self, monkeypatch):
+        calls = []
+
+        def get_process_utilization(handle, last_seen):
+            calls.append(last_seen)
+            return [
+                SimpleNamespace(pid=10, timeStamp=100, smUtil=30),
+                SimpleNamespace(pid=10, timeStamp=200, smUtil=60),
+                SimpleNamespace(pid=11, timeStamp=150, smUtil=5),
+            ]
+
+        fake = SimpleNamespace(
+            NVMLError=RuntimeError,
+            nvmlInit=lambda: None,
+            nvmlShutdown=lambda: None,
+            nvmlDeviceGetHandleByUUID=lambda uuid: uuid,
+            nvmlDeviceGetProcessUtilization=get_process_utilization,
+        )
+        monkeypatch.setattr(processes_module, "pynvml", fake)
+        sampler = NVMLProcessSampler()
+
+        assert sampler.sm_utilization("GPU-0") == {10: 0.6, 11: 0.05}
+        sampler.sm_utilization("GPU-0")
+        assert calls == [0, 200]
+        sampler.close()
+        assert sampler.available is False
@@ -0,0 +1,227 @@
+import asyncio
+import os
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.logs.collector import STDIN, LogCollector
+from exporters.logs.patterns import parse_duration, parse_tgi_line, parse_vllm_line
+from exporters.logs.tailer import CREATED, ROTATED, TRUNCATED, FileTailer, Inotify
+
+VLLM_FINISHED = (
+    "INFO 06-10 12:00:00 async_llm_engine.py:140] Finished request {request_id}. "
+    "arrival_time=100.0 first_scheduled_time=100.05 first_token_time=100.25 "
+    "finished_time=102.25 prompt_tokens=12 generation_tokens=41 model={model}"
+)
+TGI_SUCCESS = (
+    "2024-01-10T12:00:00.123456Z  INFO generate{parameters=GenerateParameters "
+    '{ max_new_tokens: Some(20) } total_time="1.013415327s" validation_time="234.012µs" '
+    'queue_time="60.5µs" inference_time="1.013121236s" time_per_token="50.656061ms" '
+    'seed="None"}: text_generation_router::server: router/src/server.rs:289: Success'
+)
+NOISE = "INFO 06-10 12:00:00 metrics.py:341] Avg prompt throughput: 0.0 tokens/s"
+
+
+def vllm_line(request_id="cmpl-1", model="log-model"):
+    return VLLM_FINISHED.format(request_id=request_id, model=model)
+
+
+def append(path, *lines, newline=True):
+    with open(path, "a") as f:
+        f.write("\n".join(lines) + ("\n" if newline else ""))
+
+
+class TestPatterns:
+    def test_parse_duration(self):
+        assert parse_duration("1.5s") == pytest.approx(1.5)
+        assert parse_duration("50.656061ms") == pytest.approx(0.050656061)
+        assert parse_duration("60.5µs") == pytest.approx(60.5e-6)
+        assert parse_duration("42ns") == pytest.approx(42e-9)
+        assert parse_duration("0.25") == pytest.approx(0.25)
+        assert parse_duration("fast") is None
+
+    def test_vllm_finished_request(self):
+        record = parse_vllm_line(vllm_line())
+
+        assert record.request_id == "cmpl-1"
+        assert record.model == "log-model"
+        assert record.ttft == pytest.approx(0.25)
+        assert record.e2e == pytest.approx(2.25)
+        assert record.queue_time == pytest.approx(0.05)
+        assert record.time_per_token == pytest.approx(0.05)
+        assert (record.prompt_tokens, record.generation_tokens) == (12, 41)
+
+    def test_vllm_relative_fields(self):
+        record = parse_vllm_line(
+            "Finished request abc: ttft=120ms e2e=2s queue_time=0 "
+            "num_prompt_tokens=7 num_generation_tokens=1"
+        )
+
+        assert (record.ttft, record.e2e, record.queue_time) == (pytest.approx(0.12), 2.0, 0.0)
+        assert record.time_per_token is None
+        assert (record.prompt_tokens, record.generation_tokens) == (7, 1)
+
+    def test_vllm_lines_without_timings_are_skipped(self):
+        assert parse_vllm_line("INFO async_llm_engine.py:140] Finished request cmpl-1.") is None
+        assert parse_vllm_line(NOISE) is None
+
+    def test_tgi_success(self):
+        record = parse_tgi_line(TGI_SUCCESS)
+
+        assert record.ttft is None
+        assert record.e2e == pytest.approx(1.013415327)
+        assert record.queue_time == pytest.approx(60.5e-6)
+        assert record.time_per_token == pytest.approx(0.050656061)
+        assert record.generation_tokens == 20
+        assert parse_tgi_line(NOISE) is None
+
+
+class TestFileTailer:
+    def test_reads_appended_lines_and_buffers_partials(self, tmp_path):
+        path = tmp_path / "server.log"
+        append(path, "old")
+        tailer = FileTailer(str(path))
+
+        append(path, "first", "sec", newline=False)
+        assert tailer.read() == (["first"], None)
+        append(path, "ond")
+        assert tailer.read() == (["second"], None)
+        assert tailer.read() == ([], None)
+
+    def test_from_start(self, tmp_path):
+        path = tmp_path / "server.log"
+        append(path, "a", "b")
+
+        assert FileTailer(str(path), from_start=True).read() == (["a", "b"], None)
+
+    def test_rotation_drains_old_file_then_follows_new(self, tmp_path):
+        path = tmp_path / "server.log"
+        append(path, "before")
+        tailer = FileTailer(str(path))
+
+        append(path, "tail of old", "unterminated", newline=False)
+        os.rename(path, tmp_path / "server.log.1")
+        assert tailer.read() == (["tail of old"], None)
+        append(path, "new file")
+
+        assert tailer.read() == (["unterminated", "new file"], ROTATED)
+        append(path, "more")
+        assert tailer.read() == (["more"], None)
+
+    def test_truncation_restarts_from_beginning(self, tmp_path):
+        path = tmp_path / "server.log"
+        append(path, "a long line that was already read")
+        tailer = FileTailer(str(path))
+        with open(path, "w") as f:
+            f.write("fresh\n")
+
+        assert tailer.read() == (["fresh"], TRUNCATED)
+
+    def test_missing_file_is_picked_up_when_created(self, tmp_path):
+        path = tmp_path / "server.log"
+        tailer = FileTailer(str(path))
+        assert tailer.read() == ([], None)
+
+        append(path, "hello")
+        assert tailer.read() == (["hello"], CREATED)
+
+    def test_inotify_wakes_on_write(self, tmp_path):
+        inotify = Inotify.create()
+        if inotify is None:
+            pytest.skip("inotify unavailable")
+        try:
+            inotify.watch(str(tmp_path))
+            assert not inotify.drain()
+            append(tmp_path / "server.log", "line")
+            assert inotify.drain()
+        finally:
+            inotify.close()
+
+
+class TestLogCollector:
+    def test_records_feed_token_path_histograms(self, tmp_path):
+        path = tmp_path / "vllm.log"
+        path.touch()
+        collector = LogCollector(
+            backend="vllm", paths=[str(path)], model="default", endpoint="http://logs:8000"
+        )
+        append(path, NOISE, vllm_line("r1"), vllm_line("r2", model="other"))
+
+        assert collector.poll() == 2
+        labels = {"model": "log-model", "endpoint": "http://logs:8000"}
+        assert REGISTRY.get_sample_value("vllm_ttft_seconds_sum", labels) == pytest.approx(0.25)
+        assert REGISTRY.get_sample_value("vllm_itl_seconds_sum", labels) == pytest.approx(0.05)
+        labels["backend"] = "vllm"
+        assert REGISTRY.get_sample_value("log_request_e2e_seconds_sum", labels) == 2.25
+        assert REGISTRY.get_sample_value("log_request_prompt_tokens_sum", labels) == 12
+        assert REGISTRY.get_sample_value("log_request_generation_tokens_sum", labels) == 41
+        assert REGISTRY.get_sample_value(
+            "log_lines_read_total", {"backend": "vllm", "source": str(path)}
+        ) == 3
+
+    def test_tgi_defaults_to_configured_model(self):
+        collector = LogCollector(
+            backend="tgi", paths=[STDIN], model="tgi-model", endpoint="http://logs:8080"
+        )
+
+        assert collector.process_lines([TGI_SUCCESS, NOISE], STDIN) == 1
+        labels = {"model": "tgi-model", "endpoint": "http://logs:8080", "backend": "tgi"}
+        assert REGISTRY.get_sample_value("log_request_generation_tokens_sum", labels) == 20
+        assert REGISTRY.get_sample_value("tgi_ttft_seconds_count", labels) is None
+
+    def test_rotation_is_counted(self, tmp_path):
+        path = tmp_path / "rotated.log"
+        path.touch()
+        collector = LogCollector(backend="vllm", paths=[str(path)], endpoint="http://rot:8000")
+        os.rename(path, tmp_path / "rotated.log.1")
+        append(path, vllm_line("after"))
+
+        assert collector.poll() == 1
+        assert REGISTRY.get_sample_value(
+            "log_file_reopens_total", {"source": str(path), "reason": ROTATED}
+        ) == 1
+
+    def test_unsupported_backend(self):
+        with pytest.raises(ValueError):
+            LogCollector(backend="triton", paths=[STDIN])
+
+    @pytest.mark.asyncio
+    async def test_stdin_lines_are_processed(self):
+        collector = LogCollector(
+            backend="vllm", paths=[STDIN], model="stdin-model", endpoint="http://stdin:8000"
+        )
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, (vllm_line("s1", model="stdin-model") + "\n" + NOISE).encode())
+        os.close(write_fd)
+
+        await asyncio.to_thread(collector._read_stdin, asyncio.get_running_loop(), read_fd)
+        await asyncio.sleep(0)
+        os.close(read_fd)
+
+        labels = {"backend": "vllm", "source": STDIN}
+        assert REGISTRY.get_sample_value("log_lines_read_total", labels) == 2
+        assert REGISTRY.get_sample_value("log_requests_parsed_total", labels) == 1
+
+    @pytest.mark.asyncio
+    async def test_tail_loop_follows_file(self, tmp_path):
+        path = tmp_path / "follow.log"
+        path.touch()
+        collector = LogCollector(
+            backend="vllm", paths=[str(path)], endpoint="http://follow:8000", poll_interval=5.0
+        )
+        task = asyncio.create_task(collector.tail_loop())
+        await asyncio.sleep(0.05)
+        append(path, vllm_line("f1"))
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if REGISTRY.get_sample_value(
+                "log_requests_parsed_total", {"backend": "vllm", "source": str(path)}
+            ):
+                break
+        collector.stop()
+        await task
+        collector.close(asyncio.get_running_loop())
+
+        assert REGISTRY.get_sample_value(
+            "log_requests_parsed_total", {"backend": "vllm", "source": str(path)}
+        ) == 1
@@ -0,0 +1,387 @@
+import gzip
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from exporters.otlp.exporter import (
+    OTLPExporter,
+    exponential_buckets,
+    exponential_index,
+    split_batches,
+)
+from exporters.otlp.protobuf import NumberPoint, OTLPMetric, encode_metric, encode_sint_field
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(data: bytes):
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos : pos + 8], pos + 8
+        else:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        yield field, value
+
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _attributes(values: list[bytes]) -> dict[str, str]:
+    attributes = {}
+    for kv in values:
+        parts = dict(_fields(kv))
+        attributes[parts[1].decode()] = dict(_fields(parts[2]))[1].decode()
+    return attributes
+
+
+def _group(data: bytes) -> dict[int, list]:
+    grouped: dict[int, list] = {}
+    for field, value in _fields(data):
+        grouped.setdefault(field, []).append(value)
+    return grouped
+
+
+def _fixed64(value: bytes) -> int:
+    return struct.unpack("<Q", value)[0]
+
+
+def _double(value: bytes) -> float:
+    return struct.unpack("<d", value)[0]
+
+
+def _decode_point(kind: str, data: bytes) -> dict:
+    f = _group(data)
+    if kind in ("gauge", "sum"):
+        return {
+            "attributes": _attributes(f.get(7, [])),
+            "start": _fixed64(f[2][0]),
+            "time": _fixed64(f[3][0]),
+            "value": _double(f[4][0]),
+        }
+    if kind == "histogram":
+        counts = f[6][0]
+        return {
+            "attributes": _attributes(f.get(9, [])),
+            "count": _fixed64(f[4][0]),
+            "sum": _double(f[5][0]),
+            "bucket_counts": list(struct.unpack(f"<{len(counts) // 8}Q", counts)),
+            "bounds": list(struct.unpack(f"<{len(f[7][0]) // 8}d", f[7][0])),
+        }
+    positive = _group(f[8][0])
+    packed, counts, pos = positive.get(2, [b""])[0], [], 0
+    while pos < len(packed):
+        value, pos = _read_varint(packed, pos)
+        counts.append(value)
+    return {
+        "attributes": _attributes(f.get(1, [])),
+        "count": _fixed64(f[4][0]),
+        "sum": _double(f[5][0]),
+        "scale": _zigzag(f[6][0]),
+        "zero_count": _fixed64(f[7][0]),
+        "offset": _zigzag(positive.get(1, [0])[0]),
+        "bucket_counts": counts,
+    }
+
+
+KINDS = {5: "gauge", 7: "sum", 9: "histogram", 10: "exponential_histogram"}
+
+
+def decode_export_request(payload: bytes) -> tuple[dict[str, str], dict[str, dict]]:
+    resource: dict[str, str] = {}
+    metrics: dict[str, dict] = {}
+    for _, resource_metrics in _fields(payload):
+        rm = _group(resource_metrics)
+        resource = _attributes(_group(rm[1][0]).get(1, []))
+        for scope_metrics in rm.get(2, []):
+            for metric in _group(scope_metrics).get(2, []):
+                m = _group(metric)
+                field = next(f for f in KINDS if f in m)
+                data = _group(m[field][0])
+                kind = KINDS[field]
+                entry = metrics.setdefault(
+                    m[1][0].decode(),
+                    {
+                        "kind": kind,
+                        "unit": m[3][0].decode() if 3 in m else "",
+                        "temporality": data.get(2, [0])[0],
+                        "monotonic": bool(data.get(3, [0])[0]),
+                        "points": [],
+                    },
+                )
+                entry["points"].extend(_decode_point(kind, p) for p in data.get(1, []))
+    return resource, metrics
+
+
+class StubOTLPReceiver:
+    def __init__(self, statuses: list[int] | None = None):
+        self.statuses = list(statuses or [])
+        self.requests: list[tuple[str, dict[str, str], bytes]] = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((self.path, dict(self.headers), body))
+                status = receiver.statuses.pop(0) if receiver.statuses else 200
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/x-protobuf")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def exports(self) -> list[tuple[dict[str, str], dict[str, dict]]]:
+        decoded = []
+        for _, headers, body in self.requests:
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            decoded.append(decode_export_request(body))
+        return decoded
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    stub = StubOTLPReceiver()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def registry():
+    registry = CollectorRegistry()
+    Gauge("test_queue_length", "Queue length", ["model"], registry=registry).labels(
+        model="llama"
+    ).set(7)
+    Counter("test_tokens", "Tokens", ["model"], registry=registry).labels(model="llama").inc(42)
+    ttft = Histogram(
+        "test_ttft_seconds", "TTFT", ["model"], buckets=[0.1, 0.5, 1.0], registry=registry
+    )
+    for value in (0.05, 0.2, 0.3, 0.7, 2.0):
+        ttft.labels(model="llama").observe(value)
+    e2e = Histogram("test_e2e_seconds", "E2E", buckets=[1.0, 10.0], registry=registry)
+    e2e.observe(3.0)
+    return registry
+
+
+def exporter_for(registry, url="http://localhost:4318", **kwargs):
+    return OTLPExporter(endpoint=url, service_name="test-exporter", registry=registry, **kwargs)
+
+
+class TestExponentialBuckets:
+    def test_index(self):
+        assert exponential_index(1.0, 0) == -1
+        assert exponential_index(1.5, 0) == 0
+        assert exponential_index(2.0, 0) == 0
+        assert exponential_index(4.0, 0) == 1
+        assert exponential_index(2.0, 1) == 1
+
+    def test_buckets_fit_max_size(self):
+        values = [(0.001, 1), (0.01, 2), (1.0, 3), (30.0, 4)]
+
+        scale, zero_count, offset, counts = exponential_buckets(values, max_size=20)
+
+        assert len(counts) <= 20
+        assert sum(counts) == 10
+        assert zero_count == 0
+        base = 2.0 ** (2.0**-scale)
+        assert base**offset < 0.001 <= base ** (offset + 1)
+
+    def test_high_resolution_for_narrow_range(self):
+        scale, _, _, counts = exponential_buckets([(0.02, 5), (0.021, 5)], max_size=160)
+
+        assert scale >= 5
+        assert sum(counts) == 10
+
+    def test_zero_and_empty(self):
+        assert exponential_buckets([(0.0, 3), (1.0, 0)]) == (0, 3, 0, ())
+
+    def test_sint_encoding(self):
+        assert encode_sint_field(1, -1) == b"\x08\x01"
+        assert encode_sint_field(1, 2) == b"\x08\x04"
+
+
+    def test_metric_rejects_mismatched_points(self):
+        metric = OTLPMetric("m", "", "", "histogram", [NumberPoint((), 0, 1, 1.0)])
+
+        with pytest.raises(ValueError, match="histogram metric m has a NumberPoint"):
+            encode_metric(metric)
+
+class TestOTLPExporter:
+    def test_endpoint_path(self, registry):
+        assert exporter_for(registry).endpoint == "http://localhost:4318/v1/metrics"
+        assert (
+            exporter_for(registry, url="http://collector/v1/metrics/").endpoint
+            == "http://collector/v1/metrics"
+        )
+        with pytest.raises(ValueError):
+            exporter_for(registry, compression="zstd")
+
+    def test_counters_are_delta(self, registry):
+        exporter = exporter_for(registry)
+        tokens = registry._names_to_collectors["test_tokens"]
+
+        first = {m.name: m for m in exporter.collect_metrics(now_ns=10**18)}
+        tokens.labels(model="llama").inc(8)
+        second = {m.name: m for m in exporter.collect_metrics(now_ns=2 * 10**18)}
+
+        assert first["test_tokens"].points[0].value == 42
+        assert second["test_tokens"].points[0].value == 8
+        assert second["test_tokens"].points[0].start_time_ns == 10**18
+        assert second["test_queue_length"].points[0].value == 7
+
+    def test_counter_reset_sends_full_value(self, registry):
+        exporter = exporter_for(registry)
+        exporter.collect_metrics(now_ns=1)
+        exporter._previous[("test_tokens", (("model", "llama"),))] = (1, [100.0])
+
+        metrics = {m.name: m for m in exporter.collect_metrics(now_ns=2)}
+
+        assert metrics["test_tokens"].points[0].value == 42
+
+    def test_ttft_is_exponential_histogram(self, registry):
+        exporter = exporter_for(registry)
+
+        metrics = {m.name: m for m in exporter.collect_metrics()}
+
+        ttft = metrics["test_ttft_seconds"]
+        assert ttft.kind == "exponential_histogram"
+        assert ttft.points[0].count == 5
+        assert sum(ttft.points[0].bucket_counts) == 5
+        assert ttft.points[0].sum == pytest.approx(3.25)
+        e2e = metrics["test_e2e_seconds"]
+        assert e2e.kind == "histogram"
+        assert e2e.points[0].bucket_counts == (0, 1, 0)
+        assert e2e.points[0].bounds == (1.0, 10.0)
+
+    def test_histogram_delta(self, registry):
+        exporter = exporter_for(registry)
+        exporter.collect_metrics()
+        registry._names_to_collectors["test_ttft_seconds"].labels(model="llama").observe(0.4)
+
+        metrics = {m.name: m for m in exporter.collect_metrics()}
+
+        point = metrics["test_ttft_seconds"].points[0]
+        assert point.count == 1
+        assert point.sum == pytest.approx(0.4)
+
+    def test_split_batches(self):
+        points = [NumberPoint((), 0, 0, float(i)) for i in range(5)]
+        metrics = [
+            OTLPMetric("a", "", "", "gauge", points[:3]),
+            OTLPMetric("b", "", "", "gauge", points[3:]),
+        ]
+
+        batches = split_batches(metrics, max_points=2)
+
+        assert [[len(m.points) for m in batch] for batch in batches] == [[2], [1, 1], [1]]
+        assert [m.name for m in batches[1]] == ["a", "b"]
+
+    def test_enqueue_drops_when_full(self, registry):
+        exporter = exporter_for(registry, queue_capacity=1, max_points_per_request=2)
+
+        dropped = exporter.push()
+
+        assert exporter.queue_depth() == 1
+        assert dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_export_to_receiver(self, registry, receiver):
+        exporter = exporter_for(registry, url=receiver.url)
+        exporter.start()
+        exporter.push()
+        await exporter.stop()
+
+        path, headers, _ = receiver.requests[0]
+        assert path == "/v1/metrics"
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Content-Type"] == "application/x-protobuf"
+        resource, metrics = receiver.exports()[0]
+        assert resource["service.name"] == "test-exporter"
+        assert metrics["test_tokens"]["kind"] == "sum"
+        assert metrics["test_tokens"]["temporality"] == 1
+        assert metrics["test_tokens"]["monotonic"] is True
+        assert metrics["test_tokens"]["points"][0]["value"] == 42
+        assert metrics["test_tokens"]["points"][0]["attributes"] == {"model": "llama"}
+        assert metrics["test_queue_length"]["kind"] == "gauge"
+        ttft = metrics["test_ttft_seconds"]
+        assert ttft["kind"] == "exponential_histogram"
+        assert ttft["unit"] == "s"
+        assert ttft["temporality"] == 1
+        assert ttft["points"][0]["count"] == 5
+        assert sum(ttft["points"][0]["bucket_counts"]) == 5
+        e2e = metrics["test_e2e_seconds"]["points"][0]
+        assert e2e["bucket_counts"] == [0, 1, 0]
+        assert e2e["bounds"] == [1.0, 10.0]
+
+    @pytest.mark.asyncio
+    async def test_uncompressed_batches(self, registry, receiver):
+        exporter = exporter_for(
+            registry, url=receiver.url, compression="none", max_points_per_request=2
+        )
+        exporter.start()
+        exporter.push()
+        await exporter.stop()
+
+        assert len(receiver.requests) == 2
+        assert "Content-Encoding" not in receiver.requests[0][1]
+        names = [name for _, metrics in receiver.exports() for name in metrics]
+        assert set(names) == {
+            "test_queue_length",
+            "test_tokens",
+            "test_ttft_seconds",
+            "test_e2e_seconds",
+        }
+
+    @pytest.mark.asyncio
+    async def test_retries_retryable_status(self, registry):
+        stub = StubOTLPReceiver(statuses=[503, 429])
+        try:
+            exporter = exporter_for(registry, url=stub.url, min_backoff=0.001)
+            assert await exporter._send_with_retry(exporter.collect_metrics()) is True
+            await exporter.stop()
+        finally:
+            stub.close()
+
+        assert len(stub.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_is_not_retried(self, registry):
+        stub = StubOTLPReceiver(statuses=[400])
+        try:
+            exporter = exporter_for(registry, url=stub.url, min_backoff=0.001)
+            assert await exporter._send_with_retry(exporter.collect_metrics()) is False
+            await exporter.stop()
+        finally:
+            stub.close()
+
+        assert len(stub.requests) == 1
@@ -0,0 +1,142 @@
+from prometheus_client import REGISTRY
+
+from exporters.payload.cache import PayloadCache, family_changed, split_families
+from exporters.reload.watcher import remove_endpoint_series
+from exporters.simulator.payloads import TGIMetricsSimulator, VLLMMetricsSimulator
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.vllm_exporter.exporter import VLLMExporter
+from exporters.vllm_exporter.metrics import METRICS as VLLM_METRICS
+from exporters.vllm_exporter.metrics import VLLM_QUEUE_LENGTH
+
+PAYLOAD = """# HELP queue Queued requests.
+# TYPE queue gauge
+queue{model="a"} 3
+# HELP tokens_total Generated tokens.
+# TYPE tokens_total counter
+tokens_total{model="a"} 10
+"""
+
+
+def cache_samples(exporter, target):
+    labels = {"exporter": exporter, "target": target}
+    return (
+        REGISTRY.get_sample_value(
+            "exporter_payload_cache_families_total", {**labels, "result": "hit"}
+        ),
+        REGISTRY.get_sample_value(
+            "exporter_payload_cache_families_total", {**labels, "result": "miss"}
+        ),
+    )
+
+
+class TestSplitFamilies:
+    def test_split_on_help_lines(self):
+        families = split_families(PAYLOAD)
+
+        assert list(families) == ["queue", "tokens_total"]
+        assert families["queue"] == '# TYPE queue gauge\nqueue{model="a"} 3'
+
+    def test_samples_without_help_are_unnamed(self):
+        families = split_families("queue 3\n# HELP tokens_total Tokens.\ntokens_total 1\n")
+
+        assert families[""] == "queue 3"
+        assert families["tokens_total"] == "tokens_total 1"
+
+    def test_family_changed_matches_sample_suffixes(self):
+        changed = frozenset({"tgi_request_duration"})
+
+        assert family_changed(changed, "tgi_request_duration_count")
+        assert not family_changed(changed, "tgi_queue_size")
+        assert family_changed(None, "tgi_queue_size")
+
+
+class TestPayloadCache:
+    def test_unchanged_families_reuse_parse(self):
+        exporter = VLLMExporter()
+        cache = PayloadCache("cache-reuse", "http://cache:8000", exporter._parse_prometheus_metrics)
+
+        first = cache.parse(PAYLOAD)
+        parsed = cache._families["queue"][1]
+        second = cache.parse(PAYLOAD.replace("} 10", "} 12"))
+
+        assert second == exporter._parse_prometheus_metrics(PAYLOAD.replace("} 10", "} 12"))
+        assert first is not second
+        assert cache._families["queue"][1] is parsed
+        assert cache.changed_families(second) == {"tokens_total"}
+        assert cache.changed_families(first) is None
+        assert cache_samples("cache-reuse", "http://cache:8000") == (1, 3)
+
+    def test_removed_and_unnamed_families_are_changed(self):
+        parse = VLLMExporter()._parse_prometheus_metrics
+        cache = PayloadCache("cache-removed", "http://cache:8000", parse)
+        cache.parse(PAYLOAD)
+
+        removed = cache.parse(PAYLOAD.split("# HELP tokens_total")[0])
+        assert cache.changed_families(removed) == {"tokens_total"}
+
+        unnamed = cache.parse("queue 4\n")
+        assert cache.changed_families(unnamed) is None
+
+    def test_disabled_cache_parses_everything(self):
+        parse = VLLMExporter()._parse_prometheus_metrics
+        cache = PayloadCache("cache-disabled", "http://cache:8000", parse, enabled=False)
+
+        metrics = cache.parse(PAYLOAD)
+
+        assert cache.changed_families(metrics) is None
+        assert cache_samples("cache-disabled", "http://cache:8000") == (None, None)
+
+
+class TestExporterPublishing:
+    def test_unchanged_families_are_not_republished(self):
+        exporter = VLLMExporter(endpoint="http://cache-publish:8000", model="base")
+        labels = {"model": "base", "endpoint": "http://cache-publish:8000"}
+        payload = VLLMMetricsSimulator(model="base", seed=5).render()
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+        assert exporter.payload.changed_families(exporter.payload._metrics) == frozenset()
+
+        VLLM_QUEUE_LENGTH.labels(**labels).set(-1)
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+        assert REGISTRY.get_sample_value("vllm_queue_length", labels) == -1
+
+        exporter.refresh_models(["base"])
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+        assert REGISTRY.get_sample_value("vllm_queue_length", labels) != -1
+
+    def test_removed_series_are_republished(self):
+        exporter = VLLMExporter(endpoint="http://cache-removed:8000", model="base")
+        labels = {"model": "base", "endpoint": "http://cache-removed:8000"}
+        payload = VLLMMetricsSimulator(model="base", seed=5).render()
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        remove_endpoint_series("http://cache-removed:8000", VLLM_METRICS)
+        assert REGISTRY.get_sample_value("vllm_queue_length", labels) is None
+        exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        assert REGISTRY.get_sample_value("vllm_queue_length", labels) is not None
+
+    def test_cached_and_uncached_exporters_agree(self):
+        simulator = TGIMetricsSimulator(num_adapters=3, num_gpus=2, seed=7)
+        payloads = [simulator.render() for _ in range(3)]
+        payloads += [payloads[-1]] * 3
+        cached = TGIExporter(endpoint="http://cache-on:8080", model="base")
+        uncached = TGIExporter(endpoint="http://cache-off:8080", model="base")
+        uncached.payload.enabled = False
+
+        for payload in payloads:
+            for exporter in (cached, uncached):
+                exporter.update_prometheus_metrics(exporter.payload.parse(payload))
+
+        for name in ("tgi_tokens_generated_total", "tgi_requests_total", "tgi_queue_length"):
+            for model in ("base", "lora-adapter-0001"):
+                for status in ({}, {"status": "success"}):
+                    on = {"model": model, "endpoint": "http://cache-on:8080", **status}
+                    off = {**on, "endpoint": "http://cache-off:8080"}
+                    assert REGISTRY.get_sample_value(name, on) == REGISTRY.get_sample_value(
+                        name, off
+                    )
+        on = {"model": "lora-adapter-0001", "endpoint": "http://cache-on:8080"}
+        assert REGISTRY.get_sample_value("tgi_tokens_generated_total", on) > 0
+        assert cache_samples("tgi", "http://cache-on:8080")[0] > 0
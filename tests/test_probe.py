@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.probe.prober import RateLimiter, TokenPathProber
+from exporters.probe.stream import StreamTiming, count_event_tokens
+
+
+class FakeStreamingServer:
+    def __init__(self, tokens: int = 5, token_delay: float = 0.01, fail: bool = False):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.fail = fail
+        self.payloads: list[dict] = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = (
+                    {"model_id": "tgi-model"}
+                    if self.path == "/info"
+                    else {"data": [{"id": "vllm-model"}]}
+                )
+                self._send_json(body)
+
+            def do_POST(self) -> None:
+                fake.payloads.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                if fake.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for i in range(fake.tokens):
+                    time.sleep(fake.token_delay)
+                    if self.path == "/generate_stream":
+                        event = {"token": {"id": i, "text": f" t{i}", "special": False}}
+                    else:
+                        event = {"choices": [{"index": 0, "text": f" t{i}"}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                if self.path != "/generate_stream":
+                    self.wfile.write(b"data: [DONE]\n\n")
+
+            def _send_json(self, body: dict) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def streaming_server():
+    server = FakeStreamingServer()
+    yield server
+    server.close()
+
+
+class TestStreamTiming:
+    def test_derived_latencies(self):
+        timing = StreamTiming(start=1.0, token_times=[1.5, 1.6, 1.8], end=2.0)
+
+        assert timing.ok
+        assert timing.ttft == 0.5
+        assert timing.itl == pytest.approx([0.1, 0.2])
+        assert timing.e2e == 1.0
+        assert timing.tokens == 3
+
+    def test_empty_stream_is_not_ok(self):
+        timing = StreamTiming(start=1.0, end=2.0)
+
+        assert not timing.ok
+        assert timing.ttft is None
+
+    def test_count_event_tokens(self):
+        assert count_event_tokens("vllm", '{"choices": [{"text": "hi"}]}') == 1
+        assert count_event_tokens("vllm", '{"choices": [{"text": ""}]}') == 0
+        assert count_event_tokens("vllm", "[DONE]") == 0
+        assert count_event_tokens("tgi", '{"token": {"text": "hi", "special": false}}') == 1
+        assert count_event_tokens("tgi", '{"token": {"text": "</s>", "special": true}}') == 0
+        with pytest.raises(ValueError):
+            count_event_tokens("tgi", '{"error": "overloaded"}')
+
+
+class TestTokenPathProber:
+    def test_init_rejects_unknown_backend(self):
+        with pytest.raises(ValueError):
+            TokenPathProber(endpoint="http://localhost:8000", backend="unknown")
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_spaces_acquisitions(self):
+        limiter = RateLimiter(rate=50.0, burst=1)
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        assert time.monotonic() - start >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_probe_vllm_stream(self, streaming_server):
+        prober = TokenPathProber(endpoint=streaming_server.endpoint, backend="vllm", max_tokens=5)
+        await prober.fetch_model_info()
+
+        timing = await prober.probe("hello")
+
+        assert prober.model == "vllm-model"
+        assert timing.ok
+        assert timing.tokens == 5
+        assert timing.ttft > 0
+        assert all(itl >= 0.005 for itl in timing.itl)
+        assert streaming_server.payloads[0]["stream"] is True
+        assert streaming_server.payloads[0]["model"] == "vllm-model"
+        labels = {**prober.labels, "status": "success"}
+        assert REGISTRY.get_sample_value("probe_requests_total", labels) >= 1
+
+    @pytest.mark.asyncio
+    async def test_probe_tgi_stream(self, streaming_server):
+        prober = TokenPathProber(endpoint=streaming_server.endpoint, backend="tgi", max_tokens=5)
+        await prober.fetch_model_info()
+
+        timing = await prober.probe("hello")
+
+        assert prober.model == "tgi-model"
+        assert timing.tokens == 5
+        assert streaming_server.payloads[0]["parameters"]["max_new_tokens"] == 5
+
+    @pytest.mark.asyncio
+    async def test_probe_cycle_runs_concurrently(self, streaming_server):
+        prober = TokenPathProber(
+            endpoint=streaming_server.endpoint,
+            concurrency=4,
+            rate_limit=0,
+            probes_per_cycle=4,
+        )
+
+        start = time.perf_counter()
+        timings = await prober.probe_cycle()
+        elapsed = time.perf_counter() - start
+
+        assert len(timings) == 4
+        assert all(t.ok for t in timings)
+        assert elapsed < sum(t.e2e for t in timings)
+
+    @pytest.mark.asyncio
+    async def test_probe_records_errors(self):
+        server = FakeStreamingServer(fail=True)
+        try:
+            prober = TokenPathProber(endpoint=server.endpoint, model="down")
+            timing = await prober.probe("hello")
+        finally:
+            server.close()
+
+        assert not timing.ok
+        assert timing.error == "HTTPStatusError"
+        labels = {**prober.labels, "status": "error"}
+        assert REGISTRY.get_sample_value("probe_requests_total", labels) == 1.0
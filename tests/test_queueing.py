@@ -0,0 +1,128 @@
+import math
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.queueing.analyzer import QueueAnalyzer, QueueSpec, ewma, littles_law_wait
+from exporters.tgi_exporter.exporter import TGIExporter
+
+SPEC = QueueSpec(
+    backend="test",
+    queue_gauge="queued",
+    running_gauge="running",
+    completion_counters=("success", "failure"),
+)
+
+
+def payload(queued, running, success, failure=0.0):
+    return {"queued": queued, "running": running, "success": success, "failure": failure}
+
+
+def labels(endpoint):
+    return {"model": "m", "endpoint": endpoint, "backend": "test"}
+
+
+class TestQueueMath:
+    def test_ewma_weights_by_elapsed_time(self):
+        assert ewma(None, 4.0, 1.0, 30.0) == 4.0
+        assert ewma(0.0, 4.0, 30.0, 30.0) == pytest.approx(4.0 * (1 - math.exp(-1)))
+        assert ewma(0.0, 4.0, 1.0, 0.0) == 4.0
+
+    def test_littles_law_wait(self):
+        assert littles_law_wait(20.0, 4.0) == 5.0
+        assert littles_law_wait(0.0, 0.0) == 0.0
+        assert littles_law_wait(3.0, 0.0) is None
+
+
+class TestQueueAnalyzer:
+    def test_rates_from_completions_and_backlog(self):
+        analyzer = QueueAnalyzer(SPEC, window=0)
+        endpoint = "http://queue-rates:8000"
+
+        analyzer.record(payload(10, 4, 100, 2), labels(endpoint), timestamp=0.0)
+        analyzer.record(payload(16, 4, 110, 2), labels(endpoint), timestamp=2.0)
+
+        assert analyzer.completion_rate == 5.0
+        assert analyzer.arrival_rate == 8.0
+        assert analyzer.predicted_wait == 3.2
+        assert REGISTRY.get_sample_value(
+            "token_path_queue_growth_rate", labels(endpoint)
+        ) == 3.0
+        assert REGISTRY.get_sample_value(
+            "token_path_queue_predicted_wait_seconds", labels(endpoint)
+        ) == 3.2
+
+    def test_stalled_completions_keep_last_wait(self):
+        analyzer = QueueAnalyzer(SPEC, window=0)
+        endpoint = "http://queue-stalled:8000"
+
+        analyzer.record(payload(10, 4, 100), labels(endpoint), timestamp=0.0)
+        analyzer.record(payload(16, 4, 110), labels(endpoint), timestamp=2.0)
+        analyzer.record(payload(20, 4, 110), labels(endpoint), timestamp=4.0)
+
+        assert analyzer.completion_rate == 0.0
+        assert analyzer.predicted_wait == 3.2
+        assert REGISTRY.get_sample_value(
+            "token_path_queue_predicted_wait_seconds", labels(endpoint)
+        ) == 3.2
+
+    def test_smoothing_dampens_bursts(self):
+        analyzer = QueueAnalyzer(SPEC, window=30.0)
+        endpoint = "http://queue-smooth:8000"
+        for step in range(5):
+            analyzer.record(payload(0, 0, 10 * step), labels(endpoint), timestamp=float(step))
+
+        analyzer.record(payload(50, 0, 40), labels(endpoint), timestamp=5.0)
+
+        assert analyzer.arrival_rate == pytest.approx(10.0 + 40.0 * (1 - math.exp(-1 / 30)))
+        assert analyzer.completion_rate < 10.0
+
+    def test_counter_reset_counts_new_completions(self):
+        analyzer = QueueAnalyzer(SPEC, window=0)
+        endpoint = "http://queue-reset:8000"
+
+        analyzer.record(payload(0, 2, 500), labels(endpoint), timestamp=0.0)
+        analyzer.record(payload(0, 2, 3), labels(endpoint), timestamp=1.0)
+
+        assert analyzer.completion_rate == 3.0
+        assert analyzer.arrival_rate == 3.0
+
+    def test_token_rate_from_tokens_counter(self):
+        spec = QueueSpec("test", "queued", completion_counters=("done",), tokens_counter="tokens")
+        analyzer = QueueAnalyzer(spec, window=0)
+        endpoint = "http://queue-tokens:8000"
+
+        analyzer.record({"queued": 0.0, "done": 1.0, "tokens": 100.0}, labels(endpoint), 0.0)
+        analyzer.record({"queued": 0.0, "done": 4.0, "tokens": 400.0}, labels(endpoint), 3.0)
+
+        assert analyzer.token_rate == 100.0
+        assert analyzer.completion_rate == 1.0
+
+    def test_missing_series_are_ignored(self):
+        analyzer = QueueAnalyzer(SPEC, window=0)
+
+        analyzer.record({"queued": 4.0}, labels("http://queue-missing:8000"), timestamp=0.0)
+        analyzer.record({"queued": 4.0}, labels("http://queue-missing:8000"), timestamp=1.0)
+
+        assert analyzer.arrival_rate is None
+        assert REGISTRY.get_sample_value(
+            "token_path_queue_arrival_rate", labels("http://queue-missing:8000")
+        ) is None
+
+
+class TestExporterQueueAnalytics:
+    def test_tgi_update_records_queue_analytics(self, mock_tgi_metrics):
+        exporter = TGIExporter(endpoint="http://queue-tgi:8080", model="m")
+        first = exporter._parse_prometheus_metrics(mock_tgi_metrics)
+        second = exporter._parse_prometheus_metrics(
+            mock_tgi_metrics.replace("tgi_request_success 1000", "tgi_request_success 1010")
+        )
+
+        exporter.update_prometheus_metrics(first)
+        exporter.update_prometheus_metrics(second)
+
+        sample = {"model": "m", "endpoint": "http://queue-tgi:8080", "backend": "tgi"}
+        assert REGISTRY.get_sample_value("token_path_queue_completion_rate", sample) > 0
+        assert exporter.queue_analyzer.predicted_wait == pytest.approx(
+            5.0 / exporter.queue_analyzer.completion_rate
+        )
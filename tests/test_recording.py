@@ -0,0 +1,188 @@
+import math
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.recording.recorder import (
+    RecordingSpec,
+    WindowedRecorder,
+    histogram_buckets,
+    sum_series,
+)
+from exporters.recording.window import (
+    SlidingWindow,
+    bucket_midpoints,
+    format_window,
+    histogram_quantile,
+)
+from exporters.simulator import VLLMMetricsSimulator
+from exporters.vllm_exporter.exporter import VLLM_RECORDING_SPEC, VLLMExporter
+
+SPEC = RecordingSpec(
+    backend="test",
+    ttft_histogram="ttft",
+    itl_histogram="itl",
+    tokens_counter="tokens",
+    preemptions_counter="preemptions",
+)
+
+
+def scrape(ttft_buckets, tokens, preemptions=0.0, bounds=("0.1", "0.5", "1", "+Inf")):
+    buckets = []
+    for model in ("a", "b"):
+        for le, value in zip(bounds, ttft_buckets):
+            buckets.append({"labels": {"model_name": model, "le": le}, "value": value / 2})
+    return {
+        "ttft_bucket": buckets,
+        "tokens": [{"labels": {"model_name": "a"}, "value": tokens}],
+        "preemptions": preemptions,
+    }
+
+
+class TestSlidingWindow:
+    def test_add_and_expire(self):
+        window = SlidingWindow(60.0, slots=6)
+
+        window.add(0.0, [1.0])
+        window.add(15.0, [2.0])
+        window.add(59.0, [4.0])
+        assert window.totals == [7.0]
+
+        window.advance(65.0)
+        assert window.totals == [6.0]
+        window.advance(75.0)
+        assert window.totals == [4.0]
+
+    def test_large_gap_clears_everything(self):
+        window = SlidingWindow(60.0, width=2, slots=6)
+        window.add(0.0, [1.0, 2.0])
+        window.add(30.0, [3.0, 4.0])
+
+        window.add(10_000.0, [1.0, 1.0])
+
+        assert window.totals == [1.0, 1.0]
+
+    def test_out_of_order_sample_lands_in_head(self):
+        window = SlidingWindow(60.0, slots=6)
+        window.add(30.0, [1.0])
+
+        window.add(5.0, [1.0])
+
+        assert window.totals == [2.0]
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            SlidingWindow(0.0)
+
+    def test_format_window(self):
+        assert format_window(60.0) == "1m"
+        assert format_window(300.0) == "5m"
+        assert format_window(3600.0) == "1h"
+        assert format_window(90.0) == "90s"
+
+
+class TestHistogramQuantile:
+    def test_interpolates_within_bucket(self):
+        bounds = (0.1, 0.5, 1.0, math.inf)
+        counts = [10.0, 10.0, 0.0, 0.0]
+
+        assert histogram_quantile(0.5, bounds, counts) == pytest.approx(0.1)
+        assert histogram_quantile(0.75, bounds, counts) == pytest.approx(0.3)
+
+    def test_inf_bucket_returns_highest_finite_bound(self):
+        bounds = (0.1, 1.0, math.inf)
+
+        assert histogram_quantile(0.99, bounds, [1.0, 1.0, 8.0]) == 1.0
+
+    def test_empty(self):
+        assert math.isnan(histogram_quantile(0.5, (0.1, math.inf), [0.0, 0.0]))
+
+    def test_bucket_midpoints(self):
+        assert bucket_midpoints((0.1, 0.5, math.inf)) == [0.05, pytest.approx(0.3), 0.5]
+
+
+class TestWindowedRecorder:
+    def test_helpers(self):
+        metrics = scrape([2, 4, 6, 8], tokens=5.0, preemptions=3.0)
+
+        assert sum_series(metrics, "tokens") == 5.0
+        assert sum_series(metrics, "preemptions") == 3.0
+        assert sum_series(metrics, "missing") is None
+        assert histogram_buckets(metrics, "ttft") == ((0.1, 0.5, 1.0, math.inf), [2, 4, 6, 8])
+
+    def test_rates_and_quantiles(self):
+        recorder = WindowedRecorder(SPEC, windows=(60.0,), quantiles=(0.5,))
+        labels = {"model": "m", "endpoint": "e"}
+
+        recorder.record(scrape([0, 0, 0, 0], tokens=0.0), labels, timestamp=0.0)
+        recorder.record(scrape([10, 20, 20, 20], tokens=300.0, preemptions=6.0), labels, 15.0)
+        recorder.record(scrape([10, 20, 20, 20], tokens=600.0, preemptions=6.0), labels, 30.0)
+
+        assert recorder.rate("tokens", 60.0, 30.0) == pytest.approx(20.0)
+        assert recorder.rate("preemptions", 60.0, 30.0) == pytest.approx(0.2)
+        assert recorder.quantile("ttft", 0.5, 60.0) == pytest.approx(0.1)
+        gauge_labels = {**labels, "backend": "test", "window": "1m"}
+        assert REGISTRY.get_sample_value("token_path_tokens_per_second", gauge_labels) == (
+            pytest.approx(20.0)
+        )
+        assert REGISTRY.get_sample_value(
+            "token_path_ttft_quantile_seconds", {**gauge_labels, "quantile": "0.5"}
+        ) == pytest.approx(0.1)
+
+    def test_old_samples_leave_the_window(self):
+        recorder = WindowedRecorder(SPEC, windows=(60.0,))
+        labels = {"model": "m", "endpoint": "e"}
+        recorder.record(scrape([0, 0, 0, 0], tokens=0.0), labels, timestamp=0.0)
+        recorder.record(scrape([0, 0, 0, 10], tokens=600.0), labels, timestamp=10.0)
+
+        recorder.record(scrape([0, 10, 10, 20], tokens=600.0), labels, timestamp=100.0)
+
+        assert recorder.rate("tokens", 60.0, 100.0) == 0.0
+        assert recorder.quantile("ttft", 0.5, 60.0) == pytest.approx(0.3)
+
+    def test_counter_reset(self):
+        recorder = WindowedRecorder(SPEC, windows=(60.0,))
+        labels = {"model": "m", "endpoint": "e"}
+        recorder.record(scrape([0, 0, 0, 0], tokens=1000.0), labels, timestamp=0.0)
+
+        recorder.record(scrape([0, 0, 0, 0], tokens=120.0), labels, timestamp=12.0)
+
+        assert recorder.rate("tokens", 60.0, 12.0) == pytest.approx(10.0)
+
+    def test_bucket_layout_change_resets_histogram(self):
+        recorder = WindowedRecorder(SPEC, windows=(60.0,))
+        labels = {"model": "m", "endpoint": "e"}
+        recorder.record(scrape([0, 0, 0, 0], tokens=0.0), labels, timestamp=0.0)
+        recorder.record(scrape([5, 5, 5, 5], tokens=0.0), labels, timestamp=1.0)
+
+        bounds = ("0.2", "2", "+Inf")
+        recorder.record(scrape([1, 1, 1], tokens=0.0, bounds=bounds), labels, timestamp=2.0)
+
+        assert math.isnan(recorder.quantile("ttft", 0.5, 60.0))
+
+    def test_vllm_exporter_records_upstream_histograms(self):
+        simulator = VLLMMetricsSimulator(model="rec-model", seed=4)
+        exporter = VLLMExporter(endpoint="http://recording:8000", model="rec-model")
+        exporter.recorder = WindowedRecorder(VLLM_RECORDING_SPEC, windows=(300.0,))
+
+        for step in range(4):
+            simulator.step()
+            metrics = exporter._parse_prometheus_metrics(simulator.render())
+            exporter.recorder.record(
+                metrics, {"model": exporter.model, "endpoint": exporter.endpoint}, step * 15.0
+            )
+
+        labels = {
+            "model": "rec-model",
+            "endpoint": "http://recording:8000",
+            "backend": "vllm",
+            "window": "5m",
+        }
+        assert REGISTRY.get_sample_value("token_path_tokens_per_second", labels) > 0
+        p50 = REGISTRY.get_sample_value(
+            "token_path_itl_quantile_seconds", {**labels, "quantile": "0.5"}
+        )
+        p99 = REGISTRY.get_sample_value(
+            "token_path_itl_quantile_seconds", {**labels, "quantile": "0.99"}
+        )
+        assert 0 < p50 <= p99
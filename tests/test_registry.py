@@ -0,0 +1,78 @@
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+
+from exporters.breakdown.breakdown import remove_model_series
+from exporters.registry import Counter, DeltaHistogram, Gauge, Histogram, remove_series
+
+
+def registered(name):
+    return name in REGISTRY._names_to_collectors
+
+
+class TestDeferredMetric:
+    def test_registered_on_first_use(self):
+        gauge = Gauge("deferred_first_use", "Deferred gauge", ["endpoint"])
+        assert not gauge.constructed
+        assert not registered("deferred_first_use")
+
+        gauge.labels(endpoint="http://deferred:8000").set(3.0)
+
+        assert gauge.constructed
+        assert REGISTRY.get_sample_value(
+            "deferred_first_use", {"endpoint": "http://deferred:8000"}
+        ) == 3.0
+
+    def test_constructor_arguments_are_kept(self):
+        histogram = Histogram("deferred_buckets", "Deferred histogram", buckets=[0.5, 1.0])
+        counter = Counter("deferred_unlabelled", "Deferred counter")
+
+        histogram.observe(0.7)
+        counter.inc()
+
+        assert REGISTRY.get_sample_value("deferred_buckets_bucket", {"le": "0.5"}) == 0.0
+        assert REGISTRY.get_sample_value("deferred_buckets_bucket", {"le": "1.0"}) == 1.0
+        assert REGISTRY.get_sample_value("deferred_unlabelled_total") == 1.0
+
+    def test_removing_series_does_not_construct(self):
+        gauge = Gauge("deferred_remove", "Deferred gauge", ["model", "endpoint"])
+
+        remove_model_series([gauge], "model", "http://deferred:8000")
+
+        assert not gauge.constructed
+        assert not registered("deferred_remove")
+
+    def test_delta_histogram_merges_observations_and_deltas(self):
+        histogram = DeltaHistogram(
+            "deferred_delta", "Deferred delta histogram", ["model"], buckets=[0.5, 1.0]
+        )
+        child = histogram.labels(model="a")
+
+        child.observe(0.7, exemplar={"trace_id": "abc"})
+        child.add([2.0, 0.0, 1.0], 3.0)
+
+        labels = {"model": "a"}
+        assert child.upper_bounds == (0.5, 1.0, float("inf"))
+        assert REGISTRY.get_sample_value("deferred_delta_bucket", {**labels, "le": "0.5"}) == 2.0
+        assert REGISTRY.get_sample_value("deferred_delta_bucket", {**labels, "le": "1.0"}) == 3.0
+        assert REGISTRY.get_sample_value("deferred_delta_count", labels) == 4.0
+        assert REGISTRY.get_sample_value("deferred_delta_sum", labels) == 3.7
+
+        remove_series([histogram], model="a")
+
+        assert REGISTRY.get_sample_value("deferred_delta_count", labels) is None
+
+    def test_exporter_import_registers_no_families(self):
+        script = (
+            "import exporters.efficiency.collector\n"
+            "from prometheus_client import REGISTRY\n"
+            "names = REGISTRY._names_to_collectors\n"
+            "print(sorted(n for n in names if not n.startswith(('process_', 'python_'))))\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "[]"
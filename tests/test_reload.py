@@ -0,0 +1,196 @@
+import asyncio
+import os
+import signal
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.config import Settings, reload_settings, settings
+from exporters.efficiency.collector import EfficiencyCollector
+from exporters.reload.watcher import ConfigWatcher
+from exporters.scheduler.scheduler import AdaptiveInterval
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+
+@pytest.fixture
+def restore_settings():
+    saved = settings.model_dump()
+    yield
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+@pytest.fixture
+def env_file(tmp_path, restore_settings):
+    path = tmp_path / "reload.env"
+    path.write_text("POLL_JITTER=0.15\n")
+    return path
+
+
+class Recorder:
+    def __init__(self):
+        self.changes = []
+
+    async def __call__(self, changes):
+        self.changes.append(changes)
+
+
+def labels(exporter):
+    return {"exporter": exporter}
+
+
+class TestReloadSettings:
+    def test_reload_updates_settings_in_place(self, env_file, monkeypatch):
+        monkeypatch.delenv("POLL_JITTER", raising=False)
+        reload_settings(str(env_file))
+        env_file.write_text("POLL_JITTER=0.3\nGPU_MEMORY_BOUND_VRAM_THRESHOLD=0.8\n")
+
+        changes = reload_settings(str(env_file))
+
+        assert changes == {"poll_jitter": 0.3, "gpu_memory_bound_vram_threshold": 0.8}
+        assert settings.poll_jitter == 0.3
+        assert reload_settings(str(env_file)) == {}
+
+    def test_watcher_follows_settings_env_file(self, monkeypatch):
+        monkeypatch.setitem(Settings.model_config, "env_file", (".env", "deploy/.env.local"))
+
+        assert ConfigWatcher("reload-path", Recorder()).path == Path("deploy/.env.local")
+
+    @pytest.mark.asyncio
+    async def test_invalid_config_keeps_settings(self, env_file):
+        apply = Recorder()
+        watcher = ConfigWatcher("reload-invalid", apply, path=str(env_file))
+        await watcher.reload()
+        env_file.write_text("POLL_JITTER=fast\n")
+
+        assert await watcher.reload() == {}
+
+        assert settings.poll_jitter == 0.15
+        assert len(apply.changes) == 1
+        assert REGISTRY.get_sample_value(
+            "config_reloads_total", {**labels("reload-invalid"), "result": "invalid"}
+        ) == 1
+
+    @pytest.mark.asyncio
+    async def test_file_change_triggers_reload(self, env_file):
+        apply = Recorder()
+        watcher = ConfigWatcher("reload-file", apply, path=str(env_file), interval=0.01)
+        await watcher.reload()
+        watcher.start()
+        try:
+            env_file.write_text("POLL_JITTER=0.25\n")
+            os.utime(env_file, ns=(0, 1))
+            for _ in range(100):
+                if len(apply.changes) > 1:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await watcher.stop()
+
+        assert apply.changes[-1] == {"poll_jitter": 0.25}
+        assert REGISTRY.get_sample_value(
+            "config_last_reload_timestamp_seconds", labels("reload-file")
+        ) > 0
+
+    @pytest.mark.asyncio
+    async def test_sighup_triggers_reload(self, env_file):
+        apply = Recorder()
+        watcher = ConfigWatcher("reload-sighup", apply, path=str(env_file), interval=0)
+        await watcher.reload()
+        watcher.start()
+        try:
+            assert watcher._signal_loop is not None
+            env_file.write_text("POLL_JITTER=0.2\n")
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(100):
+                if len(apply.changes) > 1:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await watcher.stop()
+
+        assert apply.changes[-1] == {"poll_jitter": 0.2}
+
+
+class TestApplySettings:
+    def test_schedule_reconfigure_clamps_interval(self):
+        schedule = AdaptiveInterval("test", "http://reload-schedule:8000", 20.0, seed=1)
+
+        schedule.reconfigure({"poll_max_interval": 10.0, "poll_jitter": 0.3})
+
+        assert schedule.interval == 10.0
+        assert schedule.jitter == 0.3
+
+    @pytest.mark.asyncio
+    async def test_unchanged_endpoint_keeps_state(self, mock_vllm_metrics, restore_settings):
+        exporter = VLLMExporter(endpoint="http://reload-keep:8000")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(mock_vllm_metrics))
+        previous = exporter._previous_metrics
+
+        await exporter.apply_settings(
+            {"breaker_failure_threshold": 7, "model_refresh_interval": 60.0}
+        )
+
+        assert exporter._previous_metrics is previous
+        assert exporter.breaker.failure_threshold == 7
+        assert exporter.model_refresh_interval == 60.0
+
+    @pytest.mark.asyncio
+    async def test_endpoint_change_retargets(self, mock_vllm_metrics):
+        exporter = VLLMExporter(endpoint="http://reload-old:8000", model="old-model")
+        exporter.update_prometheus_metrics(exporter._parse_prometheus_metrics(mock_vllm_metrics))
+        old = {"model": "old-model", "endpoint": "http://reload-old:8000"}
+        assert REGISTRY.get_sample_value("vllm_queue_length", old) is not None
+
+        await exporter.apply_settings({"vllm_endpoint": "http://reload-new:8000/"})
+
+        assert exporter.endpoint == "http://reload-new:8000"
+        assert exporter.model == "unknown"
+        assert exporter._previous_metrics == {}
+        assert exporter._model_refresh_due()
+        assert REGISTRY.get_sample_value("vllm_queue_length", old) is None
+        assert "http://reload-old:8000" not in exporter.pool.targets
+
+    @pytest.mark.asyncio
+    async def test_retarget_keeps_earlier_reloads(self, env_file, monkeypatch):
+        monkeypatch.delenv("VLLM_ENDPOINT", raising=False)
+        exporter = VLLMExporter(endpoint="http://reload-first:8000")
+        env_file.write_text("BREAKER_FAILURE_THRESHOLD=7\nMODEL_LABEL_LIMIT=3\n")
+        await exporter.apply_settings(reload_settings(str(env_file)))
+        env_file.write_text(
+            "BREAKER_FAILURE_THRESHOLD=7\nMODEL_LABEL_LIMIT=3\n"
+            "VLLM_ENDPOINT=http://reload-second:8000\n"
+        )
+
+        await exporter.apply_settings(reload_settings(str(env_file)))
+
+        assert exporter.endpoint == "http://reload-second:8000"
+        assert exporter.breaker.failure_threshold == 7
+        assert exporter.breakdown.max_models == 3
+
+    @pytest.mark.asyncio
+    async def test_efficiency_servers_diff(self):
+        kept_endpoint = "http://reload-kept:8000"
+        dropped_endpoint = "http://reload-dropped:8080"
+        collector = EfficiencyCollector(
+            servers={kept_endpoint: "vllm", dropped_endpoint: "tgi"},
+            gpu_map={kept_endpoint: ["0"], dropped_endpoint: ["1"]},
+        )
+        kept, dropped = collector.targets
+        for target in collector.targets:
+            target.exporter.breaker.record_failure()
+
+        await collector.set_servers({kept_endpoint: "vllm", "http://reload-added:8000": "vllm"})
+
+        assert collector.targets[0] is kept
+        assert [target.endpoint for target in collector.targets] == [
+            kept_endpoint,
+            "http://reload-added:8000",
+        ]
+        assert not dropped.active
+        circuit = {"exporter": "tgi", "target": dropped_endpoint, "state": "closed"}
+        assert REGISTRY.get_sample_value("exporter_target_circuit_state", circuit) is None
+        circuit = {"exporter": "vllm", "target": kept_endpoint, "state": "closed"}
+        assert REGISTRY.get_sample_value("exporter_target_circuit_state", circuit) == 1
+        assert kept.exporter.breaker.failures == 1
@@ -0,0 +1,168 @@
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cramjam
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge
+
+from exporters.remote_write.protobuf import encode_varint
+from exporters.remote_write.writer import RemoteWriter, RemoteWriteSample
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(data: bytes):
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos : pos + 8], pos + 8
+        else:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        yield field, value
+
+
+def decode_write_request(payload: bytes) -> list[tuple[dict[str, str], list[tuple[float, int]]]]:
+    series = []
+    for _, ts in _fields(bytes(cramjam.snappy.decompress_raw(payload))):
+        labels: dict[str, str] = {}
+        samples = []
+        for field, value in _fields(ts):
+            parts = dict(_fields(value))
+            if field == 1:
+                labels[parts[1].decode()] = parts[2].decode()
+            else:
+                samples.append((struct.unpack("<d", parts[1])[0], parts[2]))
+        series.append((labels, samples))
+    return series
+
+
+class StubReceiver:
+    def __init__(self, statuses: list[int] | None = None):
+        self.statuses = list(statuses or [])
+        self.requests: list[tuple[dict[str, str], bytes]] = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), body))
+                status = receiver.statuses.pop(0) if receiver.statuses else 204
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/write"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def series(self) -> list[tuple[dict[str, str], list[tuple[float, int]]]]:
+        return [s for _, body in self.requests for s in decode_write_request(body)]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    stub = StubReceiver()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def registry():
+    registry = CollectorRegistry()
+    gauge = Gauge("test_queue_length", "Queue length", ["model"], registry=registry)
+    gauge.labels(model="llama").set(7)
+    counter = Counter("test_tokens", "Tokens", ["model"], registry=registry)
+    counter.labels(model="llama").inc(42)
+    return registry
+
+
+class TestRemoteWriter:
+    def test_encode_varint(self):
+        assert encode_varint(1) == b"\x01"
+        assert encode_varint(300) == b"\xac\x02"
+        assert len(encode_varint(-1)) == 10
+
+    def test_collect_samples(self, registry):
+        writer = RemoteWriter(url="http://localhost", external_labels={"job": "test"}, registry=registry)
+        samples = {dict(s.labels)["__name__"]: s for s in writer.collect_samples()}
+
+        assert "test_tokens_created" not in samples
+        assert samples["test_tokens_total"].value == 42.0
+        queue = dict(samples["test_queue_length"].labels)
+        assert queue == {"__name__": "test_queue_length", "job": "test", "model": "llama"}
+
+    def test_enqueue_drops_when_full(self):
+        writer = RemoteWriter(url="http://localhost", shards=1, queue_capacity=2)
+        samples = [RemoteWriteSample((("__name__", "m"),), float(i), i) for i in range(5)]
+
+        assert writer.enqueue(samples) == 3
+        assert writer.queue_depth() == 2
+
+    @pytest.mark.asyncio
+    async def test_push_to_stub_receiver(self, receiver, registry):
+        writer = RemoteWriter(
+            url=receiver.url, shards=2, batch_send_deadline=0.05, registry=registry
+        )
+        writer.start()
+        writer.push()
+        await writer.stop()
+
+        series = {labels["__name__"]: samples for labels, samples in receiver.series()}
+        assert series["test_queue_length"][0][0] == 7.0
+        assert series["test_tokens_total"][0][0] == 42.0
+        headers = receiver.requests[0][0]
+        assert headers["Content-Encoding"] == "snappy"
+        assert headers["X-Prometheus-Remote-Write-Version"] == "0.1.0"
+
+    @pytest.mark.asyncio
+    async def test_retries_on_server_error(self, receiver):
+        receiver.statuses = [503, 429]
+        writer = RemoteWriter(url=receiver.url, min_backoff=0.001)
+        batch = [RemoteWriteSample((("__name__", "m"),), 1.0, 1000)]
+
+        assert await writer._send_with_retry(batch) is True
+        assert len(receiver.requests) == 3
+        assert decode_write_request(receiver.requests[-1][1]) == [({"__name__": "m"}, [(1.0, 1000)])]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_is_not_retried(self, receiver):
+        receiver.statuses = [400]
+        writer = RemoteWriter(url=receiver.url, min_backoff=0.001)
+        batch = [RemoteWriteSample((("__name__", "m"),), 1.0, 1000)]
+
+        assert await writer._send_with_retry(batch) is False
+        assert len(receiver.requests) == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, receiver):
+        receiver.statuses = [500] * 10
+        writer = RemoteWriter(url=receiver.url, min_backoff=0.001, max_retries=2)
+        batch = [RemoteWriteSample((("__name__", "m"),), 1.0, 1000)]
+
+        assert await writer._send_with_retry(batch) is False
+        assert len(receiver.requests) == 3
+        await writer.stop()
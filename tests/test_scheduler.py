@@ -0,0 +1,147 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.gpu_exporter.exporter import GPUExporter
+from exporters.scheduler.scheduler import AdaptiveInterval
+from exporters.simulator import NvidiaSmiSimulator
+from exporters.vllm_exporter.exporter import VLLM_POLL_SIGNAL_FLOORS, VLLMExporter
+
+
+def schedule(**kwargs):
+    options = {
+        "interval": 8.0,
+        "min_interval": 1.0,
+        "max_interval": 30.0,
+        "jitter": 0.1,
+        "adaptive": True,
+        "seed": 1,
+    }
+    options.update(kwargs)
+    return AdaptiveInterval("test", options.pop("target", "http://sched:8000"), **options)
+
+
+class TestAdaptiveInterval:
+    def test_steady_signals_lengthen_interval_up_to_max(self):
+        interval = schedule()
+
+        for _ in range(20):
+            interval.observe({"queue": 4.0, "kv_cache": 0.5})
+
+        assert interval.interval == 30.0
+
+    def test_fast_changes_shorten_interval_down_to_min(self):
+        interval = schedule()
+
+        for step in range(10):
+            interval.observe({"kv_cache": 0.1 if step % 2 else 0.9})
+
+        assert interval.interval == 1.0
+        assert interval.change == pytest.approx(0.8)
+
+    def test_moderate_change_holds_interval(self):
+        interval = schedule()
+        interval.observe({"kv_cache": 0.50})
+
+        assert interval.observe({"kv_cache": 0.55}) == 8.0
+
+    def test_queue_changes_are_relative_to_floor(self):
+        interval = schedule(floors={"queue": 8.0})
+        interval.observe({"queue": 0.0})
+        interval.observe({"queue": 1.0})
+        assert interval.change == pytest.approx(0.125)
+
+        interval.observe({"queue": 100.0})
+        interval.observe({"queue": 101.0})
+        assert interval.change == pytest.approx(1 / 101)
+
+    def test_fixed_interval_when_not_adaptive(self):
+        interval = schedule(interval=15.0, max_interval=10.0, adaptive=False)
+
+        for step in range(5):
+            interval.observe({"queue": float(step * 100)})
+
+        assert interval.interval == 15.0
+
+    def test_interval_is_clamped_to_bounds(self):
+        assert schedule(interval=60.0).interval == 30.0
+        assert schedule(interval=0.1).interval == 1.0
+
+    def test_jitter_bounds(self):
+        interval = schedule(interval=10.0, jitter=0.2)
+
+        delays = [interval.next_delay() for _ in range(200)]
+        offsets = [interval.initial_delay() for _ in range(200)]
+
+        assert 8.0 <= min(delays) < max(delays) <= 12.0
+        assert 0.0 <= min(offsets) < max(offsets) <= 2.0
+        assert interval.next_delay(elapsed=20.0) == 0.0
+
+    def test_effective_interval_is_exported_per_target(self):
+        interval = schedule(target="http://sched-export:8000")
+        labels = {"exporter": "test", "target": "http://sched-export:8000"}
+        assert REGISTRY.get_sample_value("exporter_poll_interval_seconds", labels) == 8.0
+
+        interval.observe({"queue": 1.0})
+        interval.observe({"queue": 1.0})
+
+        assert REGISTRY.get_sample_value("exporter_poll_interval_seconds", labels) == 10.0
+        assert REGISTRY.get_sample_value("exporter_poll_change_ratio", labels) == 0.0
+
+
+class TestPollSignals:
+    def test_vllm_signals(self, mock_vllm_metrics):
+        exporter = VLLMExporter()
+
+        payload = mock_vllm_metrics.replace("usage_perc 75.5", "usage_perc 0.755")
+        signals = exporter.poll_signals(exporter._parse_prometheus_metrics(payload))
+
+        assert signals["queue"] == 10.0
+        assert signals["running"] == 5.0
+        assert signals["kv_cache"] == pytest.approx(0.755)
+        assert set(VLLM_POLL_SIGNAL_FLOORS) <= set(signals)
+
+    def test_gpu_signals_per_device(self):
+        exporter = GPUExporter()
+        xml_output = NvidiaSmiSimulator(num_gpus=2, seed=1).render()
+
+        signals = exporter.poll_signals(exporter._parse_gpu_stream([xml_output]))
+
+        assert set(signals) == {
+            "compute:0",
+            "memory_bandwidth:0",
+            "compute:1",
+            "memory_bandwidth:1",
+        }
+        assert all(0.0 <= value <= 1.0 for value in signals.values())
+
+    @pytest.mark.asyncio
+    async def test_vllm_collect_loop_uses_schedule(self, mock_vllm_metrics):
+        exporter = VLLMExporter(endpoint="http://sched-loop:8000")
+        metrics = exporter._parse_prometheus_metrics(mock_vllm_metrics)
+        delays = []
+
+        polls = []
+
+        async def fetch_metrics():
+            polls.append(len(delays))
+            return metrics
+
+        async def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 2:
+                exporter.stop()
+
+        with (
+            patch.object(exporter, "fetch_model_info", new_callable=AsyncMock),
+            patch.object(exporter, "fetch_metrics", side_effect=fetch_metrics),
+            patch("exporters.vllm_exporter.exporter.asyncio.sleep", side_effect=sleep),
+        ):
+            await exporter.collect_loop(interval=4.0)
+
+        schedule = exporter.schedule
+        assert schedule.target == "http://sched-loop:8000"
+        assert polls == [0, 1]
+        assert 4.0 * (1 - schedule.jitter) <= delays[0] <= 4.0 * (1 + 2 * schedule.jitter)
+        assert delays[1] <= schedule.interval * (1 + schedule.jitter)
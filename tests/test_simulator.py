@@ -0,0 +1,145 @@
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from exporters.gpu_exporter.exporter import GPUExporter
+from exporters.simulator.nvidia_smi import NvidiaSmiSimulator
+from exporters.simulator.payloads import TGIMetricsSimulator, VLLMMetricsSimulator
+from exporters.simulator.server import MockInferenceServer
+from exporters.tgi_exporter.exporter import TGIExporter
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+
+class TestMetricsSimulators:
+    def test_vllm_payload_scales_with_models(self):
+        small = VLLMMetricsSimulator(seed=0)
+        large = VLLMMetricsSimulator(num_models=51, num_gpus=8, seed=0)
+
+        assert large.series_count() > 40 * small.series_count()
+        assert large.series_count() > 4000
+
+    def test_vllm_payload_is_parsed_by_exporter(self):
+        simulator = VLLMMetricsSimulator(num_models=2, num_adapters=3, num_gpus=2, seed=0)
+        exporter = VLLMExporter(model="test-model")
+
+        metrics = exporter._parse_prometheus_metrics(simulator.render())
+
+        assert len(metrics["vllm:num_requests_running"]) == 2
+        assert "vllm:time_to_first_token_seconds_bucket" in metrics
+        assert set(exporter._extract_gpu_memory(metrics)) == {0, 1}
+        exporter.update_prometheus_metrics(metrics)
+
+    def test_histograms_are_cumulative_and_counters_monotonic(self):
+        simulator = VLLMMetricsSimulator(seed=0)
+        exporter = VLLMExporter()
+
+        first = exporter._parse_prometheus_metrics(simulator.render())
+        second = exporter._parse_prometheus_metrics(simulator.render())
+
+        buckets = [b["value"] for b in second["vllm:time_to_first_token_seconds_bucket"]]
+        assert buckets == sorted(buckets)
+        assert second["vllm:total_tokens"] >= first["vllm:total_tokens"]
+
+    def test_counter_reset(self):
+        simulator = VLLMMetricsSimulator(seed=0, requests_per_step=50)
+        exporter = VLLMExporter()
+        for _ in range(3):
+            simulator.render()
+        before = exporter._parse_prometheus_metrics(simulator.render())
+
+        simulator.reset_probability = 1.0
+        after = exporter._parse_prometheus_metrics(simulator.render())
+
+        assert after["vllm:total_tokens"] < before["vllm:total_tokens"]
+
+    def test_tgi_payload_is_parsed_by_exporter(self):
+        simulator = TGIMetricsSimulator(num_adapters=2, seed=0)
+        exporter = TGIExporter(model="test-model")
+
+        metrics = exporter._parse_prometheus_metrics(simulator.render())
+
+        assert "tgi_queue_size" in metrics
+        assert len(metrics["tgi_request_duration_count"]) == 3
+        exporter.update_prometheus_metrics(metrics)
+
+
+class TestNvidiaSmiSimulator:
+    @pytest.mark.parametrize("num_gpus", [1, 8, 16])
+    def test_collect_metrics(self, num_gpus):
+        xml_output = NvidiaSmiSimulator(num_gpus=num_gpus, processes_per_gpu=3, seed=0).render()
+        exporter = GPUExporter()
+        exporter._stream_nvidia_smi = lambda args: iter([xml_output.encode()])
+
+        metrics_list = exporter.collect_metrics()
+
+        assert len(metrics_list) == num_gpus
+        assert all(m.process_count == 3 for m in metrics_list)
+        assert len({m.gpu_uuid for m in metrics_list}) == num_gpus
+        assert [m.gpu_id for m in metrics_list] == list(range(num_gpus))
+        assert all(m.compute_utilization > 0 for m in metrics_list)
+
+    def test_fake_binary(self):
+        env = {**os.environ, "SIM_NVIDIA_SMI_GPUS": "2", "SIM_NVIDIA_SMI_SEED": "1"}
+        result = subprocess.run(
+            [sys.executable, "-m", "exporters.simulator.nvidia_smi", "-q", "-x"],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+        assert result.returncode == 0
+        assert "<attached_gpus>2</attached_gpus>" in result.stdout
+
+    def test_fake_binary_error(self):
+        env = {**os.environ, "SIM_NVIDIA_SMI_ERROR_RATE": "1"}
+        result = subprocess.run(
+            [sys.executable, "-m", "exporters.simulator.nvidia_smi"],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+        assert result.returncode != 0
+        assert result.stdout == ""
+
+
+class TestMockInferenceServer:
+    def test_serves_metrics_and_models(self):
+        server = MockInferenceServer(num_adapters=2, seed=0).start()
+        try:
+            metrics = httpx.get(f"{server.endpoint}/metrics")
+            models = httpx.get(f"{server.endpoint}/v1/models").json()
+        finally:
+            server.stop()
+
+        assert "vllm:time_to_first_token_seconds_bucket" in metrics.text
+        assert 'model_name="lora-adapter' not in metrics.text
+        assert 'running_lora_adapters="lora-adapter-0000,lora-adapter-0001"' in metrics.text
+        assert [m["id"] for m in models["data"]] == [
+            "mock-model",
+            "lora-adapter-0000",
+            "lora-adapter-0001",
+        ]
+
+    def test_tgi_info(self):
+        server = MockInferenceServer(backend="tgi", model="bigscience/bloom").start()
+        try:
+            info = httpx.get(f"{server.endpoint}/info").json()
+            metrics = httpx.get(f"{server.endpoint}/metrics").text
+        finally:
+            server.stop()
+
+        assert info["model_id"] == "bigscience/bloom"
+        assert "tgi_queue_size" in metrics
+
+    def test_error_rate(self):
+        server = MockInferenceServer(error_rate=1.0).start()
+        try:
+            response = httpx.get(f"{server.endpoint}/metrics")
+        finally:
+            server.stop()
+
+        assert response.status_code == 500
@@ -0,0 +1,129 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.config import Settings
+from exporters.slo.engine import (
+    SLO,
+    BurnRateAlert,
+    SLOEngine,
+    SLOSpec,
+    default_slos,
+    latency_good_total,
+)
+from exporters.tgi_exporter.exporter import TGI_SLO_SPEC
+from exporters.vllm_exporter.exporter import VLLM_SLO_SPEC
+
+SPEC = SLOSpec(
+    backend="test",
+    ttft_histogram="ttft",
+    success_counter="success",
+    failure_counter="failure",
+)
+LABELS = {"model": "slo-model", "endpoint": "http://slo:8000"}
+
+
+def scrape(fast, slow, success=0.0, failure=0.0):
+    return {
+        "ttft_bucket": [
+            {"labels": {"le": "1.0"}, "value": fast},
+            {"labels": {"le": "5.0"}, "value": fast},
+            {"labels": {"le": "+Inf"}, "value": fast + slow},
+        ],
+        "success": success,
+        "failure": failure,
+    }
+
+
+def engine(alerts=()):
+    return SLOEngine(
+        SPEC,
+        slos=[SLO("ttft", 0.99, 5.0), SLO("itl", 0.99, 0.1), SLO("errors", 0.999)],
+        windows=(300.0, 3600.0),
+        budget_period=86400.0,
+        alerts=alerts,
+    )
+
+
+class TestSLOEngine:
+    def test_default_slos(self):
+        config = Settings(slo_ttft_seconds=2.0, slo_error_objective=0.995)
+
+        slos = {slo.name: slo for slo in default_slos(config)}
+
+        assert slos["ttft"].threshold == 2.0
+        assert slos["errors"].error_budget == pytest.approx(0.005)
+
+    def test_slos_without_sources_are_dropped(self):
+        assert [slo.name for slo in engine().slos] == ["ttft", "errors"]
+        assert [slo.name for slo in SLOEngine(VLLM_SLO_SPEC).slos] == ["ttft", "itl"]
+        assert [slo.name for slo in SLOEngine(TGI_SLO_SPEC).slos] == ["itl", "errors"]
+
+    def test_latency_good_total(self):
+        assert latency_good_total(scrape(90, 10), "ttft", 5.0) == (90, 100)
+        assert latency_good_total(scrape(90, 10), "ttft", 0.5) == (0.0, 100)
+        assert latency_good_total({}, "ttft", 5.0) is None
+
+    def test_burn_rate(self):
+        slo_engine = engine()
+        slo = slo_engine.slos[0]
+        slo_engine.record(scrape(0, 0), LABELS, timestamp=0.0)
+
+        slo_engine.record(scrape(980, 20), LABELS, timestamp=60.0)
+
+        assert slo_engine.burn_rate(slo, 300.0) == pytest.approx(2.0)
+        assert slo_engine.burn_rate(slo, 3600.0) == pytest.approx(2.0)
+        assert slo_engine.error_budget_remaining(slo) == pytest.approx(-1.0)
+
+    def test_short_window_recovers_first(self):
+        slo_engine = engine()
+        slo = slo_engine.slos[0]
+        slo_engine.record(scrape(0, 0), LABELS, timestamp=0.0)
+        slo_engine.record(scrape(900, 100), LABELS, timestamp=60.0)
+
+        slo_engine.record(scrape(1900, 100), LABELS, timestamp=1000.0)
+
+        assert slo_engine.burn_rate(slo, 300.0) == 0.0
+        assert slo_engine.burn_rate(slo, 3600.0) == pytest.approx(5.0)
+
+    def test_error_slo(self):
+        slo_engine = engine()
+        slo = slo_engine.slos[1]
+        slo_engine.record(scrape(0, 0, success=100, failure=0), LABELS, timestamp=0.0)
+
+        slo_engine.record(scrape(0, 0, success=1099, failure=1), LABELS, timestamp=30.0)
+
+        assert slo_engine.burn_rate(slo, 300.0) == pytest.approx(1.0)
+        assert slo_engine.error_budget_remaining(slo) == pytest.approx(0.0)
+
+    def test_counter_reset(self):
+        slo_engine = engine()
+        slo = slo_engine.slos[0]
+        slo_engine.record(scrape(5000, 0), LABELS, timestamp=0.0)
+
+        slo_engine.record(scrape(99, 1), LABELS, timestamp=30.0)
+
+        assert slo_engine.burn_rate(slo, 300.0) == pytest.approx(1.0)
+
+    def test_multi_window_alert(self):
+        alert = BurnRateAlert("page", long_window=3600.0, short_window=300.0, burn_rate=14.4)
+        slo_engine = engine(alerts=(alert,))
+        slo = slo_engine.slos[0]
+        slo_engine.record(scrape(0, 0), LABELS, timestamp=0.0)
+
+        slo_engine.record(scrape(800, 200), LABELS, timestamp=60.0)
+        assert slo_engine.firing(slo, alert) is True
+        labels = {**LABELS, "backend": "test", "slo": "ttft"}
+        assert REGISTRY.get_sample_value("slo_alert_firing", {**labels, "severity": "page"}) == 1
+        assert REGISTRY.get_sample_value("slo_burn_rate", {**labels, "window": "5m"}) == (
+            pytest.approx(20.0)
+        )
+        assert REGISTRY.get_sample_value("slo_objective_ratio", labels) == 0.99
+
+        slo_engine.record(scrape(10800, 200), LABELS, timestamp=700.0)
+        assert slo_engine.firing(slo, alert) is False
+        assert REGISTRY.get_sample_value("slo_alert_firing", {**labels, "severity": "page"}) == 0
+
+    def test_alerts_require_configured_windows(self):
+        alert = BurnRateAlert("ticket", long_window=21600.0, short_window=1800.0, burn_rate=6.0)
+
+        assert engine(alerts=(alert,)).alerts == ()
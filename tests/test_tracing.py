@@ -0,0 +1,315 @@
+import asyncio
+import gzip
+import json
+import random
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from prometheus_client.openmetrics.exposition import generate_latest
+
+from exporters.otlp.protobuf import STATUS_CODE_ERROR
+from exporters.tracing.collector import TraceCollector
+from exporters.tracing.events import LifecycleEvent, parse_events
+from exporters.tracing.exemplars import EXEMPLAR_MAX_RUNES, ExemplarReservoir, exemplar_labels
+from exporters.tracing.sampler import (
+    DROP,
+    KEEP_BASELINE,
+    KEEP_ERROR,
+    KEEP_PREEMPTED,
+    KEEP_SLOW_TTFT,
+    SamplingPolicy,
+    TailSampler,
+)
+from exporters.tracing.sink import OTLPTraceSink
+from exporters.tracing.trace import RequestTrace
+from tests.test_otlp import StubOTLPReceiver, _group
+
+
+def lifecycle(request_id, ttft=0.1, decode=1.0, preempted=False, error=None, start=1000.0):
+    events = [
+        LifecycleEvent(request_id, "queued", start, {"prompt_tokens": 12}),
+        LifecycleEvent(request_id, "scheduled", start + 0.02),
+        LifecycleEvent(request_id, "prefill_done", start + ttft - 0.01),
+        LifecycleEvent(request_id, "first_token", start + ttft),
+    ]
+    if preempted:
+        events.append(LifecycleEvent(request_id, "preempted", start + ttft + decode / 2))
+    if error:
+        events.append(LifecycleEvent(request_id, "error", start + ttft + 0.1, {"error": error}))
+    else:
+        events.append(
+            LifecycleEvent(
+                request_id, "last_token", start + ttft + decode, {"output_tokens": 64}
+            )
+        )
+    return events
+
+
+def collector(baseline_ratio=0.0, sink=None, **kwargs):
+    sampler = TailSampler(
+        SamplingPolicy(slow_ttft=2.0, slow_e2e=30.0, baseline_ratio=baseline_ratio),
+        rng=random.Random(0),
+    )
+    return TraceCollector(
+        backend="vllm",
+        model="trace-model",
+        endpoint="http://tracing:8000",
+        sampler=sampler,
+        sink=sink,
+        **kwargs,
+    )
+
+
+def _string_attributes(values: list[bytes]) -> dict[str, str]:
+    attributes = {}
+    for kv in values:
+        parts = _group(kv)
+        value = _group(parts[2][0])
+        if 1 in value:
+            attributes[parts[1][0].decode()] = value[1][0].decode()
+    return attributes
+
+
+def decode_spans(payload: bytes) -> list[dict]:
+    spans = []
+    for resource_spans in _group(gzip.decompress(payload))[1]:
+        for scope_spans in _group(resource_spans)[2]:
+            for span in _group(scope_spans).get(2, []):
+                fields = _group(span)
+                status = _group(fields[15][0]) if 15 in fields else {}
+                spans.append(
+                    {
+                        "trace_id": fields[1][0].hex(),
+                        "parent": fields[4][0].hex() if 4 in fields else "",
+                        "name": fields[5][0].decode(),
+                        "attributes": _string_attributes(fields.get(9, [])),
+                        "events": len(fields.get(11, [])),
+                        "status": status.get(3, [0])[0],
+                    }
+                )
+    return spans
+
+
+class TestLifecycleEvents:
+    def test_parse_json_lines_and_arrays(self):
+        lines = (
+            b'{"request_id": "a", "event": "queued", "timestamp": 1.0, "model": "m"}\n'
+            b"not json\n"
+        )
+        array = json.dumps([{"request_id": "b", "event": "first_token", "timestamp": 2}]).encode()
+
+        assert parse_events(lines) == [LifecycleEvent("a", "queued", 1.0, {"model": "m"})]
+        assert parse_events(array)[0].event == "first_token"
+
+    def test_unknown_or_incomplete_events_are_skipped(self):
+        payload = (
+            b'[{"request_id": "a", "event": "teleported", "timestamp": 1}, {"event": "queued"}]'
+        )
+
+        assert parse_events(payload) == []
+
+
+class TestRequestTrace:
+    def test_spans_cover_each_phase(self):
+        trace = RequestTrace("req-1", received=0.0)
+        for event in lifecycle("req-1", ttft=0.5, preempted=True):
+            trace.add(event)
+
+        spans = trace.to_spans(b"\x01" * 16, "vllm", "m")
+
+        assert trace.complete
+        assert trace.ttft == pytest.approx(0.5)
+        assert trace.e2e == pytest.approx(1.5)
+        assert [span.name for span in spans] == ["vllm.request", "queue", "prefill", "decode"]
+        assert all(span.parent_span_id == spans[0].span_id for span in spans[1:])
+        assert len(spans[0].events) == 1
+        assert len(spans[3].events) == 1
+        assert ("llm.output_tokens", 64) in spans[0].attributes
+
+    def test_error_status(self):
+        trace = RequestTrace("req-2", received=0.0)
+        for event in lifecycle("req-2", error="CUDA out of memory"):
+            trace.add(event)
+
+        root = trace.to_spans(b"\x02" * 16, "vllm", "m")[0]
+
+        assert trace.failed
+        assert root.status_code == STATUS_CODE_ERROR
+        assert root.status_message == "CUDA out of memory"
+
+
+class TestTailSampler:
+    def decide(self, events, baseline_ratio=0.0):
+        trace = RequestTrace(events[0].request_id, received=0.0)
+        for event in events:
+            trace.add(event)
+        sampler = TailSampler(SamplingPolicy(2.0, 30.0, baseline_ratio), random.Random(1))
+        return sampler.decide(trace)
+
+    def test_decisions(self):
+        assert self.decide(lifecycle("ok")) == DROP
+        assert self.decide(lifecycle("slow", ttft=3.0)) == KEEP_SLOW_TTFT
+        assert self.decide(lifecycle("err", error="boom")) == KEEP_ERROR
+        assert self.decide(lifecycle("pre", preempted=True)) == KEEP_PREEMPTED
+        assert self.decide(lifecycle("base"), baseline_ratio=1.0) == KEEP_BASELINE
+
+
+class TestExemplarReservoir:
+    def test_keeps_most_extreme_per_bucket(self):
+        reservoir = ExemplarReservoir([0.1, 1.0, float("inf")], window=60.0)
+
+        assert reservoir.offer(0.5, now=0.0)
+        assert not reservoir.offer(0.3, now=1.0)
+        assert reservoir.offer(0.8, now=2.0)
+        assert reservoir.offer(0.05, now=3.0)
+        assert reservoir.offer(5.0, now=4.0)
+
+    def test_window_expiry_resets_bucket(self):
+        reservoir = ExemplarReservoir([1.0], window=60.0)
+        reservoir.offer(0.9, now=0.0)
+        reservoir.offer(0.95, now=50.0)
+
+        assert not reservoir.offer(0.2, now=59.0)
+        assert reservoir.offer(0.2, now=61.0)
+
+    def test_traced_requests_take_precedence(self):
+        reservoir = ExemplarReservoir([1.0], window=60.0)
+        reservoir.offer(0.9, now=0.0)
+
+        assert reservoir.offer(0.4, now=1.0, traced=True)
+        assert not reservoir.offer(0.95, now=2.0)
+
+    def test_labels_fit_exemplar_limit(self):
+        labels = exemplar_labels("cmpl-" + "f" * 200, 1024, 77, trace_id="a" * 32)
+
+        assert sum(len(k) + len(v) for k, v in labels.items()) <= EXEMPLAR_MAX_RUNES
+        assert labels["prompt_tokens"] == "1024"
+        assert labels["request_id"].endswith("fff")
+
+
+class TestTraceCollector:
+    def test_only_kept_traces_get_exemplars(self):
+        trace_collector = collector()
+        for event in lifecycle("fast-1", ttft=0.03):
+            trace_collector.ingest(event)
+        for event in lifecycle("slow-1", ttft=4.0):
+            trace_collector.ingest(event)
+
+        labels = {"model": "trace-model", "endpoint": "http://tracing:8000"}
+        assert REGISTRY.get_sample_value("vllm_ttft_seconds_count", labels) == 2
+        exposition = generate_latest(REGISTRY).decode()
+        bucket_lines = [
+            line
+            for line in exposition.splitlines()
+            if line.startswith("vllm_ttft_seconds_bucket") and "http://tracing:8000" in line
+        ]
+        assert any('le="5.0"' in line and "trace_id=" in line for line in bucket_lines)
+        assert not any('le="0.05"' in line and "trace_id=" in line for line in bucket_lines)
+        assert not trace_collector.pending
+
+    def test_exemplar_carries_request_details(self):
+        trace_collector = collector()
+        trace_collector.endpoint = "http://exemplar:8000"
+
+        for event in lifecycle("cmpl-slow", ttft=0.3, decode=6.3):
+            trace_collector.ingest(event, now=0.0)
+        for event in lifecycle("cmpl-slower", ttft=0.4, decode=6.3):
+            trace_collector.ingest(event, now=1.0)
+        for event in lifecycle("cmpl-fast", ttft=0.26, decode=6.3):
+            trace_collector.ingest(event, now=2.0)
+
+        exposition = generate_latest(REGISTRY).decode()
+        ttft_exemplars = [
+            line.split(" # ")[1]
+            for line in exposition.splitlines()
+            if line.startswith("vllm_ttft_seconds_bucket")
+            and "http://exemplar:8000" in line
+            and 'le="0.5"' in line
+        ]
+        assert ttft_exemplars[0].startswith("{")
+        assert 'request_id="cmpl-slower"' in ttft_exemplars[0]
+        assert 'prompt_tokens="12"' in ttft_exemplars[0]
+        assert 'output_tokens="64"' in ttft_exemplars[0]
+        labels = {"model": "trace-model", "endpoint": "http://exemplar:8000"}
+        assert REGISTRY.get_sample_value("vllm_itl_seconds_sum", labels) == pytest.approx(0.3)
+
+    def test_pending_buffer_is_bounded(self):
+        trace_collector = collector(max_pending=2)
+
+        for request_id in ("a", "b", "c"):
+            trace_collector.ingest(LifecycleEvent(request_id, "queued", 1.0), now=0.0)
+
+        assert list(trace_collector.pending) == ["b", "c"]
+
+    def test_expire_stale_requests(self):
+        trace_collector = collector(pending_timeout=60.0)
+        trace_collector.ingest(LifecycleEvent("old", "queued", 1.0), now=0.0)
+        trace_collector.ingest(LifecycleEvent("new", "queued", 1.0), now=50.0)
+
+        assert trace_collector.expire(now=90.0) == 1
+        assert list(trace_collector.pending) == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_sampled_traces_reach_otlp_sink(self):
+        receiver = StubOTLPReceiver()
+        try:
+            sink = OTLPTraceSink(endpoint=receiver.url)
+            trace_collector = collector(sink=sink)
+            sink.start()
+            for request_id, kwargs in (
+                ("fast", {}),
+                ("slow", {"ttft": 3.0}),
+                ("failed", {"error": "boom"}),
+            ):
+                for event in lifecycle(request_id, **kwargs):
+                    trace_collector.ingest(event)
+            await sink.stop()
+        finally:
+            receiver.close()
+
+        path, headers, body = receiver.requests[0]
+        assert path == "/v1/traces"
+        assert headers["Content-Encoding"] == "gzip"
+        spans = decode_spans(body)
+        roots = {s["attributes"]["request.id"]: s for s in spans if s["name"] == "vllm.request"}
+        assert set(roots) == {"slow", "failed"}
+        assert roots["failed"]["status"] == STATUS_CODE_ERROR
+        slow_children = [
+            s for s in spans if s["trace_id"] == roots["slow"]["trace_id"] and s["parent"]
+        ]
+        assert {s["name"] for s in slow_children} == {"queue", "prefill", "decode"}
+
+    @pytest.mark.asyncio
+    async def test_ingest_endpoint(self):
+        trace_collector = collector(ingest_port=0)
+        trace_collector.start_ingest_server(asyncio.get_running_loop())
+        port = trace_collector._server.server_address[1]
+        payload = "\n".join(
+            json.dumps({"request_id": "http-1", "event": "queued", "timestamp": 5.0, "model": "m"})
+            for _ in range(2)
+        )
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"http://127.0.0.1:{port}/v1/events", content=payload
+                )
+                missing = await client.post(f"http://127.0.0.1:{port}/other", content=payload)
+            await asyncio.sleep(0.05)
+        finally:
+            trace_collector._server.shutdown()
+            trace_collector._server.server_close()
+
+        assert response.status_code == 202
+        assert missing.status_code == 404
+        assert trace_collector.pending["http-1"].attributes == {"model": "m"}
+
+    def test_sink_queue_is_bounded(self):
+        sink = OTLPTraceSink(endpoint="http://localhost:4318", queue_capacity=1)
+        trace_collector = collector(sink=sink)
+
+        for request_id in ("e1", "e2"):
+            for event in lifecycle(request_id, error="boom"):
+                trace_collector.ingest(event)
+
+        assert sink.queue_depth() == 1
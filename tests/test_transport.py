@@ -0,0 +1,89 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from exporters.simulator.server import MockInferenceServer
+from exporters.transport import pool as transport_pool
+from exporters.transport.pool import ClientPool, target_timeout
+from exporters.vllm_exporter.exporter import VLLMExporter
+
+
+@pytest.fixture
+def mock_server():
+    server = MockInferenceServer(seed=1).start()
+    yield server
+    server.stop()
+
+
+class TestClientPool:
+    def test_target_timeout_separates_connect_and_read(self):
+        timeout = target_timeout(connect=1.5, read=20.0)
+
+        assert timeout.connect == 1.5
+        assert timeout.read == 20.0
+
+    def test_tcp_targets_share_client_and_scale_limits(self):
+        pool = ClientPool("pool-scale", connections_per_target=3, keepalive_per_target=2)
+
+        first = pool.client("http://scale-a:8000")
+        second = pool.client("http://scale-b:8000/")
+
+        assert first is not second
+        assert pool.client("http://scale-a:8000/") is second
+        assert pool._limits[None].max_connections == 6
+        assert pool._limits[None].max_keepalive_connections == 4
+        assert pool._retired == [first]
+        assert REGISTRY.get_sample_value("http_pool_max_connections", {"pool": "pool-scale"}) == 6
+
+    @pytest.mark.asyncio
+    async def test_release_rebuilds_shared_client(self):
+        pool = ClientPool("pool-release", connections_per_target=3)
+        pool.client("http://release-a:8000")
+        retired = pool.client("http://release-b:8000")
+
+        await pool.release("http://release-b:8000")
+
+        assert pool.client("http://release-a:8000") is not retired
+        assert pool._limits[None].max_connections == 3
+        assert REGISTRY.get_sample_value("http_pool_max_connections", {"pool": "pool-release"}) == 3
+        await pool.aclose()
+        assert retired.is_closed
+        assert not pool._retired
+
+    def test_unix_socket_target_gets_dedicated_client(self):
+        pool = ClientPool("pool-uds", uds_paths={"http://uds:8000/": "/run/vllm.sock"})
+
+        uds = pool.client("http://uds:8000")
+        tcp = pool.client("http://tcp:8000")
+
+        assert uds is not tcp
+        assert pool.targets == {"http://tcp:8000": None}
+        assert pool._limits["http://uds:8000"].max_connections == 4
+
+    def test_http2_falls_back_without_h2(self, monkeypatch):
+        monkeypatch.setattr(transport_pool, "h2", None)
+
+        assert ClientPool("pool-h2", http2=True).http2 is False
+
+    def test_exporters_share_pool(self):
+        pool = ClientPool("pool-shared")
+
+        first = VLLMExporter(endpoint="http://shared-a:8000", pool=pool)
+        second = VLLMExporter(endpoint="http://shared-b:8000", pool=pool)
+        clients = [exporter.client for exporter in (first, second)]
+
+        assert first.client is second.client is clients[-1]
+        assert len(pool.targets) == 2
+
+    @pytest.mark.asyncio
+    async def test_keepalive_reuses_connection(self, mock_server):
+        pool = ClientPool("pool-reuse")
+        client = pool.client(mock_server.endpoint)
+
+        for _ in range(3):
+            response = await client.get(f"{mock_server.endpoint}/metrics")
+            response.raise_for_status()
+        await pool.aclose()
+
+        labels = {"pool": "pool-reuse", "target": mock_server.endpoint}
+        assert REGISTRY.get_sample_value("http_client_requests_total", labels) == 3
+        assert REGISTRY.get_sample_value("http_client_connections_opened_total", labels) == 1
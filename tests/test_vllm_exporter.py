@@ -106,6 +106,27 @@ class TestVLLMExporter:
 
             assert exporter.model == "llama-2-70b"
 
+    @pytest.mark.asyncio
+    async def test_fetch_model_info_prefers_base_model_over_adapters(self):
+        exporter = VLLMExporter(endpoint="http://lora:8000")
+
+        with patch.object(exporter.client, "get", new_callable=AsyncMock) as mock_get:
+            mock_response = MagicMock()
+            mock_response.json.return_value = {
+                "data": [
+                    {"id": "sql-lora", "parent": "llama-3-8b"},
+                    {"id": "llama-3-8b", "parent": None},
+                ]
+            }
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value = mock_response
+
+            await exporter.fetch_model_info()
+
+            assert exporter.model == "llama-3-8b"
+            assert list(exporter.breakdown.models) == ["sql-lora"]
+            assert not exporter._model_refresh_due()
+
     def test_stop(self):
         exporter = VLLMExporter()
         exporter._running = True